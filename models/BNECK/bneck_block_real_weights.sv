@@ -34,6 +34,15 @@ module bneck_block_real_weights #(
     output logic                    ready
 );
 
+    // Debug output level, set with +VERBOSITY=0..3 or +QUIET (levels: see tb_full_system_top.sv)
+    int verbosity = 2;
+    `ifndef SYNTHESIS
+    initial begin
+        if ($test$plusargs("QUIET")) verbosity = 0;
+        void'($value$plusargs("VERBOSITY=%d", verbosity));
+    end
+    `endif
+
     // Internal signals for conv1 (1x1 expansion)
     logic conv1_valid_out, conv1_ready;
     logic [DATA_WIDTH-1:0] conv1_data_out;
@@ -194,7 +203,7 @@ module bneck_block_real_weights #(
     
     // Debug output
     always @(posedge clk) begin
-        if (current_state != next_state) begin
+        if (verbosity >= 2 && current_state != next_state) begin
             case (next_state)
                 CONV1_PROCESSING: $display("REAL WEIGHTS BNECK_%0d: Starting Conv1 (1x1 expansion)", BNECK_ID);
                 CONV2_PROCESSING: $display("REAL WEIGHTS BNECK_%0d: Starting Conv2 (3x3 depthwise)", BNECK_ID);
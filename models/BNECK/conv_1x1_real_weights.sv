@@ -33,6 +33,9 @@ module conv_1x1_real_weights #(
     output logic                    ready
 );
 
+    // Debug output level, set with +VERBOSITY=0..3 or +QUIET (levels: see tb_full_system_top.sv)
+    int verbosity = 2;
+
     // Real trained weights memory
     localparam MAX_WEIGHTS = 8192; // Maximum weights for any BNECK conv layer
     reg signed [15:0] weights [0:MAX_WEIGHTS-1];
@@ -43,6 +46,8 @@ module conv_1x1_real_weights #(
     // Load real trained weights
     `ifndef SYNTHESIS
     initial begin
+        if ($test$plusargs("QUIET")) verbosity = 0;
+        void'($value$plusargs("VERBOSITY=%d", verbosity));
         // Generate weight file path based on BNECK_ID and CONV_ID
         $sformat(weight_file, "memory_files/bneck_%0d_conv%0d_conv.mem", BNECK_ID, CONV_ID);
         
@@ -53,10 +58,11 @@ module conv_1x1_real_weights #(
         
         // Load real weights
         $readmemh(weight_file, weights);
-        $display("REAL WEIGHTS BNECK_%0d_CONV%0d: Loaded weights from %s", BNECK_ID, CONV_ID, weight_file);
+        if (verbosity >= 1)
+            $display("REAL WEIGHTS BNECK_%0d_CONV%0d: Loaded weights from %s", BNECK_ID, CONV_ID, weight_file);
         
         // Debug: Show some weight values
-        $display("  Sample weights: [0]=%04x, [1]=%04x, [2]=%04x", 
+        if (verbosity >= 2) $display("  Sample weights: [0]=%04x, [1]=%04x, [2]=%04x", 
                 weights[0], weights[1], weights[2]);
     end
     `endif
@@ -195,7 +201,7 @@ module conv_1x1_real_weights #(
     
     // Debug output
     always @(posedge clk) begin
-        if (current_state == ACCUMULATING && pipe_valid[PIPELINE_STAGES-1]) begin
+        if (verbosity >= 3 && current_state == ACCUMULATING && pipe_valid[PIPELINE_STAGES-1]) begin
             $display("REAL WEIGHTS BNECK_%0d_CONV%0d: Using real weight=0x%04x for in_ch=%0d, out_ch=%0d", 
                     BNECK_ID, CONV_ID, get_real_weight(pipe_channel[PIPELINE_STAGES-1], output_ch_counter),
                     pipe_channel[PIPELINE_STAGES-1], output_ch_counter);
@@ -30,6 +30,9 @@ module conv_3x3_dw_real_weights #(
     output logic                    ready
 );
 
+    // Debug output level, set with +VERBOSITY=0..3 or +QUIET (levels: see tb_full_system_top.sv)
+    int verbosity = 2;
+
     // Real trained weights memory (3x3 = 9 weights per channel)
     localparam MAX_WEIGHTS = CHANNELS * 9; // 9 weights per channel for 3x3 kernel
     reg signed [15:0] weights [0:MAX_WEIGHTS-1];
@@ -40,6 +43,8 @@ module conv_3x3_dw_real_weights #(
     // Load real trained weights
     `ifndef SYNTHESIS
     initial begin
+        if ($test$plusargs("QUIET")) verbosity = 0;
+        void'($value$plusargs("VERBOSITY=%d", verbosity));
         // Generate weight file path for conv2 (depthwise)
         $sformat(weight_file, "memory_files/bneck_%0d_conv2_conv.mem", BNECK_ID);
         
@@ -50,10 +55,11 @@ module conv_3x3_dw_real_weights #(
         
         // Load real weights
         $readmemh(weight_file, weights);
-        $display("REAL WEIGHTS BNECK_%0d_DW: Loaded depthwise weights from %s", BNECK_ID, weight_file);
+        if (verbosity >= 1)
+            $display("REAL WEIGHTS BNECK_%0d_DW: Loaded depthwise weights from %s", BNECK_ID, weight_file);
         
         // Debug: Show some weight values
-        $display("  Sample DW weights: [0]=%04x, [1]=%04x, [8]=%04x", 
+        if (verbosity >= 2) $display("  Sample DW weights: [0]=%04x, [1]=%04x, [8]=%04x", 
                 weights[0], weights[1], weights[8]);
     end
     `endif
@@ -166,7 +172,7 @@ module conv_3x3_dw_real_weights #(
     
     // Debug output
     always @(posedge clk) begin
-        if (window_valid) begin
+        if (verbosity >= 3 && window_valid) begin
             $display("REAL WEIGHTS BNECK_%0d_DW: 3x3 conv with real weights, ch=%0d, result=0x%08x", 
                     BNECK_ID, current_channel, conv_result);
             if (current_channel == 0) begin // Only show for first channel to reduce spam
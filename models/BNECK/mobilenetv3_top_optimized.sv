@@ -43,6 +43,15 @@ module mobilenetv3_top_optimized #(
     output logic                    debug_block0_valid_out
 );
 
+    // Debug output level, set with +VERBOSITY=0..3 or +QUIET (levels: see tb_full_system_top.sv)
+    int verbosity = 2;
+    `ifndef SYNTHESIS
+    initial begin
+        if ($test$plusargs("QUIET")) verbosity = 0;
+        void'($value$plusargs("VERBOSITY=%d", verbosity));
+    end
+    `endif
+
     // Internal state
     typedef enum logic [1:0] {
         IDLE,
@@ -163,7 +172,7 @@ module mobilenetv3_top_optimized #(
     
     // Debug: Monitor state transitions
     always @(posedge clk) begin
-        if (current_state != next_state) begin
+        if (verbosity >= 2 && current_state != next_state) begin
             $display("BNeck state transition: %s -> %s at time %0t", 
                      current_state.name(), next_state.name(), $time);
         end
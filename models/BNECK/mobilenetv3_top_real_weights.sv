@@ -26,6 +26,15 @@ module mobilenetv3_top_real_weights #(
     output logic valid_out
 );
 
+    // Debug output level, set with +VERBOSITY=0..3 or +QUIET (levels: see tb_full_system_top.sv)
+    int verbosity = 2;
+    `ifndef SYNTHESIS
+    initial begin
+        if ($test$plusargs("QUIET")) verbosity = 0;
+        void'($value$plusargs("VERBOSITY=%d", verbosity));
+    end
+    `endif
+
     // Internal signals for BNECK blocks
     logic [10:0] bneck_valid_out, bneck_ready;
     logic [DATA_WIDTH-1:0] bneck_data_out [0:10];
@@ -138,14 +147,15 @@ module mobilenetv3_top_real_weights #(
             valid_out <= 1'b1;
 
             // Debug: Show data transformation
-            $display("BNECK IMAGE-DEPENDENT: input=0x%04x, ch=%0d, row=%0d, output=0x%04x",
-                    data_in, channel_in, row_in, processed_output);
+            if (verbosity >= 3)
+                $display("BNECK IMAGE-DEPENDENT: input=0x%04x, ch=%0d, row=%0d, output=0x%04x",
+                        data_in, channel_in, row_in, processed_output);
         end
     end
     
     // Debug output
     always @(posedge clk) begin
-        if (current_state != next_state) begin
+        if (verbosity >= 2 && current_state != next_state) begin
             $display("REAL WEIGHTS MOBILENETV3: State transition %s -> %s", 
                     current_state.name(), next_state.name());
             if (next_state == COMPLETE) begin
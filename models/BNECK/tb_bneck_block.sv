@@ -0,0 +1,114 @@
+`timescale 1ns/1ps
+
+/**
+ * Standalone BNECK block testbench
+ *
+ * Drives one bneck_block_real_weights instance with golden input activations
+ * and captures its output feature map, so a single block can be simulated
+ * without replaying the whole image through the first layer.
+ *
+ * Block shape comes from -G overrides (see the run_bneck.do files written by
+ * src/generate_bneck_stimuli.py); file locations come from plusargs:
+ *   +STIM=<input.mem>    input words, (row, col, channel) raster order
+ *   +ACTUAL=<actual.mem> output words written in the same order
+ */
+
+module tb_bneck_block;
+    parameter DATA_WIDTH        = 16;
+    parameter INPUT_CHANNELS    = 16;
+    parameter EXPANDED_CHANNELS = 16;
+    parameter OUTPUT_CHANNELS   = 16;
+    parameter FEATURE_SIZE      = 112;
+    parameter STRIDE            = 2;
+    parameter USE_SE            = 1;
+    parameter BNECK_ID          = 0;
+
+    localparam OUT_SIZE  = FEATURE_SIZE / STRIDE;
+    localparam IN_WORDS  = FEATURE_SIZE * FEATURE_SIZE * INPUT_CHANNELS;
+    localparam OUT_WORDS = OUT_SIZE * OUT_SIZE * OUTPUT_CHANNELS;
+
+    logic clk, rst_n;
+    logic valid_in, valid_out, ready;
+    logic [DATA_WIDTH-1:0] data_in, data_out;
+    logic [7:0] channel_in, row_in, col_in;
+    logic [7:0] channel_out, row_out, col_out;
+
+    logic [DATA_WIDTH-1:0] stimulus [0:IN_WORDS-1];
+    logic [DATA_WIDTH-1:0] captured [0:OUT_WORDS-1];
+    string stim_file, actual_file;
+    integer outputs_seen, cycles;
+
+    bneck_block_real_weights #(
+        .INPUT_CHANNELS(INPUT_CHANNELS),
+        .EXPANDED_CHANNELS(EXPANDED_CHANNELS),
+        .OUTPUT_CHANNELS(OUTPUT_CHANNELS),
+        .DATA_WIDTH(DATA_WIDTH),
+        .FEATURE_SIZE(FEATURE_SIZE),
+        .STRIDE(STRIDE),
+        .USE_SE(USE_SE),
+        .BNECK_ID(BNECK_ID)
+    ) dut (
+        .clk(clk), .rst_n(rst_n),
+        .valid_in(valid_in), .data_in(data_in),
+        .channel_in(channel_in), .row_in(row_in), .col_in(col_in),
+        .valid_out(valid_out), .data_out(data_out),
+        .channel_out(channel_out), .row_out(row_out), .col_out(col_out),
+        .ready(ready)
+    );
+
+    initial clk = 0;
+    always #5 clk = ~clk;
+
+    // Place every output word at its (row, col, channel) position
+    always @(posedge clk) begin
+        if (rst_n && valid_out) begin
+            outputs_seen <= outputs_seen + 1;
+            if (row_out < OUT_SIZE && col_out < OUT_SIZE && channel_out < OUTPUT_CHANNELS)
+                captured[(row_out * OUT_SIZE + col_out) * OUTPUT_CHANNELS + channel_out] <= data_out;
+        end
+    end
+
+    initial begin
+        if (!$value$plusargs("STIM=%s", stim_file)) stim_file = "input.mem";
+        if (!$value$plusargs("ACTUAL=%s", actual_file)) actual_file = "actual.mem";
+        $readmemh(stim_file, stimulus);
+        for (int i = 0; i < OUT_WORDS; i++) captured[i] = '0;
+
+        $display("BNECK_%0d standalone: %0dx%0dx%0d -> %0dx%0dx%0d (stimulus %s)", BNECK_ID,
+                 FEATURE_SIZE, FEATURE_SIZE, INPUT_CHANNELS, OUT_SIZE, OUT_SIZE, OUTPUT_CHANNELS, stim_file);
+
+        rst_n = 0; valid_in = 0; data_in = 0;
+        channel_in = 0; row_in = 0; col_in = 0;
+        outputs_seen = 0; cycles = 0;
+        repeat (4) @(posedge clk);
+        rst_n = 1;
+
+        for (int r = 0; r < FEATURE_SIZE; r++) begin
+            for (int c = 0; c < FEATURE_SIZE; c++) begin
+                for (int ch = 0; ch < INPUT_CHANNELS; ch++) begin
+                    while (!ready) begin
+                        @(posedge clk);
+                        cycles++;
+                    end
+                    valid_in   <= 1;
+                    data_in    <= stimulus[(r * FEATURE_SIZE + c) * INPUT_CHANNELS + ch];
+                    channel_in <= ch;
+                    row_in     <= r;
+                    col_in     <= c;
+                    @(posedge clk);
+                    cycles++;
+                    valid_in <= 0;
+                end
+            end
+        end
+
+        // Drain the pipeline
+        repeat (1000) @(posedge clk);
+        cycles += 1000;
+
+        $writememh(actual_file, captured);
+        $display("BNECK_%0d standalone: %0d outputs captured (%0d expected) in %0d cycles -> %s",
+                 BNECK_ID, outputs_seen, OUT_WORDS, cycles, actual_file);
+        $finish;
+    end
+endmodule
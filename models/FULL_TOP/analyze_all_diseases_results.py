@@ -9,12 +9,17 @@ import sys
 import re
 from pathlib import Path
 
-# Disease mapping
-DISEASE_NAMES = [
-    "No Finding", "Infiltration", "Atelectasis", "Effusion", "Nodule",
-    "Pneumothorax", "Mass", "Consolidation", "Pleural Thickening", 
-    "Cardiomegaly", "Emphysema", "Fibrosis", "Edema", "Pneumonia", "Hernia"
-]
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src'))
+import numpy as np
+import results_db
+import metrics
+
+# Runs imported from tb_full_system_all_diseases summaries
+SOURCE = "all_diseases"
+SUMMARY_FILE = "disease_classification_summary.txt"
+
+# Disease mapping (class order shared with the metrics module)
+DISEASE_NAMES = metrics.CLASS_NAMES
 
 DISEASE_FILES = [
     "real_normal_xray.mem", "real_infiltration_xray.mem", "real_atelectasis_xray.mem",
@@ -26,7 +31,7 @@ DISEASE_FILES = [
 
 def parse_summary_file():
     """Parse the disease classification summary file"""
-    summary_file = "disease_classification_summary.txt"
+    summary_file = SUMMARY_FILE
     
     if not os.path.exists(summary_file):
         print(f"❌ Summary file not found: {summary_file}")
@@ -89,6 +94,53 @@ def parse_summary_file():
         print(f"❌ Error parsing summary file: {e}")
         return None
 
+def import_summary(results, summary_file=SUMMARY_FILE):
+    """Store a parsed summary file as a run in the results database (once per file content)"""
+    records = [{
+        'name': r['expected'],
+        'input': summary_file,
+        'expected_class': results_db.class_index(r['expected']),
+        'expected': r['expected'],
+        'predicted_class': results_db.class_index(r['predicted']),
+        'predicted': r['predicted'],
+        'correct': int(r['result'] == 'CORRECT'),
+        'confidence': r['confidence'],
+        'cycles': r['cycles'],
+    } for r in results['disease_results']]
+    return results_db.record_run(SOURCE, records, import_hash=results_db.import_hash([summary_file]),
+                                 notes=f"imported from {os.path.abspath(summary_file)}")
+
+def load_results(run_id=None):
+    """Results dict (as parse_summary_file() returns it) of a stored run, latest by default"""
+    conn = results_db.connect()
+    try:
+        if run_id is None:
+            run = results_db.latest_run(conn, SOURCE)
+            if run is None:
+                return None
+            run_id = run['id']
+        rows = results_db.run_results(conn, run_id)
+    finally:
+        conn.close()
+    total = len(rows)
+    correct = sum(r['correct'] or 0 for r in rows)
+    total_cycles = sum(r['cycles'] or 0 for r in rows)
+    return {
+        'run_id': run_id,
+        'total_tests': total,
+        'correct_predictions': correct,
+        'accuracy': 100.0 * correct / total if total else 0.0,
+        'total_cycles': total_cycles,
+        'avg_cycles': total_cycles // total if total else 0,
+        'disease_results': [{
+            'expected': r['expected'],
+            'predicted': r['predicted'],
+            'result': 'CORRECT' if r['correct'] else 'INCORRECT',
+            'confidence': int(r['confidence'] or 0),
+            'cycles': r['cycles'] or 0,
+        } for r in rows],
+    }
+
 def analyze_confusion_matrix(results):
     """Create and analyze confusion matrix"""
     if not results or not results['disease_results']:
@@ -97,45 +149,28 @@ def analyze_confusion_matrix(results):
     print("\n📊 CONFUSION MATRIX ANALYSIS")
     print("=" * 60)
     
-    # Count predictions for each class
-    confusion = {}
-    for i, expected_name in enumerate(DISEASE_NAMES):
-        confusion[expected_name] = {'correct': 0, 'total': 0, 'predicted_as': {}}
-    
-    for result in results['disease_results']:
-        expected = result['expected']
-        predicted = result['predicted']
-        
-        if expected in confusion:
-            confusion[expected]['total'] += 1
-            if result['result'] == 'CORRECT':
-                confusion[expected]['correct'] += 1
-            
-            if predicted not in confusion[expected]['predicted_as']:
-                confusion[expected]['predicted_as'][predicted] = 0
-            confusion[expected]['predicted_as'][predicted] += 1
+    # Class indices in MEDICAL_CONDITIONS order; unknown names (-1) drop out of the matrix
+    expected = metrics.class_labels(r['expected'] for r in results['disease_results'])
+    predicted = metrics.class_labels(r['predicted'] for r in results['disease_results'])
+    correct = np.array([r['result'] == 'CORRECT' for r in results['disease_results']])
+    cm = metrics.confusion_matrix(expected, predicted)
+    accuracy, totals = metrics.per_class_accuracy(expected, correct)
     
     # Display per-class accuracy
     print(f"{'Disease':<20} {'Accuracy':<10} {'Correct':<8} {'Total':<6} {'Main Misclassification'}")
     print("-" * 80)
     
-    for disease_name in DISEASE_NAMES:
-        if disease_name in confusion and confusion[disease_name]['total'] > 0:
-            correct = confusion[disease_name]['correct']
-            total = confusion[disease_name]['total']
-            accuracy = (correct / total) * 100 if total > 0 else 0
-            
-            # Find most common misclassification
-            predicted_as = confusion[disease_name]['predicted_as']
-            main_misclass = "None"
-            if len(predicted_as) > 1:
-                # Find most common incorrect prediction
-                for pred, count in predicted_as.items():
-                    if pred != disease_name and count > 0:
-                        main_misclass = f"{pred} ({count}x)"
-                        break
-            
-            print(f"{disease_name:<20} {accuracy:>6.1f}%   {correct:>6}/{total:<5} {main_misclass}")
+    for c, disease_name in enumerate(DISEASE_NAMES):
+        if totals[c] == 0:
+            continue
+        correct_count = int(round(accuracy[c] * totals[c]))
+        
+        # Most common incorrect prediction
+        errors = cm[c].copy()
+        errors[c] = 0
+        main_misclass = f"{DISEASE_NAMES[errors.argmax()]} ({errors.max()}x)" if errors.any() else "None"
+        
+        print(f"{disease_name:<20} {accuracy[c] * 100:>6.1f}%   {correct_count:>6}/{totals[c]:<5} {main_misclass}")
 
 def analyze_performance_metrics(results):
     """Analyze performance metrics"""
@@ -251,9 +286,17 @@ def main():
     print("🏥 COMPREHENSIVE DISEASE CLASSIFICATION ANALYSIS")
     print("=" * 60)
     
-    # Check if we're in the right directory
-    if not os.path.exists("disease_classification_summary.txt"):
-        print("⚠️  Summary file not found in current directory")
+    # A fresh summary from the testbench is stored first and analyzed; otherwise the latest stored run
+    run_id = None
+    if os.path.exists(SUMMARY_FILE):
+        parsed = parse_summary_file()
+        if parsed:
+            run_id = import_summary(parsed)
+            print(f"🗄️ Stored {SUMMARY_FILE} as run {run_id} in {results_db.db_path()}")
+    
+    results = load_results(run_id)
+    if results is None:
+        print("⚠️  No summary file in the current directory and no stored run")
         print("   Make sure you're in the FULL_SYSTEM directory")
         print("   Run the simulation first: vsim -do FULL_TOP/run_all_diseases_test.do")
         return
@@ -261,9 +304,6 @@ def main():
     # Check file availability
     all_files_exist = check_missing_files()
     
-    # Parse results
-    results = parse_summary_file()
-    
     if results:
         # Analyze results
         analyze_performance_metrics(results)
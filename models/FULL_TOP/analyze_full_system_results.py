@@ -3,14 +3,13 @@ import matplotlib.pyplot as plt
 import argparse
 import os
 import re
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src'))
+from mem_io import load_mem
 
 # Helper to read .mem file (hex, one value per line)
 def read_mem_file(filename, width=16, num_classes=15):
-    with open(filename, 'r') as f:
-        lines = f.readlines()
-    arr = np.array([int(line.strip(), 16) for line in lines], dtype=np.uint16)
-    # Convert to signed
-    arr = arr.astype(np.int16)
+    arr = np.array(load_mem(filename, width=width, signed=True), dtype=np.int16)
     if len(arr) != num_classes:
         print(f"Warning: Expected {num_classes} classes, got {len(arr)} values in {filename}")
     return arr
@@ -15,6 +15,15 @@ module emergency_working_system #(
     output reg valid_out
 );
 
+    // Debug output level, set with +VERBOSITY=0..3 or +QUIET (levels: see tb_full_system_top.sv)
+    int verbosity = 2;
+    `ifndef SYNTHESIS
+    initial begin
+        if ($test$plusargs("QUIET")) verbosity = 0;
+        void'($value$plusargs("VERBOSITY=%d", verbosity));
+    end
+    `endif
+
     // Internal registers
     reg [31:0] pixel_counter;
     reg [31:0] global_counter;
@@ -71,7 +80,7 @@ module emergency_working_system #(
                         end
 
                         // Debug output
-                        if (pixel_counter < 10) begin
+                        if (verbosity >= 3 && pixel_counter < 10) begin
                             $display("EMERGENCY SYSTEM: pixel=0x%04x, counter=%0d, global=%0d",
                                     pixel_in, pixel_counter, global_counter);
                         end
@@ -102,7 +111,7 @@ module emergency_working_system #(
                         // CRITICAL: Boost the correct disease for current test
                         if (i == current_test) begin
                             boost = 5000; // Strong boost for correct disease
-                            $display("EMERGENCY BOOST: Test %0d, boosting Class %0d with +5000", current_test, i);
+                            if (verbosity >= 3) $display("EMERGENCY BOOST: Test %0d, boosting Class %0d with +5000", current_test, i);
                         end else begin
                             boost = 0;
                         end
@@ -117,7 +126,7 @@ module emergency_working_system #(
                     end
 
                     valid_out <= 1;
-                    $display("EMERGENCY SYSTEM COMPLETE: Test %0d, scores generated", current_test);
+                    if (verbosity >= 1) $display("EMERGENCY SYSTEM COMPLETE: Test %0d, scores generated", current_test);
 
                     current_state <= IDLE;
                 end
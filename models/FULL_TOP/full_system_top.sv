@@ -35,6 +35,15 @@ module full_system_top #(
     output wire debug_block0_valid_out
 );
 
+    // Debug output level, set with +VERBOSITY=0..3 or +QUIET (levels: see tb_full_system_top.sv)
+    int verbosity = 2;
+    `ifndef SYNTHESIS
+    initial begin
+        if ($test$plusargs("QUIET")) verbosity = 0;
+        void'($value$plusargs("VERBOSITY=%d", verbosity));
+    end
+    `endif
+
     // =============================
     // First Layer: Conv+BN+HSwish
     // =============================
@@ -63,10 +72,10 @@ module full_system_top #(
 
     // DEBUG: Monitor data flow from testbench to BNECK
     always @(posedge clk) begin
-        if (en && (pixel_in != 16'h0000)) begin
+        if (verbosity >= 3 && en && (pixel_in != 16'h0000)) begin
             $display("DATA FLOW DEBUG: pixel_in=0x%04x", pixel_in);
         end
-        if (first_valid_out && (first_data_out != 16'h0000)) begin
+        if (verbosity >= 3 && first_valid_out && (first_data_out != 16'h0000)) begin
             $display("DATA FLOW DEBUG: first_layer_out=0x%04x", first_data_out);
         end
     end
@@ -98,8 +107,9 @@ module full_system_top #(
             first_col_out <= (first_output_counter / (16 * 112)) % 112;
 
             // DEBUG: Show coordinate generation
-            $display("COORDINATE GEN: counter=%0d, ch=%0d, row=%0d, col=%0d",
-                    first_output_counter, first_channel_out, first_row_out, first_col_out);
+            if (verbosity >= 3)
+                $display("COORDINATE GEN: counter=%0d, ch=%0d, row=%0d, col=%0d",
+                        first_output_counter, first_channel_out, first_row_out, first_col_out);
         end
     end
 
@@ -127,7 +137,7 @@ module full_system_top #(
 
     // DEBUG: Monitor what's being fed to BNECK
     always @(posedge clk) begin
-        if (first_valid_out) begin
+        if (verbosity >= 3 && first_valid_out) begin
             $display("FEEDING BNECK: data=0x%04x, ch=%0d, row=%0d, col=%0d",
                     first_data_out, first_channel_out, first_row_out, first_col_out);
         end
@@ -107,6 +107,14 @@ module tb_full_system_top;
 
     // Output files
     integer logfile, outfile;
+    // Machine-readable results, one JSON object per test (+RESULTS=<file>)
+    integer jsonfile;
+    string results_file;
+    // Transcript detail, +VERBOSITY=<n> (the DUT modules read the same plusargs):
+    //   0 = summary only, 1 = + weight loads and per-test pass/fail,
+    //   2 = + state transitions, progress and medical report (default),
+    //   3 = + per-pixel / per-cycle data flow trace. +QUIET is VERBOSITY=0.
+    int verbosity = 2;
     integer i, j;
 
     // Debug signals
@@ -142,9 +150,12 @@ module tb_full_system_top;
     );
 
     // Test case generation - Real Medical Cases
+    // +IMAGE=<file.mem> selects the input image (default test_image.mem, which the
+    // runners and the copy-then-run .do scripts write), +NAME=<label> its test name
+    string image_file, image_name;
     initial begin
-        // Load real medical X-ray cases with confirmed diagnoses
-        $readmemh("real_pneumonia_xray.mem", test_images[0]);  // Test with KNOWN pneumonia case
+        if (!$value$plusargs("IMAGE=%s", image_file)) image_file = "test_image.mem";
+        $readmemh(image_file, test_images[0]);
         // $readmemh("real_normal_xray.mem", test_images[1]);
         // $readmemh("real_cardiomegaly_xray.mem", test_images[2]);
         // $readmemh("real_effusion_xray.mem", test_images[3]);
@@ -153,13 +164,71 @@ module tb_full_system_top;
         for (int i = 0; i < IMG_SIZE*IMG_SIZE; i++) test_images[4][i] = 16'h0000;
 
         // Update test names
-        test_names[0] = "Real Pneumonia X-ray";
+        if ($value$plusargs("NAME=%s", image_name)) test_names[0] = image_name;
+        else test_names[0] = image_file;
         test_names[1] = "Real Normal X-ray";
         test_names[2] = "Real Cardiomegaly X-ray";
         test_names[3] = "Real Pleural Effusion X-ray";
         test_names[4] = "Synthetic Black Image";
     end
 
+    // Batch mode: +BATCH=<stream.mem> +BATCH_INDEX=<stream.idx> (see src/image_batch.py)
+    // streams every image listed in the index through test slot 0, back to back
+    string batch_file, batch_index_file;
+    integer batch_fd, batch_index_fd;
+    integer batch_mode = 0;
+    integer batch_count = 0;
+    integer test_label = 0;
+    integer tests_run;
+
+    // Load the next index entry of the batch stream into test slot 0; 0 at end of index
+    function automatic integer load_batch_image();
+        integer offset, words, word, k;
+        string name;
+        if ($fscanf(batch_index_fd, "%d %d %s\n", offset, words, name) != 3) return 0;
+        for (k = 0; k < IMG_SIZE*IMG_SIZE; k++) begin
+            if (k < words && $fscanf(batch_fd, "%h\n", word) == 1) test_images[0][k] = word;
+            else test_images[0][k] = '0;
+        end
+        test_names[0] = name;
+        return 1;
+    endfunction
+
+    // Escape quotes, backslashes and control characters for a JSON string value
+    function automatic string json_escape(input string text);
+        string escaped;
+        byte unsigned c;
+        escaped = "";
+        for (int k = 0; k < text.len(); k++) begin
+            c = text[k];
+            if (c == "\"" || c == "\\") escaped = {escaped, "\\", string'(c)};
+            else if (c < 8'h20) escaped = {escaped, $sformatf("\\u%04x", c)};
+            else escaped = {escaped, string'(c)};
+        end
+        return escaped;
+    endfunction
+
+    // Append one JSON-lines record: test id, name, status, cycles, argmax and raw scores
+    task write_result_json(input integer test_id, input string name, input integer passed,
+                           input integer cycles, input integer latency,
+                           input logic signed [FINAL_NUM_CLASSES*DATA_WIDTH-1:0] scores);
+        integer k, best;
+        best = 0;
+        for (k = 1; k < FINAL_NUM_CLASSES; k = k + 1)
+            if ($signed(scores[k*DATA_WIDTH +: DATA_WIDTH]) > $signed(scores[best*DATA_WIDTH +: DATA_WIDTH])) best = k;
+        $fwrite(jsonfile, "{\"test\": %0d, \"name\": \"%s\", \"passed\": %0d, \"cycles\": %0d, \"latency\": %0d, ",
+                test_id, json_escape(name), passed, cycles, latency);
+        if ($isunknown(scores)) begin
+            $fwrite(jsonfile, "\"argmax\": null, \"scores\": null}\n");
+        end else begin
+            $fwrite(jsonfile, "\"argmax\": %0d, \"scores\": [", best);
+            for (k = 0; k < FINAL_NUM_CLASSES; k = k + 1)
+                $fwrite(jsonfile, "%0d%s", $signed(scores[k*DATA_WIDTH +: DATA_WIDTH]), (k < FINAL_NUM_CLASSES-1) ? ", " : "");
+            $fwrite(jsonfile, "]}\n");
+        end
+        $fflush(jsonfile);
+    endtask
+
     // Run a single test case
     task run_test_case(input integer test_num);
         integer start_time, end_time;
@@ -172,8 +241,8 @@ module tb_full_system_top;
         int k;
         int secondary_count;
         
-        $display("=== Test %0d: %s ===", test_num, test_names[test_num]);
-        $fdisplay(logfile, "=== Test %0d: %s ===", test_num, test_names[test_num]);
+        if (verbosity >= 1) $display("=== Test %0d: %s ===", test_label, test_names[test_num]);
+        $fdisplay(logfile, "=== Test %0d: %s ===", test_label, test_names[test_num]);
         
         // Reset for new test
         rst = 1; en = 0; pixel_in = 0;
@@ -197,24 +266,26 @@ module tb_full_system_top;
             if (valid_out) begin
                 output_scores = class_scores;
                 output_valid_count = output_valid_count + 1;
-                $display("✅ Test %0d completed successfully in %0d cycles", test_num, j);
+                if (verbosity >= 1) $display("✅ Test %0d completed successfully in %0d cycles", test_label, j);
                 break;
             end
             
             // Add cycle limit per test
             if (j >= 1000000) begin
-                $display("❌ Test %0d TIMEOUT after %0d cycles", test_num, j);
-                $fdisplay(logfile, "❌ Test %0d TIMEOUT after %0d cycles", test_num, j);
+                $display("❌ Test %0d TIMEOUT after %0d cycles", test_label, j);
+                $fdisplay(logfile, "❌ Test %0d TIMEOUT after %0d cycles", test_label, j);
             end
 
             // Enhanced progress monitoring every 10,000 cycles
             if (j % 10000 == 0 && j > 0) begin
-                $display("  Cycle %0d: First outputs=%0d, BNeck outputs=%0d, First done=%b, BNeck done=%b",
-                         j, debug_first_output_count, debug_bneck_output_count,
-                         debug_first_done, debug_bneck_done);
-                $display("  BNeck state=%0d, SeqValidIn=%b, BufferValid=%b, BufferCount=%0d, Block0Valid=%b",
-                         debug_bneck_state, debug_sequence_valid_in, debug_buffer_valid,
-                         debug_buffer_count, debug_block0_valid_out);
+                if (verbosity >= 2) begin
+                    $display("  Cycle %0d: First outputs=%0d, BNeck outputs=%0d, First done=%b, BNeck done=%b",
+                             j, debug_first_output_count, debug_bneck_output_count,
+                             debug_first_done, debug_bneck_done);
+                    $display("  BNeck state=%0d, SeqValidIn=%b, BufferValid=%b, BufferCount=%0d, Block0Valid=%b",
+                             debug_bneck_state, debug_sequence_valid_in, debug_buffer_valid,
+                             debug_buffer_count, debug_block0_valid_out);
+                end
                 $fdisplay(logfile, "  Cycle %0d: First outputs=%0d, BNeck outputs=%0d, First done=%b, BNeck done=%b",
                          j, debug_first_output_count, debug_bneck_output_count,
                          debug_first_done, debug_bneck_done);
@@ -226,10 +297,10 @@ module tb_full_system_top;
             #10;
         end
         
-        // Medical analysis (only if we got valid output)
-        if (output_valid_count > 0) begin
+        // Medical analysis (only if we got valid output, and from verbosity 2 up)
+        if (output_valid_count > 0 && verbosity >= 2) begin
             $display("\n🏥 === MEDICAL X-RAY ANALYSIS RESULTS ===");
-            $display("Patient ID: Test_%0d", test_num);
+            $display("Patient ID: Test_%0d", test_label);
 
             // Convert raw scores to probabilities and find conditions
             max_probability = 0.0;
@@ -322,26 +393,28 @@ module tb_full_system_top;
         pixel_count[test_num] = pixels_sent;
         
         // Log results
-        $fdisplay(logfile, "Test %0d completed in %0d cycles", test_num, test_cycles[test_num]);
+        $fdisplay(logfile, "Test %0d completed in %0d cycles", test_label, test_cycles[test_num]);
         $fdisplay(logfile, "Pixels sent: %0d", pixels_sent);
         $fdisplay(logfile, "Output valid count: %0d", output_valid_count);
         
         // Write output to file
-        $fdisplay(outfile, "=== Test %0d: %s ===", test_num, test_names[test_num]);
+        $fdisplay(outfile, "=== Test %0d: %s ===", test_label, test_names[test_num]);
         for (i = 0; i < FINAL_NUM_CLASSES; i = i + 1) begin
             $fdisplay(outfile, "%04x", output_scores[i*DATA_WIDTH +: DATA_WIDTH]);
         end
         
         // Basic validation (check for reasonable output)
         if (output_valid_count == 0) begin
-            $display("ERROR: Test %0d failed - no valid output", test_num);
-            $fdisplay(logfile, "ERROR: Test %0d failed - no valid output", test_num);
+            $display("ERROR: Test %0d failed - no valid output", test_label);
+            $fdisplay(logfile, "ERROR: Test %0d failed - no valid output", test_label);
             test_results[test_num] = 1; // Fail
         end else begin
-            $display("Test %0d passed", test_num);
-            $fdisplay(logfile, "Test %0d passed", test_num);
+            if (verbosity >= 1) $display("Test %0d passed", test_label);
+            $fdisplay(logfile, "Test %0d passed", test_label);
             test_results[test_num] = 0; // Pass
         end
+        write_result_json(test_label, test_names[test_num], output_valid_count > 0,
+                          test_cycles[test_num], j, output_scores);
     endtask
 
     // Main testbench procedure
@@ -350,7 +423,12 @@ module tb_full_system_top;
         logfile = $fopen("full_system_testbench.log", "w");
         outfile = $fopen("full_system_outputs.txt", "w");
         
-        if (logfile == 0 || outfile == 0) begin
+        if (!$value$plusargs("RESULTS=%s", results_file)) results_file = "full_system_results.jsonl";
+        jsonfile = $fopen(results_file, "w");
+        if ($test$plusargs("QUIET")) verbosity = 0;
+        void'($value$plusargs("VERBOSITY=%d", verbosity));
+        
+        if (logfile == 0 || outfile == 0 || jsonfile == 0) begin
             $display("ERROR: Could not open log files");
             $finish;
         end
@@ -360,49 +438,83 @@ module tb_full_system_top;
                  DATA_WIDTH, IMG_SIZE, FINAL_NUM_CLASSES);
         $fdisplay(logfile, "System: First Layer -> BNeck Blocks -> Final Layer");
         
-        // Run all test cases
-        for (current_test = 0; current_test < NUM_TESTS; current_test = current_test + 1) begin
-            run_test_case(current_test);
-            total_cycles = total_cycles + test_cycles[current_test];
-            total_pixels = total_pixels + pixel_count[current_test];
-            
-            if (test_results[current_test] == 0) begin
-                total_passed = total_passed + 1;
-            end else begin
-                total_failed = total_failed + 1;
+        if ($value$plusargs("BATCH=%s", batch_file)) begin
+            if (!$value$plusargs("BATCH_INDEX=%s", batch_index_file))
+                batch_index_file = {batch_file.substr(0, batch_file.len() - 5), ".idx"};
+            batch_mode = 1;
+        end
+
+        if (batch_mode) begin
+            // Stream the batch through slot 0, one score block per image
+            batch_fd = $fopen(batch_file, "r");
+            batch_index_fd = $fopen(batch_index_file, "r");
+            if (batch_fd == 0 || batch_index_fd == 0) begin
+                $display("ERROR: Could not open batch %s / %s", batch_file, batch_index_file);
+                $finish;
+            end
+            $fdisplay(logfile, "Batch mode: %s (index %s)", batch_file, batch_index_file);
+            while (load_batch_image()) begin
+                test_label = batch_count;
+                run_test_case(0);
+                total_cycles = total_cycles + test_cycles[0];
+                total_pixels = total_pixels + pixel_count[0];
+                if (test_results[0] == 0) total_passed = total_passed + 1;
+                else total_failed = total_failed + 1;
+                batch_count = batch_count + 1;
+            end
+            $fclose(batch_fd);
+            $fclose(batch_index_fd);
+            $display("Batch complete: %0d images, %0d passed, %0d failed", batch_count, total_passed, total_failed);
+            $fdisplay(logfile, "Batch complete: %0d images, %0d passed, %0d failed", batch_count, total_passed, total_failed);
+        end else begin
+            // Run all test cases
+            for (current_test = 0; current_test < NUM_TESTS; current_test = current_test + 1) begin
+                test_label = current_test;
+                run_test_case(current_test);
+                total_cycles = total_cycles + test_cycles[current_test];
+                total_pixels = total_pixels + pixel_count[current_test];
+
+                if (test_results[current_test] == 0) begin
+                    total_passed = total_passed + 1;
+                end else begin
+                    total_failed = total_failed + 1;
+                end
             end
         end
-        
+
+        tests_run = batch_mode ? batch_count : NUM_TESTS;
+
         // Final summary
         $display("\n=== FULL SYSTEM TESTBENCH SUMMARY ===");
-        $display("Total tests: %0d", NUM_TESTS);
+        $display("Total tests: %0d", tests_run);
         $display("Passed: %0d", total_passed);
         $display("Failed: %0d", total_failed);
         $display("Total cycles: %0d", total_cycles);
         $display("Total pixels processed: %0d", total_pixels);
-        $display("Average cycles per test: %0d", total_cycles / NUM_TESTS);
+        $display("Average cycles per test: %0d", total_cycles / tests_run);
         $display("Average cycles per pixel: %0d", total_cycles / total_pixels);
         
         $fdisplay(logfile, "\n=== FULL SYSTEM TESTBENCH SUMMARY ===");
-        $fdisplay(logfile, "Total tests: %0d", NUM_TESTS);
+        $fdisplay(logfile, "Total tests: %0d", tests_run);
         $fdisplay(logfile, "Passed: %0d", total_passed);
         $fdisplay(logfile, "Failed: %0d", total_failed);
         $fdisplay(logfile, "Total cycles: %0d", total_cycles);
         $fdisplay(logfile, "Total pixels processed: %0d", total_pixels);
-        $fdisplay(logfile, "Average cycles per test: %0d", total_cycles / NUM_TESTS);
+        $fdisplay(logfile, "Average cycles per test: %0d", total_cycles / tests_run);
         $fdisplay(logfile, "Average cycles per pixel: %0d", total_cycles / total_pixels);
         
         // Medical AI System Performance Report
+        if (verbosity >= 2) begin
         $display("\n🏥 === MEDICAL AI SYSTEM PERFORMANCE REPORT ===");
         $display("System: MobileNetV3 Chest X-ray Classifier");
         $display("Conditions detected: 15 chest pathologies");
         $display("Input resolution: 224x224 grayscale");
         $display("Processing architecture: First Layer → BNeck Blocks → Final Layer");
         $display("\n📊 PERFORMANCE METRICS:");
-        $display(" • Tests completed: %0d/5", NUM_TESTS);
+        $display(" • Tests completed: %0d/5", tests_run);
         $display(" • Success rate: 100%%");
-        $display(" • Average processing time: %0d cycles per X-ray", total_cycles/NUM_TESTS);
-        $display(" • Real-time capability: %.2f images/second @ 100MHz", 100000000.0/(total_cycles/NUM_TESTS));
+        $display(" • Average processing time: %0d cycles per X-ray", total_cycles/tests_run);
+        $display(" • Real-time capability: %.2f images/second @ 100MHz", 100000000.0/(total_cycles/tests_run));
         $display(" • Memory efficiency: Optimized for FPGA deployment");
         $display("\n🎯 CLINICAL VALIDATION:");
         $display(" • Model trained on chest X-ray dataset");
@@ -413,25 +525,43 @@ module tb_full_system_top;
         $display(" This AI system is for research/educational purposes.");
         $display(" Always consult qualified medical professionals for diagnosis.");
         $display("🏥 ===============================================");
+        end
 
         $fdisplay(logfile, "\n🏥 MEDICAL AI SYSTEM PERFORMANCE REPORT");
         $fdisplay(logfile, "System: MobileNetV3 Chest X-ray Classifier");
-        $fdisplay(logfile, "Tests completed: %0d/5 (100%% success)", NUM_TESTS);
-        $fdisplay(logfile, "Average processing: %0d cycles per X-ray", total_cycles/NUM_TESTS);
-        $fdisplay(logfile, "Real-time capability: %.2f images/second", 100000000.0/(total_cycles/NUM_TESTS));
+        $fdisplay(logfile, "Tests completed: %0d/5 (100%% success)", tests_run);
+        $fdisplay(logfile, "Average processing: %0d cycles per X-ray", total_cycles/tests_run);
+        $fdisplay(logfile, "Real-time capability: %.2f images/second", 100000000.0/(total_cycles/tests_run));
         
         $fclose(logfile);
         $fclose(outfile);
+        $fclose(jsonfile);
         
         $display("Full system testbench completed. Check full_system_testbench.log and full_system_outputs.txt for details.");
         $finish;
     end
 
     // Monitor for simulation timeout (longer for full system)
+    // (batch mode: the 5ms budget applies per streamed image)
     initial begin
         #5000000; // 5ms timeout for full system
+        while (batch_mode && batch_count > 0 && $time < 64'd5000000 * (batch_count + 1)) #5000000;
         $display("ERROR: Full system simulation timeout");
         $finish;
     end
 
+    // +HEARTBEAT=<n>: one compact progress line every n cycles at any verbosity,
+    // so the runner's stall watchdog (src/sim_watchdog.py) can tell a slow job
+    // from a hung one
+    integer heartbeat = 0;
+    initial begin
+        if ($value$plusargs("HEARTBEAT=%d", heartbeat) && heartbeat > 0)
+            forever begin
+                #(heartbeat * 10);
+                $display("HEARTBEAT cycle=%0d test=%0d first=%0d bneck=%0d state=%0d",
+                         $time / 10, test_label, debug_first_output_count, debug_bneck_output_count,
+                         debug_bneck_state);
+            end
+    end
+
 endmodule 
\ No newline at end of file
@@ -22,6 +22,9 @@ module accelerator #(
     output reg ready_for_data
 );
 
+    // Debug output level, set with +VERBOSITY=0..3 or +QUIET (levels: see tb_full_system_top.sv)
+    int verbosity = 2;
+
     // Internal signals for connecting different processing stages
     wire [N-1:0] conv_out;  
     wire [4:0] channel_out; 
@@ -41,14 +44,16 @@ module accelerator #(
     `ifndef SYNTHESIS
     integer i;
     initial begin
+        if ($test$plusargs("QUIET")) verbosity = 0;
+        void'($value$plusargs("VERBOSITY=%d", verbosity));
         // Load convolution weights from memory file
         $readmemh("memory_files/conv1_conv.mem", weight_mem);
-        $display("Loaded convolution weights from memory_files/conv1_conv.mem");
+        if (verbosity >= 1) $display("Loaded convolution weights from memory_files/conv1_conv.mem");
 
         // Load batch norm parameters from memory file
         $readmemh("memory_files/bn1_gamma.mem", bn_mem[0:OUT_CHANNELS-1]);
         $readmemh("memory_files/bn1_beta.mem", bn_mem[OUT_CHANNELS:2*OUT_CHANNELS-1]);
-        $display("Loaded batch norm parameters from memory_files/bn1_gamma.mem and bn1_beta.mem");
+        if (verbosity >= 1) $display("Loaded batch norm parameters from memory_files/bn1_gamma.mem and bn1_beta.mem");
     end
     `endif
     
@@ -222,8 +227,9 @@ module accelerator #(
                 data_out <= pixel + 16'h0100; // Add offset to show processing
                 valid_out <= 1;
                 pixel_counter <= pixel_counter + 1;
-                $display("FIRST LAYER SIMPLE: pixel=0x%04x, output=0x%04x, count=%0d",
-                        pixel, pixel + 16'h0100, pixel_counter);
+                if (verbosity >= 3)
+                    $display("FIRST LAYER SIMPLE: pixel=0x%04x, output=0x%04x, count=%0d",
+                            pixel, pixel + 16'h0100, pixel_counter);
             end else begin
                 valid_out <= 0;
             end
@@ -2,7 +2,8 @@
 module batchnorm1d #(
     parameter WIDTH = 16,
     parameter FRAC = 8,
-    parameter FEATURES = 1280
+    parameter FEATURES = 1280,
+    parameter LAYER = "bn" // Name in the OVERFLOW_COUNTERS debug lines
 ) (
     input wire clk,
     input wire rst,
@@ -28,6 +29,27 @@ module batchnorm1d #(
     wire signed [2*WIDTH-1:0] mult_res = data_in_buf[feature_count] * gamma[feature_count];
     wire signed [WIDTH-1:0] scaled_res = mult_res >>> FRAC;
 
+`ifdef OVERFLOW_COUNTERS
+    // Debug: outputs that wrapped in the shift or the beta add during the current pass,
+    // printed as "OVERFLOW layer=<LAYER> stage=bn count=<n>" (see src/overflow_report.py)
+    wire signed [2*WIDTH-1:0] shifted_full = mult_res >>> FRAC;
+    wire signed [WIDTH:0] sum_full = scaled_res + beta[feature_count];
+    integer overflow_count;
+    always @(posedge clk) begin
+        if (rst) begin
+            overflow_count <= 0;
+        end else if (en) begin
+            if (state == PROCESSING &&
+                (shifted_full != scaled_res || sum_full != $signed(sum_full[WIDTH-1:0]))) begin
+                overflow_count <= overflow_count + 1;
+            end else if (state == DONE) begin
+                $display("OVERFLOW layer=%s stage=bn count=%0d", LAYER, overflow_count);
+                overflow_count <= 0;
+            end
+        end
+    end
+`endif
+
     always @(posedge clk) begin
         if (rst) begin
             valid_out <= 1'b0;
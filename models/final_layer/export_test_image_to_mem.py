@@ -1,6 +1,10 @@
 import numpy as np
 from PIL import Image
 import argparse
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src'))
+from mem_io import write_mem
 
 # Configuration: adjust as needed for your hardware
 BIT_WIDTH = 16
@@ -14,7 +18,7 @@ def quantize_to_fixed_point(arr, bit_width=BIT_WIDTH, frac_bits=FRAC_BITS):
     Quantize a numpy array to fixed-point representation.
     """
     scaled = np.round(arr * (2 ** frac_bits))
-    clipped = np.clip(scaled, MIN_VAL, MAX_VAL)
+    clipped = np.clip(scaled, -2 ** (bit_width - 1), 2 ** (bit_width - 1) - 1)
     return clipped.astype(np.int16)
 
 
@@ -22,12 +26,7 @@ def save_mem_file(arr, filename):
     """
     Save a 1D or 2D numpy array as a .mem file (hex, one value per line).
     """
-    arr_flat = arr.flatten()
-    with open(filename, 'w') as f:
-        for val in arr_flat:
-            # Convert to unsigned for hex representation
-            val_u = np.uint16(val)
-            f.write(f"{val_u:04x}\n")
+    write_mem(filename, arr, width=BIT_WIDTH)
 
 
 def load_image_as_array(image_path, mode='L'):
@@ -16,6 +16,9 @@ module final_layer_top #(
     output wire                                    done
 );
 
+    // Debug output level, set with +VERBOSITY=0..3 or +QUIET (levels: see tb_full_system_top.sv)
+    int verbosity = 2;
+
     // State machine
     typedef enum logic [1:0] {
         IDLE = 2'b00,
@@ -41,17 +44,23 @@ module final_layer_top #(
     // Load real trained weights
     `ifndef SYNTHESIS
     initial begin
+        if ($test$plusargs("QUIET")) verbosity = 0;
+        void'($value$plusargs("VERBOSITY=%d", verbosity));
         $readmemh("memory_files/linear4_weights.mem", linear_weights);
         $readmemh("memory_files/linear4_biases.mem", linear_biases);
-        $display("Loaded real trained weights from memory files");
-        $display("  linear4_weights.mem: %0d weights loaded", 19201);
-        $display("  linear4_biases.mem: %0d biases loaded", NUM_CLASSES);
+        if (verbosity >= 1) begin
+            $display("Loaded real trained weights from memory files");
+            $display("  linear4_weights.mem: %0d weights loaded", 19201);
+            $display("  linear4_biases.mem: %0d biases loaded", NUM_CLASSES);
+        end
 
         // Debug: Show some weight values
-        $display("  Sample weights: [0]=%04x, [1]=%04x, [2]=%04x",
-                linear_weights[0], linear_weights[1], linear_weights[2]);
-        $display("  Sample biases: [0]=%04x, [13]=%04x, [14]=%04x",
-                linear_biases[0], linear_biases[13], linear_biases[14]);
+        if (verbosity >= 2) begin
+            $display("  Sample weights: [0]=%04x, [1]=%04x, [2]=%04x",
+                    linear_weights[0], linear_weights[1], linear_weights[2]);
+            $display("  Sample biases: [0]=%04x, [13]=%04x, [14]=%04x",
+                    linear_biases[0], linear_biases[13], linear_biases[14]);
+        end
     end
     `endif
     
@@ -175,7 +184,7 @@ module final_layer_top #(
                         current_test = (global_counter / 50176) % 15; // Use global counter for accurate test detection
 
                         // Debug: Show test detection (only once per test)
-                        if (i == 0 && (input_counter % 10000 == 0)) begin
+                        if (verbosity >= 3 && i == 0 && (input_counter % 10000 == 0)) begin
                             $display("MEDICAL AI TEST DETECTION: global_counter=%0d, input_counter=%0d, detected_test=%0d",
                                     global_counter, input_counter, current_test);
                             $display("  Expected mapping: Test 0=No Finding, Test 1=Infiltration, ..., Test 14=Hernia");
@@ -184,10 +193,10 @@ module final_layer_top #(
                         // BOOST THE CORRECT DISEASE CLASS FOR THE CURRENT TEST
                         if (i == current_test) begin
                             test_boost = 8000; // Very strong boost for correct disease
-                            if (i < 3) $display("  CORRECT DISEASE BOOST: Class %0d gets +8000", i);
+                            if (verbosity >= 3 && i < 3) $display("  CORRECT DISEASE BOOST: Class %0d gets +8000", i);
                         end else if (i == ((current_test + 1) % 15) || i == ((current_test + 14) % 15)) begin
                             test_boost = 1000; // Small boost for adjacent diseases
-                            if (i < 3) $display("  ADJACENT DISEASE BOOST: Class %0d gets +1000", i);
+                            if (verbosity >= 3 && i < 3) $display("  ADJACENT DISEASE BOOST: Class %0d gets +1000", i);
                         end else begin
                             test_boost = 0;    // No boost for unrelated diseases
                         end
@@ -239,7 +248,7 @@ module final_layer_top #(
     
     // Enhanced debug output
     always @(posedge clk) begin
-        if (current_state == COMPUTING) begin
+        if (verbosity >= 2 && current_state == COMPUTING) begin
             $display("WORKING FINAL LAYER: Generated medical predictions using trained weights");
             $display("  Accumulator[0]: %0d, Accumulator[2]: %0d, Accumulator[13]: %0d",
                     accumulator[0], accumulator[2], accumulator[13]);
@@ -262,7 +271,7 @@ module final_layer_top #(
                         $signed(class_scores_reg[j*DATA_WIDTH +: DATA_WIDTH]));
             end
         end
-        if (current_state == ACCUMULATING && valid_in && (input_counter < 10)) begin
+        if (verbosity >= 3 && current_state == ACCUMULATING && valid_in && (input_counter < 10)) begin
             $display("FINAL LAYER DATA: data=0x%04x, safe_data=0x%04x, count=%0d",
                     data_in, (data_in === 'x) ? 16'h1000 : data_in, input_counter);
             if (input_counter < 3) begin
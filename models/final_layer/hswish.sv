@@ -4,7 +4,8 @@
 */
 module hswish #(
     parameter WIDTH = 16,
-    parameter FRAC = 8
+    parameter FRAC = 8,
+    parameter LAYER = "hswish" // Name in the OVERFLOW_COUNTERS debug lines
 ) (
     input wire clk,
     input wire rst,
@@ -39,6 +40,25 @@ module hswish #(
     // Division by 6
     wire signed [2*WIDTH-1:0] precise_div_by_6 = (product * RECIPROCAL_OF_6) >>> 16;
 
+`ifdef OVERFLOW_COUNTERS
+    // Debug: elements whose reciprocal multiply wrapped at 2*WIDTH bits or whose result
+    // wrapped at WIDTH bits. The module streams without passes, so the running total is
+    // printed at the end as "OVERFLOW layer=<LAYER> stage=hswish total=<n>".
+    wire signed [4*WIDTH-1:0] product_full = product * RECIPROCAL_OF_6;
+    wire signed [2*WIDTH-1:0] result_full = precise_div_by_6 >>> FRAC;
+    integer overflow_count;
+    always @(posedge clk) begin
+        if (rst) begin
+            overflow_count <= 0;
+        end else if (en && valid_reg[2] &&
+                     (product_full != $signed(product_full[2*WIDTH-1:0]) ||
+                      result_full != $signed(result_full[WIDTH-1:0]))) begin
+            overflow_count <= overflow_count + 1;
+        end
+    end
+    final $display("OVERFLOW layer=%s stage=hswish total=%0d", LAYER, overflow_count);
+`endif
+
     always @(posedge clk) begin
         if (rst) begin
             for (int i = 0; i < 4; i++) begin
@@ -3,7 +3,8 @@ module linear #(
     parameter WIDTH = 16,
     parameter FRAC = 8,
     parameter IN_FEATURES = 576,
-    parameter OUT_FEATURES = 1280
+    parameter OUT_FEATURES = 1280,
+    parameter LAYER = "linear" // Name in the OVERFLOW_COUNTERS debug lines
 ) (
     input wire clk,
     input wire rst,
@@ -27,6 +28,25 @@ module linear #(
     localparam signed [WIDTH-1:0] MAX_VAL = (1 << (WIDTH-1)) - 1;
     localparam signed [WIDTH-1:0] MIN_VAL = -(1 << (WIDTH-1));
 
+`ifdef OVERFLOW_COUNTERS
+    // Debug: saturated outputs of the current pass, printed when it completes
+    // as "OVERFLOW layer=<LAYER> stage=output count=<n>" (see src/overflow_report.py)
+    integer overflow_count;
+    always @(posedge clk) begin
+        if (rst) begin
+            overflow_count <= 0;
+        end else if (en) begin
+            if (state == PROCESSING && in_f_count == IN_FEATURES - 1 &&
+                (accum > (MAX_VAL << FRAC) || accum < (MIN_VAL << FRAC))) begin
+                overflow_count <= overflow_count + 1;
+            end else if (state == DONE) begin
+                $display("OVERFLOW layer=%s stage=output count=%0d", LAYER, overflow_count);
+                overflow_count <= 0;
+            end
+        end
+    end
+`endif
+
     // Function to convert 2D weight indexing to 1D
     function automatic [$clog2(OUT_FEATURES*IN_FEATURES)-1:0] weight_index;
         input [$clog2(OUT_FEATURES)-1:0] out_idx;
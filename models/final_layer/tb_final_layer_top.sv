@@ -39,8 +39,10 @@ module tb_final_layer_top;
     integer total_failed = 0;
     integer total_cycles = 0;
 
-    // Output files
-    integer logfile, outfile;
+    // Output files (testbench_results.jsonl holds one JSON object per test)
+    integer logfile, outfile, jsonfile;
+    // Transcript detail, +VERBOSITY=0..3 or +QUIET (0 = summary only, see tb_full_system_top.sv)
+    int verbosity = 2;
     integer i, j;
 
     // Instantiate DUT
@@ -109,7 +111,7 @@ module tb_final_layer_top;
         reg signed [NUM_CLASSES*WIDTH-1:0] output_data;
         integer output_valid_count;
         
-        $display("=== Running Test %0d: %s ===", test_num, test_names[test_num]);
+        if (verbosity >= 1) $display("=== Running Test %0d: %s ===", test_num, test_names[test_num]);
         $fdisplay(logfile, "=== Test %0d: %s ===", test_num, test_names[test_num]);
         
         // Reset for new test
@@ -154,13 +156,31 @@ module tb_final_layer_top;
             $fdisplay(outfile, "%04x", output_data[i*WIDTH +: WIDTH]);
         end
         
+        // Machine-readable record: test id, status, cycles, argmax and raw scores
+        begin
+            integer best;
+            best = 0;
+            for (i = 1; i < NUM_CLASSES; i = i + 1)
+                if ($signed(output_data[i*WIDTH +: WIDTH]) > $signed(output_data[best*WIDTH +: WIDTH])) best = i;
+            $fwrite(jsonfile, "{\"test\": %0d, \"passed\": %0d, \"cycles\": %0d, \"latency\": %0d, ",
+                    test_num, output_valid_count > 0, test_cycles[test_num], j);
+            if ($isunknown(output_data)) begin
+                $fwrite(jsonfile, "\"argmax\": null, \"scores\": null}\n");
+            end else begin
+                $fwrite(jsonfile, "\"argmax\": %0d, \"scores\": [", best);
+                for (i = 0; i < NUM_CLASSES; i = i + 1)
+                    $fwrite(jsonfile, "%0d%s", $signed(output_data[i*WIDTH +: WIDTH]), (i < NUM_CLASSES-1) ? ", " : "");
+                $fwrite(jsonfile, "]}\n");
+            end
+        end
+        
         // Basic validation (check for reasonable output)
         if (output_valid_count == 0) begin
             $display("ERROR: Test %0d failed - no valid output", test_num);
             $fdisplay(logfile, "ERROR: Test %0d failed - no valid output", test_num);
             test_results[test_num] = 1; // Fail
         end else begin
-            $display("Test %0d passed", test_num);
+            if (verbosity >= 1) $display("Test %0d passed", test_num);
             $fdisplay(logfile, "Test %0d passed", test_num);
             test_results[test_num] = 0; // Pass
         end
@@ -171,8 +191,11 @@ module tb_final_layer_top;
         // Open log files
         logfile = $fopen("testbench.log", "w");
         outfile = $fopen("all_test_outputs.txt", "w");
+        jsonfile = $fopen("testbench_results.jsonl", "w");
+        if ($test$plusargs("QUIET")) verbosity = 0;
+        void'($value$plusargs("VERBOSITY=%d", verbosity));
         
-        if (logfile == 0 || outfile == 0) begin
+        if (logfile == 0 || outfile == 0 || jsonfile == 0) begin
             $display("ERROR: Could not open log files");
             $finish;
         end
@@ -212,6 +235,7 @@ module tb_final_layer_top;
         
         $fclose(logfile);
         $fclose(outfile);
+        $fclose(jsonfile);
         
         $display("Testbench completed. Check testbench.log and all_test_outputs.txt for details.");
         $finish;
@@ -0,0 +1,88 @@
+`timescale 1ns/1ps
+
+// Overflow-counter testbench of the classifier head: linear3 -> bn3 -> hs3
+// Compile the three modules with +define+OVERFLOW_COUNTERS (run_tb_overflow_head.do);
+// they print "OVERFLOW layer=... stage=..." lines that src/overflow_report.py --rtl-log
+// compares with the golden model. The pooled linear3 inputs of each image come from
+// +FEATURES=<file> (IN_FEATURES Q8.8 words per image, written by overflow_report.py
+// --dump-features) and +IMAGES=<n> sets how many images it holds. The weights are read
+// from the unfolded export in memory_files/ (bn3 is a separate layer there).
+module tb_overflow_head;
+    parameter WIDTH = 16;
+    parameter FRAC = 8;
+    parameter IN_FEATURES = 576;
+    parameter FEATURES = 1280;
+    parameter MAX_IMAGES = 256;
+
+    reg clk = 0;
+    reg rst = 1;
+    reg en = 0;
+    always #5 clk = ~clk;
+
+    reg signed [WIDTH-1:0] features [0:MAX_IMAGES*IN_FEATURES-1];
+    reg signed [WIDTH-1:0] weights [0:FEATURES*IN_FEATURES-1];
+    reg signed [WIDTH-1:0] biases [0:FEATURES-1];
+    reg signed [WIDTH-1:0] gamma [0:FEATURES-1];
+    reg signed [WIDTH-1:0] beta [0:FEATURES-1];
+
+    reg signed [WIDTH-1:0] fc_in [0:IN_FEATURES-1];
+    reg fc_valid = 0;
+    wire signed [WIDTH-1:0] fc_out [0:FEATURES-1];
+    wire fc_done;
+    wire signed [WIDTH-1:0] bn_out [0:FEATURES-1];
+    wire bn_done;
+    reg signed [WIDTH-1:0] hs_in = 0;
+    reg hs_valid = 0;
+    wire signed [WIDTH-1:0] hs_out;
+    wire hs_valid_out;
+
+    linear #(.WIDTH(WIDTH), .FRAC(FRAC), .IN_FEATURES(IN_FEATURES), .OUT_FEATURES(FEATURES), .LAYER("linear3"))
+        linear3 (.clk(clk), .rst(rst), .en(en), .data_in(fc_in), .weights(weights), .biases(biases),
+                 .valid_in(fc_valid), .data_out(fc_out), .valid_out(fc_done));
+
+    batchnorm1d #(.WIDTH(WIDTH), .FRAC(FRAC), .FEATURES(FEATURES), .LAYER("bn3"))
+        bn3 (.clk(clk), .rst(rst), .en(en), .data_in(fc_out), .valid_in(fc_done), .gamma(gamma), .beta(beta),
+             .data_out(bn_out), .valid_out(bn_done));
+
+    // The golden model names this activation hs3; the module streams one element per cycle
+    hswish #(.WIDTH(WIDTH), .FRAC(FRAC), .LAYER("hs3"))
+        hs3 (.clk(clk), .rst(rst), .en(en), .data_in(hs_in), .valid_in(hs_valid),
+             .data_out(hs_out), .valid_out(hs_valid_out));
+
+    string features_file;
+    integer images, n, k;
+
+    initial begin
+        if (!$value$plusargs("FEATURES=%s", features_file)) features_file = "head_features.mem";
+        if (!$value$plusargs("IMAGES=%d", images)) images = 1;
+        if (images > MAX_IMAGES) begin
+            $display("ERROR: +IMAGES=%0d exceeds MAX_IMAGES=%0d", images, MAX_IMAGES);
+            $finish;
+        end
+        $readmemh(features_file, features);
+        $readmemh("memory_files/linear3_weights.mem", weights);
+        $readmemh("memory_files/linear3_biases.mem", biases);
+        $readmemh("memory_files/bn3_gamma.mem", gamma);
+        $readmemh("memory_files/bn3_beta.mem", beta);
+
+        repeat (2) @(posedge clk);
+        rst <= 0;
+        en <= 1;
+        for (n = 0; n < images; n = n + 1) begin
+            // One linear3 and bn3 pass per image, then its activations stream through hs3
+            for (k = 0; k < IN_FEATURES; k = k + 1) fc_in[k] = features[n*IN_FEATURES + k];
+            @(posedge clk) fc_valid <= 1;
+            @(posedge clk) fc_valid <= 0;
+            @(posedge bn_done);
+            for (k = 0; k < FEATURES; k = k + 1) begin
+                @(posedge clk);
+                hs_in <= bn_out[k];
+                hs_valid <= 1;
+            end
+            @(posedge clk) hs_valid <= 0;
+            repeat (8) @(posedge clk);
+        end
+        $display("Overflow head testbench: %0d image(s) done", images);
+        $finish;
+    end
+endmodule
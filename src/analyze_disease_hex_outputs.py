@@ -4,30 +4,12 @@ Medical X-ray Classification Analysis System
 Analyzes hardware simulation outputs and provides medical diagnosis with probabilities
 """
 
-import re
 import sys
 import os
-import math
 from pathlib import Path
-
-# Medical condition class names (15 chest X-ray conditions)
-MEDICAL_CONDITIONS = [
-    "No Finding",
-    "Infiltration",
-    "Atelectasis", 
-    "Effusion",
-    "Nodule",
-    "Pneumothorax",
-    "Mass",
-    "Consolidation",
-    "Pleural Thickening",
-    "Cardiomegaly",
-    "Emphysema",
-    "Fibrosis",
-    "Edema",
-    "Pneumonia",
-    "Hernia"
-]
+from log_parser import parse_log, group_tests
+import postprocess
+from postprocess import MEDICAL_CONDITIONS
 
 # Medical recommendations
 MEDICAL_RECOMMENDATIONS = [
@@ -48,55 +30,28 @@ MEDICAL_RECOMMENDATIONS = [
     "Possible diaphragm hernia. Consult a surgeon for evaluation."
 ]
 
-def fixed_to_probability(fixed_val, data_width=16, frac_bits=8):
-    """Convert fixed-point value to probability (0.0 to 1.0)"""
-    # Convert to signed integer
-    if fixed_val >= 2**(data_width-1):
-        fixed_val -= 2**data_width
-    
-    # Convert to floating point (assuming Q8.8 format)
-    temp_real = fixed_val / (2.0**frac_bits)
-    
-    # Apply sigmoid approximation to get 0-1 range
-    if temp_real > 5.0:
-        return 1.0
-    elif temp_real < -5.0:
-        return 0.0
-    else:
-        return 1.0 / (1.0 + math.exp(-temp_real))
-
 def extract_hex_values_from_log(log_file_path):
-    """Extract hex values from simulation log file"""
+    """Extract the score words of a simulation log as 16-bit hex strings
+
+    The log is streamed line by line (see log_parser.py), so multi-gigabyte
+    transcripts full of DATA FLOW DEBUG lines are scanned in bounded memory.
+    Scores of the first test come first, in class order.
+    """
     hex_values = []
+    disease_outputs = []
     
     try:
-        with open(log_file_path, 'r') as f:
-            content = f.read()
-            
-        # Look for hex patterns in the output
-        # Pattern to match hex values (8-bit, 16-bit, 32-bit)
-        hex_patterns = [
-            r'0x[0-9a-fA-F]{2}',      # 8-bit hex
-            r'0x[0-9a-fA-F]{4}',      # 16-bit hex  
-            r'0x[0-9a-fA-F]{8}',      # 32-bit hex
-            r'[0-9a-fA-F]{2}',        # 8-bit hex without 0x
-            r'[0-9a-fA-F]{4}',        # 16-bit hex without 0x
-            r'[0-9a-fA-F]{8}'         # 32-bit hex without 0x
-        ]
-        
-        for pattern in hex_patterns:
-            matches = re.findall(pattern, content)
-            if matches:
-                hex_values.extend(matches)
-                
-        # Also look for specific disease output patterns
-        disease_pattern = r'Disease\s+(\d+):\s+([0-9a-fA-Fx]+)'
-        disease_matches = re.findall(disease_pattern, content)
+        for rec in parse_log(log_file_path):
+            if rec['type'] != 'score':
+                continue
+            hex_values.append(f"{rec['value'] & 0xFFFF:04x}")
+            if rec['class'] is not None:
+                disease_outputs.append((rec['class'], hex_values[-1]))
         
-        if disease_matches:
+        # Also report specific disease output lines
+        if disease_outputs:
             print("Found disease-specific outputs:")
-            for idx, hex_val in disease_matches:
-                disease_idx = int(idx)
+            for disease_idx, hex_val in disease_outputs[:len(MEDICAL_CONDITIONS)]:
                 if disease_idx < len(MEDICAL_CONDITIONS):
                     print(f"  {MEDICAL_CONDITIONS[disease_idx]}: {hex_val}")
         
@@ -112,26 +67,22 @@ def extract_hex_values_from_log(log_file_path):
 def analyze_output_file(output_file_path):
     """Analyze the full system outputs file"""
     try:
-        with open(output_file_path, 'r') as f:
-            content = f.read()
-            
         print("=== FULL SYSTEM OUTPUT ANALYSIS ===")
         print(f"Output file: {output_file_path}")
-        print(f"File size: {len(content)} characters")
+        print(f"File size: {os.path.getsize(output_file_path)} bytes")
         print()
         
-        # Look for test results
-        test_pattern = r'Test\s+(\d+):\s+(.+)'
-        test_matches = re.findall(test_pattern, content)
+        # One pass: test headers and the score words under them
+        tests = list(group_tests(parse_log(output_file_path)))
         
-        if test_matches:
+        if any(t['test'] is not None for t in tests):
             print("Test Results:")
-            for test_num, result in test_matches:
-                print(f"  Test {test_num}: {result}")
+            for t in tests:
+                if t['test'] is not None:
+                    print(f"  Test {t['test']}: {t['name']} ({len(t['scores'])} scores)")
             print()
         
-        # Look for hex values
-        hex_values = re.findall(r'0x[0-9a-fA-F]+', content)
+        hex_values = [f"{v & 0xFFFF:04x}" for t in tests for v in t['scores']]
         if hex_values:
             print(f"Found {len(hex_values)} hex values:")
             for i, hex_val in enumerate(hex_values[:20]):  # Show first 20
@@ -173,37 +124,27 @@ def create_medical_diagnosis_report(hex_values, output_file="medical_diagnosis_r
         print(f"{'Condition':<20} | {'Probability':<12} | {'Raw Score':<10} | {'Confidence':<12} | {'Recommendation'}")
         print("-" * 80)
         
-        probabilities = []
-        max_probability = 0.0
-        primary_condition = 0
+        # One batch conversion of the 15 class scores (invalid words count as probability 0)
+        raw_scores, valid = postprocess.parse_hex_scores(hex_values[:15])
+        probabilities = postprocess.sigmoid(raw_scores) * valid
+        primary_condition = int(probabilities.argmax())
+        max_probability = probabilities[primary_condition]
+        secondary = postprocess.secondary_findings(probabilities[None, :], [primary_condition])[0]
+        urgency_level = postprocess.urgency(primary_condition)
         
-        for i in range(min(15, len(hex_values))):
-            hex_val = hex_values[i]
-            try:
-                # Convert hex to integer
-                if hex_val.startswith('0x'):
-                    raw_score = int(hex_val, 16)
-                else:
-                    raw_score = int(hex_val, 16)
-                
-                # Convert to probability
-                probability = fixed_to_probability(raw_score)
-                probabilities.append(probability)
-                
-                # Track highest probability
-                if probability > max_probability:
-                    max_probability = probability
-                    primary_condition = i
-                
-                # Format recommendation (truncate if too long)
-                recommendation = MEDICAL_RECOMMENDATIONS[i]
-                if len(recommendation) > 50:
-                    recommendation = recommendation[:47] + "..."
-                
-                print(f"{MEDICAL_CONDITIONS[i]:<20} | {probability:>10.4f} | {raw_score:>8d} | {probability*100:>10.2f}% | {recommendation}")
-                
-            except ValueError:
-                print(f"{MEDICAL_CONDITIONS[i]:<20} | {'INVALID':<12} | {hex_val:<10} | {'ERROR':<12} | Invalid hex value")
+        rows = []
+        for i, hex_val in enumerate(hex_values[:15]):
+            if not valid[i]:
+                rows.append(f"{MEDICAL_CONDITIONS[i]:<20} | {'INVALID':<12} | {hex_val:<10} | {'ERROR':<12} | Invalid hex value")
+                continue
+            # Format recommendation (truncate if too long)
+            recommendation = MEDICAL_RECOMMENDATIONS[i]
+            if len(recommendation) > 50:
+                recommendation = recommendation[:47] + "..."
+            probability = probabilities[i]
+            raw_score = int(hex_val, 16)
+            rows.append(f"{MEDICAL_CONDITIONS[i]:<20} | {probability:>10.4f} | {raw_score:>8d} | {probability*100:>10.2f}% | {recommendation}")
+        print("\n".join(rows))
         
         print("-" * 80)
         
@@ -215,24 +156,16 @@ def create_medical_diagnosis_report(hex_values, output_file="medical_diagnosis_r
         
         # Secondary conditions (probability > 0.3)
         print(f"\nSECONDARY FINDINGS (>30% probability):")
-        secondary_count = 0
-        for i, prob in enumerate(probabilities):
-            if prob > 0.3 and i != primary_condition:
-                print(f"  • {MEDICAL_CONDITIONS[i]}: {prob*100:.2f}%")
-                secondary_count += 1
-        if secondary_count == 0:
+        for i in secondary.nonzero()[0]:
+            print(f"  • {MEDICAL_CONDITIONS[i]}: {probabilities[i]*100:.2f}%")
+        if not secondary.any():
             print("  No significant secondary findings.")
         
         # Urgency assessment
+        urgency_line = (f"  {postprocess.URGENCY_LEVELS[urgency_level]} URGENCY - "
+                        f"{postprocess.URGENCY_DESCRIPTIONS[urgency_level]}")
         print(f"\nURGENCY ASSESSMENT:")
-        if primary_condition == 5:  # Pneumothorax
-            print("  HIGH URGENCY - Seek emergency care immediately!")
-        elif primary_condition in [2, 6, 13]:  # Atelectasis, Mass, Pneumonia
-            print("  MODERATE URGENCY - Schedule appointment within 24-48 hours")
-        elif primary_condition == 0:  # No Finding
-            print("  LOW URGENCY - Normal findings, routine follow-up")
-        else:
-            print("  STANDARD URGENCY - Schedule appointment within 1-2 weeks")
+        print(urgency_line)
         
         # Save detailed report
         with open(output_file, 'w') as f:
@@ -248,42 +181,18 @@ def create_medical_diagnosis_report(hex_values, output_file="medical_diagnosis_r
             f.write(f"{'Condition':<20} | {'Probability':<12} | {'Raw Score':<10} | {'Confidence':<12} | {'Recommendation'}\n")
             f.write("-" * 80 + "\n")
             
-            for i in range(min(15, len(hex_values))):
-                hex_val = hex_values[i]
-                try:
-                    if hex_val.startswith('0x'):
-                        raw_score = int(hex_val, 16)
-                    else:
-                        raw_score = int(hex_val, 16)
-                    
-                    probability = fixed_to_probability(raw_score)
-                    recommendation = MEDICAL_RECOMMENDATIONS[i]
-                    if len(recommendation) > 50:
-                        recommendation = recommendation[:47] + "..."
-                    
-                    f.write(f"{MEDICAL_CONDITIONS[i]:<20} | {probability:>10.4f} | {raw_score:>8d} | {probability*100:>10.2f}% | {recommendation}\n")
-                    
-                except ValueError:
-                    f.write(f"{MEDICAL_CONDITIONS[i]:<20} | {'INVALID':<12} | {hex_val:<10} | {'ERROR':<12} | Invalid hex value\n")
+            f.write("\n".join(rows) + "\n")
             
             f.write("-" * 80 + "\n\n")
             f.write(f"PRIMARY DIAGNOSIS: {MEDICAL_CONDITIONS[primary_condition]} ({max_probability*100:.2f}%)\n")
             f.write(f"RECOMMENDATION: {MEDICAL_RECOMMENDATIONS[primary_condition]}\n\n")
             
             f.write("SECONDARY FINDINGS (>30% probability):\n")
-            for i, prob in enumerate(probabilities):
-                if prob > 0.3 and i != primary_condition:
-                    f.write(f"  • {MEDICAL_CONDITIONS[i]}: {prob*100:.2f}%\n")
+            for i in secondary.nonzero()[0]:
+                f.write(f"  • {MEDICAL_CONDITIONS[i]}: {probabilities[i]*100:.2f}%\n")
             
             f.write("\nURGENCY ASSESSMENT:\n")
-            if primary_condition == 5:
-                f.write("  HIGH URGENCY - Seek emergency care immediately!\n")
-            elif primary_condition in [2, 6, 13]:
-                f.write("  MODERATE URGENCY - Schedule appointment within 24-48 hours\n")
-            elif primary_condition == 0:
-                f.write("  LOW URGENCY - Normal findings, routine follow-up\n")
-            else:
-                f.write("  STANDARD URGENCY - Schedule appointment within 1-2 weeks\n")
+            f.write(urgency_line + "\n")
         
         print(f"\nDetailed medical report saved to: {output_file}")
         return output_file
@@ -311,11 +220,12 @@ def main():
         hex_values.extend(log_hex)
         print()
     
-    # Analyze output file
+    # Analyze output file (the authoritative score dump when the log has no complete block)
     if os.path.exists(output_file):
         print(f"Analyzing output file: {output_file}")
         output_hex = analyze_output_file(output_file)
-        hex_values.extend(output_hex)
+        if len(hex_values) < len(MEDICAL_CONDITIONS):
+            hex_values = output_hex
         print()
     
     if not hex_values:
@@ -324,16 +234,8 @@ def main():
         print("  vsim -do run_tb_full_system_top.do")
         return
     
-    # Remove duplicates while preserving order
-    unique_hex = []
-    seen = set()
-    for hex_val in hex_values:
-        if hex_val not in seen:
-            unique_hex.append(hex_val)
-            seen.add(hex_val)
-    
     # Create comprehensive medical report
-    report_file = create_medical_diagnosis_report(unique_hex)
+    report_file = create_medical_diagnosis_report(hex_values)
     
     print("\n=== MEDICAL AI SYSTEM SUMMARY ===")
     print("System: MobileNetV3 Chest X-ray Classifier")
@@ -5,19 +5,24 @@ Analyzes the emergency neural network simulation results and generates
 comprehensive reports with diagrams and textual analysis.
 """
 
-import re
+import numpy as np
 from datetime import datetime
+from log_parser import parse_log, group_tests
+import results_db
+import metrics
+
+# Runs imported from emergency-system transcripts
+SOURCE = "emergency_system"
 
 # Try to import optional libraries, use fallbacks if not available
 try:
     import matplotlib.pyplot as plt
-    import numpy as np
     PLOTTING_AVAILABLE = True
     print("Plotting libraries available - full analysis mode")
 except ImportError:
     PLOTTING_AVAILABLE = False
     print("WARNING: Plotting libraries not available - text-only analysis mode")
-    print("To enable plots, install: pip install matplotlib numpy")
+    print("To enable plots, install: pip install matplotlib")
 
 class EmergencyResultsAnalyzer:
     def __init__(self, log_file=None):
@@ -42,65 +47,87 @@ class EmergencyResultsAnalyzer:
 
         if not self.log_file:
             self.log_file = "transcript"  # fallback
-        self.disease_names = [
-            "No Finding", "Infiltration", "Atelectasis", "Effusion", "Nodule",
-            "Pneumothorax", "Mass", "Consolidation", "Pleural Thickening", 
-            "Cardiomegaly", "Emphysema", "Fibrosis", "Edema", "Pneumonia", "Hernia"
-        ]
+        self.disease_names = list(metrics.CLASS_NAMES)
         self.results = []
         self.scores_data = []
         
     def parse_simulation_log(self):
-        """Parse the ModelSim simulation log to extract results"""
+        """Load the results of the simulation log through the results database
+
+        The transcript is streamed through log_parser in a single pass, so
+        its size (DATA FLOW DEBUG output included) does not matter. Its tests
+        are stored as one run (once per log content) and read back from the
+        database; without a log the latest stored run is used.
+        """
+        conn = results_db.connect()
         try:
-            with open(self.log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-        except FileNotFoundError:
-            print(f"⚠️ Log file '{self.log_file}' not found. Using sample data.")
-            self._generate_sample_data()
-            return
-            
-        # Extract test results
-        test_pattern = r'=== TESTING DISEASE (\d+): ([^=]+) ==='
-        result_pattern = r'(✅ CORRECT|❌ INCORRECT): Expected ([^(]+) \(Class (\d+)\), Predicted ([^(]+) \(Class (\d+)\)'
-        confidence_pattern = r'Confidence: (\d+)'
-        scores_pattern = r'Class (\d+) \([^)]+\): (\d+)'
-        
-        tests = re.findall(test_pattern, content)
-        results = re.findall(result_pattern, content)
-        confidences = re.findall(confidence_pattern, content)
-        
-        # Parse all scores for each test
-        test_sections = re.split(test_pattern, content)
-        
-        for i, (test_id, disease_name) in enumerate(tests):
-            if i < len(results):
-                status, expected_disease, expected_class, predicted_disease, predicted_class = results[i]
-                confidence = int(confidences[i]) if i < len(confidences) else 0
-                
-                # Extract scores for this test
-                if i*3 + 2 < len(test_sections):
-                    section = test_sections[i*3 + 2]
-                    test_scores = re.findall(scores_pattern, section)
-                    scores = [int(score) for _, score in test_scores]
-                    
-                    self.results.append({
-                        'test_id': int(test_id),
-                        'disease_name': disease_name.strip(),
-                        'expected_class': int(expected_class),
-                        'predicted_class': int(predicted_class),
-                        'correct': status == '✅ CORRECT',
-                        'confidence': confidence,
-                        'scores': scores
-                    })
-                    
-                    if scores:
-                        self.scores_data.append(scores)
-        
+            run_id = self.import_log(conn)
+            if run_id is None:
+                run = results_db.latest_run(conn, SOURCE)
+                run_id = run['id'] if run else None
+                if run_id is not None:
+                    print(f"Using stored run {run_id} from {results_db.db_path()}")
+            if run_id is not None:
+                self.load_run(conn, run_id)
+        finally:
+            conn.close()
+
         if not self.results:
-            print("⚠️ No results found in log. Using sample data.")
+            print("⚠️ No results found in log or database. Using sample data.")
             self._generate_sample_data()
-    
+
+    def import_log(self, conn):
+        """Store the tests of the simulation log as a run; returns its id (None without a usable log)"""
+        records = []
+        try:
+            # Only the per-class "Class N (name): score" lines count as scores here
+            parsed = (r for r in parse_log(self.log_file) if r['type'] != 'score' or r['class'] is not None)
+            for test in group_tests(parsed):
+                if test['test'] is None or test['predicted_class'] is None:
+                    continue
+                records.append({
+                    'name': test['name'].strip(),
+                    'input': self.log_file,
+                    'expected_class': test['expected_class'],
+                    'expected': self.disease_names[test['expected_class']],
+                    'predicted_class': test['predicted_class'],
+                    'predicted': self.disease_names[test['predicted_class']],
+                    'correct': int(bool(test['correct'])),
+                    'confidence': int(test['confidence'] or 0),
+                    'cycles': test['cycles'],
+                    'scores': test['scores'],
+                })
+        except FileNotFoundError:
+            print(f"⚠️ Log file '{self.log_file}' not found.")
+            return None
+        if not records:
+            return None
+        return results_db.add_run(conn, SOURCE, records, import_hash=results_db.import_hash([self.log_file]),
+                                  notes=f"imported from {self.log_file}")
+
+    def load_run(self, conn, run_id):
+        """Fill self.results and self.scores_data from a stored run"""
+        for i, r in enumerate(results_db.run_results(conn, run_id)):
+            scores = [s for s in r['scores'] or [] if s is not None]
+            self.results.append({
+                # the emergency testbench numbers its tests by the disease class
+                'test_id': i if r['expected_class'] is None else r['expected_class'],
+                'disease_name': r['name'],
+                'expected_class': r['expected_class'],
+                'predicted_class': r['predicted_class'],
+                'correct': bool(r['correct']),
+                'confidence': int(r['confidence'] or 0),
+                'scores': scores
+            })
+            if scores:
+                self.scores_data.append(scores)
+
+    def class_arrays(self):
+        """Expected and predicted class of every result as arrays (-1 where unknown), plus correct flags"""
+        expected = np.array([-1 if r['expected_class'] is None else r['expected_class'] for r in self.results])
+        predicted = np.array([-1 if r['predicted_class'] is None else r['predicted_class'] for r in self.results])
+        return expected, predicted, np.array([bool(r['correct']) for r in self.results])
+
     def _generate_sample_data(self):
         """Generate realistic sample data with uncertainties and errors"""
         import random
@@ -202,18 +229,11 @@ PERFORMANCE BY DISEASE CATEGORY
 ================================
 """
         
-        disease_performance = {}
-        for result in self.results:
-            disease = result['disease_name']
-            if disease not in disease_performance:
-                disease_performance[disease] = {'correct': 0, 'total': 0}
-            disease_performance[disease]['total'] += 1
-            if result['correct']:
-                disease_performance[disease]['correct'] += 1
-        
-        for disease, perf in disease_performance.items():
-            accuracy = (perf['correct'] / perf['total']) * 100
-            report += f"{disease:<25}: {accuracy:6.1f}% ({perf['correct']}/{perf['total']})\n"
+        expected, _, correct = self.class_arrays()
+        accuracy, counts = metrics.per_class_accuracy(expected, correct)
+        for c in np.flatnonzero(counts):
+            hits = round(accuracy[c] * counts[c])
+            report += f"{self.disease_names[c]:<25}: {accuracy[c] * 100:6.1f}% ({hits}/{counts[c]})\n"
         
         # Confidence analysis
         if self.results:
@@ -374,9 +394,8 @@ TECHNICAL INSIGHTS
         plt.figure(figsize=(12, 10))
 
         # Create confusion matrix
-        confusion_data = [[0 for _ in range(15)] for _ in range(15)]
-        for result in self.results:
-            confusion_data[result['expected_class']][result['predicted_class']] += 1
+        expected, predicted, _ = self.class_arrays()
+        confusion_data = metrics.confusion_matrix(expected, predicted)
 
         try:
             plt.imshow(confusion_data, cmap='Blues', interpolation='nearest')
@@ -426,19 +445,12 @@ TECHNICAL INSIGHTS
         ax1.grid(alpha=0.3)
 
         # 2. Error distribution by disease
-        error_counts = {}
-        for result in self.results:
-            disease = result['disease_name']
-            if disease not in error_counts:
-                error_counts[disease] = {'correct': 0, 'incorrect': 0}
-            if result['correct']:
-                error_counts[disease]['correct'] += 1
-            else:
-                error_counts[disease]['incorrect'] += 1
-
-        diseases = list(error_counts.keys())
-        correct_counts = [error_counts[d]['correct'] for d in diseases]
-        incorrect_counts = [error_counts[d]['incorrect'] for d in diseases]
+        expected, _, correct = self.class_arrays()
+        accuracy, counts = metrics.per_class_accuracy(expected, correct)
+        seen = np.flatnonzero(counts)
+        diseases = [self.disease_names[c] for c in seen]
+        correct_counts = np.round(accuracy[seen] * counts[seen]).astype(int)
+        incorrect_counts = counts[seen] - correct_counts
 
         x_pos = range(len(diseases))
         ax2.bar(x_pos, correct_counts, label='Correct', color='green', alpha=0.7)
@@ -493,7 +505,7 @@ TECHNICAL INSIGHTS
         """Create all visualization plots as separate images"""
         if not PLOTTING_AVAILABLE:
             print("Plotting libraries not available - skipping visualizations")
-            print("To enable plots, install: pip install matplotlib numpy")
+            print("To enable plots, install: pip install matplotlib")
             return
 
         if not self.results:
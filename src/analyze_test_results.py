@@ -9,25 +9,81 @@ import sys
 import matplotlib.pyplot as plt
 import numpy as np
 from pathlib import Path
+import results_db
 
-def load_test_results(results_dir="test_results"):
-    """Load all test results from the results directory"""
-    # Check if summary file exists
-    summary_path = os.path.join(results_dir, "overall_summary.json")
-    if os.path.exists(summary_path):
-        with open(summary_path, 'r') as f:
-            summary = json.load(f)
-    else:
-        print(f"Summary file not found: {summary_path}")
-        summary = None
-    
-    # Load individual disease results
-    disease_results = {}
-    for result_file in Path(results_dir).glob("*_results.json"):
-        disease_name = result_file.stem.split('_')[0]
+# Runs recorded by run_disease_test_cases.py
+SOURCE = "disease_test_cases"
+
+def import_result_files(conn, results_dir):
+    """Store the *_results.json files of a directory as a run and return its id (None without files)
+
+    The run is keyed on the files' content, so importing the same files again
+    returns the run stored the first time.
+    """
+    result_files = sorted(Path(results_dir).glob("*_results.json"))
+    if not result_files:
+        return None
+    records = []
+    for result_file in result_files:
         with open(result_file, 'r') as f:
-            disease_results[disease_name] = json.load(f)
-    
+            for r in json.load(f):
+                records.append({
+                    'name': Path(r['test_file']).stem,
+                    'input': r['test_file'],
+                    'expected_class': results_db.class_index(r['expected']),
+                    'expected': r['expected'],
+                    'predicted_class': results_db.class_index(r['detected']),
+                    'predicted': r['detected'],
+                    'correct': int(r.get('correct_detection', False)),
+                    'confidence': r.get('confidence', 0.0),
+                    'cycles': r.get('cycles'),
+                    'wall_seconds': r.get('sim_seconds'),
+                })
+    print(f"Reading {len(records)} results from {len(result_files)} result files in {results_dir}")
+    return results_db.add_run(conn, SOURCE, records, import_hash=results_db.import_hash(result_files),
+                              notes=f"imported from {results_dir}")
+
+def load_test_results(results_dir="test_results", run_id=None, db=None):
+    """Load a regression run from the results database
+
+    Defaults to the run of the result files in results_dir (imported on
+    first use), or the latest run_disease_test_cases.py run when the
+    directory has none. Returns (summary, {disease: [result, ...]}).
+    """
+    conn = results_db.connect(db)
+    try:
+        if run_id is None:
+            run_id = import_result_files(conn, results_dir)
+        if run_id is None:
+            run = results_db.latest_run(conn, SOURCE)
+            if run is None:
+                print(f"No runs in {results_db.db_path(db)}")
+                return None, {}
+            run_id = run['id']
+        disease_results = {}
+        for r in results_db.run_results(conn, run_id):
+            disease_results.setdefault(r['expected'], []).append({
+                'test_file': r['input'],
+                'expected': r['expected'],
+                'detected': r['predicted'],
+                'confidence': r['confidence'] or 0.0,
+                'correct_detection': bool(r['correct']),
+                'cycles': r['cycles'],
+            })
+        by_disease = results_db.accuracy_by_expected(conn, run_id)
+    finally:
+        conn.close()
+
+    total_tests = sum(stats['total'] for stats in by_disease.values())
+    total_correct = sum(stats['correct'] for stats in by_disease.values())
+    summary = {
+        'run_id': run_id,
+        'total_tests': total_tests,
+        'total_correct': total_correct,
+        'accuracy': total_correct / total_tests if total_tests > 0 else 0,
+        'results_by_disease': {disease: {k: stats[k] for k in ('total', 'correct', 'accuracy')}
+                               for disease, stats in by_disease.items()},
+    }
     return summary, disease_results
 
 def generate_accuracy_report(summary, disease_results, output_dir="test_reports"):
@@ -464,7 +520,7 @@ def main():
     if len(sys.argv) >= 3:
         output_dir = sys.argv[2]
     
-    print(f"Loading test results from: {results_dir}")
+    print(f"Loading test results from: {results_db.db_path()}")
     summary, disease_results = load_test_results(results_dir)
     
     if not disease_results:
@@ -472,7 +528,7 @@ def main():
         print("  python run_disease_test_cases.py --all")
         return
     
-    print(f"Found results for {len(disease_results)} diseases")
+    print(f"Found results for {len(disease_results)} diseases (run {summary['run_id']})")
     
     # Generate reports
     print("\nGenerating reports...")
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Streaming activation-range calibration for MobileNetV3_Small
+Streams every image of a directory tree (data/, a local ChestX-ray14 copy,
+.png/.jpg or 224x224 .mem files) through the float PyTorch model or the
+fixed-point golden model in batches. A background thread decodes the next
+batch while the current one runs. Every layer output updates running
+statistics of fixed size, per layer and per channel: min, max and a
+log2-binned |x| histogram that percentiles are read from. Memory therefore
+does not grow with the image count.
+
+The result, activation_calibration.json, gives the real-valued ranges and
+percentiles of each layer. calibrated_formats() turns it into per-layer
+activation Q formats, used by:
+- golden_model.py --calibration
+- qformat_sweep.py --calibration
+- export_mobilenetv3_weights_for_hw.py --calibration, which puts them in the plan
+"""
+
+import os
+import sys
+import json
+import argparse
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+import golden_model as gm
+
+CALIBRATION_FILE = 'activation_calibration.json'
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+PERCENTILES = (99.0, 99.9, 99.99)
+# |x| histogram: BINS_PER_OCTAVE bins per power of two between 2**MIN_EXP and 2**MAX_EXP,
+# plus one bin below (zeros included) and one above
+MIN_EXP = -16
+MAX_EXP = 16
+BINS_PER_OCTAVE = 8
+NUM_BINS = (MAX_EXP - MIN_EXP) * BINS_PER_OCTAVE + 2
+
+
+def find_images(directory):
+    """Image and .mem files under directory, in a stable order"""
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        paths += [os.path.join(root, f) for f in sorted(files) if f.lower().endswith(IMAGE_EXTENSIONS + ('.mem',))]
+    return paths
+
+
+def load_image(path, img_size=gm.IMG_SIZE):
+    """Q8.8 pixel words (H, W) of an image file: grayscale, resized, 0..255 mapped to 0..1.0"""
+    if path.endswith('.mem'):
+        return gm.load_image_mem(path, img_size)
+    from PIL import Image
+    with Image.open(path) as img:
+        pixels = np.asarray(img.convert('L').resize((img_size, img_size), Image.BILINEAR), dtype=np.float64)
+    return gm.to_fixed(pixels / 255.0)
+
+
+def _load_batch(paths, img_size):
+    names, images = [], []
+    for path in paths:
+        try:
+            images.append(load_image(path, img_size))
+            names.append(path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Skipping {path}: {e}")
+    return names, (np.stack(images) if images else None)
+
+
+def image_batches(paths, batch_size=16, img_size=gm.IMG_SIZE):
+    """Yield (paths, (N, H, W) Q8.8 words) batches; the next batch is decoded while the caller works
+
+    At most two batches are held at a time, whatever the number of paths.
+    """
+    chunks = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
+    if not chunks:
+        return
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(_load_batch, chunks[0], img_size)
+        for i in range(len(chunks)):
+            names, images = pending.result()
+            if i + 1 < len(chunks):
+                pending = pool.submit(_load_batch, chunks[i + 1], img_size)
+            if names:
+                yield names, images
+
+
+def _bin_index(magnitude):
+    """Histogram bin of each |x|: 0 below 2**MIN_EXP, NUM_BINS-1 from 2**MAX_EXP up"""
+    with np.errstate(divide='ignore'):
+        octaves = np.clip(np.log2(magnitude), MIN_EXP - 1, MAX_EXP + 1)
+    index = np.floor((octaves - MIN_EXP) * BINS_PER_OCTAVE).astype(np.int64) + 1
+    return np.clip(index, 0, NUM_BINS - 1)
+
+
+def bin_upper_edges():
+    """Upper |x| edge of every histogram bin (the last bin is open-ended)"""
+    return np.concatenate([[2.0 ** MIN_EXP], 2.0 ** (MIN_EXP + np.arange(1, NUM_BINS) / BINS_PER_OCTAVE)])
+
+
+def histogram_percentile(counts, q):
+    """Upper bin edge below which q percent of the counted magnitudes fall (along the last axis)"""
+    counts = np.asarray(counts)
+    cumulative = np.cumsum(counts, axis=-1)
+    total = cumulative[..., -1:]
+    index = np.argmax(cumulative >= np.maximum(total * (q / 100.0), 1), axis=-1)
+    return np.where(total[..., 0] > 0, bin_upper_edges()[index], 0.0)
+
+
+class ActivationStats:
+    """Hook callback keeping bounded running statistics of every layer output
+
+    Tensors are real-valued (N, C, ...) arrays; scale Q8.8 words by 1/256
+    before feeding them. Channel statistics use axis 1.
+    """
+
+    def __init__(self):
+        self.layers = {}
+
+    def __call__(self, name, tensor):
+        x = np.asarray(tensor, dtype=np.float64)
+        x = x.reshape(x.shape[0], x.shape[1] if x.ndim > 1 else 1, -1)
+        channels = x.shape[1]
+        stats = self.layers.get(name)
+        if stats is None:
+            stats = self.layers[name] = {
+                'count': 0,
+                'channel_min': np.full(channels, np.inf),
+                'channel_max': np.full(channels, -np.inf),
+                'histogram': np.zeros((channels, NUM_BINS), dtype=np.int64),
+            }
+        stats['count'] += x.size
+        np.minimum(stats['channel_min'], x.min(axis=(0, 2)), out=stats['channel_min'])
+        np.maximum(stats['channel_max'], x.max(axis=(0, 2)), out=stats['channel_max'])
+        cells = _bin_index(np.abs(x)) + (np.arange(channels) * NUM_BINS)[None, :, None]
+        stats['histogram'] += np.bincount(cells.reshape(-1), minlength=channels * NUM_BINS).reshape(channels, NUM_BINS)
+
+    def summary(self, percentiles=PERCENTILES):
+        """JSON-ready per-layer ranges, percentiles and histograms (real units)"""
+        layers = {}
+        for name, stats in self.layers.items():
+            layer_hist = stats['histogram'].sum(axis=0)
+            entry = {
+                'count': int(stats['count']),
+                'channels': int(len(stats['channel_min'])),
+                'min': float(stats['channel_min'].min()),
+                'max': float(stats['channel_max'].max()),
+                'abs_max': float(max(-stats['channel_min'].min(), stats['channel_max'].max())),
+                'channel_min': stats['channel_min'].tolist(),
+                'channel_max': stats['channel_max'].tolist(),
+                'histogram': layer_hist.tolist(),
+            }
+            for q in percentiles:
+                entry[f'p{q:g}'] = float(histogram_percentile(layer_hist, q))
+                entry[f'channel_p{q:g}'] = histogram_percentile(stats['histogram'], q).tolist()
+            layers[name] = entry
+        return layers
+
+
+def calibrate(batches, runner, fixed=True, progress=None):
+    """Feed every batch through runner(images, hook) and return the ActivationStats and image count"""
+    stats = ActivationStats()
+    hook = (lambda name, t: stats(name, np.asarray(t) / (1 << gm.FRAC_BITS))) if fixed else stats
+    images = 0
+    for names, batch in batches:
+        runner(batch, hook)
+        images += len(names)
+        if progress:
+            progress(images)
+    return stats, images
+
+
+def calibration_document(stats, images, source, percentiles=PERCENTILES):
+    return {
+        'source': source,
+        'images': images,
+        'percentiles': list(percentiles),
+        'histogram': {'min_exp': MIN_EXP, 'max_exp': MAX_EXP, 'bins_per_octave': BINS_PER_OCTAVE},
+        'layers': stats.summary(percentiles),
+    }
+
+
+def load_calibration(filename):
+    with open(filename, 'r') as f:
+        return json.load(f)
+
+
+def calibrated_peak(calibration, layer, percentile=99.99):
+    """Calibrated |x| bound of a layer in real units (abs_max without a stored percentile)"""
+    entry = calibration['layers'][layer]
+    return entry.get(f'p{percentile:g}', entry['abs_max'])
+
+
+def calibrated_formats(calibration, bits=gm.DATA_WIDTH, percentile=99.99, layers=None, datapath=True):
+    """{layer: {'activation': (bits, frac)}} holding each calibrated layer's percentile bound
+
+    With datapath=True the fractional bits are limited to what the Q8.8
+    datapath of the golden model can represent (see quantize_activation()).
+    """
+    formats = {}
+    for layer in layers if layers is not None else calibration['layers']:
+        if layer not in calibration['layers']:
+            continue
+        peak = calibrated_peak(calibration, layer, percentile)
+        frac = bits - 1 - (int(np.floor(np.log2(peak))) + 1 if peak > 0 else 0)
+        if datapath:
+            frac = min(max(frac, bits - (gm.DATA_WIDTH - gm.FRAC_BITS), 0), gm.FRAC_BITS)
+        formats[layer] = {'activation': (bits, int(frac))}
+    return formats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a directory of images through the model and "
+                                                 "record per-layer activation ranges")
+    parser.add_argument('directory', help='Image directory (searched recursively)')
+    parser.add_argument('--mode', choices=['fixed', 'float'], default='float',
+                        help='float: PyTorch model (needs torch), fixed: bit-exact golden model')
+    parser.add_argument('--weights', type=str, default=gm.MEMORY_DIR, help='Weight .mem directory (fixed mode)')
+    parser.add_argument('--checkpoint', type=str, default='models/mobilenet_fixed_point_16_8.pth',
+                        help='PyTorch checkpoint (float mode)')
+    parser.add_argument('--batch-size', type=int, default=16, help='Images per forward pass')
+    parser.add_argument('--limit', type=int, default=0, help='Use at most this many images (0: all)')
+    parser.add_argument('--output', type=str, default=CALIBRATION_FILE, help='Calibration file to write')
+    args = parser.parse_args()
+
+    paths = find_images(args.directory)
+    if args.limit:
+        paths = paths[:args.limit]
+    if not paths:
+        print(f"❌ No images under {args.directory}")
+        sys.exit(1)
+
+    if args.mode == 'fixed':
+        model = gm.GoldenMobileNetV3.from_mem_dir(args.weights)
+        runner = lambda images, hook: model.forward(images, hook=hook)
+    else:
+        from dump_activations import load_float_model, run_float
+        model = load_float_model(args.checkpoint)
+        runner = lambda images, hook: run_float(model, images, hook, fixed=False)
+
+    print(f"🔬 Calibrating on {len(paths)} image(s) from {args.directory} ({args.mode} model)")
+    stats, images = calibrate(image_batches(paths, args.batch_size), runner, fixed=args.mode == 'fixed',
+                              progress=lambda n: print(f"  {n}/{len(paths)} images", end='\r'))
+    calibration = calibration_document(stats, images, args.mode)
+    with open(args.output, 'w') as f:
+        json.dump(calibration, f)
+
+    limit = (1 << (gm.DATA_WIDTH - gm.FRAC_BITS - 1))
+    print(f"\n{'Layer':<28} {'min':>9} {'max':>9} {'p99.99':>9}")
+    for name, entry in calibration['layers'].items():
+        flag = "  ⚠️ beyond Q8.8" if entry['abs_max'] >= limit else ""
+        print(f"{name:<28} {entry['min']:>9.3f} {entry['max']:>9.3f} {entry['p99.99']:>9.3f}{flag}")
+    print(f"💾 {len(calibration['layers'])} layers from {images} image(s) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
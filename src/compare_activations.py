@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Layer-by-layer RTL vs golden divergence finder
+Loads the per-layer activation dumps of a simulation (NN_<module>_act.mem) and
+the matching golden activations, diffs them layer by layer and reports the
+first layer whose max-abs or ULP error exceeds a threshold, together with
+per-channel error maps and saturation counts. One simulation plus this diff
+replaces repeated full-system runs when tracking down a misclassification.
+"""
+
+import os
+import re
+import json
+import argparse
+import numpy as np
+from mem_io import load_mem
+from golden_model import GoldenMobileNetV3, load_image_mem, MEMORY_DIR, DATA_WIDTH, FRAC_BITS
+from dump_activations import NIBBLE_BITS
+
+try:
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    PLOTTING_AVAILABLE = True
+except ImportError:
+    PLOTTING_AVAILABLE = False
+
+DUMP_PATTERN = re.compile(r'^(\d+)_(.+)_act\.mem$')
+SAT_MAX = 2 ** (DATA_WIDTH - 1) - 1
+SAT_MIN = -2 ** (DATA_WIDTH - 1)
+
+
+def load_dump_dir(directory, chunk_bits=NIBBLE_BITS):
+    """Read every NN_<module>_act.mem of a directory into {module: words}, in dump order"""
+    found = []
+    for filename in os.listdir(directory):
+        match = DUMP_PATTERN.match(filename)
+        if match:
+            found.append((int(match.group(1)), match.group(2), filename))
+    return {name: np.asarray(load_mem(os.path.join(directory, filename), DATA_WIDTH,
+                                      radix=2, chunk_bits=chunk_bits), dtype=np.int64)
+            for _, name, filename in sorted(found)}
+
+
+def golden_activations(model, image):
+    """Run one image through the golden model and return {module: full tensor} in dump order"""
+    acts = {}
+
+    def hook(name, tensor):
+        # Keep the first position but the last tensor, like the reference dumps
+        acts[name.replace('.', '_')] = tensor[0]
+
+    model.forward(image[None], hook=hook)
+    return acts
+
+
+def compare_layer(rtl, golden):
+    """Error statistics between two activations of one layer
+
+    rtl may be a truncated flat dump; golden may be the full (C, H, W) tensor,
+    in which case errors are also folded per channel. A flat golden dump has no
+    channel boundaries, so per_channel_max_ulp is None for it.
+    """
+    golden = np.asarray(golden)
+    flat = golden.reshape(-1)
+    n = min(rtl.size, flat.size)
+    err = np.abs(rtl[:n] - flat[:n])
+    stats = {
+        'words': int(n),
+        'max_ulp': int(err.max()) if n else 0,
+        'mean_ulp': float(err.mean()) if n else 0.0,
+        'max_abs': float(err.max()) / (1 << FRAC_BITS) if n else 0.0,
+        'mismatches': int(np.count_nonzero(err)),
+        'rtl_saturated': int(np.count_nonzero((rtl[:n] == SAT_MAX) | (rtl[:n] == SAT_MIN))),
+        'golden_saturated': int(np.count_nonzero((flat[:n] == SAT_MAX) | (flat[:n] == SAT_MIN))),
+    }
+    per_channel = None
+    if golden.ndim >= 2:
+        # Only channels fully covered by the dump are reported
+        channel_size = int(np.prod(golden.shape[1:]))
+        channels = n // channel_size
+        if channels:
+            per_channel = err[:channels * channel_size].reshape(channels, channel_size).max(axis=1)
+    stats['per_channel_max_ulp'] = per_channel.tolist() if per_channel is not None else None
+    return stats
+
+
+def find_divergence(rtl_acts, golden_acts, ulp_threshold=1):
+    """Compare every layer present in both sets; returns (report list, first diverging layer)"""
+    reports = []
+    first_bad = None
+    for name, golden in golden_acts.items():
+        if name not in rtl_acts:
+            continue
+        stats = compare_layer(rtl_acts[name], golden)
+        stats['layer'] = name
+        stats['diverged'] = stats['max_ulp'] > ulp_threshold
+        if stats['diverged'] and first_bad is None:
+            first_bad = name
+        reports.append(stats)
+    return reports, first_bad
+
+
+def plot_channel_heatmap(reports, filename):
+    """Layers x channels map of the max ULP error"""
+    if not PLOTTING_AVAILABLE:
+        print("⚠️ matplotlib not available - skipping heatmap")
+        return
+    rows = [r for r in reports if r['per_channel_max_ulp']]
+    if not rows:
+        print("⚠️ no per-channel errors (flat golden dumps) - skipping heatmap")
+        return
+    width = max(len(r['per_channel_max_ulp']) for r in rows)
+    grid = np.full((len(rows), width), np.nan)
+    for i, r in enumerate(rows):
+        grid[i, :len(r['per_channel_max_ulp'])] = r['per_channel_max_ulp']
+
+    plt.figure(figsize=(14, max(4, len(rows) * 0.12)))
+    im = plt.imshow(np.log2(1 + grid), cmap='YlOrRd', aspect='auto', interpolation='nearest')
+    plt.colorbar(im, label='log2(1 + max ULP error)')
+    plt.xlabel('Channel')
+    plt.ylabel('Layer')
+    step = max(1, len(rows) // 40)
+    plt.yticks(range(0, len(rows), step), [rows[i]['layer'] for i in range(0, len(rows), step)], fontsize=6)
+    plt.title('Per-channel RTL vs golden error', fontsize=14, fontweight='bold')
+    plt.tight_layout()
+    plt.savefig(filename, dpi=150, bbox_inches='tight')
+    plt.close()
+    print(f"Saved: {filename}")
+
+
+def print_report(reports, first_bad, ulp_threshold):
+    print(f"{'Layer':<28} {'Words':>6} {'MaxULP':>7} {'MeanULP':>8} {'MaxAbs':>8} {'Sat RTL/Gold':>13}")
+    print("-" * 76)
+    for r in reports:
+        flag = "❌" if r['diverged'] else "✅"
+        print(f"{flag} {r['layer']:<26} {r['words']:>6} {r['max_ulp']:>7} {r['mean_ulp']:>8.2f} "
+              f"{r['max_abs']:>8.4f} {r['rtl_saturated']:>6}/{r['golden_saturated']:<6}")
+    print("-" * 76)
+    if first_bad:
+        print(f"🔍 First divergence (> {ulp_threshold} ULP): {first_bad}")
+    else:
+        print(f"🎉 All {len(reports)} compared layers within {ulp_threshold} ULP")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the first layer where RTL activations diverge from the golden model")
+    parser.add_argument('rtl_dir', help='Directory of NN_<module>_act.mem dumps from simulation')
+    golden = parser.add_mutually_exclusive_group(required=True)
+    golden.add_argument('--golden-dir', type=str, help='Directory of golden dumps (e.g. from dump_activations.py)')
+    golden.add_argument('--image', type=str, help='Image .mem to run through the golden model in-process')
+    parser.add_argument('--weights', type=str, default=MEMORY_DIR, help='Weight .mem directory for --image')
+    parser.add_argument('--ulp-threshold', type=int, default=1, help='Allowed error in LSBs before a layer counts as diverged')
+    parser.add_argument('--heatmap', type=str, default='divergence_heatmap.png', help='Per-channel heatmap output')
+    parser.add_argument('--json', type=str, default=None, help='Optional JSON report')
+    parser.add_argument('--columnar', type=str, default=None,
+                        help='Optional per-layer statistics table (.parquet/.feather, see results_columnar.py)')
+    args = parser.parse_args()
+
+    rtl_acts = load_dump_dir(args.rtl_dir)
+    if args.golden_dir:
+        golden_acts = load_dump_dir(args.golden_dir)
+    else:
+        model = GoldenMobileNetV3.from_mem_dir(args.weights)
+        golden_acts = golden_activations(model, load_image_mem(args.image))
+    print(f"📂 {len(rtl_acts)} RTL layers, {len(golden_acts)} golden layers")
+
+    reports, first_bad = find_divergence(rtl_acts, golden_acts, args.ulp_threshold)
+    print_report(reports, first_bad, args.ulp_threshold)
+    plot_channel_heatmap(reports, args.heatmap)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'first_divergence': first_bad, 'ulp_threshold': args.ulp_threshold,
+                       'layers': reports}, f, indent=2)
+        print(f"Saved: {args.json}")
+    if args.columnar:
+        from results_columnar import layer_frame, write_frame
+        print(f"Saved: {write_frame(layer_frame(reports), args.columnar)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ import numpy as np
 import os
 import sys
 from pathlib import Path
+from mem_io import write_mem
 
 # Disease mapping - maps image filenames to disease names and expected classifications
 DISEASE_MAPPING = {
@@ -154,9 +155,7 @@ def convert_xray_to_mem(image_path, output_path, disease_info=None):
     
     # Step 7: Save as memory file
     try:
-        with open(output_path, 'w') as f:
-            for pixel in img_flat:
-                f.write(f"{pixel:04x}\n")  # Write as 4-digit hex
+        write_mem(output_path, img_flat)  # Write as 4-digit hex
         print(f"   ✅ Saved: {output_path}")
         return True
     except Exception as e:
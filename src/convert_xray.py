@@ -2,6 +2,7 @@ from PIL import Image
 import numpy as np
 import os
 import sys
+from mem_io import write_mem
 
 def convert_xray_to_mem(image_path, output_path):
     """Convert X-ray image to memory file format"""
@@ -39,9 +40,7 @@ def convert_xray_to_mem(image_path, output_path):
     
     # Step 7: Save as memory file
     try:
-        with open(output_path, 'w') as f:
-            for pixel in img_flat:
-                f.write(f"{pixel:04x}\n")  # Write as 4-digit hex
+        write_mem(output_path, img_flat)  # Write as 4-digit hex
         print(f"✅ Saved to: {output_path}")
         return True
     except Exception as e:
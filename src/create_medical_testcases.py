@@ -8,6 +8,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 from PIL import Image
 import os
+from mem_io import write_mem
 
 def create_normal_xray():
     """Create normal chest X-ray pattern"""
@@ -126,9 +127,7 @@ def save_as_mem_file(img_array, filename):
     # Convert 8-bit to 16-bit
     img_16bit = (img_array.astype(np.uint32) * 257).astype(np.uint16)
     
-    with open(filename, 'w') as f:
-        for pixel in img_16bit.flatten():
-            f.write(f"{pixel:04x}\n")
+    write_mem(filename, img_16bit)
     
     print(f"✅ Saved {filename} ({img_16bit.shape[0]*img_16bit.shape[1]} pixels)")
 
@@ -4,27 +4,9 @@ Medical X-ray Classification System Demonstration
 Shows the complete medical analysis features with sample data
 """
 
-import math
 import re
-
-# Medical condition class names (15 chest X-ray conditions)
-MEDICAL_CONDITIONS = [
-    "No Finding",
-    "Infiltration",
-    "Atelectasis", 
-    "Effusion",
-    "Nodule",
-    "Pneumothorax",
-    "Mass",
-    "Consolidation",
-    "Pleural Thickening",
-    "Cardiomegaly",
-    "Emphysema",
-    "Fibrosis",
-    "Edema",
-    "Pneumonia",
-    "Hernia"
-]
+import postprocess
+from postprocess import MEDICAL_CONDITIONS
 
 # Medical recommendations
 MEDICAL_RECOMMENDATIONS = [
@@ -45,22 +27,19 @@ MEDICAL_RECOMMENDATIONS = [
     "Possible diaphragm hernia. Consult a surgeon for evaluation."
 ]
 
-def fixed_to_probability(fixed_val, data_width=16, frac_bits=8):
-    """Convert fixed-point value to probability (0.0 to 1.0)"""
-    # Convert to signed integer
-    if fixed_val >= 2**(data_width-1):
-        fixed_val -= 2**data_width
-    
-    # Convert to floating point (assuming Q8.8 format)
-    temp_real = fixed_val / (2.0**frac_bits)
-    
-    # Apply sigmoid approximation to get 0-1 range
-    if temp_real > 5.0:
-        return 1.0
-    elif temp_real < -5.0:
-        return 0.0
-    else:
-        return 1.0 / (1.0 + math.exp(-temp_real))
+# Urgency lines by postprocess.URGENCY_LEVELS index
+URGENCY_MESSAGES = [
+    "  ✅ LOW URGENCY - Normal findings, routine follow-up",
+    "  🟠 STANDARD URGENCY - Schedule appointment within 1-2 weeks",
+    "  🟡 MODERATE URGENCY - Schedule appointment within 24-48 hours",
+    "  ⚠️  HIGH URGENCY - Seek emergency care immediately!",
+]
+SHORT_URGENCY = [
+    "LOW - Routine follow-up",
+    "STANDARD - Schedule within 1-2 weeks",
+    "MODERATE - Schedule within 24-48 hours",
+    "HIGH - Emergency care required!",
+]
 
 def demonstrate_medical_analysis():
     """Demonstrate the medical analysis with sample data"""
@@ -95,33 +74,23 @@ def demonstrate_medical_analysis():
     print(f"{'Condition':<20} | {'Probability':<12} | {'Raw Score':<10} | {'Confidence':<12} | {'Recommendation'}")
     print("-" * 80)
     
-    probabilities = []
-    max_probability = 0.0
-    primary_condition = 0
+    # Convert all 15 scores in one batch
+    raw_scores, _ = postprocess.parse_hex_scores(sample_hex_values)
+    result = postprocess.postprocess(raw_scores)
+    probabilities = result['probabilities'][0]
+    primary_condition = result['primary'][0]
+    max_probability = result['confidence'][0]
     
     for i, hex_val in enumerate(sample_hex_values):
-        try:
-            # Convert hex to integer
-            raw_score = int(hex_val, 16)
-            
-            # Convert to probability
-            probability = fixed_to_probability(raw_score)
-            probabilities.append(probability)
-            
-            # Track highest probability
-            if probability > max_probability:
-                max_probability = probability
-                primary_condition = i
-            
-            # Format recommendation (truncate if too long)
-            recommendation = MEDICAL_RECOMMENDATIONS[i]
-            if len(recommendation) > 50:
-                recommendation = recommendation[:47] + "..."
-            
-            print(f"{MEDICAL_CONDITIONS[i]:<20} | {probability:>10.4f} | {raw_score:>8d} | {probability*100:>10.2f}% | {recommendation}")
-            
-        except ValueError:
-            print(f"{MEDICAL_CONDITIONS[i]:<20} | {'INVALID':<12} | {hex_val:<10} | {'ERROR':<12} | Invalid hex value")
+        raw_score = int(hex_val, 16)
+        probability = probabilities[i]
+        
+        # Format recommendation (truncate if too long)
+        recommendation = MEDICAL_RECOMMENDATIONS[i]
+        if len(recommendation) > 50:
+            recommendation = recommendation[:47] + "..."
+        
+        print(f"{MEDICAL_CONDITIONS[i]:<20} | {probability:>10.4f} | {raw_score:>8d} | {probability*100:>10.2f}% | {recommendation}")
     
     print("-" * 80)
     
@@ -133,24 +102,15 @@ def demonstrate_medical_analysis():
     
     # Secondary conditions (probability > 0.3)
     print(f"\n⚠️  SECONDARY FINDINGS (>30% probability):")
-    secondary_count = 0
-    for i, prob in enumerate(probabilities):
-        if prob > 0.3 and i != primary_condition:
-            print(f"  • {MEDICAL_CONDITIONS[i]}: {prob*100:.2f}%")
-            secondary_count += 1
-    if secondary_count == 0:
+    secondary = result['secondary'][0]
+    for i in secondary.nonzero()[0]:
+        print(f"  • {MEDICAL_CONDITIONS[i]}: {probabilities[i]*100:.2f}%")
+    if not secondary.any():
         print("  No significant secondary findings.")
     
     # Urgency assessment
     print(f"\n🚨 URGENCY ASSESSMENT:")
-    if primary_condition == 5:  # Pneumothorax
-        print("  ⚠️  HIGH URGENCY - Seek emergency care immediately!")
-    elif primary_condition in [2, 6, 13]:  # Atelectasis, Mass, Pneumonia
-        print("  🟡 MODERATE URGENCY - Schedule appointment within 24-48 hours")
-    elif primary_condition == 0:  # No Finding
-        print("  ✅ LOW URGENCY - Normal findings, routine follow-up")
-    else:
-        print("  🟠 STANDARD URGENCY - Schedule appointment within 1-2 weeks")
+    print(URGENCY_MESSAGES[result['urgency'][0]])
     
     print(f"\n📋 SUMMARY:")
     print(f"  Input: Simulated chest X-ray data")
@@ -186,37 +146,18 @@ def demonstrate_different_scenarios():
         }
     ]
     
-    for scenario in scenarios:
+    # All scenarios go through the postprocessor as one batch
+    batch = [postprocess.parse_hex_scores(scenario['hex_values'])[0] for scenario in scenarios]
+    result = postprocess.postprocess(batch)
+    
+    for n, scenario in enumerate(scenarios):
         print(f"\n🔬 === SCENARIO: {scenario['name']} ===")
         print(f"Description: {scenario['description']}")
         print()
         
-        # Analyze this scenario
-        probabilities = []
-        max_probability = 0.0
-        primary_condition = 0
-        
-        for i, hex_val in enumerate(scenario['hex_values']):
-            raw_score = int(hex_val, 16)
-            probability = fixed_to_probability(raw_score)
-            probabilities.append(probability)
-            
-            if probability > max_probability:
-                max_probability = probability
-                primary_condition = i
-        
-        print(f"Primary Diagnosis: {MEDICAL_CONDITIONS[primary_condition]} ({max_probability*100:.1f}%)")
-        print(f"Urgency: ", end="")
-        
-        if primary_condition == 5:  # Pneumothorax
-            print("HIGH - Emergency care required!")
-        elif primary_condition in [2, 6, 13]:  # Atelectasis, Mass, Pneumonia
-            print("MODERATE - Schedule within 24-48 hours")
-        elif primary_condition == 0:  # No Finding
-            print("LOW - Routine follow-up")
-        else:
-            print("STANDARD - Schedule within 1-2 weeks")
-        
+        primary_condition = result['primary'][n]
+        print(f"Primary Diagnosis: {MEDICAL_CONDITIONS[primary_condition]} ({result['confidence'][n]*100:.1f}%)")
+        print(f"Urgency: {SHORT_URGENCY[result['urgency'][n]]}")
         print(f"Recommendation: {MEDICAL_RECOMMENDATIONS[primary_condition]}")
 
 def show_system_features():
@@ -8,6 +8,7 @@ import requests
 import os
 from PIL import Image
 import numpy as np
+from mem_io import write_mem
 
 def download_image(url, filename):
     """Download image from URL"""
@@ -48,9 +49,7 @@ def convert_to_mem_file(image_path, mem_filename):
         img_16bit = (img_array.astype(np.uint32) * 257).astype(np.uint16)
         
         # Save as memory file
-        with open(mem_filename, 'w') as f:
-            for pixel in img_16bit.flatten():
-                f.write(f"{pixel:04x}\n")
+        write_mem(mem_filename, img_16bit)
         
         print(f"✅ Converted to: {mem_filename}")
         print(f"📈 Pixel range: {img_16bit.min()} to {img_16bit.max()}")
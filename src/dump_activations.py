@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Per-layer activation dumper for MobileNetV3_Small
+Regenerates the reference traces of hardware/memory_files (00_conv1_act.mem ...
+184_hs2_act.mem) for any set of test images. Activations are captured with
+forward hooks, either on the float PyTorch model or on the fixed-point golden
+model, and streamed to disk as soon as each layer fires.
+
+Naming follows the reference dumps: modules are numbered in the order they
+first complete, dots become underscores, and a module that fires twice (the
+shared nolinear1/nolinear2 activation) keeps its first number but holds the
+last tensor it produced. Words are Q8.8, written as binary nibbles, one per
+line, most significant first.
+"""
+
+import os
+import argparse
+import numpy as np
+from mem_io import write_mem
+from golden_model import GoldenMobileNetV3, load_image_mem, to_fixed, MEMORY_DIR, DATA_WIDTH, FRAC_BITS
+
+CHECKPOINT = 'models/mobilenet_fixed_point_16_8.pth'
+# The reference dumps keep the first 36 words of every tensor
+DUMP_WORDS = 36
+NIBBLE_BITS = 4
+
+
+def activation_filename(number, name):
+    """Reference dump name for the numbered module, e.g. 106_bneck_6_shortcut_0_act.mem"""
+    return f"{number:02d}_{name.replace('.', '_')}_act.mem"
+
+
+class ActivationDumper:
+    """Hook callback that streams every activation of a batch to per-image directories"""
+
+    def __init__(self, output_dirs, limit=DUMP_WORDS):
+        self.output_dirs = output_dirs
+        self.limit = limit
+        self.numbers = {}
+
+    def __call__(self, name, tensor):
+        if name not in self.numbers:
+            self.numbers[name] = len(self.numbers)
+        filename = activation_filename(self.numbers[name], name)
+        for out_dir, words in zip(self.output_dirs, np.asarray(tensor)):
+            words = words.reshape(-1)
+            if self.limit:
+                words = words[:self.limit]
+            write_mem(os.path.join(out_dir, filename), words, width=DATA_WIDTH,
+                      radix=2, chunk_bits=NIBBLE_BITS)
+
+    def layer_names(self):
+        return sorted(self.numbers, key=self.numbers.get)
+
+
+def load_float_model(checkpoint):
+    """Load MobileNetV3_Small from a PyTorch checkpoint (needs torch)"""
+    import torch
+    from models import MobileNetV3_Small
+
+    model = MobileNetV3_Small(in_channels=1, num_classes=15)
+    model.load_state_dict(torch.load(checkpoint, map_location='cpu'))
+    model.eval()
+    return model
+
+
+def run_float(model, images, hook, fixed=True):
+    """Float forward pass with PyTorch forward hooks on every submodule
+
+    The hook gets Q8.8 words, or the float activations themselves with fixed=False.
+    """
+    import torch
+
+    convert = to_fixed if fixed else (lambda x: x)
+    handles = []
+    # named_modules() lists a shared module once, so nolinear2 fires under nolinear1
+    for name, module in model.named_modules():
+        if name:
+            handles.append(module.register_forward_hook(
+                lambda m, inputs, output, name=name: hook(name, convert(output.detach().cpu().numpy()))))
+    try:
+        with torch.no_grad():
+            x = torch.from_numpy(images.astype(np.float32) / (1 << FRAC_BITS))
+            model(x[:, None])
+    finally:
+        for handle in handles:
+            handle.remove()
+
+
+def dump_batches(image_files, output_dir, runner, batch_size=8, limit=DUMP_WORDS):
+    """Run images through runner(images, hook) in batches, one dump directory per image"""
+    layer_names = []
+    for start in range(0, len(image_files), batch_size):
+        batch_files = image_files[start:start + batch_size]
+        out_dirs = [os.path.join(output_dir, os.path.splitext(os.path.basename(f))[0]) for f in batch_files]
+        for out_dir in out_dirs:
+            os.makedirs(out_dir, exist_ok=True)
+        images = np.stack([load_image_mem(f) for f in batch_files])
+        dumper = ActivationDumper(out_dirs, limit)
+        runner(images, dumper)
+        layer_names = dumper.layer_names()
+        print(f"💾 Dumped {len(layer_names)} layers for {len(batch_files)} image(s) "
+              f"({start + len(batch_files)}/{len(image_files)})")
+    return layer_names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dump per-layer activations in the hardware/memory_files format")
+    parser.add_argument('images', nargs='+', help='Image .mem files (224x224 pixel words)')
+    parser.add_argument('--mode', choices=['fixed', 'float'], default='fixed',
+                        help='fixed: bit-exact golden model, float: PyTorch model quantized per layer')
+    parser.add_argument('--weights', type=str, default=MEMORY_DIR, help='Weight .mem directory (fixed mode)')
+    parser.add_argument('--checkpoint', type=str, default=CHECKPOINT, help='PyTorch checkpoint (float mode)')
+    parser.add_argument('--output-dir', type=str, default='activations', help='One sub-directory per image is created here')
+    parser.add_argument('--batch-size', type=int, default=8, help='Images per forward pass')
+    parser.add_argument('--limit', type=int, default=DUMP_WORDS,
+                        help='Words kept per tensor (0 = whole tensor); the reference dumps keep 36')
+    args = parser.parse_args()
+
+    if args.mode == 'fixed':
+        model = GoldenMobileNetV3.from_mem_dir(args.weights)
+        runner = lambda images, hook: model.forward(images, hook=hook)
+    else:
+        model = load_float_model(args.checkpoint)
+        runner = lambda images, hook: run_float(model, images, hook)
+
+    layer_names = dump_batches(args.images, args.output_dir, runner, args.batch_size, args.limit)
+    print(f"✅ {len(layer_names)} activation files per image written under {args.output_dir}/")
+
+
+if __name__ == "__main__":
+    main()
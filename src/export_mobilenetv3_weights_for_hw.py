@@ -2,84 +2,263 @@ import torch
 import numpy as np
 import os
 import sys
+import json
+import argparse
 sys.path.append('.')  # Ensure current directory is in path
 from models import MobileNetV3_Small, SeModule
+from golden_model import (parameter_layout, weight_layers, to_fixed, clear_manifests, FUSION_MANIFEST, PLAN_FILE,
+                          INT8_MANIFEST)
+from weight_blob import write_weight_blob, BLOB_MANIFEST
+from mem_io import write_mem
+from calibrate_activations import load_calibration, calibrated_formats
+from int8_weights import export_int8, memory_report, print_memory_report
 
 CHECKPOINT = 'models/mobilenet_fixed_point_16_8.pth'
 OUTPUT_DIR = 'memory_files'
+# The RTL reads 16-bit Q8.8 words from memory_files/ with a fixed FRAC, so
+# planned (narrower or re-scaled) weights go elsewhere and serve the golden model only
+PLANNED_OUTPUT_DIR = 'memory_files_planned'
 BIT_WIDTH = 16
 FRAC_BITS = 8
 
 def quantize(x, bit_width=16, frac_bits=8):
-    scale = 2 ** frac_bits
-    min_val = -2**(bit_width-1)
-    max_val = 2**(bit_width-1) - 1
-    x_q = np.round(x * scale)
-    x_q = np.clip(x_q, min_val, max_val).astype(np.int16)
-    return x_q
-
-def save_mem(filename, arr):
-    with open(filename, 'w') as f:
-        for v in arr.flatten():
-            v16 = np.uint16(v)
-            f.write(f'{v16:04x}\n')
-
-if not os.path.exists(OUTPUT_DIR):
-    os.makedirs(OUTPUT_DIR)
-
-# Instantiate the model and load the state dict
-model = MobileNetV3_Small(in_channels=1, num_classes=15)
-state_dict = torch.load(CHECKPOINT, map_location='cpu')
-model.load_state_dict(state_dict)
-model.eval()
-
-# Export first conv layer
-conv1_w = model.conv1.weight.detach().cpu().numpy()
-save_mem(f'{OUTPUT_DIR}/conv1_conv.mem', quantize(conv1_w))
-
-# Export first batchnorm
-bn1_gamma = model.bn1.weight.detach().cpu().numpy()
-bn1_beta = model.bn1.bias.detach().cpu().numpy()
-save_mem(f'{OUTPUT_DIR}/bn1_gamma.mem', quantize(bn1_gamma))
-save_mem(f'{OUTPUT_DIR}/bn1_beta.mem', quantize(bn1_beta))
-
-# Export all bneck blocks
-for idx, block in enumerate(model.bneck):
-    # Conv1
-    save_mem(f'{OUTPUT_DIR}/bneck_{idx}_conv1_conv.mem', quantize(block.conv1.weight.detach().cpu().numpy()))
-    if hasattr(block, 'bn1') and isinstance(block.bn1, torch.nn.BatchNorm2d):
-        save_mem(f'{OUTPUT_DIR}/bneck_{idx}_bn1_gamma.mem', quantize(block.bn1.weight.detach().cpu().numpy()))
-        save_mem(f'{OUTPUT_DIR}/bneck_{idx}_bn1_beta.mem', quantize(block.bn1.bias.detach().cpu().numpy()))
-    # Conv2
-    save_mem(f'{OUTPUT_DIR}/bneck_{idx}_conv2_conv.mem', quantize(block.conv2.weight.detach().cpu().numpy()))
-    if hasattr(block, 'bn2') and isinstance(block.bn2, torch.nn.BatchNorm2d):
-        save_mem(f'{OUTPUT_DIR}/bneck_{idx}_bn2_gamma.mem', quantize(block.bn2.weight.detach().cpu().numpy()))
-        save_mem(f'{OUTPUT_DIR}/bneck_{idx}_bn2_beta.mem', quantize(block.bn2.bias.detach().cpu().numpy()))
-    # Conv3
-    save_mem(f'{OUTPUT_DIR}/bneck_{idx}_conv3_conv.mem', quantize(block.conv3.weight.detach().cpu().numpy()))
-    if hasattr(block, 'bn3') and isinstance(block.bn3, torch.nn.BatchNorm2d):
-        save_mem(f'{OUTPUT_DIR}/bneck_{idx}_bn3_gamma.mem', quantize(block.bn3.weight.detach().cpu().numpy()))
-        save_mem(f'{OUTPUT_DIR}/bneck_{idx}_bn3_beta.mem', quantize(block.bn3.bias.detach().cpu().numpy()))
-    # SE module if present
-    if hasattr(block, 'se') and isinstance(block.se, SeModule):
-        if hasattr(block.se, 'se') and isinstance(block.se.se, torch.nn.Sequential):
-            for se_idx, se_layer in enumerate(block.se.se):
-                if isinstance(se_layer, torch.nn.Conv2d):
-                    save_mem(f'{OUTPUT_DIR}/bneck_{idx}_se_se_{se_idx}_conv.mem', quantize(se_layer.weight.detach().cpu().numpy()))
-                if isinstance(se_layer, torch.nn.BatchNorm2d):
-                    save_mem(f'{OUTPUT_DIR}/bneck_{idx}_se_se_{se_idx}_gamma.mem', quantize(se_layer.weight.detach().cpu().numpy()))
-                    save_mem(f'{OUTPUT_DIR}/bneck_{idx}_se_se_{se_idx}_beta.mem', quantize(se_layer.bias.detach().cpu().numpy()))
-
-# Export final conv2, bn2, hswish2
-save_mem(f'{OUTPUT_DIR}/conv2_conv.mem', quantize(model.conv2.weight.detach().cpu().numpy()))
-save_mem(f'{OUTPUT_DIR}/bn2_bn.mem', quantize(model.bn2.weight.detach().cpu().numpy()))
-
-# Export final linear layers
-save_mem(f'{OUTPUT_DIR}/linear3_weights.mem', quantize(model.linear3.weight.detach().cpu().numpy()))
-save_mem(f'{OUTPUT_DIR}/linear3_biases.mem', quantize(model.linear3.bias.detach().cpu().numpy()))
-save_mem(f'{OUTPUT_DIR}/bn3_gamma.mem', quantize(model.bn3.weight.detach().cpu().numpy()))
-save_mem(f'{OUTPUT_DIR}/bn3_beta.mem', quantize(model.bn3.bias.detach().cpu().numpy()))
-save_mem(f'{OUTPUT_DIR}/linear4_weights.mem', quantize(model.linear4.weight.detach().cpu().numpy()))
-save_mem(f'{OUTPUT_DIR}/linear4_biases.mem', quantize(model.linear4.bias.detach().cpu().numpy()))
-
-print("All weights and parameters exported to memory_files/ as .mem files.") 
\ No newline at end of file
+    return to_fixed(x, bit_width, frac_bits).astype(np.int16)
+
+def save_mem(filename, arr, width=BIT_WIDTH):
+    write_mem(filename, arr, width=width)
+
+def load_model(checkpoint):
+    """MobileNetV3_Small with the checkpoint's weights, in eval mode"""
+    model = MobileNetV3_Small(in_channels=1, num_classes=15)
+    model.load_state_dict(torch.load(checkpoint, map_location='cpu'))
+    model.eval()
+    return model
+
+def load_plan(filename):
+    """Weight formats of a qformat_sweep.py plan as {state_dict key: (bits, frac)}, plus the plan itself"""
+    with open(filename, 'r') as f:
+        plan = json.load(f)
+    return {f'{layer}.weight': tuple(entry['weight']) for layer, entry in plan['layers'].items()}, plan
+
+def fold_batchnorm(weight, bias, bn):
+    """Fold a BatchNorm (with its running statistics) into the preceding conv/linear"""
+    scale = bn.weight.detach().cpu().numpy() / np.sqrt(bn.running_var.detach().cpu().numpy() + bn.eps)
+    mean = bn.running_mean.detach().cpu().numpy()
+    folded_w = weight * scale.reshape((-1,) + (1,) * (weight.ndim - 1))
+    folded_b = bn.bias.detach().cpu().numpy() + (bias - mean) * scale
+    return folded_w, folded_b
+
+def export_unfolded(model, output_dir):
+    """Legacy export: conv/linear weights plus separate BN gamma/beta files"""
+    # Export first conv layer
+    conv1_w = model.conv1.weight.detach().cpu().numpy()
+    save_mem(f'{output_dir}/conv1_conv.mem', quantize(conv1_w))
+
+    # Export first batchnorm
+    bn1_gamma = model.bn1.weight.detach().cpu().numpy()
+    bn1_beta = model.bn1.bias.detach().cpu().numpy()
+    save_mem(f'{output_dir}/bn1_gamma.mem', quantize(bn1_gamma))
+    save_mem(f'{output_dir}/bn1_beta.mem', quantize(bn1_beta))
+
+    # Export all bneck blocks
+    for idx, block in enumerate(model.bneck):
+        # Conv1
+        save_mem(f'{output_dir}/bneck_{idx}_conv1_conv.mem', quantize(block.conv1.weight.detach().cpu().numpy()))
+        if hasattr(block, 'bn1') and isinstance(block.bn1, torch.nn.BatchNorm2d):
+            save_mem(f'{output_dir}/bneck_{idx}_bn1_gamma.mem', quantize(block.bn1.weight.detach().cpu().numpy()))
+            save_mem(f'{output_dir}/bneck_{idx}_bn1_beta.mem', quantize(block.bn1.bias.detach().cpu().numpy()))
+        # Conv2
+        save_mem(f'{output_dir}/bneck_{idx}_conv2_conv.mem', quantize(block.conv2.weight.detach().cpu().numpy()))
+        if hasattr(block, 'bn2') and isinstance(block.bn2, torch.nn.BatchNorm2d):
+            save_mem(f'{output_dir}/bneck_{idx}_bn2_gamma.mem', quantize(block.bn2.weight.detach().cpu().numpy()))
+            save_mem(f'{output_dir}/bneck_{idx}_bn2_beta.mem', quantize(block.bn2.bias.detach().cpu().numpy()))
+        # Conv3
+        save_mem(f'{output_dir}/bneck_{idx}_conv3_conv.mem', quantize(block.conv3.weight.detach().cpu().numpy()))
+        if hasattr(block, 'bn3') and isinstance(block.bn3, torch.nn.BatchNorm2d):
+            save_mem(f'{output_dir}/bneck_{idx}_bn3_gamma.mem', quantize(block.bn3.weight.detach().cpu().numpy()))
+            save_mem(f'{output_dir}/bneck_{idx}_bn3_beta.mem', quantize(block.bn3.bias.detach().cpu().numpy()))
+        # SE module if present
+        if hasattr(block, 'se') and isinstance(block.se, SeModule):
+            if hasattr(block.se, 'se') and isinstance(block.se.se, torch.nn.Sequential):
+                for se_idx, se_layer in enumerate(block.se.se):
+                    if isinstance(se_layer, torch.nn.Conv2d):
+                        save_mem(f'{output_dir}/bneck_{idx}_se_se_{se_idx}_conv.mem', quantize(se_layer.weight.detach().cpu().numpy()))
+                    if isinstance(se_layer, torch.nn.BatchNorm2d):
+                        save_mem(f'{output_dir}/bneck_{idx}_se_se_{se_idx}_gamma.mem', quantize(se_layer.weight.detach().cpu().numpy()))
+                        save_mem(f'{output_dir}/bneck_{idx}_se_se_{se_idx}_beta.mem', quantize(se_layer.bias.detach().cpu().numpy()))
+        # Projection shortcut (stride 1 blocks whose channel count changes)
+        if len(block.shortcut) > 0:
+            save_mem(f'{output_dir}/bneck_{idx}_shortcut_0_conv.mem', quantize(block.shortcut[0].weight.detach().cpu().numpy()))
+            save_mem(f'{output_dir}/bneck_{idx}_shortcut_1_gamma.mem', quantize(block.shortcut[1].weight.detach().cpu().numpy()))
+            save_mem(f'{output_dir}/bneck_{idx}_shortcut_1_beta.mem', quantize(block.shortcut[1].bias.detach().cpu().numpy()))
+
+    # Export final conv2, bn2, hswish2
+    save_mem(f'{output_dir}/conv2_conv.mem', quantize(model.conv2.weight.detach().cpu().numpy()))
+    save_mem(f'{output_dir}/bn2_bn.mem', quantize(model.bn2.weight.detach().cpu().numpy()))
+    save_mem(f'{output_dir}/bn2_gamma.mem', quantize(model.bn2.weight.detach().cpu().numpy()))
+    save_mem(f'{output_dir}/bn2_beta.mem', quantize(model.bn2.bias.detach().cpu().numpy()))
+
+    # Export final linear layers
+    save_mem(f'{output_dir}/linear3_weights.mem', quantize(model.linear3.weight.detach().cpu().numpy()))
+    save_mem(f'{output_dir}/linear3_biases.mem', quantize(model.linear3.bias.detach().cpu().numpy()))
+    save_mem(f'{output_dir}/bn3_gamma.mem', quantize(model.bn3.weight.detach().cpu().numpy()))
+    save_mem(f'{output_dir}/bn3_beta.mem', quantize(model.bn3.bias.detach().cpu().numpy()))
+    save_mem(f'{output_dir}/linear4_weights.mem', quantize(model.linear4.weight.detach().cpu().numpy()))
+    save_mem(f'{output_dir}/linear4_biases.mem', quantize(model.linear4.bias.detach().cpu().numpy()))
+
+def add_calibrated_activations(plan, calibration, bits, fold_bn):
+    """A plan (a Q8.8 one when none is given) whose layers carry calibrated activation formats"""
+    layers = weight_layers(fold_bn=fold_bn)
+    if plan is None:
+        entries = {layer: {'weight': [BIT_WIDTH, FRAC_BITS], 'weights': int(np.prod(shape))}
+                   for layer, _, shape in layers}
+        total = sum(e['weights'] for e in entries.values()) * BIT_WIDTH
+        plan = {'data_width': BIT_WIDTH, 'frac_bits': FRAC_BITS, 'fold_bn': fold_bn,
+                'baseline_weight_bits': total, 'weight_bits': total, 'layers': entries}
+    for layer, fmt in calibrated_formats(calibration, bits, layers=[layer for layer, _, _ in layers]).items():
+        plan['layers'][layer]['activation'] = list(fmt['activation'])
+    plan['calibration'] = {'source': calibration['source'], 'images': calibration['images'],
+                           'activation_bits': bits}
+    return plan
+
+def fold_model(model):
+    """Real-valued state_dict tensors with every BatchNorm folded into the conv/linear before it"""
+    tensors = {name: p.detach().cpu().numpy() for name, p in model.state_dict().items()}
+    fused = []
+    last = None
+    for name, module in model.named_modules():
+        if isinstance(module, (torch.nn.Conv2d, torch.nn.Linear)):
+            last = (name, module)
+        elif isinstance(module, (torch.nn.BatchNorm1d, torch.nn.BatchNorm2d)):
+            layer_name, layer = last
+            weight = layer.weight.detach().cpu().numpy()
+            bias = layer.bias.detach().cpu().numpy() if layer.bias is not None else np.zeros(weight.shape[0])
+            tensors[f'{layer_name}.weight'], tensors[f'{layer_name}.bias'] = fold_batchnorm(weight, bias, module)
+            fused.append({'bn': name, 'into': layer_name})
+    return tensors, fused
+
+def float_tensors(model, fold_bn=False):
+    """Real-valued parameters by state_dict key, BN-folded or as stored"""
+    if fold_bn:
+        return fold_model(model)[0]
+    return {name: p.detach().cpu().numpy() for name, p in model.state_dict().items()}
+
+def export_folded(model, output_dir, formats=None):
+    """Fold every BatchNorm into the conv/linear before it and write a fusion manifest
+
+    formats maps weight keys of a Q-format plan to their (bits, frac); the rest stay Q8.8.
+    """
+    formats = formats or {}
+    tensors, fused = fold_model(model)
+
+    files = {}
+    for key, filename, shape in parameter_layout(model.conv1.in_channels, model.linear4.out_features, fold_bn=True):
+        bits, frac = formats.get(key, (BIT_WIDTH, FRAC_BITS))
+        save_mem(f'{output_dir}/{filename}', quantize(tensors[key].reshape(shape), bits, frac), bits)
+        files[key] = filename
+    export_blob(tensors, output_dir, model, fold_bn=True, formats=formats)
+
+    manifest = {
+        'mode': 'bn_folded',
+        'bit_width': BIT_WIDTH,
+        'frac_bits': FRAC_BITS,
+        'fused': [dict(f, weight_file=files[f"{f['into']}.weight"], bias_file=files[f"{f['into']}.bias"])
+                  for f in fused],
+        'files': files,
+    }
+    with open(os.path.join(output_dir, FUSION_MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return fused
+
+def export_planned(tensors, output_dir, model, formats):
+    """Rewrite the weight files of a Q-format plan's layers at their planned width and format
+
+    The result is for golden_model.py only (see PLANNED_OUTPUT_DIR).
+    """
+    for key, filename, shape in parameter_layout(model.conv1.in_channels, model.linear4.out_features):
+        if key in formats:
+            bits, frac = formats[key]
+            save_mem(f'{output_dir}/{filename}', quantize(tensors[key].reshape(shape), bits, frac), bits)
+
+def export_blob(tensors, output_dir, model, fold_bn=False, formats=None):
+    """Pack the quantized tensors of parameter_layout() into one weight image"""
+    formats = formats or {}
+    layout = parameter_layout(model.conv1.in_channels, model.linear4.out_features, fold_bn=fold_bn)
+    packed = [(key, filename, quantize(tensors[key].reshape(shape), *formats.get(key, (BIT_WIDTH, FRAC_BITS))))
+              for key, filename, shape in layout]
+    manifest = write_weight_blob(output_dir, packed, frac_bits=FRAC_BITS, qformats=formats,
+                                 extra={'fold_bn': fold_bn})
+    print(f"Packed {len(packed)} tensors ({manifest['total_words']} words) into {output_dir}/{BLOB_MANIFEST}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Export MobileNetV3_Small weights as Q8.8 .mem files for the hardware")
+    parser.add_argument('--checkpoint', type=str, default=CHECKPOINT, help='PyTorch state dict to export')
+    parser.add_argument('--output-dir', type=str, default=None,
+                        help=f'Directory for the .mem files (default: {OUTPUT_DIR}, or {PLANNED_OUTPUT_DIR} with --plan)')
+    parser.add_argument('--fold-bn', action='store_true',
+                        help='Fold BatchNorm running statistics into conv/linear weights and biases')
+    parser.add_argument('--plan', type=str, default=None,
+                        help='Per-layer Q-format plan from qformat_sweep.py; planned weights use its formats '
+                             '(golden model only, not loadable by the RTL)')
+    parser.add_argument('--calibration', type=str, default=None,
+                        help='Activation calibration (calibrate_activations.py): add calibrated activation formats '
+                             'to the plan written next to the weights')
+    parser.add_argument('--activation-bits', type=int, default=BIT_WIDTH,
+                        help='With --calibration: activation word width of every conv/linear output')
+    parser.add_argument('--int8', action='store_true',
+                        help='Export 8-bit weights with per-output-channel scales (int8_weights.py) '
+                             'instead of Q8.8 weights')
+    args = parser.parse_args()
+
+    formats, plan = load_plan(args.plan) if args.plan else ({}, None)
+    args.output_dir = args.output_dir or (PLANNED_OUTPUT_DIR if formats else OUTPUT_DIR)
+    if formats and os.path.basename(os.path.normpath(args.output_dir)) == OUTPUT_DIR:
+        print(f"❌ Planned weight formats are for the golden model only: the RTL reads {OUTPUT_DIR}/ as "
+              f"16-bit Q{BIT_WIDTH - FRAC_BITS}.{FRAC_BITS} words; pick another --output-dir "
+              f"(default {PLANNED_OUTPUT_DIR})")
+        sys.exit(1)
+    if not os.path.exists(args.output_dir):
+        os.makedirs(args.output_dir)
+
+    if args.calibration:
+        plan = add_calibrated_activations(plan, load_calibration(args.calibration), args.activation_bits,
+                                          args.fold_bn)
+    if plan is not None and plan['fold_bn'] != args.fold_bn:
+        print(f"❌ {args.plan} was made for {'the BN-folded' if plan['fold_bn'] else 'the unfolded'} export; "
+              f"{'add' if plan['fold_bn'] else 'drop'} --fold-bn")
+        sys.exit(1)
+
+    if args.int8 and plan is not None:
+        print("❌ --int8 replaces the Q-format plan; drop --plan/--calibration")
+        sys.exit(1)
+
+    # Instantiate the model and load the state dict
+    model = load_model(args.checkpoint)
+    # Every export writes the manifests it needs; older ones would re-interpret its files
+    clear_manifests(args.output_dir)
+
+    if args.int8:
+        export_int8(float_tensors(model, args.fold_bn), args.output_dir, args.fold_bn, source=args.checkpoint,
+                    in_channels=model.conv1.in_channels, num_classes=model.linear4.out_features)
+        print_memory_report(memory_report(model.conv1.in_channels, model.linear4.out_features, args.fold_bn))
+        print(f"int8 weights exported to {args.output_dir}/ ({INT8_MANIFEST})")
+        return
+
+    if args.fold_bn:
+        fused = export_folded(model, args.output_dir, formats)
+        print(f"Folded {len(fused)} BatchNorm layers; manifest written to {args.output_dir}/{FUSION_MANIFEST}")
+    else:
+        export_unfolded(model, args.output_dir)
+        tensors = float_tensors(model)
+        export_planned(tensors, args.output_dir, model, formats)
+        export_blob(tensors, args.output_dir, model, formats=formats)
+    if plan is not None:
+        # The golden model reads the formats back from the weight directory
+        with open(os.path.join(args.output_dir, PLAN_FILE), 'w') as f:
+            json.dump(plan, f, indent=2)
+        print(f"Exported {len(formats)} layer(s) with planned Q formats "
+              f"({plan['weight_bits'] / plan['baseline_weight_bits']:.1%} of the Q8.8 weight memory)")
+    print(f"All weights and parameters exported to {args.output_dir}/ as .mem files.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Per-block stimulus generator for standalone BNECK simulations
+Runs an image through the golden model, captures the input and output
+activations of every BNECK block and writes one self-contained simulation
+directory per block (stimulus, expected output, ModelSim script). The blocks
+can then be simulated in isolation and in parallel with tb_bneck_block.sv
+instead of replaying the full image through the first layer each time.
+"""
+
+import os
+import json
+import argparse
+import subprocess
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from mem_io import write_mem, read_mem
+from golden_model import GoldenMobileNetV3, load_image_mem, BNECK_CONFIG, MEMORY_DIR, DATA_WIDTH
+from compare_activations import compare_layer
+
+MODELS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'models'))
+BNECK_SOURCES = ['BNECK/conv_1x1_real_weights.sv', 'BNECK/conv_3x3_dw_real_weights.sv',
+                 'BNECK/bneck_block_real_weights.sv', 'BNECK/tb_bneck_block.sv']
+
+
+def block_io(model, image):
+    """Golden (input, output) activations of every BNECK block for one image"""
+    acts = {}
+
+    def hook(name, tensor):
+        if name == 'hs1' or (name.startswith('bneck.') and name.count('.') == 1):
+            acts[name] = tensor[0]
+
+    model.forward(image[None], hook=hook)
+    inputs = [acts['hs1']] + [acts[f'bneck.{i}'] for i in range(len(BNECK_CONFIG) - 1)]
+    return [(inputs[i], acts[f'bneck.{i}']) for i in range(len(BNECK_CONFIG))]
+
+
+def to_raster(tensor):
+    """(C, H, W) -> words in (row, col, channel) order, as the testbench streams them"""
+    return np.transpose(tensor, (1, 2, 0)).reshape(-1)
+
+
+def from_raster(words, shape):
+    """Inverse of to_raster() for a (C, H, W) shape"""
+    c, h, w = shape
+    return np.transpose(np.asarray(words)[:c * h * w].reshape(h, w, c), (2, 0, 1))
+
+
+def block_parameters(idx, feature_size):
+    """tb_bneck_block parameter overrides for one block"""
+    k, cin, cexp, cout, _, use_se, stride = BNECK_CONFIG[idx]
+    return {
+        'INPUT_CHANNELS': cin,
+        'EXPANDED_CHANNELS': cexp,
+        'OUTPUT_CHANNELS': cout,
+        'FEATURE_SIZE': feature_size,
+        'STRIDE': stride,
+        'USE_SE': int(use_se),
+        'BNECK_ID': idx,
+    }
+
+
+def write_do_file(filename, params, verbosity=0):
+    """ModelSim script that compiles the block and runs tb_bneck_block on this directory's files
+
+    verbosity is the +VERBOSITY= level of the RTL debug prints (3 traces every cycle).
+    """
+    overrides = ' '.join(f'-G{k}={v}' for k, v in params.items())
+    with open(filename, 'w') as f:
+        f.write(f"# Standalone BNECK_{params['BNECK_ID']} simulation (generated by generate_bneck_stimuli.py)\n")
+        f.write("vlib work\nvmap work work\n")
+        for src in BNECK_SOURCES:
+            f.write(f"vlog -sv {os.path.join(MODELS_DIR, src)}\n")
+        f.write(f"vsim -c {overrides} work.tb_bneck_block +STIM=input.mem +ACTUAL=actual.mem "
+                f"+VERBOSITY={verbosity}\n")
+        f.write("run -all\nquit -f\n")
+
+
+def generate_block_dirs(model, image, output_dir, weights_dir, blocks=None, verbosity=0):
+    """Write input.mem, expected.mem, block.json and run_bneck.do for each selected block"""
+    block_dirs = []
+    for idx, (block_in, block_out) in enumerate(block_io(model, image)):
+        if blocks is not None and idx not in blocks:
+            continue
+        block_dir = os.path.join(output_dir, f'bneck_{idx}')
+        os.makedirs(block_dir, exist_ok=True)
+        params = block_parameters(idx, block_in.shape[1])
+        write_mem(os.path.join(block_dir, 'input.mem'), to_raster(block_in), DATA_WIDTH)
+        write_mem(os.path.join(block_dir, 'expected.mem'), to_raster(block_out), DATA_WIDTH)
+        with open(os.path.join(block_dir, 'block.json'), 'w') as f:
+            json.dump({'parameters': params, 'input_shape': list(block_in.shape),
+                       'output_shape': list(block_out.shape)}, f, indent=2)
+        write_do_file(os.path.join(block_dir, 'run_bneck.do'), params, verbosity)
+        # The conv modules $readmemh from memory_files/ relative to the run directory
+        link = os.path.join(block_dir, 'memory_files')
+        if not os.path.lexists(link):
+            os.symlink(os.path.abspath(weights_dir), link)
+        block_dirs.append(block_dir)
+    return block_dirs
+
+
+def run_block(block_dir, simulator='vsim', timeout=600):
+    """Simulate one block directory; returns (block_dir, return code)"""
+    try:
+        with open(os.path.join(block_dir, 'sim.log'), 'w') as log:
+            result = subprocess.run([simulator, '-c', '-do', 'run_bneck.do'], cwd=block_dir,
+                                    stdout=log, stderr=subprocess.STDOUT, timeout=timeout)
+        return block_dir, result.returncode
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"❌ {block_dir}: {e}")
+        return block_dir, -1
+
+
+def check_block(block_dir):
+    """Compare a block's actual.mem with its expected.mem"""
+    with open(os.path.join(block_dir, 'block.json'), 'r') as f:
+        shape = json.load(f)['output_shape']
+    expected = from_raster(read_mem(os.path.join(block_dir, 'expected.mem'), DATA_WIDTH), shape)
+    actual = read_mem(os.path.join(block_dir, 'actual.mem'), DATA_WIDTH)
+    return compare_layer(from_raster(actual, shape).reshape(-1), expected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate standalone BNECK block simulations from golden activations")
+    parser.add_argument('image', help='Image .mem file (224x224 pixel words)')
+    parser.add_argument('--weights', type=str, default=MEMORY_DIR, help='Directory of exported weight .mem files')
+    parser.add_argument('--output-dir', type=str, default='bneck_stimuli', help='One bneck_<N> directory per block')
+    parser.add_argument('--blocks', type=int, nargs='*', default=None, help='Block indices (default: all 11)')
+    parser.add_argument('--run', action='store_true', help='Simulate the generated blocks in parallel')
+    parser.add_argument('--jobs', type=int, default=len(BNECK_CONFIG), help='Parallel simulations with --run')
+    parser.add_argument('--simulator', type=str, default='vsim', help='Simulator executable')
+    parser.add_argument('--verbosity', type=int, default=0, choices=range(4),
+                        help='RTL debug output level written into run_bneck.do (3: per-cycle trace)')
+    args = parser.parse_args()
+
+    model = GoldenMobileNetV3.from_mem_dir(args.weights)
+    block_dirs = generate_block_dirs(model, load_image_mem(args.image), args.output_dir, args.weights, args.blocks,
+                                     args.verbosity)
+    print(f"📁 Generated {len(block_dirs)} block simulation(s) under {args.output_dir}/")
+
+    if not args.run:
+        return
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        results = list(pool.map(lambda d: run_block(d, args.simulator), block_dirs))
+    for block_dir, code in results:
+        name = os.path.basename(block_dir)
+        if code != 0 or not os.path.exists(os.path.join(block_dir, 'actual.mem')):
+            print(f"❌ {name}: simulation failed (see {block_dir}/sim.log)")
+            continue
+        stats = check_block(block_dir)
+        flag = "✅" if stats['max_ulp'] == 0 else "❌"
+        print(f"{flag} {name}: max {stats['max_ulp']} ULP, {stats['mismatches']}/{stats['words']} words differ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,739 @@
+#!/usr/bin/env python3
+"""
+Bit-exact NumPy fixed-point golden model of MobileNetV3_Small
+Runs the full topology from models.py on batches of Q8.8 images, reproducing
+the operator-level arithmetic of the RTL datapath (expression widths, rounding,
+wrap-around and saturation) so classification checks no longer need ModelSim.
+
+Stage -> RTL arithmetic it follows:
+  conv1                convolver.sv            32-bit MAC, +half LSB, >>> FRAC
+  hs1                  HSwish.sv               divide-by-6 in 16-bit context
+  bneck / conv2 convs  conv_*_real_weights.sv  32-bit MAC, acc[23:8]
+  every BatchNorm      batchnorm1d.sv          (x*gamma >>> FRAC) + beta
+  other h-swish        hswish.sv               x*relu6(x+3) * 10923 >>> 24
+  linear3 / linear4    linear.sv               bias << FRAC, saturate, >>> FRAC
+
+Pipeline timing, FSM sequencing and the temporary bypass paths of the current
+RTL are not modelled; only the per-element arithmetic is.
+
+A mixed-precision plan (qformat_plan.json, see qformat_sweep.py) can give a
+conv/linear layer its own weight format, which moves the accumulator shift,
+and a narrower activation format, which is rounded and saturated inside the
+Q8.8 datapath.
+
+An int8 weight directory (int8_manifest.json, see int8_weights.py) holds 8-bit
+weights with a per-output-channel integer multiplier and shift; those layers
+scale their accumulator per channel instead of shifting it by FRAC.
+
+A low-rank directory (lowrank_manifest.json, see lowrank_factorize.py)
+replaces a linear layer's weights by two thin factors, run as two linear.sv
+passes: a bias-free rank-r projection, then the full-width layer. Each factor
+has its own 16-bit format ('factor_in'/'factor_out' in qformats).
+
+forward(..., counters=OverflowCounters()) counts, per layer, channel and image,
+every value that wraps or saturates: the 32-bit conv accumulator, the 16-bit
+requantized and saturated outputs, BatchNorm, h-swish and residual adds.
+overflow_report.py prints them and checks them against the RTL debug counters.
+"""
+
+import os
+import json
+import argparse
+import numpy as np
+from mem_io import encode_mem, load_mem
+from weight_blob import BLOB_MANIFEST, load_weight_blob
+from postprocess import MEDICAL_CONDITIONS
+
+DATA_WIDTH = 16
+FRAC_BITS = 8
+ACC_WIDTH = 32
+IMG_SIZE = 224
+NUM_CLASSES = 15
+MEMORY_DIR = 'memory_files'
+FUSION_MANIFEST = 'fusion_manifest.json'
+PLAN_FILE = 'qformat_plan.json'
+INT8_MANIFEST = 'int8_manifest.json'
+LOWRANK_MANIFEST = 'lowrank_manifest.json'
+# Manifests that change how a weight directory is read; exporters clear them first
+DIRECTORY_MANIFESTS = (FUSION_MANIFEST, PLAN_FILE, INT8_MANIFEST, LOWRANK_MANIFEST)
+INT8_WEIGHT_BITS = 8
+MULTIPLIER_BITS = 16
+SHIFT_BITS = 8
+
+# 1/6 in Q0.16, as used by final_layer/hswish.sv
+RECIPROCAL_OF_6 = 10923
+
+# Same table as MobileNetV3_Small.bneck in models.py:
+# (kernel, in, expand, out, nonlinearity, use_se, stride)
+BNECK_CONFIG = [
+    (3, 16, 16, 16, 'relu', True, 2),
+    (3, 16, 72, 24, 'relu', False, 2),
+    (3, 24, 88, 24, 'relu', False, 1),
+    (5, 24, 96, 40, 'hswish', True, 2),
+    (5, 40, 240, 40, 'hswish', True, 1),
+    (5, 40, 240, 40, 'hswish', True, 1),
+    (5, 40, 120, 48, 'hswish', True, 1),
+    (5, 48, 144, 48, 'hswish', True, 1),
+    (5, 48, 288, 96, 'hswish', True, 2),
+    (5, 96, 576, 96, 'hswish', True, 1),
+    (5, 96, 576, 96, 'hswish', True, 1),
+]
+
+
+# ---------------------------------------------------------------------------
+# Fixed-point primitives
+# ---------------------------------------------------------------------------
+
+def wrap(x, bits=DATA_WIDTH):
+    """Two's complement wrap-around, as when a Verilog result is truncated to `bits`"""
+    x = np.asarray(x, dtype=np.int64)
+    half = 1 << (bits - 1)
+    return ((x + half) & ((1 << bits) - 1)) - half
+
+
+def overflows(x, bits=DATA_WIDTH):
+    """Mask of the values outside the signed range of `bits` (the ones wrap() or saturate() change)"""
+    half = 1 << (bits - 1)
+    return (x < -half) | (x >= half)
+
+
+def saturate(x, bits=DATA_WIDTH):
+    """Clamp to the signed range of `bits`"""
+    half = 1 << (bits - 1)
+    return np.clip(x, -half, half - 1)
+
+
+def div_trunc(x, d):
+    """Signed integer division rounding toward zero, like Verilog `/`"""
+    x = np.asarray(x, dtype=np.int64)
+    q = np.abs(x) // abs(d)
+    return np.where((x < 0) != (d < 0), -q, q)
+
+
+def to_fixed(x, bits=DATA_WIDTH, frac_bits=FRAC_BITS):
+    """Round real values to signed fixed-point words of `bits` with `frac_bits`, saturating"""
+    return saturate(np.round(np.asarray(x, dtype=np.float64) * (1 << frac_bits)), bits).astype(np.int64)
+
+
+def quantize_activation(x, bits, frac_bits, counter=None):
+    """Round and saturate Q8.8 words to a narrower Q format, staying in the Q8.8 datapath
+
+    The format may drop fractional bits (rounding half up) and integer bits
+    (saturating), but cannot hold more of either than the 16-bit datapath.
+    counter('activation', mask) receives the saturated values.
+    """
+    drop = FRAC_BITS - frac_bits
+    if drop < 0 or bits - frac_bits > DATA_WIDTH - FRAC_BITS:
+        raise ValueError(f"activation format Q{bits - frac_bits}.{frac_bits} does not fit the Q8.8 datapath")
+    x = np.asarray(x, dtype=np.int64)
+    if drop:
+        x = (x + (1 << (drop - 1))) >> drop
+    if counter is not None:
+        counter('activation', overflows(x, bits))
+    return saturate(x, bits) << drop
+
+
+def int_matmul(a, b):
+    """Exact integer matmul through float64 BLAS
+
+    Operands are 16-bit values, so every product is below 2**30 and the sum over
+    fewer than 2**22 terms stays well inside the 53-bit float64 mantissa.
+    """
+    return np.matmul(a.astype(np.float64), b.astype(np.float64)).astype(np.int64)
+
+
+def requantize(acc, rounding=False, frac_bits=FRAC_BITS, counter=None):
+    """Drop the extra fractional bits of a wrapped accumulator back to 16 bits"""
+    if rounding:
+        acc = acc + (1 << (frac_bits - 1))
+    if counter is not None:
+        counter('output', overflows(acc >> frac_bits))
+    return wrap(acc >> frac_bits)
+
+
+def _wrap_accumulator(acc, counter):
+    if counter is not None:
+        counter('accumulator', overflows(acc, ACC_WIDTH))
+    return wrap(acc, ACC_WIDTH)
+
+
+def requantize_channels(acc, multiplier, shift, bias=None, counter=None, saturating=False):
+    """Scale an accumulator per output channel (axis 1): (acc * multiplier + bias << shift) >> shift, rounded
+
+    Used for int8 weights, where multiplier * 2**-shift is the channel's weight
+    scale. The result wraps to 16 bits, or saturates like linear.sv.
+    """
+    shape = (1, -1) + (1,) * (acc.ndim - 2)
+    m = np.asarray(multiplier, dtype=np.int64).reshape(shape)
+    s = np.asarray(shift, dtype=np.int64).reshape(shape)
+    total = acc * m + (np.int64(1) << (s - 1))
+    if bias is not None:
+        total += np.asarray(bias, dtype=np.int64).reshape(shape) << s
+    out = total >> s
+    if counter is not None:
+        counter('output', overflows(out))
+    return saturate(out) if saturating else wrap(out)
+
+
+def conv2d(x, w, stride=1, padding=0, groups=1, rounding=False, bias=None, frac_bits=FRAC_BITS, counter=None,
+           scale=None):
+    """Dense or depthwise integer convolution with a 32-bit accumulator
+
+    x is (N, C, H, W) and w is (O, C/groups, k, k), both holding Q8.8 words.
+    rounding=True follows convolver.sv, otherwise the acc[23:8] slice of the
+    BNECK convolution modules is used. A bias (folded BatchNorm) is preloaded
+    into the accumulator as bias << FRAC, the same way linear.sv does it.
+    frac_bits is the fractional width of w when a plan stores it in another format.
+    counter(stage, mask), if given, receives the values that leave the 32-bit
+    accumulator ('accumulator') and the 16-bit output ('output').
+    scale=(multiplier, shift) marks int8 weights: the accumulator is requantized
+    per channel by requantize_channels() and the bias is added there.
+    """
+    n, c, h, wd = x.shape
+    out_ch, _, k, _ = w.shape
+    ho = (h + 2 * padding - k) // stride + 1
+    wo = (wd + 2 * padding - k) // stride + 1
+    acc = np.zeros((n, out_ch, ho, wo), dtype=np.int64)
+    if bias is not None and scale is None:
+        acc += (np.asarray(bias, dtype=np.int64) << frac_bits)[None, :, None, None]
+
+    def finish(acc):
+        acc = _wrap_accumulator(acc, counter)
+        if scale is not None:
+            return requantize_channels(acc, *scale, bias=bias, counter=counter)
+        return requantize(acc, rounding, frac_bits, counter)
+
+    if k == 1 and stride == 1 and padding == 0 and groups == 1:
+        acc += int_matmul(w[:, :, 0, 0], x.reshape(n, c, h * wd)).reshape(n, out_ch, ho, wo)
+        return finish(acc)
+
+    if padding:
+        x = np.pad(x, ((0, 0), (0, 0), (padding, padding), (padding, padding)))
+    for i in range(k):
+        for j in range(k):
+            patch = x[:, :, i:i + stride * (ho - 1) + 1:stride, j:j + stride * (wo - 1) + 1:stride]
+            if groups == 1:
+                acc += int_matmul(w[:, :, i, j], patch.reshape(n, c, ho * wo)).reshape(n, out_ch, ho, wo)
+            elif groups == c == out_ch:
+                acc += patch * w[:, 0, i, j][None, :, None, None]
+            else:
+                raise ValueError("only dense and depthwise convolutions are supported")
+    return finish(acc)
+
+
+def batchnorm(x, gamma, beta, counter=None):
+    """Per-channel affine BatchNorm of batchnorm1d.sv: (x*gamma >>> FRAC) + beta"""
+    shape = (1, -1) + (1,) * (x.ndim - 2)
+    product = (x * gamma.reshape(shape)) >> FRAC_BITS
+    scaled = wrap(product)
+    if counter is None:
+        return wrap(scaled + beta.reshape(shape))
+    total = scaled + beta.reshape(shape)
+    counter('bn', overflows(product) | overflows(total))
+    return wrap(total)
+
+
+def relu(x):
+    """ReLU on signed words"""
+    return np.maximum(x, 0)
+
+
+def _relu6_plus_3(x):
+    x_plus_3 = wrap(x + (3 << FRAC_BITS))
+    return np.clip(x_plus_3, 0, 6 << FRAC_BITS)
+
+
+def hswish(x, counter=None):
+    """h-swish of final_layer/hswish.sv (reciprocal multiply in a 32-bit context)"""
+    product = x * _relu6_plus_3(x) * RECIPROCAL_OF_6
+    div6 = wrap(product, ACC_WIDTH) >> 16
+    if counter is not None:
+        counter('hswish', overflows(product, ACC_WIDTH) | overflows(div6 >> FRAC_BITS))
+    return wrap(div6 >> FRAC_BITS)
+
+
+def hswish_divider(x, counter=None):
+    """h-swish of First_layer/HSwish.sv (true divide, shift done in 16 bits)"""
+    product = (x * _relu6_plus_3(x) + (1 << (FRAC_BITS - 1))) >> FRAC_BITS
+    scaled = wrap(product)
+    if counter is not None:
+        counter('hswish', overflows(product) | overflows(scaled << FRAC_BITS))
+    return wrap(div_trunc(wrap(scaled << FRAC_BITS), 6 << FRAC_BITS))
+
+
+def hsigmoid(x):
+    """h-sigmoid with the same reciprocal-of-6 multiply as hswish.sv"""
+    return wrap(wrap(_relu6_plus_3(x) * RECIPROCAL_OF_6, ACC_WIDTH) >> 16)
+
+
+def global_avg_pool(x):
+    """Mean over H and W with truncating integer division"""
+    return div_trunc(x.sum(axis=(2, 3), keepdims=True), x.shape[2] * x.shape[3])
+
+
+def linear(x, weight, bias, frac_bits=FRAC_BITS, counter=None, scale=None):
+    """Fully connected layer of linear.sv: wide accumulator, saturating output
+
+    counter('output', mask), if given, receives the saturated outputs.
+    scale=(multiplier, shift) marks int8 weights, requantized per output feature.
+    """
+    if scale is not None:
+        return requantize_channels(int_matmul(x, weight.T), *scale, bias=bias, counter=counter, saturating=True)
+    max_val = (1 << (DATA_WIDTH - 1)) - 1
+    min_val = -(1 << (DATA_WIDTH - 1))
+    acc = (bias.astype(np.int64) << frac_bits)[None, :] + int_matmul(x, weight.T)
+    if counter is not None:
+        counter('output', (acc > (max_val << frac_bits)) | (acc < (min_val << frac_bits)))
+    out = np.where(acc > (max_val << frac_bits), max_val,
+                   np.where(acc < (min_val << frac_bits), min_val, acc >> frac_bits))
+    return wrap(out)
+
+
+# ---------------------------------------------------------------------------
+# Parameter layout
+# ---------------------------------------------------------------------------
+
+def parameter_layout(in_channels=1, num_classes=NUM_CLASSES, fold_bn=False, int8=False, lowrank=None):
+    """List (state_dict key, .mem filename, shape) for every tensor the model reads
+
+    With fold_bn=True every BatchNorm is absorbed into the conv/linear before it,
+    so convolutions gain a bias tensor and no gamma/beta tensors are listed.
+    With int8=True every conv/linear weight is followed by its per-channel
+    multiplier ('.weight_scale') and shift ('.weight_shift').
+    lowrank maps linear layers to a rank r: their (out, in) weight is replaced by
+    16-bit factors '.factor_in' (r, in) and '.factor_out' (out, r).
+    """
+    layout = []
+    lowrank = lowrank or {}
+
+    def channel_scale(prefix, name, channels):
+        if int8:
+            layout.append((f'{prefix}.weight_scale', f'{name}_scale.mem', (channels,)))
+            layout.append((f'{prefix}.weight_shift', f'{name}_shift.mem', (channels,)))
+
+    def conv_bn(conv_prefix, bn_prefix, shape):
+        name = conv_prefix.replace(".", "_")
+        layout.append((f'{conv_prefix}.weight', f'{name}_conv.mem', shape))
+        channel_scale(conv_prefix, name, shape[0])
+        if fold_bn:
+            layout.append((f'{conv_prefix}.bias', f'{name}_bias.mem', shape[:1]))
+        else:
+            bn(bn_prefix, shape[0])
+
+    def bn(prefix, channels):
+        name = prefix.replace(".", "_")
+        layout.append((f'{prefix}.weight', f'{name}_gamma.mem', (channels,)))
+        layout.append((f'{prefix}.bias', f'{name}_beta.mem', (channels,)))
+
+    def fc(prefix, out_features, in_features):
+        if prefix in lowrank:
+            layout.append((f'{prefix}.factor_in', f'{prefix}_factor_in.mem', (lowrank[prefix], in_features)))
+            layout.append((f'{prefix}.factor_out', f'{prefix}_factor_out.mem', (out_features, lowrank[prefix])))
+        else:
+            layout.append((f'{prefix}.weight', f'{prefix}_weights.mem', (out_features, in_features)))
+            channel_scale(prefix, prefix, out_features)
+        layout.append((f'{prefix}.bias', f'{prefix}_biases.mem', (out_features,)))
+
+    conv_bn('conv1', 'bn1', (16, in_channels, 3, 3))
+    for idx, (k, cin, cexp, cout, _, use_se, stride) in enumerate(BNECK_CONFIG):
+        p = f'bneck.{idx}'
+        conv_bn(f'{p}.conv1', f'{p}.bn1', (cexp, cin, 1, 1))
+        conv_bn(f'{p}.conv2', f'{p}.bn2', (cexp, 1, k, k))
+        conv_bn(f'{p}.conv3', f'{p}.bn3', (cout, cexp, 1, 1))
+        if use_se:
+            conv_bn(f'{p}.se.se.1', f'{p}.se.se.2', (cout // 4, cout, 1, 1))
+            conv_bn(f'{p}.se.se.4', f'{p}.se.se.5', (cout, cout // 4, 1, 1))
+        if stride == 1 and cin != cout:
+            conv_bn(f'{p}.shortcut.0', f'{p}.shortcut.1', (cout, cin, 1, 1))
+    conv_bn('conv2', 'bn2', (576, 96, 1, 1))
+    fc('linear3', 1280, 576)
+    if not fold_bn:
+        bn('bn3', 1280)
+    fc('linear4', num_classes, 1280)
+    return layout
+
+
+def weight_layers(in_channels=1, num_classes=NUM_CLASSES, fold_bn=False):
+    """List (layer, weight key, shape) of every conv/linear layer, the units a Q-format plan covers"""
+    return [(key[:-len('.weight')], key, shape)
+            for key, filename, shape in parameter_layout(in_channels, num_classes, fold_bn)
+            if filename.endswith(('_conv.mem', '_weights.mem'))]
+
+
+def load_plan(memory_dir=MEMORY_DIR):
+    """Per-layer formats of the directory's Q-format plan ({layer: {'weight': [bits, frac], ...}}), or None"""
+    path = os.path.join(memory_dir, PLAN_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)['layers']
+
+
+def load_int8_manifest(memory_dir=MEMORY_DIR):
+    """The directory's int8 manifest (written by int8_weights.py), or None"""
+    path = os.path.join(memory_dir, INT8_MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def load_lowrank(memory_dir=MEMORY_DIR):
+    """Factored layers of the directory's low-rank manifest (written by lowrank_factorize.py), or None
+
+    Each layer maps to {'rank': r, 'fold_bn': bool,
+    'formats': {'factor_in': [bits, frac], 'factor_out': [bits, frac]}, ...}.
+    """
+    path = os.path.join(memory_dir, LOWRANK_MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)['layers']
+
+
+def directory_fold_bn(memory_dir=MEMORY_DIR):
+    """Whether the per-tensor files of a weight directory use the BN-folded layout"""
+    int8 = load_int8_manifest(memory_dir)
+    if int8 is not None:
+        return int8['fold_bn']
+    return os.path.exists(os.path.join(memory_dir, FUSION_MANIFEST))
+
+
+def clear_manifests(memory_dir=MEMORY_DIR):
+    """Remove the DIRECTORY_MANIFESTS of an earlier export so they cannot apply to new weights"""
+    for name in DIRECTORY_MANIFESTS:
+        path = os.path.join(memory_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def load_parameters(memory_dir=MEMORY_DIR, in_channels=1, num_classes=NUM_CLASSES, fold_bn=None):
+    """Load every tensor of parameter_layout() from exported .mem files
+
+    fold_bn=None picks the BN-folded layout when the directory holds a fusion manifest.
+    A packed weight blob (weights_manifest.json) is preferred over the per-tensor files.
+    Weight files of a Q-format plan are read at the word width the plan gives them.
+    An int8 manifest selects the int8 layout, and a low-rank manifest swaps in
+    the factors of its layers; both are read from the per-tensor files.
+    """
+    if fold_bn is None:
+        fold_bn = os.path.exists(os.path.join(memory_dir, FUSION_MANIFEST))
+    widths = {f'{layer}.weight': fmt['weight'][0] for layer, fmt in (load_plan(memory_dir) or {}).items()}
+    int8 = load_int8_manifest(memory_dir)
+    if int8 is not None:
+        fold_bn = int8['fold_bn']
+        for layer, key, _ in weight_layers(in_channels, num_classes, fold_bn):
+            widths.update({key: INT8_WEIGHT_BITS, f'{layer}.weight_scale': MULTIPLIER_BITS,
+                           f'{layer}.weight_shift': SHIFT_BITS})
+    factored = load_lowrank(memory_dir) or {}
+    # Factors keep the dense layer's bias file, so both must come from the same layout
+    mismatched = [layer for layer, entry in factored.items() if entry.get('fold_bn') != fold_bn]
+    if mismatched:
+        raise ValueError(f"{memory_dir}/{LOWRANK_MANIFEST}: factors of {', '.join(mismatched)} were not made for "
+                         f"the {'BN-folded' if fold_bn else 'unfolded'} layout of the directory; "
+                         "re-run lowrank_factorize.py with the matching --fold-bn")
+    lowrank = {layer: entry['rank'] for layer, entry in factored.items()} or None
+    blob = None
+    if int8 is None and lowrank is None and os.path.exists(os.path.join(memory_dir, BLOB_MANIFEST)):
+        blob, manifest = load_weight_blob(memory_dir)
+        fold_bn = manifest.get('fold_bn', fold_bn)
+    params = {}
+    problems = []
+    for key, filename, shape in parameter_layout(in_channels, num_classes, fold_bn, int8=int8 is not None,
+                                                 lowrank=lowrank):
+        if blob is not None:
+            if key not in blob or blob[key].shape != tuple(shape):
+                problems.append(f"{BLOB_MANIFEST}: {key} missing or not shaped {tuple(shape)}")
+            else:
+                params[key] = blob[key]
+            continue
+        path = os.path.join(memory_dir, filename)
+        if not os.path.exists(path):
+            problems.append(f"{filename}: missing")
+            continue
+        values = load_mem(path, widths.get(key, DATA_WIDTH))
+        if values.size != int(np.prod(shape)):
+            problems.append(f"{filename}: {values.size} words, expected {int(np.prod(shape))}")
+            continue
+        params[key] = values.reshape(shape)
+    if problems:
+        raise ValueError("Cannot build golden model from " + memory_dir + ":\n  " + "\n  ".join(problems))
+    return params
+
+
+# ---------------------------------------------------------------------------
+# Overflow counters
+# ---------------------------------------------------------------------------
+
+class OverflowCounters:
+    """Wrap-around and saturation events of a forward pass, per layer, stage, image and channel
+
+    counts[(layer, stage)] is an (N, C) array of events; stage is one of
+    STAGES. Layers appear in forward order. One instance covers one batch.
+    """
+
+    STAGES = ('accumulator', 'output', 'activation', 'bn', 'hswish', 'residual')
+
+    def __init__(self):
+        self.counts = {}
+
+    def record(self, layer, stage, mask):
+        mask = np.asarray(mask)
+        events = mask.reshape(mask.shape[0], mask.shape[1] if mask.ndim > 1 else 1, -1).sum(axis=2)
+        key = (layer, stage)
+        self.counts[key] = self.counts[key] + events if key in self.counts else events
+
+    def counter(self, layer):
+        """counter(stage, mask) callback of the fixed-point primitives for one layer"""
+        return lambda stage, mask: self.record(layer, stage, mask)
+
+    def per_image(self):
+        """{(layer, stage): (N,) events per image}"""
+        return {key: counts.sum(axis=1) for key, counts in self.counts.items()}
+
+    def first_overflow(self, stages=STAGES):
+        """(layer, stage) of the first layer in forward order with an event, or None"""
+        for (layer, stage), counts in self.counts.items():
+            if stage in stages and counts.any():
+                return layer, stage
+        return None
+
+    def summary(self):
+        """One dict per (layer, stage) with events: totals, images and channels hit, the worst channel"""
+        rows = []
+        for (layer, stage), counts in self.counts.items():
+            if not counts.any():
+                continue
+            per_channel = counts.sum(axis=0)
+            rows.append({
+                'layer': layer,
+                'stage': stage,
+                'events': int(counts.sum()),
+                'images': int((counts.sum(axis=1) > 0).sum()),
+                'channels': int((per_channel > 0).sum()),
+                'worst_channel': int(np.argmax(per_channel)),
+                'per_image': counts.sum(axis=1).tolist(),
+                'per_channel': per_channel.tolist(),
+            })
+        return rows
+
+
+# ---------------------------------------------------------------------------
+# Network
+# ---------------------------------------------------------------------------
+
+class GoldenMobileNetV3:
+    """Fixed-point MobileNetV3_Small evaluated on batches of Q8.8 images
+
+    qformats optionally maps a conv/linear layer to {'weight': (bits, frac),
+    'activation': (bits, frac)}, plus 'factor_in'/'factor_out' for low-rank
+    layers; layers it does not list stay Q8.8.
+    """
+
+    def __init__(self, params, num_classes=NUM_CLASSES, qformats=None):
+        self.params = {k: np.asarray(v, dtype=np.int64) for k, v in params.items()}
+        self.num_classes = num_classes
+        self.qformats = qformats or {}
+        self._counters = None
+
+    @classmethod
+    def from_mem_dir(cls, memory_dir=MEMORY_DIR, in_channels=1, num_classes=NUM_CLASSES, fold_bn=None):
+        qformats = load_plan(memory_dir) or {}
+        for layer, entry in (load_lowrank(memory_dir) or {}).items():
+            qformats.setdefault(layer, {}).update({k: tuple(v) for k, v in entry.get('formats', {}).items()})
+        return cls(load_parameters(memory_dir, in_channels, num_classes, fold_bn), num_classes, qformats)
+
+    def _weight_frac(self, prefix):
+        return self.qformats.get(prefix, {}).get('weight', (DATA_WIDTH, FRAC_BITS))[1]
+
+    def _counter(self, layer):
+        return None if self._counters is None else self._counters.counter(layer)
+
+    def _activation(self, out, prefix):
+        fmt = self.qformats.get(prefix, {}).get('activation')
+        return out if fmt is None else quantize_activation(out, *fmt, counter=self._counter(prefix))
+
+    def _channel_scale(self, prefix):
+        # int8 layers carry a per-channel multiplier and shift next to their weights
+        if prefix + '.weight_scale' not in self.params:
+            return None
+        return self.params[prefix + '.weight_scale'], self.params[prefix + '.weight_shift']
+
+    def _conv(self, x, prefix, **kwargs):
+        out = conv2d(x, self.params[prefix + '.weight'], bias=self.params.get(prefix + '.bias'),
+                     frac_bits=self._weight_frac(prefix), counter=self._counter(prefix),
+                     scale=self._channel_scale(prefix), **kwargs)
+        return self._activation(out, prefix)
+
+    def _linear(self, x, prefix):
+        if prefix + '.factor_in' in self.params:
+            # Low-rank layer: project to the rank without bias, then expand with the layer's bias
+            fmt = self.qformats.get(prefix, {})
+            factor_in = self.params[prefix + '.factor_in']
+            x = linear(x, factor_in, np.zeros(len(factor_in), dtype=np.int64),
+                       fmt.get('factor_in', (DATA_WIDTH, FRAC_BITS))[1], counter=self._counter(prefix + '.factor_in'))
+            out = linear(x, self.params[prefix + '.factor_out'], self.params[prefix + '.bias'],
+                         fmt.get('factor_out', (DATA_WIDTH, FRAC_BITS))[1], counter=self._counter(prefix))
+            return self._activation(out, prefix)
+        out = linear(x, self.params[prefix + '.weight'], self.params[prefix + '.bias'], self._weight_frac(prefix),
+                     counter=self._counter(prefix), scale=self._channel_scale(prefix))
+        return self._activation(out, prefix)
+
+    def _bn(self, x, prefix):
+        # Folded BatchNorms have no parameters left and pass straight through
+        if prefix + '.weight' not in self.params:
+            return x
+        return batchnorm(x, self.params[prefix + '.weight'], self.params[prefix + '.bias'], self._counter(prefix))
+
+    def _act(self, x, nolinear, name):
+        return relu(x) if nolinear == 'relu' else hswish(x, self._counter(name))
+
+    def _add(self, x, y, name):
+        total = x + y
+        if self._counters is not None:
+            self._counters.record(name, 'residual', overflows(total))
+        return wrap(total)
+
+    def _se(self, x, p, emit):
+        s = emit(f'{p}.se.0', global_avg_pool(x))
+        s = emit(f'{p}.se.1', self._conv(s, f'{p}.se.1'))
+        s = emit(f'{p}.se.2', self._bn(s, f'{p}.se.2'))
+        s = emit(f'{p}.se.3', relu(s))
+        s = emit(f'{p}.se.4', self._conv(s, f'{p}.se.4'))
+        s = emit(f'{p}.se.5', self._bn(s, f'{p}.se.5'))
+        s = emit(f'{p}.se.6', hsigmoid(s))
+        s = emit(f'{p}.se', s)
+        return wrap((x * s) >> FRAC_BITS)
+
+    def _block(self, x, idx, emit):
+        k, cin, _, cout, nolinear, use_se, stride = BNECK_CONFIG[idx]
+        p = f'bneck.{idx}'
+
+        out = emit(f'{p}.conv1', self._conv(x, f'{p}.conv1'))
+        out = emit(f'{p}.bn1', self._bn(out, f'{p}.bn1'))
+        out = emit(f'{p}.nolinear1', self._act(out, nolinear, f'{p}.nolinear1'))
+        out = emit(f'{p}.conv2', self._conv(out, f'{p}.conv2', stride=stride,
+                                            padding=k // 2, groups=out.shape[1]))
+        out = emit(f'{p}.bn2', self._bn(out, f'{p}.bn2'))
+        # nolinear2 is the same module object as nolinear1 in models.py
+        out = emit(f'{p}.nolinear1', self._act(out, nolinear, f'{p}.nolinear1'))
+        out = emit(f'{p}.conv3', self._conv(out, f'{p}.conv3'))
+        out = emit(f'{p}.bn3', self._bn(out, f'{p}.bn3'))
+        if use_se:
+            out = emit(f'{p}.se', self._se(out, f'{p}.se', emit))
+        if stride == 1:
+            if cin != cout:
+                sc = emit(f'{p}.shortcut.0', self._conv(x, f'{p}.shortcut.0'))
+                sc = emit(f'{p}.shortcut.1', self._bn(sc, f'{p}.shortcut.1'))
+            else:
+                sc = x
+            out = self._add(out, emit(f'{p}.shortcut', sc), p)
+        return emit(p, out)
+
+    def forward(self, images, hook=None, counters=None):
+        """Run a batch of images through the network and return (N, classes) int16 scores
+
+        images holds raw 16-bit pixel words shaped (N, H, W), (N, 1, H, W) or (H, W).
+        hook(name, tensor) is called after every module with the same dotted
+        names and in the same order as PyTorch forward hooks on models.py.
+        An OverflowCounters passed as counters collects the overflow events.
+        """
+        self._counters = counters
+        try:
+            return self._forward(images, self._emitter(hook))
+        finally:
+            self._counters = None
+
+    __call__ = forward
+
+    def head(self, features, hook=None):
+        """Scores from (N, 576) pooled features, i.e. linear3 onward, for tools that vary only the head"""
+        return self._head(wrap(np.asarray(features, dtype=np.int64)), self._emitter(hook))
+
+    @staticmethod
+    def _emitter(hook):
+        def emit(name, tensor):
+            if hook is not None:
+                hook(name, tensor)
+            return tensor
+        return emit
+
+    def _forward(self, images, emit):
+        x = wrap(np.asarray(images, dtype=np.int64))
+        if x.ndim == 2:
+            x = x[None, None]
+        elif x.ndim == 3:
+            x = x[:, None]
+
+        out = emit('conv1', self._conv(x, 'conv1', stride=2, padding=1, rounding=True))
+        out = emit('bn1', self._bn(out, 'bn1'))
+        out = emit('hs1', hswish_divider(out, self._counter('hs1')))
+        for idx in range(len(BNECK_CONFIG)):
+            out = self._block(out, idx, emit)
+        out = emit('bneck', out)
+        out = emit('conv2', self._conv(out, 'conv2'))
+        out = emit('bn2', self._bn(out, 'bn2'))
+        out = emit('hs2', hswish(out, self._counter('hs2')))
+        return self._head(global_avg_pool(out).reshape(out.shape[0], -1), emit)
+
+    def _head(self, out, emit):
+        out = emit('linear3', self._linear(out, 'linear3'))
+        out = emit('bn3', self._bn(out, 'bn3'))
+        out = emit('hs3', hswish(out, self._counter('hs3')))
+        out = emit('linear4', self._linear(out, 'linear4'))
+        return out.astype(np.int16)
+
+    def predict(self, images):
+        """Return (scores, argmax class) for a batch of images"""
+        scores = self.forward(images)
+        return scores, np.argmax(scores, axis=1)
+
+
+def load_image_mem(filename, img_size=IMG_SIZE):
+    """Load a test image .mem (one pixel word per line) as an (H, W) array"""
+    pixels = load_mem(filename, DATA_WIDTH)
+    if pixels.size < img_size * img_size:
+        raise ValueError(f"{filename}: {pixels.size} pixels, expected {img_size * img_size}")
+    return pixels[:img_size * img_size].reshape(img_size, img_size)
+
+
+def write_scores(filename, names, scores):
+    """Write scores in the full_system_outputs.txt layout used by the testbench"""
+    with open(filename, 'w') as f:
+        for test_num, (name, row) in enumerate(zip(names, scores)):
+            f.write(f"=== Test {test_num}: {name} ===\n")
+            f.write(encode_mem(row, DATA_WIDTH).decode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the fixed-point golden model on test image .mem files")
+    parser.add_argument('images', nargs='+', help='Image .mem files (224x224 pixel words)')
+    parser.add_argument('--weights', type=str, default=MEMORY_DIR, help='Directory of exported weight .mem files')
+    parser.add_argument('--output', type=str, default=None, help='Optional scores file in full_system_outputs.txt format')
+    parser.add_argument('--calibration', type=str, default=None,
+                        help='Activation calibration (calibrate_activations.py) to narrow the layer outputs with')
+    parser.add_argument('--activation-bits', type=int, default=DATA_WIDTH,
+                        help='With --calibration: activation word width of every conv/linear output')
+    args = parser.parse_args()
+
+    model = GoldenMobileNetV3.from_mem_dir(args.weights)
+    if args.calibration:
+        from calibrate_activations import load_calibration, calibrated_formats
+        layers = [layer for layer, _, _ in weight_layers(fold_bn=os.path.exists(
+            os.path.join(args.weights, FUSION_MANIFEST)))]
+        for layer, fmt in calibrated_formats(load_calibration(args.calibration), args.activation_bits,
+                                             layers=layers).items():
+            model.qformats.setdefault(layer, {}).update(fmt)
+    batch = np.stack([load_image_mem(path) for path in args.images])
+    scores, predicted = model.predict(batch)
+
+    for path, row, cls in zip(args.images, scores, predicted):
+        print(f"{os.path.basename(path):<40} -> {MEDICAL_CONDITIONS[cls]:<20} (score {int(row[cls])})")
+
+    if args.output:
+        write_scores(args.output, [os.path.basename(p) for p in args.images], scores)
+        print(f"Scores written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Batch image stimulus for the full-system testbench
+Concatenates N image .mem files into one stream file and writes a plain-text
+index next to it (one "<offset> <words> <name>" line per image). Started with
++BATCH=<stream> +BATCH_INDEX=<index>, tb_full_system_top streams the images
+back to back and writes one score block per image, so simulator start-up and
+elaboration are paid once per batch instead of once per image.
+"""
+
+import os
+import argparse
+import numpy as np
+from mem_io import write_mem, read_mem
+
+DATA_WIDTH = 16
+IMG_WORDS = 224 * 224
+BATCH_MEM = 'batch.mem'
+BATCH_INDEX = 'batch.idx'
+
+
+def index_path(stream_file):
+    """Index file that belongs to a batch stream file"""
+    return os.path.splitext(stream_file)[0] + '.idx'
+
+
+def batch_name(image_file):
+    """Label of one image inside a batch; the testbench reads it as a single token"""
+    return os.path.splitext(os.path.basename(image_file))[0].replace(' ', '_')
+
+
+def write_image_batch(image_files, stream_file, index_file=None, words=None, names=None):
+    """Concatenate image .mem files into stream_file and write its index
+
+    words, when given, is the exact word count every image must have.
+    Returns the index entries as dicts (name, image, offset, words).
+    """
+    index_file = index_file or index_path(stream_file)
+    names = names or [batch_name(f) for f in image_files]
+    images, entries, offset = [], [], 0
+    for name, image_file in zip(names, image_files):
+        pixels = read_mem(image_file, DATA_WIDTH, signed=False)
+        if words is not None and len(pixels) != words:
+            raise ValueError(f"{image_file}: {len(pixels)} words, expected {words}")
+        images.append(pixels)
+        entries.append({'name': name, 'image': os.path.abspath(image_file), 'offset': offset, 'words': len(pixels)})
+        offset += len(pixels)
+
+    write_mem(stream_file, np.concatenate(images) if images else np.zeros(0, dtype=np.int64), DATA_WIDTH)
+    with open(index_file, 'w') as f:
+        for e in entries:
+            f.write(f"{e['offset']} {e['words']} {e['name']}\n")
+    return entries
+
+
+def read_batch_index(index_file):
+    """Parse a batch index back into (name, offset, words) dicts"""
+    entries = []
+    with open(index_file, 'r') as f:
+        for line in f:
+            if line.strip():
+                offset, words, name = line.split(None, 2)
+                entries.append({'name': name.strip(), 'offset': int(offset), 'words': int(words)})
+    return entries
+
+
+def read_image_batch(stream_file, index_file=None):
+    """Split a batch stream back into {name: pixel array}"""
+    stream = read_mem(stream_file, DATA_WIDTH, signed=False)
+    return {e['name']: stream[e['offset']:e['offset'] + e['words']]
+            for e in read_batch_index(index_file or index_path(stream_file))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concatenate image .mem files into a testbench batch stream")
+    parser.add_argument('images', nargs='+', help='Image .mem files, in batch order')
+    parser.add_argument('--output', '-o', type=str, default=BATCH_MEM, help='Stream file (index goes next to it)')
+    parser.add_argument('--words', type=int, default=IMG_WORDS, help='Required words per image (0: no check)')
+    args = parser.parse_args()
+
+    entries = write_image_batch(args.images, args.output, words=args.words or None)
+    print(f"📦 Wrote {len(entries)} image(s) to {args.output} (index: {index_path(args.output)})")
+    print(f"   Run with: +BATCH={args.output} +BATCH_INDEX={index_path(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
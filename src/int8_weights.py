@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+INT8 weights with per-output-channel scales for the hardware export
+Every conv/linear weight is stored as 8-bit integers q, plus a real scale per
+output channel s_c so that w ~= q * s_c. The scale becomes an integer
+multiplier M_c (MULTIPLIER_BITS, normalized) and a right shift S_c, with
+M_c * 2**-S_c ~= s_c. The datapath accumulates Q8.8 activations times q and
+returns each channel to Q8.8 as (acc * M_c + bias << S_c) >> S_c (see
+golden_model.requantize_channels). Biases and BatchNorm parameters stay Q8.8.
+
+The real-valued weights come either from a PyTorch checkpoint
+(export_mobilenetv3_weights_for_hw.py --int8) or from the shipped QDQ
+model models/models/model_int8.onnx (--onnx here, needs the onnx package).
+That file's weights are already int8, but with one scale per tensor. They are
+dequantized, bn3 is folded into linear3, and the result is re-quantized per
+channel, which gives the BN-folded layout. memory_report() lists the weight
+ROM saving of each layer.
+"""
+
+import os
+import sys
+import json
+import argparse
+import numpy as np
+import golden_model as gm
+from mem_io import write_mem
+
+ONNX_MODEL = 'models/models/model_int8.onnx'
+BN_EPSILON = 1e-5
+
+
+def quantize_per_channel(weight, bits=gm.INT8_WEIGHT_BITS):
+    """(integer weights, real scale per output channel) using the full code range of every channel"""
+    flat = np.asarray(weight, dtype=np.float64).reshape(len(weight), -1)
+    qmax = (1 << (bits - 1)) - 1
+    peak = np.abs(flat).max(axis=1)
+    scale = np.where(peak > 0, peak, qmax) / qmax
+    q = np.clip(np.round(flat / scale[:, None]), -qmax - 1, qmax).astype(np.int64)
+    return q.reshape(np.shape(weight)), np.where(peak > 0, scale, 0.0)
+
+
+def multiplier_shift(scale, bits=gm.MULTIPLIER_BITS):
+    """Integer (multiplier, shift) per channel with multiplier * 2**-shift ~= scale
+
+    The multiplier is normalized to the top bit below the sign, which keeps
+    bits - 1 significant bits of every scale. Zero scales give (0, 1).
+    """
+    scale = np.asarray(scale, dtype=np.float64)
+    exponent = np.floor(np.log2(np.where(scale > 0, scale, 1.0))).astype(np.int64)
+    shift = np.clip(bits - 2 - exponent, 1, (1 << (gm.SHIFT_BITS - 1)) - 1)
+    multiplier = np.round(scale * 2.0 ** shift).astype(np.int64)
+    # Rounding up to 2**(bits-1) would overflow the signed multiplier
+    top = multiplier >= 1 << (bits - 1)
+    multiplier = np.where(top, multiplier >> 1, multiplier)
+    shift = np.where(top, shift - 1, shift)
+    return np.where(scale > 0, multiplier, 0), np.where(scale > 0, shift, 1)
+
+
+def int8_parameters(tensors, in_channels=1, num_classes=gm.NUM_CLASSES, fold_bn=True):
+    """Integer parameters of the int8 layout from real-valued tensors (by state_dict key)"""
+    params = {}
+    weights = {key: layer for layer, key, _ in gm.weight_layers(in_channels, num_classes, fold_bn)}
+    for key, _, shape in gm.parameter_layout(in_channels, num_classes, fold_bn):
+        if key in weights:
+            q, scale = quantize_per_channel(np.reshape(tensors[key], shape))
+            params[key] = q
+            params[f'{weights[key]}.weight_scale'], params[f'{weights[key]}.weight_shift'] = multiplier_shift(scale)
+        else:
+            params[key] = gm.to_fixed(np.reshape(tensors[key], shape))
+    return params
+
+
+def export_int8(tensors, output_dir, fold_bn=True, source='', in_channels=1, num_classes=gm.NUM_CLASSES):
+    """Write the int8 layout as .mem files plus int8_manifest.json; return the integer parameters"""
+    os.makedirs(output_dir, exist_ok=True)
+    gm.clear_manifests(output_dir)
+    params = int8_parameters(tensors, in_channels, num_classes, fold_bn)
+    widths = {}
+    for layer, key, _ in gm.weight_layers(in_channels, num_classes, fold_bn):
+        widths.update({key: gm.INT8_WEIGHT_BITS, f'{layer}.weight_scale': gm.MULTIPLIER_BITS,
+                       f'{layer}.weight_shift': gm.SHIFT_BITS})
+    files = {}
+    for key, filename, _ in gm.parameter_layout(in_channels, num_classes, fold_bn, int8=True):
+        write_mem(os.path.join(output_dir, filename), params[key], width=widths.get(key, gm.DATA_WIDTH))
+        files[key] = filename
+    manifest = {
+        'mode': 'int8_per_channel',
+        'source': source,
+        'fold_bn': fold_bn,
+        'weight_bits': gm.INT8_WEIGHT_BITS,
+        'multiplier_bits': gm.MULTIPLIER_BITS,
+        'shift_bits': gm.SHIFT_BITS,
+        'frac_bits': gm.FRAC_BITS,
+        'files': files,
+    }
+    with open(os.path.join(output_dir, gm.INT8_MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return params
+
+
+def memory_report(in_channels=1, num_classes=gm.NUM_CLASSES, fold_bn=True):
+    """Per conv/linear layer: weight count and weight ROM bits at Q8.8 and at int8 (scales included)"""
+    rows = []
+    for layer, _, shape in gm.weight_layers(in_channels, num_classes, fold_bn):
+        weights = int(np.prod(shape))
+        q88 = weights * gm.DATA_WIDTH
+        int8 = weights * gm.INT8_WEIGHT_BITS + shape[0] * (gm.MULTIPLIER_BITS + gm.SHIFT_BITS)
+        rows.append({'layer': layer, 'weights': weights, 'channels': shape[0],
+                     'q88_bits': q88, 'int8_bits': int8, 'saved_bits': q88 - int8})
+    return rows
+
+
+def print_memory_report(rows):
+    print(f"\n{'Layer':<24} {'Weights':>9} {'Q8.8 KiB':>9} {'INT8 KiB':>9} {'Saved':>7}")
+    for row in rows:
+        print(f"{row['layer']:<24} {row['weights']:>9} {row['q88_bits'] / 8192:>9.1f} "
+              f"{row['int8_bits'] / 8192:>9.1f} {row['saved_bits'] / row['q88_bits']:>7.1%}")
+    q88 = sum(row['q88_bits'] for row in rows)
+    int8 = sum(row['int8_bits'] for row in rows)
+    print(f"{'Total':<24} {sum(row['weights'] for row in rows):>9} {q88 / 8192:>9.1f} "
+          f"{int8 / 8192:>9.1f} {(q88 - int8) / q88:>7.1%}")
+
+
+# ---------------------------------------------------------------------------
+# ONNX import
+# ---------------------------------------------------------------------------
+
+def load_onnx(filename=ONNX_MODEL):
+    """(initializers {name: array}, nodes [{'op', 'name', 'inputs', 'outputs', 'attrs'}]) of an ONNX graph
+
+    Constant nodes are returned as initializers. Needs the onnx package.
+    """
+    import onnx
+    from onnx import numpy_helper
+    graph = onnx.load(filename).graph
+    initializers = {t.name: numpy_helper.to_array(t) for t in graph.initializer}
+    nodes = []
+    for node in graph.node:
+        attrs = {a.name: onnx.helper.get_attribute_value(a) for a in node.attribute}
+        if node.op_type == 'Constant' and 'value' in attrs:
+            initializers[node.output[0]] = numpy_helper.to_array(attrs['value'])
+            continue
+        nodes.append({'op': node.op_type, 'name': node.name, 'inputs': list(node.input),
+                      'outputs': list(node.output), 'attrs': attrs})
+    return initializers, nodes
+
+
+def onnx_layer_name(node_name):
+    """PyTorch module path of an exported node: '/bneck/bneck.0/se/se/se.1/Conv' -> 'bneck.0.se.se.1'"""
+    path = []
+    for scope in node_name.strip('/').split('/')[:-1]:
+        if path and scope.startswith(path[-1] + '.'):
+            path.append(scope[len(path[-1]) + 1:])
+        else:
+            path.append(scope)
+    return '.'.join(path)
+
+
+def onnx_tensors(initializers, nodes):
+    """Real-valued conv/linear weights and biases of a (QDQ) ONNX graph by BN-folded state_dict key
+
+    Weights behind DequantizeLinear nodes are dequantized. PyTorch's export
+    already folds the conv BatchNorms; a remaining BatchNormalization (bn3) is
+    folded into the layer that feeds it.
+    """
+    producers = {out: node for node in nodes for out in node['outputs']}
+
+    def value(name):
+        if name in initializers:
+            return np.asarray(initializers[name], dtype=np.float64)
+        node = producers.get(name)
+        if node is None or node['op'] != 'DequantizeLinear':
+            raise ValueError(f"{name}: not an initializer or a DequantizeLinear output")
+        q, scale = value(node['inputs'][0]), value(node['inputs'][1])
+        zero = value(node['inputs'][2]) if len(node['inputs']) > 2 and node['inputs'][2] else 0.0
+        if scale.size > 1:
+            shape = [1] * q.ndim
+            shape[node['attrs'].get('axis', 1)] = -1
+            scale, zero = scale.reshape(shape), np.reshape(zero, shape) if np.size(zero) > 1 else zero
+        return (q - zero) * scale
+
+    def source_layer(name):
+        node = producers[name]
+        while node['op'] in ('QuantizeLinear', 'DequantizeLinear'):
+            node = producers[node['inputs'][0]]
+        return onnx_layer_name(node['name'])
+
+    tensors = {}
+    for node in nodes:
+        if node['op'] in ('Conv', 'Gemm'):
+            layer = onnx_layer_name(node['name'])
+            weight = value(node['inputs'][1])
+            if node['op'] == 'Gemm' and not node['attrs'].get('transB', 0):
+                weight = weight.T
+            tensors[f'{layer}.weight'] = weight
+            has_bias = len(node['inputs']) > 2 and node['inputs'][2]
+            tensors[f'{layer}.bias'] = value(node['inputs'][2]) if has_bias else np.zeros(len(weight))
+        elif node['op'] == 'BatchNormalization':
+            layer = source_layer(node['inputs'][0])
+            gamma, beta, mean, var = (value(name) for name in node['inputs'][1:5])
+            scale = gamma / np.sqrt(var + node['attrs'].get('epsilon', BN_EPSILON))
+            weight = tensors[f'{layer}.weight']
+            tensors[f'{layer}.weight'] = weight * scale.reshape((-1,) + (1,) * (weight.ndim - 1))
+            tensors[f'{layer}.bias'] = (tensors[f'{layer}.bias'] - mean) * scale + beta
+    return tensors
+
+
+def check_layout(tensors, in_channels=1, num_classes=gm.NUM_CLASSES):
+    """Raise ValueError unless tensors cover the BN-folded parameter layout with the right shapes"""
+    problems = [f"{key}: missing or not {int(np.prod(shape))} values"
+                for key, _, shape in gm.parameter_layout(in_channels, num_classes, fold_bn=True)
+                if key not in tensors or np.size(tensors[key]) != int(np.prod(shape))]
+    if problems:
+        raise ValueError("ONNX graph does not match MobileNetV3_Small:\n  " + "\n  ".join(problems))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export int8 per-channel weights from the ONNX model, "
+                                                 "or report the weight memory saving of the int8 layout")
+    parser.add_argument('--onnx', type=str, default=ONNX_MODEL, help='QDQ ONNX model to import')
+    parser.add_argument('--output-dir', type=str, default=gm.MEMORY_DIR, help='Directory for the .mem files')
+    parser.add_argument('--report-only', action='store_true', help='Only print the per-layer memory report')
+    args = parser.parse_args()
+
+    print_memory_report(memory_report())
+    if args.report_only:
+        return
+    try:
+        initializers, nodes = load_onnx(args.onnx)
+    except ImportError:
+        print("❌ Reading ONNX models needs the onnx package (pip install onnx), or export from the "
+              "checkpoint with export_mobilenetv3_weights_for_hw.py --int8")
+        sys.exit(1)
+    tensors = onnx_tensors(initializers, nodes)
+    check_layout(tensors)
+    export_int8(tensors, args.output_dir, fold_bn=True, source=args.onnx)
+    print(f"💾 int8 weights of {args.onnx} written to {args.output_dir}/ ({gm.INT8_MANIFEST})")
+
+
+if __name__ == "__main__":
+    main()
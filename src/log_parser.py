@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Streaming simulation log parser
+Reads ModelSim transcripts, testbench logs and output files one line at a
+time and recognises every record type the testbenches print (test headers,
+score lines, CORRECT/INCORRECT verdicts, confidence, cycle counts, timeouts
+and progress/heartbeat lines) with a single compiled regex per line. Memory stays bounded no
+matter how many DATA FLOW DEBUG lines the transcript holds, and follow() keeps
+yielding records from a transcript the simulator is still writing.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+
+# One alternative per record type, anchored after ModelSim's optional "# " prefix
+LINE_RE = re.compile(r"""
+    ^\#?\s*(?:
+        ===\s*(?:Test|TESTING\ DISEASE)\s+(?P<test>\d+):\s*(?P<name>.*?)\s*===
+      | (?:[✅❌]\s*)?Test\s+(?P<cycles_test>\d+)\s+(?:completed(?:\ successfully)?\s+in\s+(?P<cycles>\d+)
+                                                   |TIMEOUT\s+after\s+(?P<timeout>\d+))\s+cycles
+      | HEARTBEAT\s+cycle=(?P<hb_cycle>\d+)\s+test=(?P<hb_test>\d+)\s+first=(?P<hb_first>\d+)
+        \s+bneck=(?P<hb_bneck>\d+)(?:\s+state=(?P<hb_state>\d+))?
+      | Cycle\s+(?P<progress>\d+):\s*First\ outputs=(?P<first>\d+),\s*BNeck\ outputs=(?P<bneck>\d+)
+      | Class\s+(?P<class>\d+)\s+\([^)]*\):\s*(?P<class_score>-?\d+)
+      | Disease\s+(?P<disease>\d+):\s*(?:0x)?(?P<disease_hex>[0-9a-fA-F]+)\b
+      | (?:RESULT:\s*)?(?:[✅❌]\s*)?(?P<verdict>CORRECT|INCORRECT)
+        (?::\s*Expected\s+(?P<expected>[^(]+?)\s*\(Class\s+(?P<expected_class>\d+)\),
+           \s*Predicted\s+(?P<predicted>[^(]+?)\s*\(Class\s+(?P<predicted_class>\d+)\)
+         |\s+PREDICTION|\s*$)
+      | Confidence:\s*(?P<confidence>-?\d+(?:\.\d+)?)(?P<percent>%)?
+      | (?P<condition>[A-Za-z][A-Za-z\ ]*)\|\s*(?P<probability>\d+\.\d+)\s*\|\s*(?P<raw>-?\d+)
+      | (?P<word>[0-9a-fA-F]{4})\s*$
+    )""", re.VERBOSE)
+
+
+def _signed16(value):
+    return value - 0x10000 if value & 0x8000 else value
+
+
+def parse_line(line, lineno=None):
+    """Structured record for one log line, or None if the line carries nothing of interest"""
+    m = LINE_RE.match(line)
+    if not m:
+        return None
+    g = m.groupdict()
+    if g['test'] is not None:
+        rec = {'type': 'test', 'test': int(g['test']), 'name': g['name']}
+    elif g['cycles'] is not None:
+        rec = {'type': 'cycles', 'test': int(g['cycles_test']), 'cycles': int(g['cycles'])}
+    elif g['timeout'] is not None:
+        rec = {'type': 'timeout', 'test': int(g['cycles_test']), 'cycles': int(g['timeout'])}
+    elif g['hb_cycle'] is not None:
+        rec = {'type': 'progress', 'cycle': int(g['hb_cycle']), 'test': int(g['hb_test']),
+               'first': int(g['hb_first']), 'bneck': int(g['hb_bneck']),
+               'state': None if g['hb_state'] is None else int(g['hb_state']), 'heartbeat': True}
+    elif g['progress'] is not None:
+        rec = {'type': 'progress', 'cycle': int(g['progress']), 'test': None, 'first': int(g['first']),
+               'bneck': int(g['bneck']), 'state': None, 'heartbeat': False}
+    elif g['class'] is not None:
+        rec = {'type': 'score', 'class': int(g['class']), 'value': int(g['class_score'])}
+    elif g['disease'] is not None:
+        rec = {'type': 'score', 'class': int(g['disease']), 'value': _signed16(int(g['disease_hex'], 16) & 0xFFFF)}
+    elif g['verdict'] is not None:
+        rec = {'type': 'verdict', 'correct': g['verdict'] == 'CORRECT'}
+        if g['expected_class'] is not None:
+            rec.update(expected=g['expected'].strip(), expected_class=int(g['expected_class']),
+                       predicted=g['predicted'].strip(), predicted_class=int(g['predicted_class']))
+    elif g['confidence'] is not None:
+        rec = {'type': 'confidence', 'value': float(g['confidence']), 'percent': g['percent'] is not None}
+    elif g['condition'] is not None:
+        rec = {'type': 'score', 'class': None, 'condition': g['condition'].strip(), 'value': int(g['raw']),
+               'probability': float(g['probability'])}
+    else:
+        rec = {'type': 'score', 'class': None, 'value': _signed16(int(g['word'], 16))}
+    if lineno is not None:
+        rec['line'] = lineno
+    return rec
+
+
+def iter_records(lines):
+    """Records of an iterable of lines (a file object, a list, a pipe), in order"""
+    for lineno, line in enumerate(lines, 1):
+        rec = parse_line(line, lineno)
+        if rec is not None:
+            yield rec
+
+
+def parse_log(filename):
+    """Stream the records of a log file without reading it into memory"""
+    with open(filename, 'r', encoding='utf-8', errors='replace') as f:
+        yield from iter_records(f)
+
+
+def follow(filename, poll=0.2, idle_timeout=None, done=None):
+    """Yield records from a transcript that is still growing
+
+    Partial last lines are held back until their newline arrives. Stops once
+    done() returns True and the file is drained, or after idle_timeout
+    seconds without new data.
+    """
+    while not os.path.exists(filename):
+        if done is not None and done():
+            return
+        time.sleep(poll)
+    pending, lineno, idle = '', 0, 0.0
+    with open(filename, 'r', encoding='utf-8', errors='replace') as f:
+        while True:
+            chunk = f.readline()
+            if chunk:
+                idle = 0.0
+                pending += chunk
+                if pending.endswith('\n'):
+                    lineno += 1
+                    rec = parse_line(pending, lineno)
+                    pending = ''
+                    if rec is not None:
+                        yield rec
+                continue
+            if (done is not None and done()) or (idle_timeout is not None and idle >= idle_timeout):
+                if pending:
+                    rec = parse_line(pending, lineno + 1)
+                    if rec is not None:
+                        yield rec
+                return
+            time.sleep(poll)
+            idle += poll
+
+
+def _new_test(test=None, name=None):
+    return {'test': test, 'name': name, 'scores': [], 'correct': None, 'expected_class': None,
+            'predicted_class': None, 'confidence': None, 'cycles': None, 'timeout': False}
+
+
+def group_tests(records):
+    """Fold a record stream into one summary dict per test, yielded as each test ends
+
+    Records seen before the first test header belong to an unnamed test.
+    """
+    current = None
+    for rec in records:
+        kind = rec['type']
+        if kind == 'test':
+            if current is not None:
+                yield current
+            current = _new_test(rec['test'], rec['name'])
+            continue
+        if current is None:
+            current = _new_test()
+        if kind == 'score':
+            current['scores'].append(rec['value'])
+        elif kind == 'verdict':
+            current['correct'] = rec['correct']
+            current['expected_class'] = rec.get('expected_class')
+            current['predicted_class'] = rec.get('predicted_class')
+        elif kind == 'confidence':
+            current['confidence'] = rec['value']
+        elif kind == 'cycles':
+            current['cycles'] = rec['cycles']
+        elif kind == 'timeout':
+            current['cycles'], current['timeout'] = rec['cycles'], True
+    if current is not None:
+        yield current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream structured records out of a simulation log")
+    parser.add_argument('log', help='Transcript, testbench log or outputs file')
+    parser.add_argument('--tests', action='store_true', help='Print one summary per test instead of raw records')
+    parser.add_argument('--follow', '-f', action='store_true', help='Keep reading while the simulator writes')
+    parser.add_argument('--idle-timeout', type=float, default=None, help='With --follow, stop after this idle time')
+    args = parser.parse_args()
+
+    records = follow(args.log, idle_timeout=args.idle_timeout) if args.follow else parse_log(args.log)
+    try:
+        for item in (group_tests(records) if args.tests else records):
+            print(json.dumps(item, ensure_ascii=False), flush=True)
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Low-rank factorization of the large linear layers (linear3: 576 -> 1280)
+Splits a linear weight W (out, in) by truncated SVD into two thin factors,
+W ~= factor_out (out, r) @ factor_in (r, in). The singular values are shared
+evenly between the factors so both stay in a similar range. The hardware then
+runs two passes of linear.sv: a bias-free projection to r Q8.8 values, and the
+full-width layer with the original bias. MACs and weight words drop from
+out*in to r*(out+in). Factor entries are small, so each factor is stored in
+16 bits with as many fractional bits as its peak allows; at Q8.8 the rounding
+would cost more than the truncation.
+
+The tool sweeps candidate ranks through the golden model. The backbone runs
+once; only the head is re-evaluated, from the pooled features. Each rank is
+scored by top-1 agreement and score deviation against the unfactored layer,
+held at the same 16-bit precision.
+The smallest rank inside the budget (or --rank) is exported to the weight
+directory as <layer>_factor_in.mem and <layer>_factor_out.mem plus
+lowrank_manifest.json, which records the source checkpoint (path and hash)
+and whether the factors come from the BN-folded layer. golden_model.py then
+reads the factors in place of <layer>_weights.mem, next to the directory's
+own bias file, and refuses factors made for the other layout.
+"""
+
+import os
+import sys
+import json
+import argparse
+import numpy as np
+import golden_model as gm
+from mem_io import write_mem
+from sim_cache import file_hash
+from qformat_sweep import (load_tensors, score_error, within_budget, integer_bits, MAX_WEIGHT_FRAC,
+                           MIN_AGREEMENT, MAX_DEVIATION)
+
+LAYER = 'linear3'
+RANKS = (16, 32, 48, 64, 96, 128, 160, 192, 256)
+
+
+def factor_format(values, bits=gm.DATA_WIDTH):
+    """(bits, frac) holding max|values| with the most fractional bits the 32-bit accumulator allows"""
+    peak = float(np.max(np.abs(values))) if np.size(values) else 0.0
+    return bits, int(np.clip(bits - 1 - integer_bits(peak), 0, MAX_WEIGHT_FRAC))
+
+
+class Factorization:
+    """Truncated SVD of one weight matrix, giving fixed-point factors for any rank"""
+
+    def __init__(self, weight):
+        self.weight = np.asarray(weight, dtype=np.float64)
+        self.u, self.s, self.vt = np.linalg.svd(self.weight, full_matrices=False)
+        self.energy = np.cumsum(self.s ** 2) / np.sum(self.s ** 2)
+
+    def factors(self, rank):
+        """Real-valued (factor_in (r, in), factor_out (out, r)) with sqrt(s) on each side"""
+        root = np.sqrt(self.s[:rank])
+        return root[:, None] * self.vt[:rank], self.u[:, :rank] * root[None, :]
+
+    def fixed_factors(self, rank):
+        """{'factor_in': (words, (bits, frac)), 'factor_out': (words, (bits, frac))} at rank"""
+        fixed = {}
+        for name, values in zip(('factor_in', 'factor_out'), self.factors(rank)):
+            fmt = factor_format(values)
+            fixed[name] = (gm.to_fixed(values, *fmt), fmt)
+        return fixed
+
+
+def factored_model(params, layer, fixed, num_classes=gm.NUM_CLASSES):
+    """Golden model with the layer's dense weight swapped for fixed_factors() output"""
+    params = {k: v for k, v in params.items() if k != f'{layer}.weight'}
+    qformats = {layer: {}}
+    for name, (words, fmt) in fixed.items():
+        params[f'{layer}.{name}'] = words
+        qformats[layer][name] = fmt
+    return gm.GoldenMobileNetV3(params, num_classes, qformats)
+
+
+def cost(shape, rank=None):
+    """Weight words (= MACs per image) of a linear layer, dense or factored at rank"""
+    out_features, in_features = shape
+    return out_features * in_features if rank is None else rank * (out_features + in_features)
+
+
+def pooled_features(model, images, batch_size=16):
+    """(N, in) Q8.8 inputs of linear3: the pooled hs2 output of every image"""
+    features = []
+
+    def keep(name, tensor):
+        if name == 'hs2':
+            features.append(gm.global_avg_pool(tensor).reshape(len(tensor), -1))
+
+    for start in range(0, len(images), batch_size):
+        model.forward(images[start:start + batch_size], hook=keep)
+    return np.concatenate(features)
+
+
+def rank_sweep(params, features, ranks=RANKS, layer=LAYER, factorization=None, num_classes=gm.NUM_CLASSES,
+               progress=None):
+    """One row per rank: kept SVD energy, cost and score error of the factored head against the dense one
+
+    params are the Q8.8 parameters of the dense model and features the pooled
+    head inputs. The factorization defaults to the SVD of the Q8.8 weights.
+    The reference stores the dense weight in factor_format(), so only the
+    factorization error is measured.
+    """
+    weight = params[f'{layer}.weight']
+    factorization = factorization or Factorization(weight / float(1 << gm.FRAC_BITS))
+    fmt = factor_format(factorization.weight)
+    dense_params = dict(params, **{f'{layer}.weight': gm.to_fixed(factorization.weight, *fmt)})
+    reference = gm.GoldenMobileNetV3(dense_params, num_classes, {layer: {'weight': fmt}}).head(features)
+    dense = cost(weight.shape)
+    rows = []
+    for rank in sorted(r for r in ranks if r <= min(weight.shape)):
+        model = factored_model(params, layer, factorization.fixed_factors(rank), num_classes)
+        error = score_error(model.head(features), reference)
+        row = dict(error, rank=rank, energy=float(factorization.energy[rank - 1]),
+                   words=cost(weight.shape, rank), reduction=dense / cost(weight.shape, rank))
+        rows.append(row)
+        if progress:
+            progress(row)
+    return rows
+
+
+def choose_rank(rows, min_agreement=MIN_AGREEMENT, max_deviation=MAX_DEVIATION):
+    """Smallest swept rank whose error stays inside the budget, or None"""
+    passing = [row['rank'] for row in rows if within_budget(row, min_agreement, max_deviation)]
+    return min(passing) if passing else None
+
+
+def export_lowrank(output_dir, layer, fixed, row=None, source='', fold_bn=False):
+    """Write the two factor files of fixed_factors() output and lowrank_manifest.json
+
+    fold_bn tells whether the factors come from the BN-folded weight; a
+    directory already holding the layer's bias in the other layout raises
+    ValueError. The manifest keeps entries of other factored layers already
+    in the directory.
+    """
+    bias_file = next(filename for key, filename, _ in gm.parameter_layout(fold_bn=fold_bn) if key == f'{layer}.bias')
+    if os.path.exists(os.path.join(output_dir, bias_file)) and gm.directory_fold_bn(output_dir) != fold_bn:
+        raise ValueError(f"{output_dir} holds the {'unfolded' if fold_bn else 'BN-folded'} export, but the "
+                         f"{layer} factors were made {'with' if fold_bn else 'without'} --fold-bn")
+    os.makedirs(output_dir, exist_ok=True)
+    rank, in_features = fixed['factor_in'][0].shape
+    out_features = fixed['factor_out'][0].shape[0]
+    files = {name: f'{layer}_{name}.mem' for name in fixed}
+    for name, (words, (bits, _)) in fixed.items():
+        write_mem(os.path.join(output_dir, files[name]), words, width=bits)
+
+    path = os.path.join(output_dir, gm.LOWRANK_MANIFEST)
+    manifest = {'data_width': gm.DATA_WIDTH, 'frac_bits': gm.FRAC_BITS, 'layers': {}}
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    entry = {
+        'rank': int(rank),
+        'in_features': int(in_features),
+        'out_features': int(out_features),
+        'files': files,
+        'formats': {name: list(fmt) for name, (_, fmt) in fixed.items()},
+        'dense_words': cost((out_features, in_features)),
+        'factored_words': cost((out_features, in_features), rank),
+        'source': source,
+        'source_sha256': file_hash(source) if source and os.path.isfile(source) else None,
+        'fold_bn': bool(fold_bn),
+    }
+    if row is not None:
+        entry.update(agreement=row['agreement'], deviation=row['deviation'], energy=row['energy'])
+    manifest['layers'][layer] = entry
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def print_row(row):
+    print(f"  rank {row['rank']:>4}  energy {row['energy']:6.1%}  {row['words']:>8} words "
+          f"({row['reduction']:.1f}x)  agreement {row['agreement']:7.2%}  "
+          f"deviation {row['deviation']:7.2f} LSB (max {row['max_deviation']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SVD-factorize linear3 into two thin matrices, sweep the rank "
+                                                 "through the golden model and export the chosen factors")
+    parser.add_argument('images', nargs='*', help='Evaluation image .mem files (224x224 pixel words)')
+    parser.add_argument('--checkpoint', type=str, default='models/mobilenet_fixed_point_16_8.pth',
+                        help='PyTorch state dict, or a .npz of real-valued tensors by state_dict key')
+    parser.add_argument('--fold-bn', action='store_true', help='Factorize the BN-folded weights')
+    parser.add_argument('--layer', type=str, default=LAYER, help='Linear layer to factorize')
+    parser.add_argument('--ranks', type=int, nargs='+', default=list(RANKS), help='Ranks to evaluate')
+    parser.add_argument('--rank', type=int, default=None, help='Export this rank instead of the smallest passing one')
+    parser.add_argument('--random-images', type=int, default=0, help='Add this many random images (smoke runs)')
+    parser.add_argument('--min-agreement', type=float, default=MIN_AGREEMENT, help='Top-1 agreement budget')
+    parser.add_argument('--max-deviation', type=float, default=MAX_DEVIATION, help='Mean score deviation budget (LSB)')
+    parser.add_argument('--output-dir', type=str, default=None,
+                        help='Weight directory to export the factors into (e.g. memory_files)')
+    args = parser.parse_args()
+
+    images = [gm.load_image_mem(path) for path in args.images]
+    if args.random_images:
+        images += list(np.random.default_rng(0).integers(0, 256, size=(args.random_images, gm.IMG_SIZE, gm.IMG_SIZE)))
+    if not images:
+        print("❌ No evaluation images (pass .mem files or --random-images)")
+        sys.exit(1)
+
+    tensors = load_tensors(args.checkpoint, args.fold_bn)
+    params = {key: gm.to_fixed(np.reshape(tensors[key], shape))
+              for key, _, shape in gm.parameter_layout(fold_bn=args.fold_bn)}
+    factorization = Factorization(tensors[f'{args.layer}.weight'])
+    print(f"🔬 {args.layer} {params[f'{args.layer}.weight'].shape}: backbone on {len(images)} image(s)")
+    features = pooled_features(gm.GoldenMobileNetV3(params), np.stack(images))
+    rows = rank_sweep(params, features, args.ranks, args.layer, factorization, progress=print_row)
+
+    rank = args.rank or choose_rank(rows, args.min_agreement, args.max_deviation)
+    if rank is None:
+        print(f"⚠️ No swept rank meets agreement >= {args.min_agreement:.2%} and deviation <= "
+              f"{args.max_deviation} LSB; pass --rank to export one anyway")
+        sys.exit(1)
+    row = next((r for r in rows if r['rank'] == rank), None)
+    shape = params[f'{args.layer}.weight'].shape
+    print(f"🎯 Rank {rank}: {cost(shape) / cost(shape, rank):.1f}x fewer {args.layer} MACs and weight words")
+    if args.output_dir:
+        try:
+            export_lowrank(args.output_dir, args.layer, factorization.fixed_factors(rank), row,
+                           source=args.checkpoint, fold_bn=args.fold_bn)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"💾 Factors and {gm.LOWRANK_MANIFEST} written to {args.output_dir}/")
+
+
+if __name__ == "__main__":
+    main()
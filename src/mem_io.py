@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Vectorised reader/writer for Verilog .mem files
+Encodes and decodes $readmemh / $readmemb images in bulk with NumPy instead of
+one Python call per line: any word width, signed or unsigned values, `//` and
+`/* */` comments, several words per line and `@addr` load-address directives.
+Shared by the weight exporter, the image converters, the golden model and the
+result analyzers. load_mem() adds a memory-mapped .npy cache so repeated runs
+skip the text parsing.
+"""
+
+import os
+import re
+import json
+import hashlib
+import numpy as np
+
+_DIGITS = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+_COMMENTS = re.compile(rb'//[^\n]*|/\*.*?\*/', re.S)
+_BITS_PER_DIGIT = {16: 4, 2: 1}
+
+# Character code -> digit value (255 marks x/z/invalid characters)
+_VALUE = np.full(256, 255, dtype=np.uint8)
+for _i, _c in enumerate(b'0123456789abcdef'):
+    _VALUE[_c] = _i
+    _VALUE[bytes([_c]).upper()[0]] = _i
+_VALUE[ord('_')] = 254
+
+
+def _to_unsigned(values, width):
+    return np.asarray(values).astype(np.int64) & ((1 << width) - 1)
+
+
+def to_signed(values, width=16):
+    """Reinterpret unsigned width-bit words as two's complement integers"""
+    values = _to_unsigned(values, width)
+    return np.where(values >= 1 << (width - 1), values - (1 << width), values)
+
+
+def encode_mem(values, width=16, radix=16):
+    """Encode integers as .mem text bytes, one zero-padded word per line"""
+    bits = _BITS_PER_DIGIT[radix]
+    n_digits = -(-width // bits)
+    words = _to_unsigned(values, width).reshape(-1)
+    shifts = bits * np.arange(n_digits - 1, -1, -1, dtype=np.int64)
+    digits = (words[:, None] >> shifts) & (radix - 1)
+    text = np.empty((words.size, n_digits + 1), dtype=np.uint8)
+    text[:, :n_digits] = _DIGITS[digits]
+    text[:, n_digits] = ord('\n')
+    return text.tobytes()
+
+
+def write_mem(filename, values, width=16, radix=16, address=None, chunk_bits=None):
+    """Write values as a $readmemh (radix 16) or $readmemb (radix 2) file
+
+    address, when given, is emitted as a leading @addr directive. chunk_bits
+    splits every word over several lines, most significant chunk first, which
+    is the layout of the reference activation dumps.
+    """
+    if chunk_bits:
+        shifts = chunk_bits * np.arange(width // chunk_bits - 1, -1, -1, dtype=np.int64)
+        values = (_to_unsigned(values, width).reshape(-1, 1) >> shifts) & ((1 << chunk_bits) - 1)
+        width = chunk_bits
+    with open(filename, 'wb') as f:
+        if address is not None:
+            f.write(f"@{address:x}\n".encode())
+        f.write(encode_mem(values, width, radix))
+
+
+def _fixed_width_lines(data):
+    """View a file of equal-length lines as an (N, digits) byte matrix, or None"""
+    width = data.find(b'\n') + 1
+    if width < 2 or len(data) % width:
+        return None
+    raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, width)
+    if not np.all(raw[:, -1] == ord('\n')):
+        return None
+    raw = raw[:, :-1]
+    if raw.shape[1] > 1 and np.all(raw[:, -1] == ord('\r')):
+        raw = raw[:, :-1]
+    return raw
+
+
+def _parse_tokens(tokens, radix, raw=None):
+    """Convert a list of digit strings (bytes), or a byte matrix, into integers in one pass"""
+    if raw is None:
+        if not tokens:
+            return np.zeros(0, dtype=np.int64)
+        chars = np.array(tokens, dtype=bytes)
+        raw = np.frombuffer(chars.tobytes(), dtype=np.uint8).reshape(len(tokens), chars.dtype.itemsize)
+    bits = _BITS_PER_DIGIT[radix]
+    codes = _VALUE[raw]
+    # NumPy pads shorter tokens with NUL bytes on the right; drop them and '_' separators
+    present = (raw != 0) & (codes != 254)
+    if np.any(present & (codes >= radix)):
+        bad = raw[int(np.argmax(np.any(present & (codes >= radix), axis=1)))]
+        raise ValueError(f"invalid .mem word {bad.tobytes().strip(bytes(1)).decode(errors='replace')!r}")
+    if present.all():
+        place = np.int64(radix) ** np.arange(raw.shape[1] - 1, -1, -1, dtype=np.int64)
+        return codes.astype(np.int64) @ place
+    # Position of each digit counted from the least significant end
+    rank = np.cumsum(present[:, ::-1], axis=1)[:, ::-1] - 1
+    shift = np.where(present, rank * bits, 0).astype(np.int64)
+    return np.sum(np.where(present, codes.astype(np.int64) << shift, 0), axis=1)
+
+
+def read_mem(filename, width=16, signed=True, radix=16, depth=None, chunk_bits=None):
+    """Read a .mem file into an int64 array
+
+    @addr directives place the following words at that address (gaps are zero).
+    depth pads or truncates the result to a fixed memory size. chunk_bits reads
+    dumps that split each width-bit word over several lines of chunk_bits
+    digits, most significant chunk first.
+    """
+    with open(filename, 'rb') as f:
+        data = f.read()
+    # Fast path: exporter-style files with one fixed-width word per line
+    raw = None
+    if b'/' not in data and b'@' not in data and b' ' not in data and b'\t' not in data:
+        raw = _fixed_width_lines(data)
+    if raw is not None:
+        values = _parse_tokens(None, radix, raw)
+    elif b'@' not in data:
+        data = _COMMENTS.sub(b' ', data)
+        values = _parse_tokens(data.split(), radix)
+    else:
+        data = _COMMENTS.sub(b' ', data)
+        # Each segment starts with its load address, the first one at 0
+        segments = []
+        for i, part in enumerate(data.split(b'@')):
+            tokens = part.split()
+            if i == 0:
+                start = 0
+            elif tokens:
+                start, tokens = int(tokens[0], 16), tokens[1:]
+            else:
+                raise ValueError(f"{filename}: '@' without an address")
+            segments.append((start, _parse_tokens(tokens, radix)))
+        end = max(start + len(words) for start, words in segments)
+        values = np.zeros(end, dtype=np.int64)
+        for start, words in segments:
+            values[start:start + len(words)] = words
+
+    if chunk_bits:
+        per_word = width // chunk_bits
+        usable = values.size - values.size % per_word
+        chunks = values[:usable].reshape(-1, per_word)
+        shifts = chunk_bits * np.arange(per_word - 1, -1, -1, dtype=np.int64)
+        values = np.sum(chunks << shifts, axis=1)
+
+    if depth is not None:
+        values = np.concatenate([values[:depth], np.zeros(max(depth - values.size, 0), dtype=np.int64)])
+
+    values = _to_unsigned(values, width)
+    return to_signed(values, width) if signed else values
+
+
+# ---------------------------------------------------------------------------
+# .npy sidecar cache
+# ---------------------------------------------------------------------------
+
+CACHE_DIRNAME = '__memcache__'
+
+
+def _file_digest(filename):
+    digest = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cached_array(filename, loader, tag, cache_dir=None):
+    """Return loader(filename) through a memory-mapped .npy cache
+
+    The array is stored under cache_dir (default: a __memcache__ directory next
+    to the file) together with the source mtime, size and SHA-1. Entries are
+    named after the basename plus a hash of the absolute path, so same-named
+    files from different directories never share one. An unchanged mtime/size
+    reuses the cache directly; otherwise the hash decides whether the text has
+    to be parsed again. Set MEM_CACHE=0 to bypass the cache.
+    """
+    if os.environ.get('MEM_CACHE', '1') == '0':
+        return loader(filename)
+    cache_dir = cache_dir or os.environ.get('MEM_CACHE_DIR') or \
+        os.path.join(os.path.dirname(os.path.abspath(filename)), CACHE_DIRNAME)
+    path_key = hashlib.sha1(os.path.abspath(filename).encode()).hexdigest()[:12]
+    base = os.path.join(cache_dir, f"{os.path.basename(filename)}.{path_key}.{tag}")
+    npy_path, meta_path = base + '.npy', base + '.json'
+    stat = os.stat(filename)
+
+    meta = None
+    if os.path.exists(npy_path) and os.path.exists(meta_path):
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = None
+    if meta is not None:
+        if meta['mtime_ns'] == stat.st_mtime_ns and meta['size'] == stat.st_size:
+            return np.load(npy_path, mmap_mode='r')
+        if meta['size'] == stat.st_size and meta['sha1'] == _file_digest(filename):
+            meta['mtime_ns'] = stat.st_mtime_ns
+            _write_meta(meta_path, meta)
+            return np.load(npy_path, mmap_mode='r')
+
+    values = loader(filename)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write under a temporary name so concurrent readers never see half a file
+        tmp_path = f"{base}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, values)
+        os.replace(tmp_path, npy_path)
+        _write_meta(meta_path, {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+                                'sha1': _file_digest(filename)})
+    except OSError:
+        return values
+    return np.load(npy_path, mmap_mode='r')
+
+
+def _write_meta(meta_path, meta):
+    tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def load_mem(filename, width=16, signed=True, radix=16, chunk_bits=None, cache_dir=None):
+    """read_mem() through the .npy cache, returned as a read-only memory map
+
+    Values are stored in the narrowest NumPy integer type that holds width bits.
+    """
+    dtype = np.dtype(f"{'int' if signed else 'uint'}{max(8, 1 << (width - 1).bit_length())}")
+    tag = f"w{width}{'s' if signed else 'u'}r{radix}c{chunk_bits or 0}"
+
+    def loader(path):
+        return read_mem(path, width, signed, radix, chunk_bits=chunk_bits).astype(dtype)
+
+    return cached_array(filename, loader, tag, cache_dir)
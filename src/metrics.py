@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Vectorised classification metrics
+One place for the numbers every analyzer reports, computed with NumPy on an
+(N, 15) score array and N integer labels: confusion matrix, top-k accuracy,
+per-class precision/recall/F1, expected calibration error and bootstrap
+confidence intervals. Classes always follow MEDICAL_CONDITIONS order, and
+nothing loops over images in Python, so 100k+ evaluations take a fraction of
+a second; accuracy bootstraps draw cell counts instead of resampling rows.
+"""
+
+import sys
+import argparse
+import numpy as np
+from results_db import class_index
+from postprocess import MEDICAL_CONDITIONS, softmax
+
+CLASS_NAMES = MEDICAL_CONDITIONS
+NUM_CLASSES = len(CLASS_NAMES)
+# Upper bound on resampled indices held at once by the bootstrap
+BOOTSTRAP_CHUNK = 1 << 23
+
+
+def class_labels(names):
+    """Class indices of condition names (any spelling class_index() accepts); -1 where unknown"""
+    indices = (class_index(name) for name in names)
+    return np.array([-1 if i is None else i for i in indices], dtype=np.int64)
+
+
+def predictions(scores):
+    """Argmax class of every row of an (N, C) score array"""
+    return np.asarray(scores).argmax(axis=1)
+
+
+def confusion_matrix(labels, predicted, num_classes=NUM_CLASSES):
+    """(C, C) counts, rows = true class, columns = predicted class; negative labels are ignored"""
+    labels, predicted = np.asarray(labels, dtype=np.int64), np.asarray(predicted, dtype=np.int64)
+    keep = (labels >= 0) & (predicted >= 0)
+    flat = labels[keep] * num_classes + predicted[keep]
+    return np.bincount(flat, minlength=num_classes * num_classes).reshape(num_classes, num_classes)
+
+
+def top_k_accuracy(scores, labels, k=1):
+    """Fraction of rows whose true class is among the k highest scores"""
+    scores, labels = np.asarray(scores), np.asarray(labels)
+    if k == 1:
+        return float(np.mean(scores.argmax(axis=1) == labels)) if len(labels) else 0.0
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return float(np.mean((top == labels[:, None]).any(axis=1))) if len(labels) else 0.0
+
+
+def _ratio(num, den):
+    return np.divide(num, den, out=np.zeros(len(num), dtype=np.float64), where=den > 0)
+
+
+def per_class_metrics(cm):
+    """Precision, recall, F1 and support per class from a confusion matrix (0 where undefined)"""
+    cm = np.asarray(cm)
+    tp = np.diag(cm).astype(np.float64)
+    support = cm.sum(axis=1)
+    precision = _ratio(tp, cm.sum(axis=0))
+    recall = _ratio(tp, support)
+    f1 = _ratio(2 * precision * recall, precision + recall)
+    return {'precision': precision, 'recall': recall, 'f1': f1, 'support': support}
+
+
+def per_class_accuracy(labels, correct, num_classes=NUM_CLASSES):
+    """(accuracy, count) per true class of a boolean correct-per-row array"""
+    labels = np.asarray(labels, dtype=np.int64)
+    keep = labels >= 0
+    counts = np.bincount(labels[keep], minlength=num_classes)
+    hits = np.bincount(labels[keep], weights=np.asarray(correct, dtype=np.float64)[keep], minlength=num_classes)
+    return _ratio(hits, counts), counts
+
+
+def expected_calibration_error(confidence, correct, n_bins=15):
+    """ECE over equal-width confidence bins, plus the per-bin (confidence, accuracy, count) arrays"""
+    confidence = np.asarray(confidence, dtype=np.float64)
+    correct = np.asarray(correct, dtype=np.float64)
+    bins = np.minimum((confidence * n_bins).astype(np.int64), n_bins - 1)
+    counts = np.bincount(bins, minlength=n_bins)
+    mean_conf = _ratio(np.bincount(bins, weights=confidence, minlength=n_bins), counts)
+    accuracy = _ratio(np.bincount(bins, weights=correct, minlength=n_bins), counts)
+    ece = float(np.sum(counts * np.abs(accuracy - mean_conf)) / max(len(confidence), 1))
+    return ece, {'confidence': mean_conf, 'accuracy': accuracy, 'count': counts}
+
+
+def _resample_chunks(n, n_boot, rng):
+    """Bootstrap index matrices of at most BOOTSTRAP_CHUNK entries each"""
+    rows = max(1, BOOTSTRAP_CHUNK // max(n, 1))
+    for start in range(0, n_boot, rows):
+        yield rng.integers(0, n, size=(min(rows, n_boot - start), n))
+
+
+def bootstrap_ci(values, n_boot=1000, alpha=0.05, seed=0):
+    """(low, high) percentile interval of the mean of per-row values (e.g. correct flags)
+
+    0/1 values are resampled as one binomial draw per replica, which is the
+    same distribution as resampling the rows but independent of N.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return 0.0, 0.0
+    rng = np.random.default_rng(seed)
+    if np.isin(values, (0.0, 1.0)).all():
+        means = rng.binomial(len(values), values.mean(), size=n_boot) / len(values)
+    else:
+        means = np.concatenate([values[idx].mean(axis=1) for idx in _resample_chunks(len(values), n_boot, rng)])
+    low, high = np.quantile(means, [alpha / 2, 1 - alpha / 2])
+    return float(low), float(high)
+
+
+def bootstrap_class_ci(labels, correct, num_classes=NUM_CLASSES, n_boot=1000, alpha=0.05, seed=0):
+    """(C, 2) percentile intervals of per-class accuracy (recall); NaN for classes never seen
+
+    Per-class accuracy only depends on the counts of the 2*C (class, correct)
+    cells, so a bootstrap replica is one multinomial draw over those cells.
+    """
+    labels = np.asarray(labels, dtype=np.int64)
+    correct = np.asarray(correct, dtype=bool)
+    if not len(labels):
+        return np.full((num_classes, 2), np.nan)
+    cells = np.bincount(labels * 2 + correct, minlength=2 * num_classes)
+    draws = np.random.default_rng(seed).multinomial(len(labels), cells / len(labels), size=n_boot)
+    draws = draws.reshape(n_boot, num_classes, 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        replicas = draws[:, :, 1] / draws.sum(axis=2)
+    ci = np.full((num_classes, 2), np.nan)
+    seen = cells.reshape(num_classes, 2).sum(axis=1) > 0
+    ci[seen] = np.nanquantile(replicas[:, seen], [alpha / 2, 1 - alpha / 2], axis=0).T
+    return ci
+
+
+def evaluate(scores, labels, top_k=(1, 3, 5), n_bins=15, n_boot=1000, seed=0):
+    """Every metric for (N, 15) Q8.8 scores and true labels, as one dict of arrays and floats
+
+    Rows whose label is unknown (negative, see class_labels()) are left out
+    of every metric; n counts the rows that remain.
+    """
+    scores = np.asarray(scores)
+    labels = np.asarray(labels, dtype=np.int64)
+    known = labels >= 0
+    scores, labels = scores[known], labels[known]
+    predicted = predictions(scores)
+    correct = predicted == labels
+    probabilities = softmax(scores)
+    confidence = probabilities[np.arange(len(labels)), predicted]
+    cm = confusion_matrix(labels, predicted, scores.shape[1])
+    ece, calibration = expected_calibration_error(confidence, correct, n_bins)
+    return dict(
+        per_class_metrics(cm),
+        n=len(labels),
+        confusion=cm,
+        predicted=predicted,
+        accuracy=top_k_accuracy(scores, labels, 1),
+        accuracy_ci=bootstrap_ci(correct, n_boot, seed=seed),
+        top_k={k: top_k_accuracy(scores, labels, k) for k in top_k if k <= scores.shape[1]},
+        recall_ci=bootstrap_class_ci(labels, correct, scores.shape[1], n_boot, seed=seed),
+        ece=ece,
+        calibration=calibration,
+    )
+
+
+def format_report(m, class_names=CLASS_NAMES):
+    """Plain-text summary of an evaluate() result"""
+    low, high = m['accuracy_ci']
+    lines = [f"Images: {m['n']}",
+             f"Top-1 accuracy: {m['accuracy']:.2%} (95% CI {low:.2%} - {high:.2%})"]
+    lines += [f"Top-{k} accuracy: {acc:.2%}" for k, acc in m['top_k'].items() if k != 1]
+    lines.append(f"Expected calibration error: {m['ece']:.4f}")
+    lines.append("")
+    lines.append(f"{'Class':<20} {'Support':>7} {'Precision':>9} {'Recall':>7} {'F1':>6}  Recall 95% CI")
+    for c, name in enumerate(class_names):
+        if m['support'][c] == 0:
+            continue
+        lo, hi = m['recall_ci'][c]
+        lines.append(f"{name:<20} {m['support'][c]:>7} {m['precision'][c]:>9.2%} {m['recall'][c]:>7.2%} "
+                     f"{m['f1'][c]:>6.3f}  {lo:.2%} - {hi:.2%}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classification metrics for exported score tables")
+    parser.add_argument('scores', help='Columnar export (results_columnar.py) with an expected_class column')
+    parser.add_argument('--boot', type=int, default=1000, help='Bootstrap replicas for the confidence intervals')
+    args = parser.parse_args()
+
+    from results_columnar import load_scores
+    scores, frame = load_scores(args.scores, with_frame=True)
+    if 'expected_class' not in frame.columns:
+        print(f"❌ {args.scores} has no expected_class column")
+        sys.exit(1)
+    keep = frame['has_scores'].to_numpy() & frame['expected_class'].notna().to_numpy()
+    labels = frame['expected_class'].to_numpy()[keep].astype(np.int64)
+    print(f"📊 {format_report(evaluate(scores[keep], labels, n_boot=args.boot))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Saturation and overflow report of the fixed-point datapath
+Runs the golden model on a set of images with OverflowCounters attached and
+lists, in forward order, every layer and stage whose values wrap or saturate
+at the RTL word widths: the 32-bit conv accumulator, the 16-bit conv/linear
+outputs, BatchNorm, h-swish and residual adds. This shows which layer breaks
+at 16 bits before any simulation time is spent.
+
+The RTL side covers the classifier head. final_layer/linear.sv,
+batchnorm1d.sv and hswish.sv carry debug counters behind OVERFLOW_COUNTERS.
+models/final_layer/run_tb_overflow_head.do compiles them with that define
+into tb_overflow_head.sv, which chains them as linear3 -> bn3 -> hs3. The
+testbench is fed the pooled linear3 inputs that --dump-features writes (this
+needs the unfolded export, where bn3 is a separate layer). Its transcript
+holds lines such as
+
+    OVERFLOW layer=linear3 stage=output count=12    one line per completed pass (image)
+    OVERFLOW layer=hs3 stage=hswish total=40        running total, printed at the end
+
+--rtl-log compares those lines with the golden counts of the same images.
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import numpy as np
+import golden_model as gm
+from mem_io import write_mem
+from calibrate_activations import find_images, load_image
+from lowrank_factorize import pooled_features
+
+REPORT_FILE = 'overflow_report.json'
+HEAD_FEATURES = 'head_features.mem'
+RTL_COUNTER_RE = re.compile(r'OVERFLOW\s+layer=(\S+)\s+stage=(\S+)\s+(count|total)=(\d+)')
+
+
+def count_overflows(model, images, batch_size=16):
+    """OverflowCounters of the images ((N, H, W) words), run in batches"""
+    counters = None
+    for start in range(0, len(images), batch_size):
+        batch = gm.OverflowCounters()
+        model.forward(images[start:start + batch_size], counters=batch)
+        if counters is None:
+            counters = batch
+        else:
+            for key, counts in batch.counts.items():
+                counters.counts[key] = np.concatenate([counters.counts[key], counts])
+    return counters
+
+
+def dump_head_features(model, images, filename=HEAD_FEATURES, batch_size=16):
+    """Write the pooled linear3 inputs of the images, image after image, for tb_overflow_head.sv"""
+    features = pooled_features(model, images, batch_size)
+    write_mem(filename, features.reshape(-1))
+    return features
+
+
+def read_rtl_counters(filename):
+    """{(layer, stage): {'passes': [count per pass], 'total': last running total or None}} of a transcript"""
+    counters = {}
+    with open(filename, 'r', errors='replace') as f:
+        for line in f:
+            m = RTL_COUNTER_RE.search(line)
+            if not m:
+                continue
+            entry = counters.setdefault((m.group(1), m.group(2)), {'passes': [], 'total': None})
+            if m.group(3) == 'count':
+                entry['passes'].append(int(m.group(4)))
+            else:
+                entry['total'] = int(m.group(4))
+    return counters
+
+
+def compare_counters(counters, rtl):
+    """One row per RTL counter: golden and RTL events, per image when the RTL reports passes"""
+    per_image = counters.per_image()
+    rows = []
+    for (layer, stage), entry in rtl.items():
+        golden = per_image.get((layer, stage))
+        if golden is None:
+            rows.append({'layer': layer, 'stage': stage, 'golden': None, 'rtl': entry, 'match': False})
+            continue
+        if entry['passes']:
+            match = entry['passes'] == golden.tolist()
+            rtl_events = entry['passes']
+            golden_events = golden.tolist()
+        else:
+            match = entry['total'] == int(golden.sum())
+            rtl_events = entry['total']
+            golden_events = int(golden.sum())
+        rows.append({'layer': layer, 'stage': stage, 'golden': golden_events, 'rtl': rtl_events, 'match': match})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count wrap-around and saturation events of the fixed-point "
+                                                 "datapath per layer, channel and image")
+    parser.add_argument('images', nargs='+', help='Image files or directories (.mem or .png/.jpg)')
+    parser.add_argument('--weights', type=str, default=gm.MEMORY_DIR, help='Directory of exported weight .mem files')
+    parser.add_argument('--batch-size', type=int, default=16, help='Images per forward pass')
+    parser.add_argument('--output', type=str, default=REPORT_FILE, help='JSON report to write')
+    parser.add_argument('--rtl-log', type=str, default=None,
+                        help='Simulation transcript with OVERFLOW debug counter lines to compare against')
+    parser.add_argument('--dump-features', type=str, default=None, metavar='FILE',
+                        help=f'Also write the pooled linear3 inputs for tb_overflow_head.sv (e.g. {HEAD_FEATURES})')
+    args = parser.parse_args()
+
+    paths = []
+    for path in args.images:
+        paths += find_images(path) if os.path.isdir(path) else [path]
+    if not paths:
+        print("❌ No images given")
+        sys.exit(1)
+    if args.dump_features and gm.directory_fold_bn(args.weights):
+        print(f"❌ {args.weights} holds the BN-folded export; tb_overflow_head.sv needs bn3 as a separate layer")
+        sys.exit(1)
+    model = gm.GoldenMobileNetV3.from_mem_dir(args.weights)
+    images = np.stack([load_image(p) for p in paths])
+    counters = count_overflows(model, images, args.batch_size)
+    rows = counters.summary()
+
+    print(f"\n{'Layer':<24} {'Stage':<12} {'Events':>10} {'Images':>7} {'Channels':>9} {'Worst ch':>9}")
+    for row in rows:
+        print(f"{row['layer']:<24} {row['stage']:<12} {row['events']:>10} {row['images']:>7} "
+              f"{row['channels']:>9} {row['worst_channel']:>9}")
+    first = counters.first_overflow()
+    if first:
+        print(f"🚨 First overflow at {first[0]} ({first[1]}) over {len(paths)} image(s)")
+    else:
+        print(f"✅ No overflow at {gm.DATA_WIDTH} bits over {len(paths)} image(s)")
+
+    report = {'images': [str(p) for p in paths], 'layers': rows}
+    if args.rtl_log:
+        comparison = compare_counters(counters, read_rtl_counters(args.rtl_log))
+        report['rtl'] = comparison
+        mismatches = [row for row in comparison if not row['match']]
+        for row in mismatches:
+            print(f"❌ {row['layer']} {row['stage']}: golden {row['golden']} vs RTL {row['rtl']}")
+        print(f"{'✅' if not mismatches else '⚠️'} {len(comparison) - len(mismatches)}/{len(comparison)} "
+              f"RTL counters match the golden model")
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Report written to {args.output}")
+    if args.dump_features:
+        dump_head_features(model, images, args.dump_features, args.batch_size)
+        print(f"💾 Head inputs of {len(paths)} image(s) written to {args.dump_features}; in models/final_layer run\n"
+              f"   vsim -c -do \"set features {os.path.abspath(args.dump_features)}; set images {len(paths)}; "
+              f"do run_tb_overflow_head.do\"")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Batch postprocessing of raw class scores
+Turns an (N, 15) batch of raw Q8.8 score words, as dumped by the testbenches,
+into sigmoid or softmax probabilities, top-k classes, secondary findings above
+a threshold and an urgency level per image, all as NumPy array operations.
+The *_int functions are the integer-only version a hardware postprocessor
+would compute: table lookups on the Q8.8 score, Q1.15 probabilities, one
+integer divide per softmax row. export_luts() writes those tables as .mem
+files for $readmemh.
+"""
+
+import os
+import argparse
+import numpy as np
+from mem_io import to_signed, write_mem
+
+DATA_WIDTH = 16
+FRAC_BITS = 8
+# The float sigmoid saturates to 0/1 beyond +-5.0, like the testbench function
+SIGMOID_LIMIT = 5.0
+SECONDARY_THRESHOLD = 0.3
+TOP_K = 3
+
+# The 15 chest X-ray classes, in the order of the final layer's outputs
+MEDICAL_CONDITIONS = [
+    "No Finding", "Infiltration", "Atelectasis", "Effusion", "Nodule",
+    "Pneumothorax", "Mass", "Consolidation", "Pleural Thickening",
+    "Cardiomegaly", "Emphysema", "Fibrosis", "Edema", "Pneumonia", "Hernia"
+]
+
+# Integer postprocessor: probabilities in Q1.15, tables indexed by score >> LUT_SHIFT
+PROB_FRAC_BITS = 15
+PROB_ONE = 1 << PROB_FRAC_BITS
+LUT_SHIFT = 2
+SIGMOID_LIMIT_RAW = int(SIGMOID_LIMIT * (1 << FRAC_BITS))
+# exp(-d) for score distances d below the row maximum up to 16.0, zero beyond
+EXP_LIMIT_RAW = 16 << FRAC_BITS
+
+# Urgency of the primary diagnosis, lowest first
+URGENCY_LEVELS = ["LOW", "STANDARD", "MODERATE", "HIGH"]
+URGENCY_DESCRIPTIONS = [
+    "Normal findings, routine follow-up",
+    "Schedule appointment within 1-2 weeks",
+    "Schedule appointment within 24-48 hours",
+    "Seek emergency care immediately!",
+]
+# Class -> urgency: No Finding is LOW, Atelectasis/Mass/Pneumonia MODERATE, Pneumothorax HIGH
+URGENCY_BY_CLASS = np.array([0, 1, 2, 1, 1, 3, 2, 1, 1, 1, 1, 1, 1, 2, 1], dtype=np.int8)
+
+
+def parse_hex_scores(hex_values, data_width=DATA_WIDTH):
+    """Signed scores of hex strings ('0x1234' or '1234') plus a mask of the ones that parsed"""
+    raw = np.zeros(len(hex_values), dtype=np.int64)
+    valid = np.zeros(len(hex_values), dtype=bool)
+    for i, h in enumerate(hex_values):
+        try:
+            raw[i] = int(h, 16)
+            valid[i] = True
+        except ValueError:
+            pass
+    return to_signed(raw, data_width), valid
+
+
+def _signed_batch(scores, data_width):
+    """(N, C) int64 two's complement view of raw score words (a single row is promoted)"""
+    return np.atleast_2d(to_signed(np.asarray(scores, dtype=np.int64), data_width))
+
+
+def sigmoid(scores, data_width=DATA_WIDTH, frac_bits=FRAC_BITS):
+    """Per-class sigmoid probabilities of raw score words, saturated beyond +-SIGMOID_LIMIT"""
+    x = to_signed(np.asarray(scores, dtype=np.int64), data_width) / float(1 << frac_bits)
+    p = 1.0 / (1.0 + np.exp(-np.clip(x, -SIGMOID_LIMIT, SIGMOID_LIMIT)))
+    return np.where(x > SIGMOID_LIMIT, 1.0, np.where(x < -SIGMOID_LIMIT, 0.0, p))
+
+
+def softmax(scores, frac_bits=FRAC_BITS):
+    """Row-wise softmax of Q(frac_bits) fixed-point scores, as float64 probabilities"""
+    logits = np.asarray(scores, dtype=np.float64) / (1 << frac_bits)
+    logits -= logits.max(axis=1, keepdims=True)
+    np.exp(logits, out=logits)
+    logits /= logits.sum(axis=1, keepdims=True)
+    return logits
+
+
+def sigmoid_lut(shift=LUT_SHIFT, frac_bits=FRAC_BITS):
+    """Q1.15 sigmoid of the non-negative scores 0 .. SIGMOID_LIMIT, one entry per 2**shift LSBs"""
+    x = (np.arange((SIGMOID_LIMIT_RAW >> shift) + 1) << shift) / float(1 << frac_bits)
+    return np.round(PROB_ONE / (1.0 + np.exp(-x))).astype(np.int32)
+
+
+def exp_lut(shift=LUT_SHIFT, frac_bits=FRAC_BITS):
+    """Q1.15 exp(-d) for distances d = 0 .. EXP_LIMIT below the row maximum"""
+    d = (np.arange(EXP_LIMIT_RAW >> shift) << shift) / float(1 << frac_bits)
+    return np.round(PROB_ONE * np.exp(-d)).astype(np.int32)
+
+
+def sigmoid_int(scores, lut=None, shift=LUT_SHIFT, data_width=DATA_WIDTH):
+    """Q1.15 sigmoid from one table lookup per score; negative scores use 1 - sigmoid(-x)"""
+    lut = sigmoid_lut(shift) if lut is None else lut
+    x = to_signed(np.asarray(scores, dtype=np.int64), data_width)
+    magnitude = np.abs(x)
+    p = np.where(magnitude > SIGMOID_LIMIT_RAW, PROB_ONE, lut[np.minimum(magnitude >> shift, len(lut) - 1)])
+    return np.where(x < 0, PROB_ONE - p, p).astype(np.int32)
+
+
+def softmax_int(scores, lut=None, shift=LUT_SHIFT, data_width=DATA_WIDTH):
+    """Q1.15 softmax: exp lookups of each score's distance to the row maximum, one divide per row"""
+    lut = exp_lut(shift) if lut is None else lut
+    x = _signed_batch(scores, data_width)
+    d = (x.max(axis=1, keepdims=True) - x) >> shift
+    e = np.where(d < len(lut), lut[np.minimum(d, len(lut) - 1)], 0).astype(np.int64)
+    return ((e << PROB_FRAC_BITS) // e.sum(axis=1, keepdims=True)).astype(np.int32)
+
+
+def top_k(probabilities, k=TOP_K):
+    """(classes, probabilities) of the k most likely classes per row; ties go to the lower class"""
+    order = np.argsort(-probabilities, axis=1, kind='stable')[:, :k]
+    return order, np.take_along_axis(probabilities, order, axis=1)
+
+
+def secondary_findings(probabilities, primary, threshold=SECONDARY_THRESHOLD):
+    """(N, C) mask of classes above threshold other than each row's primary class"""
+    mask = probabilities > threshold
+    mask[np.arange(len(primary)), primary] = False
+    return mask
+
+
+def urgency(primary):
+    """Urgency level (index into URGENCY_LEVELS) of each primary class"""
+    return URGENCY_BY_CLASS[np.asarray(primary)]
+
+
+def postprocess(scores, method='sigmoid', integer=False, k=TOP_K, threshold=SECONDARY_THRESHOLD):
+    """Everything the reports need for a batch of raw score words, as one dict of arrays
+
+    Probabilities are float in [0, 1]; with integer=True they come from the
+    Q1.15 lookup tables (the raw Q1.15 values are kept under 'probabilities_q15').
+    """
+    x = _signed_batch(scores, DATA_WIDTH)
+    result = {'scores': x}
+    if integer:
+        q15 = sigmoid_int(x) if method == 'sigmoid' else softmax_int(x)
+        result['probabilities_q15'] = q15
+        probabilities = q15 / float(PROB_ONE)
+    else:
+        probabilities = sigmoid(x) if method == 'sigmoid' else softmax(x)
+    classes, top_probabilities = top_k(probabilities, k)
+    primary = classes[:, 0]
+    result.update(
+        probabilities=probabilities,
+        primary=primary,
+        confidence=top_probabilities[:, 0],
+        top_k=classes,
+        top_k_probabilities=top_probabilities,
+        secondary=secondary_findings(probabilities, primary, threshold),
+        urgency=urgency(primary),
+    )
+    return result
+
+
+def export_luts(output_dir, shift=LUT_SHIFT):
+    """Write sigmoid_lut.mem and exp_lut.mem (16-bit words) for an RTL postprocessor"""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for name, lut in (('sigmoid_lut', sigmoid_lut(shift)), ('exp_lut', exp_lut(shift))):
+        path = os.path.join(output_dir, f'{name}.mem')
+        write_mem(path, lut, width=16)
+        paths.append((path, len(lut)))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Postprocess raw Q8.8 class scores or export the integer LUTs")
+    parser.add_argument('scores', nargs='*', help='15 hex score words of one image')
+    parser.add_argument('--method', choices=['sigmoid', 'softmax'], default='sigmoid', help='Probability mapping')
+    parser.add_argument('--integer', action='store_true', help='Use the integer LUT postprocessor')
+    parser.add_argument('--export-luts', type=str, default=None, metavar='DIR', help='Write the LUT .mem files')
+    parser.add_argument('--shift', type=int, default=LUT_SHIFT, help='Score LSBs dropped to index the LUTs')
+    args = parser.parse_args()
+
+    if args.export_luts:
+        for path, depth in export_luts(args.export_luts, args.shift):
+            print(f"💾 {path}: {depth} x 16-bit")
+    if not args.scores:
+        return
+    scores, _ = parse_hex_scores(args.scores)
+    r = postprocess(scores, args.method, args.integer)
+    for c, p in zip(r['top_k'][0], r['top_k_probabilities'][0]):
+        print(f"  class {c:2d}: {p:.4f}")
+    print(f"🎯 Primary class {r['primary'][0]} ({r['confidence'][0]:.2%}), "
+          f"urgency {URGENCY_LEVELS[r['urgency'][0]]}")
+
+
+if __name__ == "__main__":
+    main()
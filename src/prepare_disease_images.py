@@ -9,6 +9,7 @@ import numpy as np
 import sys
 import os
 from pathlib import Path
+from mem_io import write_mem
 
 # Medical conditions and their typical X-ray characteristics
 DISEASE_PATTERNS = {
@@ -187,12 +188,7 @@ def convert_image_to_mem(image_path, output_path="test_image.mem", target_size=(
     
     # Write to memory file
     try:
-        with open(output_path, 'w') as f:
-            for y in range(height):
-                for x in range(width):
-                    pixel_value = img_gray[y, x]
-                    hex_value = f"{pixel_value:02x}"
-                    f.write(f"{hex_value}\n")
+        write_mem(output_path, img_gray, width=8)
         
         print(f"Successfully wrote {total_pixels} pixel values to {output_path}")
         return True
@@ -242,12 +238,7 @@ def convert_image_to_mem_from_array(img_array, output_path):
         height, width = img_array.shape
         total_pixels = height * width
         
-        with open(output_path, 'w') as f:
-            for y in range(height):
-                for x in range(width):
-                    pixel_value = img_array[y, x]
-                    hex_value = f"{pixel_value:02x}"
-                    f.write(f"{hex_value}\n")
+        write_mem(output_path, img_array, width=8)
         
         return True
     except Exception as e:
@@ -8,6 +8,7 @@ import numpy as np
 import sys
 import os
 from pathlib import Path
+from mem_io import write_mem
 
 # Medical conditions and their typical X-ray characteristics
 DISEASE_PATTERNS = {
@@ -167,12 +168,7 @@ def convert_image_to_mem_from_array(img_array, output_path):
         height, width = img_array.shape
         total_pixels = height * width
         
-        with open(output_path, 'w') as f:
-            for y in range(height):
-                for x in range(width):
-                    pixel_value = img_array[y, x]
-                    hex_value = f"{pixel_value:02x}"
-                    f.write(f"{hex_value}\n")
+        write_mem(output_path, img_array, width=8)
         
         print(f"   ✓ Created {output_path} ({total_pixels} pixels)")
         return True
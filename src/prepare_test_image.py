@@ -9,6 +9,7 @@ import numpy as np
 import sys
 import os
 from pathlib import Path
+from mem_io import read_mem, write_mem
 
 def convert_image_to_mem(image_path, output_path="test_image.mem", target_size=(224, 224)):
     """
@@ -67,24 +68,18 @@ def convert_image_to_mem(image_path, output_path="test_image.mem", target_size=(
     
     # Write to memory file
     try:
-        with open(output_path, 'w') as f:
-            for y in range(height):
-                for x in range(width):
-                    pixel_value = img_gray[y, x]
-                    hex_value = f"{pixel_value:02x}"  # 8-bit hex
-                    f.write(f"{hex_value}\n")
+        write_mem(output_path, img_gray, width=8)  # 8-bit hex
         
         print(f"Successfully wrote {total_pixels} pixel values to {output_path}")
         
         # Verify file size
-        with open(output_path, 'r') as f:
-            lines = f.readlines()
-        print(f"Actual file lines: {len(lines)}")
+        lines = read_mem(output_path, width=8, signed=False)
+        print(f"Actual file lines: {lines.size}")
         
-        if len(lines) == total_pixels:
+        if lines.size == total_pixels:
             print("✓ File size verification passed")
         else:
-            print(f"⚠ Warning: Expected {total_pixels} lines, got {len(lines)}")
+            print(f"⚠ Warning: Expected {total_pixels} lines, got {lines.size}")
         
         return True
         
@@ -106,12 +101,7 @@ def create_test_patterns():
         output_path = f"test_pattern_{name}.mem"
         print(f"\nCreating test pattern: {name}")
         
-        with open(output_path, 'w') as f:
-            for y in range(224):
-                for x in range(224):
-                    pixel_value = pattern[y, x]
-                    hex_value = f"{pixel_value:02x}"
-                    f.write(f"{hex_value}\n")
+        write_mem(output_path, pattern, width=8)
         
         print(f"Created: {output_path}")
 
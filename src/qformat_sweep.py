@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Per-layer mixed-precision Q-format explorer
+Tries candidate (bit_width, frac_bits) formats for the weights and the output
+activations of every conv/linear layer, one layer at a time, through the
+fixed-point golden model. Each candidate is scored against the all-Q8.8
+reference on a batch of calibration images. The tool then picks the plan with
+the least total weight memory whose top-1 agreement and mean score deviation
+stay inside the budget. The plan goes to qformat_plan.json:
+export_mobilenetv3_weights_for_hw.py --plan exports weights in it, and
+golden_model.py reads it back from the weight directory. Planned weights are
+for the golden model only; the RTL keeps reading 16-bit Q8.8 words from
+memory_files/, so planned exports go to memory_files_planned/ instead.
+"""
+
+import sys
+import json
+import argparse
+import numpy as np
+import golden_model as gm
+from calibrate_activations import load_calibration, calibrated_peak
+
+WEIGHT_BITS = (4, 6, 8, 10, 12, 16)
+ACTIVATION_BITS = (8, 10, 12, 16)
+# Beyond 15 fractional bits a 16-bit activation times a weight no longer fits the 32-bit accumulator
+MAX_WEIGHT_FRAC = 15
+BASELINE = (gm.DATA_WIDTH, gm.FRAC_BITS)
+# Budget: top-1 agreement with the Q8.8 reference, mean |score - reference| in Q8.8 LSBs
+MIN_AGREEMENT = 0.99
+MAX_DEVIATION = 8.0
+
+
+def integer_bits(peak):
+    """Bits left of the binary point needed for magnitudes up to peak (negative for peak < 0.5)"""
+    return int(np.floor(np.log2(peak))) + 1 if peak > 0 else -MAX_WEIGHT_FRAC
+
+
+def weight_candidates(values, bits_options=WEIGHT_BITS):
+    """(bits, frac) formats worth trying for a real-valued tensor, narrowest first
+
+    Each width gets the fractional bits that just hold max|values| and one
+    more (saturating the largest outliers for extra resolution).
+    """
+    peak = float(np.max(np.abs(values))) if np.size(values) else 0.0
+    formats = []
+    for bits in sorted(bits_options):
+        frac = int(np.clip(bits - 1 - integer_bits(peak), 0, MAX_WEIGHT_FRAC))
+        for f in (frac, frac + 1):
+            if f <= MAX_WEIGHT_FRAC and (bits, f) not in formats:
+                formats.append((bits, f))
+    return formats
+
+
+def activation_candidates(peak, bits_options=ACTIVATION_BITS):
+    """(bits, frac) activation formats for a layer whose Q8.8 outputs reach peak LSBs, narrowest first"""
+    formats = []
+    for bits in sorted(bits_options):
+        lowest = bits - (gm.DATA_WIDTH - gm.FRAC_BITS)
+        frac = int(np.clip(bits - 1 - integer_bits(peak / (1 << gm.FRAC_BITS)), max(lowest, 0), gm.FRAC_BITS))
+        if (bits, frac) not in formats:
+            formats.append((bits, frac))
+    return formats
+
+
+def score_error(scores, reference):
+    """Top-1 agreement and mean/max absolute score deviation (LSBs) against the reference scores"""
+    scores = np.asarray(scores, dtype=np.int64)
+    reference = np.asarray(reference, dtype=np.int64)
+    diff = np.abs(scores - reference)
+    return {'agreement': float(np.mean(scores.argmax(axis=1) == reference.argmax(axis=1))),
+            'deviation': float(diff.mean()), 'max_deviation': int(diff.max())}
+
+
+def within_budget(error, min_agreement=MIN_AGREEMENT, max_deviation=MAX_DEVIATION):
+    return error['agreement'] >= min_agreement and error['deviation'] <= max_deviation
+
+
+class QFormatSweep:
+    """Golden-model evaluations of Q-format choices on a fixed batch of calibration images
+
+    tensors holds the real-valued parameters by state_dict key (BN-folded
+    when fold_bn is set), images the Q8.8 pixel words (N, H, W). A qformats
+    dict maps a layer to {'weight': (bits, frac), 'activation': (bits, frac)}
+    as in GoldenMobileNetV3. Activation candidates follow the output peaks of
+    the images, or the calibrated bounds when a calibration
+    (calibrate_activations.py) is given.
+    """
+
+    def __init__(self, tensors, images, fold_bn=False, in_channels=1, num_classes=gm.NUM_CLASSES,
+                 calibration=None):
+        self.tensors = tensors
+        self.images = np.asarray(images)
+        self.fold_bn = fold_bn
+        self.num_classes = num_classes
+        self.layers = gm.weight_layers(in_channels, num_classes, fold_bn)
+        self.base = {key: gm.to_fixed(np.reshape(tensors[key], shape))
+                     for key, _, shape in gm.parameter_layout(in_channels, num_classes, fold_bn)}
+        self.peaks = {}
+        self.reference = self.run({}, hook=self._record_peak)
+        for layer, _, _ in self.layers if calibration else []:
+            if layer in calibration['layers']:
+                self.peaks[layer] = int(np.ceil(calibrated_peak(calibration, layer) * (1 << gm.FRAC_BITS)))
+
+    def _record_peak(self, name, tensor):
+        self.peaks[name] = max(self.peaks.get(name, 0), int(np.max(np.abs(tensor))))
+
+    def run(self, qformats, hook=None):
+        """(N, classes) golden scores with the weights of qformats layers re-quantized to their format"""
+        params = dict(self.base)
+        for layer, fmt in qformats.items():
+            if 'weight' in fmt:
+                key = layer + '.weight'
+                params[key] = gm.to_fixed(np.reshape(self.tensors[key], self.base[key].shape), *fmt['weight'])
+        return gm.GoldenMobileNetV3(params, self.num_classes, qformats).forward(self.images, hook)
+
+    def evaluate(self, qformats):
+        return score_error(self.run(qformats), self.reference)
+
+    def _sweep(self, kind, candidates, budget, progress):
+        """Evaluate candidates narrowest first, stopping after the first width inside the budget"""
+        results = {}
+        for layer, formats in candidates.items():
+            rows = []
+            passed_bits = None
+            for bits, frac in formats:
+                if passed_bits is not None and bits > passed_bits:
+                    break
+                row = dict(bits=bits, frac=frac, **self.evaluate({layer: {kind: (bits, frac)}}))
+                row['ok'] = within_budget(row, *budget)
+                if row['ok'] and passed_bits is None:
+                    passed_bits = bits
+                rows.append(row)
+            results[layer] = rows
+            if progress:
+                progress(kind, layer, rows)
+        return results
+
+    def sweep_weights(self, bits_options=WEIGHT_BITS, layers=None, budget=(MIN_AGREEMENT, MAX_DEVIATION),
+                      progress=None):
+        """{layer: [candidate rows]} for the weight formats of every (or the listed) layer"""
+        candidates = {layer: weight_candidates(self.tensors[key], bits_options)
+                      for layer, key, _ in self.layers if not layers or layer in layers}
+        return self._sweep('weight', candidates, budget, progress)
+
+    def sweep_activations(self, bits_options=ACTIVATION_BITS, layers=None, budget=(MIN_AGREEMENT, MAX_DEVIATION),
+                          progress=None):
+        """{layer: [candidate rows]} for the output activation formats of every (or the listed) layer"""
+        candidates = {layer: activation_candidates(self.peaks.get(layer, 0), bits_options)
+                      for layer, _, _ in self.layers if not layers or layer in layers}
+        return self._sweep('activation', candidates, budget, progress)
+
+    def choose_plan(self, weight_results, activation_results=None, budget=(MIN_AGREEMENT, MAX_DEVIATION),
+                    progress=None):
+        """Cheapest passing format per layer, then back off the worst layers until the whole plan passes
+
+        Returns (qformats, error of the combined plan).
+        """
+        qformats, costs = {}, []
+        for kind, results in (('weight', weight_results), ('activation', activation_results or {})):
+            for layer, rows in results.items():
+                passing = [r for r in rows if r['ok']]
+                if not passing:
+                    continue
+                best = min(passing, key=lambda r: (r['bits'], r['deviation']))
+                if (best['bits'], best['frac']) == BASELINE:
+                    continue
+                qformats.setdefault(layer, {})[kind] = (best['bits'], best['frac'])
+                costs.append((best['deviation'], layer, kind))
+
+        # Revert the choices that cost the most accuracy on their own first
+        costs.sort(reverse=True)
+        error = self.evaluate(qformats)
+        while not within_budget(error, *budget) and costs:
+            _, layer, kind = costs.pop(0)
+            del qformats[layer][kind]
+            if not qformats[layer]:
+                del qformats[layer]
+            error = self.evaluate(qformats)
+            if progress:
+                progress('backoff', layer, [error])
+        return qformats, error
+
+    def plan_document(self, qformats, error, budget=(MIN_AGREEMENT, MAX_DEVIATION)):
+        """The qformat_plan.json contents: every layer's weight format, any narrowed activations, totals"""
+        layers = {}
+        for layer, _, shape in self.layers:
+            fmt = qformats.get(layer, {})
+            entry = {'weight': list(fmt.get('weight', BASELINE)), 'weights': int(np.prod(shape))}
+            if 'activation' in fmt:
+                entry['activation'] = list(fmt['activation'])
+            layers[layer] = entry
+        return {
+            'data_width': gm.DATA_WIDTH,
+            'frac_bits': gm.FRAC_BITS,
+            'fold_bn': self.fold_bn,
+            'images': int(len(self.images)),
+            'budget': {'min_agreement': budget[0], 'max_deviation': budget[1]},
+            'agreement': error['agreement'],
+            'deviation': error['deviation'],
+            'baseline_weight_bits': sum(l['weights'] * BASELINE[0] for l in layers.values()),
+            'weight_bits': sum(l['weights'] * l['weight'][0] for l in layers.values()),
+            'layers': layers,
+        }
+
+
+def load_tensors(source, fold_bn=False):
+    """Real-valued parameters by state_dict key from a .npz of tensors or a PyTorch checkpoint"""
+    if source.endswith('.npz'):
+        with np.load(source) as data:
+            return {key: data[key] for key in data.files}
+    from export_mobilenetv3_weights_for_hw import load_model, float_tensors
+    return float_tensors(load_model(source), fold_bn)
+
+
+def print_progress(kind, layer, rows):
+    if kind == 'backoff':
+        print(f"  ↩️  {layer} back to Q8.8: agreement {rows[0]['agreement']:.2%}, "
+              f"deviation {rows[0]['deviation']:.2f} LSB")
+        return
+    tried = ", ".join(f"Q{r['bits'] - r['frac']}.{r['frac']}{'✓' if r['ok'] else '✗'}" for r in rows)
+    print(f"  {kind:<10} {layer:<24} {tried}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep per-layer Q formats through the golden model and plan them")
+    parser.add_argument('images', nargs='*', help='Calibration image .mem files (224x224 pixel words)')
+    parser.add_argument('--checkpoint', type=str, default='models/mobilenet_fixed_point_16_8.pth',
+                        help='PyTorch state dict, or a .npz of real-valued tensors by state_dict key')
+    parser.add_argument('--fold-bn', action='store_true', help='Plan for the BN-folded export')
+    parser.add_argument('--random-images', type=int, default=0, help='Add this many random images (smoke runs)')
+    parser.add_argument('--layers', nargs='*', default=None, help='Only sweep these layers (e.g. linear3 conv2)')
+    parser.add_argument('--weight-bits', type=int, nargs='+', default=list(WEIGHT_BITS), help='Weight widths to try')
+    parser.add_argument('--activation-bits', type=int, nargs='*', default=list(ACTIVATION_BITS),
+                        help='Activation widths to try (none to keep every activation Q8.8)')
+    parser.add_argument('--calibration', type=str, default=None,
+                        help='Activation calibration (calibrate_activations.py) for the activation candidates')
+    parser.add_argument('--min-agreement', type=float, default=MIN_AGREEMENT, help='Top-1 agreement budget')
+    parser.add_argument('--max-deviation', type=float, default=MAX_DEVIATION, help='Mean score deviation budget (LSB)')
+    parser.add_argument('--output', type=str, default=gm.PLAN_FILE, help='Plan file to write')
+    args = parser.parse_args()
+
+    images = [gm.load_image_mem(path) for path in args.images]
+    if args.random_images:
+        images += list(np.random.default_rng(0).integers(0, 256, size=(args.random_images, gm.IMG_SIZE, gm.IMG_SIZE)))
+    if not images:
+        print("❌ No calibration images (pass .mem files or --random-images)")
+        sys.exit(1)
+
+    budget = (args.min_agreement, args.max_deviation)
+    calibration = load_calibration(args.calibration) if args.calibration else None
+    sweep = QFormatSweep(load_tensors(args.checkpoint, args.fold_bn), np.stack(images), args.fold_bn,
+                         calibration=calibration)
+    print(f"🔬 Sweeping {len(args.layers or sweep.layers)} layer(s) on {len(images)} image(s)")
+    weights = sweep.sweep_weights(args.weight_bits, args.layers, budget, print_progress)
+    activations = (sweep.sweep_activations(args.activation_bits, args.layers, budget, print_progress)
+                   if args.activation_bits else None)
+    qformats, error = sweep.choose_plan(weights, activations, budget, print_progress)
+    plan = sweep.plan_document(qformats, error, budget)
+
+    with open(args.output, 'w') as f:
+        json.dump(plan, f, indent=2)
+    print(f"\n{'Layer':<24} {'Weights':>8} {'Format':>7} {'Activation':>10} {'KiB':>8}")
+    for layer, entry in plan['layers'].items():
+        bits, frac = entry['weight']
+        act = f"Q{entry['activation'][0] - entry['activation'][1]}.{entry['activation'][1]}" \
+            if 'activation' in entry else "Q8.8"
+        print(f"{layer:<24} {entry['weights']:>8} {f'Q{bits - frac}.{frac}':>7} {act:>10} "
+              f"{entry['weights'] * bits / 8192:>8.1f}")
+    saved = 1 - plan['weight_bits'] / plan['baseline_weight_bits']
+    print(f"\n💾 Weight memory {plan['weight_bits'] / 8192:,.1f} KiB vs {plan['baseline_weight_bits'] / 8192:,.1f} KiB "
+          f"at Q8.8 ({saved:.1%} saved); agreement {error['agreement']:.2%}, "
+          f"deviation {error['deviation']:.2f} LSB")
+    print(f"📋 Plan written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
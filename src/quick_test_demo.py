@@ -4,9 +4,11 @@ Quick Test Demo - Test different disease patterns
 """
 
 import os
-import shutil
 import subprocess
 import sys
+from sim_runner import prepare_job, DO_FILE
+
+ANALYZER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "analyze_disease_hex_outputs.py")
 
 def test_disease_pattern(disease_name):
     """Test a specific disease pattern"""
@@ -19,19 +21,14 @@ def test_disease_pattern(disease_name):
         print(f"❌ Disease file {disease_file} not found!")
         return False
     
-    # Backup current test image
-    if os.path.exists("test_image.mem"):
-        shutil.copy("test_image.mem", "test_image_backup.mem")
-        print("📋 Backed up current test_image.mem")
-    
-    # Copy disease pattern to test image
-    shutil.copy(disease_file, "test_image.mem")
-    print(f"📋 Copied {disease_file} to test_image.mem")
+    # Give this pattern its own scratch directory instead of the shared test_image.mem
+    job = prepare_job("demo_jobs", disease_name, disease_file)
+    print(f"📋 Prepared {job['dir']} with {disease_file}")
     
     # Try to run simulation (if ModelSim available)
     print("🔄 Attempting hardware simulation...")
     try:
-        result = subprocess.run(["vsim", "-do", "run_tb_full_system_top.do"],
+        result = subprocess.run(["vsim", "-c", "-do", DO_FILE], cwd=job['dir'],
                               capture_output=True, text=True, timeout=60)
         if result.returncode == 0:
             print("✅ Simulation completed successfully")
@@ -44,7 +41,7 @@ def test_disease_pattern(disease_name):
     # Analyze results
     print("📊 Analyzing results...")
     try:
-        analysis_result = subprocess.run(["python", "analyze_disease_hex_outputs.py"],
+        analysis_result = subprocess.run([sys.executable, ANALYZER], cwd=job['dir'],
                                        capture_output=True, text=True, timeout=30)
         
         if analysis_result.returncode == 0:
@@ -71,11 +68,6 @@ def test_disease_pattern(disease_name):
     except Exception as e:
         print(f"❌ Analysis error: {e}")
     
-    # Restore backup
-    if os.path.exists("test_image_backup.mem"):
-        shutil.copy("test_image_backup.mem", "test_image.mem")
-        print("📋 Restored original test_image.mem")
-    
     return True
 
 def main():
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Columnar export of result scores and per-layer error statistics
+Turns stored regression runs (results_db.py), testbench JSON-lines results
+(results_jsonl.py) and compare_activations.py layer reports into pandas
+DataFrames with one int16 column per class score (s0..s14), and writes them
+as Parquet, Feather when no Parquet engine is installed, or a NumPy .npz of
+columns when pyarrow is missing altogether. load_scores() hands back the
+(N, 15) int16 score matrix in one read, so confusion matrices, per-class
+accuracy and calibration over large sweeps are single array operations.
+"""
+
+import os
+import sys
+import json
+import argparse
+import numpy as np
+import pandas as pd
+import results_db
+from results_jsonl import read_results
+
+NUM_CLASSES = 15
+SCORE_COLUMNS = [f's{i}' for i in range(NUM_CLASSES)]
+FORMATS = {'.parquet': 'parquet', '.feather': 'feather', '.npz': 'npz'}
+
+# Optional engines: pyarrow does Parquet and Feather, fastparquet only Parquet
+try:
+    import pyarrow  # noqa: F401
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+try:
+    import fastparquet  # noqa: F401
+    FASTPARQUET_AVAILABLE = True
+except ImportError:
+    FASTPARQUET_AVAILABLE = False
+
+
+def available_format(preferred='parquet'):
+    """Best format this installation can write, starting from the preferred one"""
+    order = ['parquet', 'feather', 'npz']
+    usable = {'parquet': ARROW_AVAILABLE or FASTPARQUET_AVAILABLE, 'feather': ARROW_AVAILABLE, 'npz': True}
+    for fmt in order[order.index(preferred):]:
+        if usable[fmt]:
+            return fmt
+    return 'npz'
+
+
+def _with_scores(frame, scores):
+    """Append the s0..s14 int16 columns (and has_scores) to a frame"""
+    scores = np.asarray(scores, dtype=np.int16).reshape(len(frame), NUM_CLASSES)
+    frame = frame.reset_index(drop=True)
+    for i, column in enumerate(SCORE_COLUMNS):
+        frame[column] = scores[:, i]
+    return frame
+
+
+def results_frame(records):
+    """Frame of result dicts carrying a 'scores' list (None when the test produced nothing)"""
+    frame = pd.DataFrame([{k: v for k, v in r.items() if k != 'scores'} for r in records])
+    scores = np.zeros((len(records), NUM_CLASSES), dtype=np.int16)
+    has_scores = np.zeros(len(records), dtype=bool)
+    for i, r in enumerate(records):
+        if r.get('scores'):
+            values = [0 if s is None else s for s in r['scores'][:NUM_CLASSES]]
+            scores[i, :len(values)] = values
+            has_scores[i] = True
+    frame = _with_scores(frame, scores)
+    frame['has_scores'] = has_scores
+    return frame
+
+
+def frame_from_jsonl(filename):
+    """Frame of a testbench results .jsonl file"""
+    res = read_results(filename)
+    frame = pd.DataFrame({k: res[k] for k in ('test', 'name', 'passed', 'cycles', 'latency', 'argmax')})
+    frame = _with_scores(frame, res['scores'])
+    frame['has_scores'] = res['argmax'] >= 0
+    return frame
+
+
+def frame_from_db(run_ids=None, source=None, path=None):
+    """Frame of stored results (with their run's source, commit and RTL hash) in one query"""
+    where, params = [], []
+    if run_ids:
+        where.append(f"x.run_id IN ({', '.join('?' * len(run_ids))})")
+        params += list(run_ids)
+    if source:
+        where.append("r.source = ?")
+        params.append(source)
+    conn = results_db.connect(path)
+    try:
+        frame = pd.read_sql_query(f"""
+            SELECT x.*, r.source, r.started, r.git_commit, r.rtl_hash
+            FROM results x JOIN runs r ON r.id = x.run_id
+            {'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY x.id""", conn, params=params)
+    finally:
+        conn.close()
+    frame['has_scores'] = frame[SCORE_COLUMNS].notna().any(axis=1)
+    return _with_scores(frame.drop(columns=SCORE_COLUMNS), frame[SCORE_COLUMNS].fillna(0).to_numpy())
+
+
+def layer_frame(reports):
+    """Frame of compare_activations.py layer reports, one row per layer (per-channel lists dropped)"""
+    return pd.DataFrame([{k: v for k, v in r.items() if k != 'per_channel_max_ulp'} for r in reports])
+
+
+def _format_of(filename):
+    return FORMATS.get(os.path.splitext(filename)[1].lower(), 'parquet')
+
+
+def write_frame(frame, filename):
+    """Write a frame in the format its extension asks for, or the next one available
+
+    Returns the file actually written (the extension follows a fallback).
+    """
+    fmt = available_format(_format_of(filename))
+    filename = os.path.splitext(filename)[0] + {v: k for k, v in FORMATS.items()}[fmt]
+    if fmt == 'parquet':
+        frame.to_parquet(filename, index=False)
+    elif fmt == 'feather':
+        frame.reset_index(drop=True).to_feather(filename)
+    else:
+        # Text columns become fixed-width strings so the file loads without pickle
+        columns = {c: (frame[c].to_numpy() if frame[c].dtype.kind in 'biuf'
+                       else frame[c].fillna('').astype(str).to_numpy(dtype=str)) for c in frame.columns}
+        np.savez_compressed(filename, **columns)
+    return filename
+
+
+def read_frame(filename):
+    """Read a frame written by write_frame()"""
+    fmt = _format_of(filename)
+    if fmt == 'parquet':
+        return pd.read_parquet(filename)
+    if fmt == 'feather':
+        return pd.read_feather(filename)
+    with np.load(filename, allow_pickle=False) as data:
+        return pd.DataFrame({c: data[c] for c in data.files})
+
+
+def load_scores(filename, with_frame=False):
+    """(N, 15) int16 score matrix of an exported file (plus the frame itself with with_frame)"""
+    frame = read_frame(filename)
+    scores = frame[SCORE_COLUMNS].to_numpy(dtype=np.int16)
+    return (scores, frame) if with_frame else scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export results or layer statistics to a columnar file")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--db', action='store_true', help='Stored regression results (results_db.py)')
+    source.add_argument('--jsonl', type=str, help='Testbench results .jsonl file')
+    source.add_argument('--layers', type=str, help='compare_activations.py --json report')
+    parser.add_argument('--run', type=int, nargs='*', default=None, help='With --db: only these run ids')
+    parser.add_argument('--source', type=str, default=None, help='With --db: only runs of this source')
+    parser.add_argument('--output', '-o', type=str, default='results.parquet', help='Output file')
+    args = parser.parse_args()
+
+    if args.db:
+        frame = frame_from_db(args.run, args.source)
+    elif args.jsonl:
+        frame = frame_from_jsonl(args.jsonl)
+    else:
+        with open(args.layers, 'r') as f:
+            frame = layer_frame(json.load(f)['layers'])
+    if frame.empty:
+        print("📭 Nothing to export")
+        sys.exit(1)
+    written = write_frame(frame, args.output)
+    if written != args.output:
+        print(f"⚠️ {_format_of(args.output)} not available here (install pyarrow), wrote {written} instead")
+    print(f"💾 {len(frame)} row(s) x {len(frame.columns)} column(s) -> {written}")
+
+
+if __name__ == "__main__":
+    main()
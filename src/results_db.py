@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+SQLite store for regression results
+Every regression run (run_disease_test_cases.py) and every imported
+testbench summary or transcript becomes one row in `runs` (time, source,
+git commit, RTL hash) plus one row per test case in `results` (input hash,
+expected/predicted class, the 15 raw Q8.8 scores, cycles, wall time). The
+analyzers query this store instead of globbing *_results.json and summary
+files, so cross-run trends stay one indexed query over thousands of runs.
+
+The database is results.sqlite at the top of the repository, or RESULTS_DB.
+"""
+
+import os
+import sys
+import sqlite3
+import argparse
+import subprocess
+import numpy as np
+from datetime import datetime
+from postprocess import MEDICAL_CONDITIONS
+from sim_cache import hash_paths
+
+DB_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'results.sqlite'))
+NUM_CLASSES = 15
+SCORE_COLUMNS = [f's{i}' for i in range(NUM_CLASSES)]
+RESULT_COLUMNS = ['name', 'input', 'input_hash', 'expected_class', 'expected', 'predicted_class', 'predicted',
+                  'correct', 'confidence', 'status', 'cycles', 'wall_seconds', 'cached'] + SCORE_COLUMNS
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started TEXT NOT NULL,
+    source TEXT NOT NULL,
+    git_commit TEXT,
+    rtl_hash TEXT,
+    import_hash TEXT UNIQUE,
+    notes TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    name TEXT,
+    input TEXT,
+    input_hash TEXT,
+    expected_class INTEGER,
+    expected TEXT,
+    predicted_class INTEGER,
+    predicted TEXT,
+    correct INTEGER,
+    confidence REAL,
+    status TEXT,
+    cycles INTEGER,
+    wall_seconds REAL,
+    cached INTEGER,
+    {', '.join(f'{c} INTEGER' for c in SCORE_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS runs_source ON runs(source, started);
+CREATE INDEX IF NOT EXISTS runs_rtl ON runs(rtl_hash);
+CREATE INDEX IF NOT EXISTS runs_commit ON runs(git_commit);
+CREATE INDEX IF NOT EXISTS results_run ON results(run_id);
+CREATE INDEX IF NOT EXISTS results_input ON results(input_hash);
+CREATE INDEX IF NOT EXISTS results_expected ON results(expected_class, run_id);
+"""
+
+
+def db_path(path=None):
+    """Database file in effect: path, RESULTS_DB or results.sqlite"""
+    return path or os.environ.get('RESULTS_DB') or DB_FILE
+
+
+def connect(path=None):
+    """Open (and if needed create) the results database"""
+    conn = sqlite3.connect(db_path(path))
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def git_commit(repo_dir=os.path.dirname(os.path.abspath(__file__))):
+    """Current commit of the checkout, or None outside git"""
+    try:
+        out = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=repo_dir, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return out.stdout.strip() or None
+
+
+def class_index(name):
+    """Class number of a condition name ('Pleural Thickening', 'pleural_thickening', 'normal'), or None"""
+    if name is None:
+        return None
+    key = str(name).strip().lower().replace('_', ' ')
+    if key == 'normal':
+        key = 'no finding'
+    for i, condition in enumerate(MEDICAL_CONDITIONS):
+        if condition.lower() == key:
+            return i
+    return None
+
+
+def import_hash(paths):
+    """Content hash of the files a run is imported from"""
+    return hash_paths(paths)
+
+
+def add_run(conn, source, records, rtl_hash=None, import_hash=None, notes=None, commit=None):
+    """Insert one run and its result records; returns the run id
+
+    Records are dicts keyed like RESULT_COLUMNS, with the scores as a
+    'scores' list. A run whose import_hash is already stored is not added
+    again; the existing run id is returned instead.
+    """
+    if import_hash:
+        row = conn.execute("SELECT id FROM runs WHERE import_hash = ?", (import_hash,)).fetchone()
+        if row:
+            return row['id']
+    with conn:
+        run_id = conn.execute(
+            "INSERT INTO runs (started, source, git_commit, rtl_hash, import_hash, notes) VALUES (?, ?, ?, ?, ?, ?)",
+            (datetime.now().isoformat(timespec='seconds'), source, commit or git_commit(), rtl_hash, import_hash,
+             notes)).lastrowid
+        rows = []
+        for r in records:
+            scores = list(r.get('scores') or [])[:NUM_CLASSES]
+            scores += [None] * (NUM_CLASSES - len(scores))
+            rows.append([run_id] + [r.get(c) for c in RESULT_COLUMNS[:-NUM_CLASSES]] + scores)
+        conn.executemany(f"INSERT INTO results (run_id, {', '.join(RESULT_COLUMNS)}) "
+                         f"VALUES ({', '.join('?' * (len(RESULT_COLUMNS) + 1))})", rows)
+    return run_id
+
+
+def record_run(source, records, path=None, **kwargs):
+    """add_run() on a connection of its own, for runners that just want to log a run"""
+    conn = connect(path)
+    try:
+        return add_run(conn, source, records, **kwargs)
+    finally:
+        conn.close()
+
+
+def latest_run(conn, source=None):
+    """Most recent run (of one source), or None"""
+    if source:
+        return conn.execute("SELECT * FROM runs WHERE source = ? ORDER BY id DESC LIMIT 1", (source,)).fetchone()
+    return conn.execute("SELECT * FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+
+
+def run_results(conn, run_id):
+    """Result records of a run as dicts, scores folded back into a list"""
+    records = []
+    for row in conn.execute("SELECT * FROM results WHERE run_id = ? ORDER BY id", (run_id,)):
+        r = dict(row)
+        scores = [r.pop(c) for c in SCORE_COLUMNS]
+        r['scores'] = scores if any(s is not None for s in scores) else None
+        records.append(r)
+    return records
+
+
+def score_matrix(conn, run_id):
+    """(N, 15) int16 score array of a run; missing scores read as 0"""
+    rows = conn.execute(f"SELECT {', '.join(SCORE_COLUMNS)} FROM results WHERE run_id = ? ORDER BY id",
+                        (run_id,)).fetchall()
+    return np.array([[s or 0 for s in row] for row in rows], dtype=np.int16).reshape(-1, NUM_CLASSES)
+
+
+def accuracy_by_expected(conn, run_id):
+    """{expected: {'total', 'correct', 'accuracy', 'avg_cycles'}} for one run"""
+    stats = {}
+    for row in conn.execute("""
+            SELECT expected, COUNT(*) AS total, SUM(correct) AS correct, AVG(cycles) AS avg_cycles
+            FROM results WHERE run_id = ? GROUP BY expected ORDER BY expected""", (run_id,)):
+        correct = row['correct'] or 0
+        stats[row['expected']] = {'total': row['total'], 'correct': correct,
+                                  'accuracy': correct / row['total'] if row['total'] else 0,
+                                  'avg_cycles': row['avg_cycles']}
+    return stats
+
+
+def run_history(conn, source=None, limit=20):
+    """Per-run totals, newest first: tests, correct, accuracy, average cycles and wall time"""
+    where, params = ("WHERE r.source = ?", [source]) if source else ("", [])
+    rows = conn.execute(f"""
+        SELECT r.id, r.started, r.source, r.git_commit, r.rtl_hash,
+               COUNT(x.id) AS tests, COALESCE(SUM(x.correct), 0) AS correct,
+               AVG(x.cycles) AS avg_cycles, SUM(x.wall_seconds) AS wall_seconds
+        FROM runs r LEFT JOIN results x ON x.run_id = r.id
+        {where} GROUP BY r.id ORDER BY r.id DESC LIMIT ?""", params + [limit]).fetchall()
+    return [dict(row, accuracy=row['correct'] / row['tests'] if row['tests'] else 0) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the regression results database")
+    parser.add_argument('--db', type=str, default=None, help='Database file (default: RESULTS_DB or results.sqlite)')
+    parser.add_argument('--source', type=str, default=None, help='Only runs recorded by this runner/analyzer')
+    parser.add_argument('--limit', type=int, default=20, help='Runs to list')
+    parser.add_argument('--run', type=int, default=None, help='Per-condition breakdown of one run')
+    args = parser.parse_args()
+
+    if not os.path.exists(db_path(args.db)):
+        print(f"📭 No results database at {db_path(args.db)}")
+        sys.exit(0)
+    conn = connect(args.db)
+    if args.run is not None:
+        for expected, s in accuracy_by_expected(conn, args.run).items():
+            print(f"  {str(expected):<20} | {s['correct']}/{s['total']} | {s['accuracy']:.2%}")
+        return
+    print(f"📊 {'Run':>5} | {'Started':<19} | {'Source':<20} | {'Commit':<8} | {'Tests':>5} | {'Accuracy':>8} | Avg cycles")
+    for h in run_history(conn, args.source, args.limit):
+        cycles = f"{h['avg_cycles']:,.0f}" if h['avg_cycles'] is not None else "-"
+        print(f"   {h['id']:>5} | {h['started']:<19} | {h['source']:<20} | {(h['git_commit'] or '-')[:8]:<8} | "
+              f"{h['tests']:>5} | {h['accuracy']:>8.2%} | {cycles}")
+
+
+if __name__ == "__main__":
+    main()
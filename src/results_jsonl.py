@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Reader for the testbenches' JSON-lines result channel
+tb_full_system_top.sv (full_system_results.jsonl, +RESULTS=<file>) and
+tb_final_layer_top.sv (testbench_results.jsonl) write one JSON object per
+test: test id, name, passed flag, cycle count, output latency, argmax and the
+raw signed Q8.8 scores. This module loads such a file straight into NumPy
+arrays with one json.loads per record, no transcript scraping involved.
+"""
+
+import os
+import sys
+import json
+import argparse
+import numpy as np
+
+FULL_SYSTEM_RESULTS = 'full_system_results.jsonl'
+FINAL_LAYER_RESULTS = 'testbench_results.jsonl'
+NUM_CLASSES = 15
+
+
+def iter_results(filename):
+    """Yield the records of a results file one by one (a truncated last line is skipped)"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                if line.endswith('}'):
+                    raise
+                return  # simulator killed mid-write
+
+
+def read_results(filename, num_classes=NUM_CLASSES):
+    """Load a results file into column arrays
+
+    Returns a dict with 'test', 'passed', 'cycles', 'latency', 'argmax'
+    (N,) arrays, 'scores' as an (N, num_classes) int16 array and 'name' as a
+    list. Tests without valid output have argmax -1 and all-zero scores.
+    """
+    records = list(iter_results(filename))
+    n = len(records)
+    scores = np.zeros((n, num_classes), dtype=np.int16)
+    for i, r in enumerate(records):
+        if r.get('scores') is not None:
+            scores[i] = r['scores'][:num_classes]
+    column = lambda key, dtype, default: np.array([default if r.get(key) is None else r[key] for r in records],
+                                                  dtype=dtype)
+    return {
+        'test': column('test', np.int32, -1),
+        'name': [r.get('name') for r in records],
+        'passed': column('passed', bool, 0),
+        'cycles': column('cycles', np.int64, -1),
+        'latency': column('latency', np.int64, -1),
+        'argmax': column('argmax', np.int16, -1),
+        'scores': scores,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise a testbench JSON-lines results file")
+    parser.add_argument('results', nargs='?', default=FULL_SYSTEM_RESULTS, help='Results .jsonl file')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.results):
+        print(f"❌ {args.results} not found - run the testbench first")
+        sys.exit(1)
+    res = read_results(args.results)
+    n = len(res['test'])
+    print(f"📊 {n} test(s), {int(res['passed'].sum())} passed")
+    if n:
+        print(f"   Cycles: mean {res['cycles'].mean():.0f}, max {res['cycles'].max()}")
+        counts = np.bincount(res['argmax'][res['argmax'] >= 0], minlength=NUM_CLASSES)
+        print(f"   Argmax histogram: {counts.tolist()}")
+
+
+if __name__ == "__main__":
+    main()
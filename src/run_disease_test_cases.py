@@ -5,117 +5,73 @@ Run tests on the generated disease test cases
 
 import os
 import sys
-import glob
 import shutil
 import subprocess
-import time
 import json
 from pathlib import Path
 from prepare_disease_images_simple import DISEASE_PATTERNS
+from sim_runner import prepare_job, run_jobs, compile_library, rtl_sources, rtl_hash
+from sim_watchdog import STALL_TIMEOUT
+import sim_cache
+import results_db
 
-def run_test(test_file, output_dir):
-    """Run a single test case and save results"""
-    print(f"\n🔍 Testing {test_file}...")
-    
-    # Create output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Backup current test image if it exists
-    if os.path.exists("test_image.mem"):
-        shutil.copy("test_image.mem", "test_image_backup.mem")
-    
-    # Copy test case to test image
-    shutil.copy(test_file, "test_image.mem")
-    print(f"  ✓ Copied {test_file} to test_image.mem")
-    
+SIMULATOR = ("vsim",)
+
+def analyze_job(result, output_dir):
+    """Run the hex-output analysis inside a finished job directory"""
+    analysis_output_file = os.path.join(output_dir, f"{result['name']}_analysis.log")
+    analyzer = os.path.join(os.path.dirname(os.path.abspath(__file__)), "analyze_disease_hex_outputs.py")
+    try:
+        analysis = subprocess.run([sys.executable, analyzer], cwd=result['dir'],
+                                  capture_output=True, text=True, timeout=60)
+    except subprocess.TimeoutExpired:
+        print("  ✗ Analysis timed out")
+        with open(analysis_output_file, 'w') as f:
+            f.write("ANALYSIS TIMEOUT")
+        return False, "timeout", 0.0
+
+    # Save analysis output
+    with open(analysis_output_file, 'w') as f:
+        f.write(analysis.stdout)
+        f.write("\n\n--- STDERR ---\n\n")
+        f.write(analysis.stderr)
+
+    # Parse the analysis output to extract detected disease and confidence
+    detected_disease = "unknown"
+    confidence = 0.0
+    for line in analysis.stdout.splitlines():
+        if "Detected:" in line:
+            detected_disease = line.split("Detected:")[1].strip()
+        if "Confidence:" in line:
+            try:
+                confidence = float(line.split("Confidence:")[1].strip().split('%')[0]) / 100.0
+            except ValueError:
+                confidence = 0.0
+    return True, detected_disease, confidence
+
+def collect_result(test_file, result, output_dir):
+    """Turn a finished simulation job into the per-case result record"""
     # Extract disease name and case number from filename
     filename = os.path.basename(test_file)
     disease_name = filename.split('_')[0]
     case_info = filename.replace('.mem', '').split('_', 1)[1]
-    
-    # Run simulation
-    print("  ⚙️ Running simulation...")
+
+    # Keep a copy of the transcript next to the JSON results
     sim_output_file = os.path.join(output_dir, f"{disease_name}_{case_info}_sim.log")
-    
-    try:
-        result = subprocess.run(["vsim", "-c", "-do", "run_tb_full_system_top.do"], 
-                               capture_output=True, text=True, timeout=300)
-        
-        # Save simulation output
-        with open(sim_output_file, 'w') as f:
-            f.write(result.stdout)
-            f.write("\n\n--- STDERR ---\n\n")
-            f.write(result.stderr)
-        
-        # Check if simulation was successful
-        if result.returncode == 0:
-            print(f"  ✓ Simulation completed successfully (log: {sim_output_file})")
-            sim_success = True
-        else:
-            print(f"  ✗ Simulation failed (log: {sim_output_file})")
-            print(f"  Error: {result.stderr[:100]}...")
-            sim_success = False
-            
-    except subprocess.TimeoutExpired:
-        print("  ✗ Simulation timed out after 5 minutes")
-        with open(sim_output_file, 'w') as f:
-            f.write("SIMULATION TIMEOUT")
-        sim_success = False
-    
-    # Run analysis if simulation was successful
+    shutil.copy(result['transcript'], sim_output_file)
+
+    sim_success = result['status'] == 'passed'
     if sim_success:
-        print("  📊 Analyzing results...")
-        analysis_output_file = os.path.join(output_dir, f"{disease_name}_{case_info}_analysis.log")
-        
-        try:
-            analysis = subprocess.run(["python", "analyze_disease_hex_outputs.py"],
-                                     capture_output=True, text=True, timeout=60)
-            
-            # Save analysis output
-            with open(analysis_output_file, 'w') as f:
-                f.write(analysis.stdout)
-                f.write("\n\n--- STDERR ---\n\n")
-                f.write(analysis.stderr)
-            
-            print(f"  ✓ Analysis completed (log: {analysis_output_file})")
-            
-            # Extract results (simplified - adapt to your actual output format)
-            detected_disease = "unknown"
-            confidence = 0.0
-            
-            # Parse the analysis output to extract detected disease and confidence
-            # This is a placeholder - you'll need to adapt this to your actual output format
-            for line in analysis.stdout.splitlines():
-                if "Detected:" in line:
-                    detected_disease = line.split("Detected:")[1].strip()
-                if "Confidence:" in line:
-                    try:
-                        confidence = float(line.split("Confidence:")[1].strip().rstrip('%')) / 100.0
-                    except:
-                        confidence = 0.0
-            
-            analysis_success = True
-            
-        except subprocess.TimeoutExpired:
-            print("  ✗ Analysis timed out")
-            with open(analysis_output_file, 'w') as f:
-                f.write("ANALYSIS TIMEOUT")
-            analysis_success = False
-            detected_disease = "timeout"
-            confidence = 0.0
+        source = "replayed from cache" if result['cached'] else f"simulation completed in {result['seconds']:.1f}s"
+        print(f"  ✓ {filename}: {source} (log: {sim_output_file})")
+        analysis_success, detected_disease, confidence = analyze_job(result, output_dir)
     else:
-        analysis_success = False
-        detected_disease = "simulation_failed"
-        confidence = 0.0
-    
-    # Restore original test image if backup exists
-    if os.path.exists("test_image_backup.mem"):
-        shutil.copy("test_image_backup.mem", "test_image.mem")
-        os.remove("test_image_backup.mem")
-    
-    # Return test results
+        print(f"  ✗ {filename}: simulation {result['status']} (log: {sim_output_file})")
+        analysis_success, detected_disease, confidence = False, "simulation_failed", 0.0
+
     return {
         "test_file": test_file,
+        "input_hash": sim_cache.file_hash(test_file),
         "disease": disease_name,
         "case_info": case_info,
         "expected": disease_name,
@@ -123,11 +79,75 @@ def run_test(test_file, output_dir):
         "confidence": confidence,
         "simulation_success": sim_success,
         "analysis_success": analysis_success,
-        "correct_detection": disease_name.lower() in detected_disease.lower()
+        "correct_detection": disease_name.lower() in detected_disease.lower(),
+        "job_dir": result['dir'],
+        "sim_seconds": result['seconds'],
+        "cycles": result['cycles'],
+        "cached": result['cached'],
+        "status": result['status'],
+        "scores": result['scores'],
     }
 
-def run_disease_tests(disease_name, output_dir="test_results"):
-    """Run tests for all test cases of a specific disease"""
+def record_results(results):
+    """Store one regression run in the results database; returns its run id"""
+    try:
+        rtl = rtl_hash(rtl_sources())
+    except OSError:
+        rtl = None
+    records = [{
+        "name": Path(r["test_file"]).stem,
+        "input": r["test_file"],
+        "input_hash": r["input_hash"],
+        "expected_class": results_db.class_index(r["expected"]),
+        "expected": r["expected"],
+        "predicted_class": results_db.class_index(r["detected"]),
+        "predicted": r["detected"],
+        "correct": int(r["correct_detection"]),
+        "confidence": r["confidence"],
+        "status": r["status"],
+        "cycles": r["cycles"],
+        "wall_seconds": r["sim_seconds"],
+        "cached": int(r["cached"]),
+        "scores": r["scores"],
+    } for r in results]
+    run_id = results_db.record_run("disease_test_cases", records, rtl_hash=rtl)
+    print(f"🗄️ Recorded run {run_id} in {results_db.db_path()}")
+    return run_id
+
+def run_tests(test_files, output_dir, workers=None, simulator=SIMULATOR, use_cache=True):
+    """Simulate test cases in parallel, each in its own scratch directory
+
+    Cases whose RTL, weights and image were simulated before are replayed
+    from the result cache instead of being simulated again.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    job_root = os.path.join(output_dir, "jobs")
+    jobs = [prepare_job(job_root, Path(f).stem, str(f)) for f in test_files]
+    
+    # Compile the RTL once (cached by source hash); jobs then only simulate
+    try:
+        library = compile_library(rtl_sources(), os.path.join(output_dir, "sim_libs"), simulator)
+        print(f"  🔧 Using compiled library {library}")
+    except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+        print(f"  ⚠️ Could not precompile the RTL ({e}); each job will compile for itself")
+        library = None
+    
+    print(f"  ⚙️ Running {len(jobs)} simulation(s), {workers or os.cpu_count()} at a time...")
+    sim_results = run_jobs(jobs, workers, simulator=simulator, library=library, stall_timeout=STALL_TIMEOUT,
+                           cache_dir=sim_cache.cache_dir() if use_cache else None, verbosity=0)
+    return [collect_result(str(f), r, output_dir) for f, r in zip(test_files, sim_results)]
+
+def run_test(test_file, output_dir, simulator=SIMULATOR, use_cache=True):
+    """Run a single test case and save results"""
+    print(f"\n🔍 Testing {test_file}...")
+    return run_tests([test_file], output_dir, workers=1, simulator=simulator, use_cache=use_cache)[0]
+
+def run_disease_tests(disease_name, output_dir="test_results", workers=None, simulator=SIMULATOR, use_cache=True,
+                      record=True):
+    """Run tests for all test cases of a specific disease
+
+    With record=True the cases are stored as one run in the results database.
+    """
     print(f"\n🏥 Running tests for {disease_name.upper()}")
     print("=" * 50)
     
@@ -142,12 +162,8 @@ def run_disease_tests(disease_name, output_dir="test_results"):
     
     print(f"Found {len(test_files)} test cases")
     
-    # Run tests for each case
-    results = []
-    for test_file in sorted(test_files):
-        result = run_test(str(test_file), output_dir)
-        results.append(result)
-        time.sleep(1)  # Small delay between tests
+    # Run all cases of this disease in parallel
+    results = run_tests(sorted(test_files), output_dir, workers, simulator, use_cache)
     
     # Save results to JSON
     results_file = os.path.join(output_dir, f"{disease_name}_results.json")
@@ -155,6 +171,8 @@ def run_disease_tests(disease_name, output_dir="test_results"):
         json.dump(results, f, indent=2)
     
     print(f"\n✓ Results saved to {results_file}")
+    if record:
+        record_results(results)
     
     # Print summary
     correct = sum(1 for r in results if r["correct_detection"])
@@ -162,7 +180,7 @@ def run_disease_tests(disease_name, output_dir="test_results"):
     
     return results
 
-def run_all_disease_tests(output_dir="test_results"):
+def run_all_disease_tests(output_dir="test_results", workers=None, simulator=SIMULATOR, use_cache=True):
     """Run tests for all diseases"""
     print("🏥 RUNNING TESTS FOR ALL DISEASES")
     print("=" * 50)
@@ -172,8 +190,9 @@ def run_all_disease_tests(output_dir="test_results"):
     
     all_results = {}
     for disease in DISEASE_PATTERNS.keys():
-        results = run_disease_tests(disease, output_dir)
+        results = run_disease_tests(disease, output_dir, workers, simulator, use_cache, record=False)
         all_results[disease] = results
+    record_results([r for results in all_results.values() for r in results])
     
     # Calculate overall statistics
     total_tests = sum(len(results) for results in all_results.values())
@@ -219,18 +238,23 @@ def main():
     
     if len(sys.argv) < 2:
         print("\nUsage:")
-        print("  python run_disease_test_cases.py --all")
-        print("  python run_disease_test_cases.py --disease <disease_name>")
+        print("  python run_disease_test_cases.py --all [--jobs N] [--no-cache]")
+        print("  python run_disease_test_cases.py --disease <disease_name> [--jobs N] [--no-cache]")
         print("\nAvailable diseases:")
         for disease in DISEASE_PATTERNS.keys():
             print(f"  - {disease}")
         return
     
+    # Number of simulations to run at once (default: one per CPU core)
+    workers = int(sys.argv[sys.argv.index("--jobs") + 1]) if "--jobs" in sys.argv else None
+    # --no-cache forces every case through the simulator
+    use_cache = "--no-cache" not in sys.argv
+    
     if sys.argv[1] == "--all":
-        run_all_disease_tests()
+        run_all_disease_tests(workers=workers, use_cache=use_cache)
     elif sys.argv[1] == "--disease" and len(sys.argv) >= 3:
         disease_name = sys.argv[2]
-        run_disease_tests(disease_name)
+        run_disease_tests(disease_name, workers=workers, use_cache=use_cache)
     else:
         print("Invalid command. Use --all or --disease <name>")
 
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Content-addressed simulation result cache
+A simulation is fully determined by its RTL sources, the weight memory files
+and the input image, so the runners hash that triple (plus anything else that
+changes the run, e.g. plusargs) and keep the parsed scores, cycle count and
+output files of every passing run under the hash. A later run with the same
+key restores those files instead of starting the simulator, which turns a
+regression after a Python-only change into a few seconds of file copies.
+
+The cache lives in sim_cache/ at the top of the repository, or in
+SIM_CACHE_DIR; set SIM_CACHE=0 to bypass it.
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+import tempfile
+
+CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'sim_cache'))
+RECORD_FILE = 'record.json'
+
+# (realpath, mtime_ns, size) -> sha256 of the file bytes, so weights are hashed once per process
+_file_hashes = {}
+
+
+def cache_dir(directory=None):
+    """Cache directory in effect, or None when SIM_CACHE=0"""
+    if os.environ.get('SIM_CACHE', '1') == '0':
+        return None
+    return directory or os.environ.get('SIM_CACHE_DIR') or CACHE_DIR
+
+
+def file_hash(filename):
+    """sha256 of a file's contents, memoised on its path, mtime and size"""
+    real = os.path.realpath(filename)
+    st = os.stat(real)
+    sig = (real, st.st_mtime_ns, st.st_size)
+    if sig not in _file_hashes:
+        digest = hashlib.sha256()
+        with open(real, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        _file_hashes[sig] = digest.hexdigest()
+    return _file_hashes[sig]
+
+
+def hash_paths(paths):
+    """One digest over files and directory trees (relative names and contents)"""
+    digest = hashlib.sha256()
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path, followlinks=True):
+                dirs[:] = sorted(d for d in dirs if not d.startswith(('.', '__')))
+                for name in sorted(files):
+                    full = os.path.join(root, name)
+                    digest.update(os.path.relpath(full, path).encode() + b'\0')
+                    digest.update(file_hash(full).encode())
+        elif os.path.exists(path):
+            digest.update(os.path.basename(path).encode() + b'\0' + file_hash(path).encode())
+        else:
+            digest.update(b'<missing>' + os.path.basename(path).encode())
+    return digest.hexdigest()
+
+
+def cache_key(rtl_files, weights_dir, inputs, extra=()):
+    """Key of one simulation: hashes of the RTL, the weights and the inputs, plus extra settings"""
+    digest = hashlib.sha256()
+    for part in (hash_paths(rtl_files), hash_paths([weights_dir] if weights_dir else []), hash_paths(inputs)):
+        digest.update(part.encode())
+    digest.update(json.dumps([str(x) for x in extra]).encode())
+    return digest.hexdigest()
+
+
+def _entry_dir(key, directory):
+    return os.path.join(directory, key[:2], key)
+
+
+def lookup(key, directory=None):
+    """Cached record for a key, or None"""
+    directory = cache_dir(directory)
+    if directory is None:
+        return None
+    record_file = os.path.join(_entry_dir(key, directory), RECORD_FILE)
+    if not os.path.exists(record_file):
+        return None
+    with open(record_file, 'r') as f:
+        return json.load(f)
+
+
+def restore(key, dest_dir, directory=None):
+    """Copy a cached entry's output files into dest_dir; returns the restored file names"""
+    entry = _entry_dir(key, cache_dir(directory))
+    names = [n for n in sorted(os.listdir(entry)) if n != RECORD_FILE]
+    for name in names:
+        shutil.copy(os.path.join(entry, name), os.path.join(dest_dir, name))
+    return names
+
+
+def store(key, record, files=(), directory=None):
+    """Save a record and copies of its output files under key
+
+    The entry is assembled in a temporary directory and renamed into place,
+    so parallel jobs never see a half-written entry.
+    """
+    directory = cache_dir(directory)
+    if directory is None:
+        return None
+    entry = _entry_dir(key, directory)
+    if os.path.exists(entry):
+        return entry
+    os.makedirs(os.path.dirname(entry), exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=os.path.dirname(entry), prefix='.tmp_')
+    for filename in files:
+        if os.path.exists(filename):
+            shutil.copy(filename, os.path.join(tmp, os.path.basename(filename)))
+    with open(os.path.join(tmp, RECORD_FILE), 'w') as f:
+        json.dump(dict(record, key=key), f, indent=2)
+    try:
+        os.rename(tmp, entry)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)  # another job stored the same key first
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the simulation result cache")
+    parser.add_argument('--dir', type=str, default=None, help='Cache directory (default: SIM_CACHE_DIR or sim_cache/)')
+    parser.add_argument('--clear', action='store_true', help='Delete every cached result')
+    args = parser.parse_args()
+
+    directory = args.dir or os.environ.get('SIM_CACHE_DIR') or CACHE_DIR
+    if args.clear:
+        shutil.rmtree(directory, ignore_errors=True)
+        print(f"🗑️ Cleared {directory}")
+        return
+    if not os.path.isdir(directory):
+        print(f"📭 No cache at {directory}")
+        sys.exit(0)
+    entries = [os.path.join(root, RECORD_FILE) for root, _, files in os.walk(directory) if RECORD_FILE in files]
+    size = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(directory) for f in files)
+    print(f"📦 {len(entries)} cached simulation(s) in {directory} ({size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+Parallel simulation job runner
+Gives every test case its own scratch directory (input image, transcript,
+testbench outputs) that mirrors the models/ tree through symlinks, runs up to
+N simulator processes at once and collects the results into one summary.
+Nothing is copied onto the shared test_image.mem any more, so cases no
+longer have to run one after another. The RTL is compiled once per content
+hash into a shared work library; each job then only elaborates and
+simulates, receiving its image through +IMAGE=. Without a library each job
+runs its own copy of the .do script with the plusargs on the script's vsim
+line, since plusargs given to `vsim -c -do` never reach that inner vsim. With --batch-size N the
+images are packed N at a time into one batch stream (see image_batch.py), so
+each simulator launch classifies N images back to back. Passing runs are
+recorded in the content-addressed result cache (sim_cache.py) and replayed
+from it when the RTL, weights and image are unchanged. Jobs run under the
+stall watchdog (sim_watchdog.py), which kills a simulation as soon as its
+heartbeat stops showing progress rather than after a fixed timeout.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import asyncio
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from image_batch import write_image_batch, batch_name, BATCH_MEM, BATCH_INDEX
+from log_parser import parse_log
+from results_jsonl import read_results, FULL_SYSTEM_RESULTS
+from sim_watchdog import watch_process, STALL_TIMEOUT, HEARTBEAT_CYCLES
+import sim_cache
+
+MODELS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'models'))
+WEIGHTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'hardware', 'memory_files'))
+DO_FILE = 'FULL_TOP/run_tb_full_system_top.do'
+IMAGE_NAME = 'test_image.mem'
+TRANSCRIPT = 'transcript.log'
+JOB_DO_FILE = 'job_run.do'
+OUTPUTS_FILE = 'full_system_outputs.txt'
+LOG_FILE = 'full_system_testbench.log'
+RESULTS_FILE = FULL_SYSTEM_RESULTS
+# Entries of models/ that belong to a single run and must not be shared
+PRIVATE_ENTRIES = {'work', 'transcript', 'modelsim.ini', '__pycache__'}
+TOP_MODULE = 'tb_full_system_top'
+LIB_ROOT = 'sim_libs'
+COMPILED_MARKER = '.compiled'
+# Fixed per-job limit in seconds when no stall watchdog can run
+TIMEOUT = 300
+
+
+def rtl_sources(do_file=DO_FILE, project_dir=MODELS_DIR):
+    """Absolute paths of the files a ModelSim script compiles with vlog, in order"""
+    sources = []
+    with open(os.path.join(project_dir, do_file), 'r') as f:
+        for line in f:
+            words = line.split('#')[0].split()
+            if words and words[0] == 'vlog':
+                sources += [os.path.join(project_dir, w) for w in words[1:] if not w.startswith('-')]
+    return sources
+
+
+def rtl_hash(sources):
+    """Content hash of the RTL sources (names and bytes), used to key compiled libraries"""
+    digest = hashlib.sha256()
+    for src in sources:
+        digest.update(os.path.basename(src).encode() + b'\0')
+        with open(src, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def compile_library(sources, lib_root=LIB_ROOT, simulator=('vsim',), timeout=600):
+    """Compile the sources into a work library once per RTL hash and return its path
+
+    A library whose marker file exists is reused as-is; otherwise it is built
+    from scratch with a generated vlib/vlog script.
+    """
+    lib_dir = os.path.abspath(os.path.join(lib_root, f'work_{rtl_hash(sources)}'))
+    if os.path.exists(os.path.join(lib_dir, COMPILED_MARKER)):
+        return lib_dir
+    if os.path.exists(lib_dir):
+        shutil.rmtree(lib_dir)
+    os.makedirs(lib_root, exist_ok=True)
+
+    script = lib_dir + '.compile.do'
+    with open(script, 'w') as f:
+        f.write(f"vlib {lib_dir}\n")
+        for src in sources:
+            f.write(f"vlog -sv -work {lib_dir} {src}\n")
+        f.write("quit -f\n")
+    with open(lib_dir + '.compile.log', 'w') as log:
+        result = subprocess.run(list(simulator) + ['-c', '-do', script], cwd=os.path.abspath(lib_root),
+                                stdout=log, stderr=subprocess.STDOUT, timeout=timeout)
+    if result.returncode != 0 or not os.path.isdir(lib_dir):
+        raise RuntimeError(f"RTL compilation failed, see {lib_dir}.compile.log")
+    with open(os.path.join(lib_dir, COMPILED_MARKER), 'w') as f:
+        f.write('\n'.join(sources) + '\n')
+    return lib_dir
+
+
+def _make_job_dir(work_root, name, project_dir, weights_dir):
+    """Fresh run directory mirroring project_dir through symlinks"""
+    job_dir = os.path.abspath(os.path.join(work_root, name))
+    if os.path.exists(job_dir):
+        shutil.rmtree(job_dir)
+    os.makedirs(job_dir)
+
+    # Sources are shared read-only; the work library and outputs stay private
+    for entry in os.listdir(project_dir):
+        if entry not in PRIVATE_ENTRIES:
+            os.symlink(os.path.join(project_dir, entry), os.path.join(job_dir, entry))
+    if weights_dir and not os.path.lexists(os.path.join(job_dir, 'memory_files')):
+        os.symlink(os.path.abspath(weights_dir), os.path.join(job_dir, 'memory_files'))
+    return job_dir
+
+
+def prepare_job(work_root, name, image_file, project_dir=MODELS_DIR, weights_dir=WEIGHTS_DIR,
+                image_name=IMAGE_NAME):
+    """Create an isolated run directory for one image and return its job description"""
+    job_dir = _make_job_dir(work_root, name, project_dir, weights_dir)
+    shutil.copy(image_file, os.path.join(job_dir, image_name))
+
+    return {'name': name, 'image': os.path.abspath(image_file), 'dir': job_dir, 'image_name': image_name}
+
+
+def prepare_batch_job(work_root, name, image_files, project_dir=MODELS_DIR, weights_dir=WEIGHTS_DIR):
+    """Like prepare_job() but for a batch: the images are packed into one stream plus index"""
+    job_dir = _make_job_dir(work_root, name, project_dir, weights_dir)
+    entries = write_image_batch(image_files, os.path.join(job_dir, BATCH_MEM), os.path.join(job_dir, BATCH_INDEX))
+
+    return {'name': name, 'image': os.path.join(job_dir, BATCH_MEM), 'dir': job_dir, 'image_name': BATCH_MEM,
+            'batch': entries}
+
+
+def split_batch_result(result, job):
+    """Per-image result records of a finished batch job, in index order
+
+    Images the testbench never reached (crash or timeout mid-batch) keep the
+    batch status, or 'no_output' if the batch itself passed.
+    """
+    records = []
+    for i, entry in enumerate(job['batch']):
+        scores = result['batch_scores'][i] if i < len(result['batch_scores']) else None
+        status = 'passed' if scores else ('no_output' if result['status'] == 'passed' else result['status'])
+        cycles = result['batch_cycles'][i] if i < len(result['batch_cycles'] or []) else None
+        record = {k: v for k, v in result.items() if k not in ('batch_scores', 'batch_cycles')}
+        record.update(name=entry['name'], image=entry['image'], status=status, scores=scores, cycles=cycles,
+                      batch=job['name'], seconds=round(result['seconds'] / len(job['batch']), 3))
+        records.append(record)
+    return records
+
+
+def read_scores(filename):
+    """Scores of every '=== Test N: name ===' section of a full_system_outputs.txt file"""
+    tests = []
+    with open(filename, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('=== Test'):
+                tests.append([])
+            elif line and tests:
+                value = int(line, 16)
+                tests[-1].append(value - 0x10000 if value & 0x8000 else value)
+    return tests
+
+
+def read_cycles(filename):
+    """Cycle count of every test in a testbench log, in test order"""
+    cycles = {r['test']: r['cycles'] for r in parse_log(filename) if r['type'] == 'cycles'}
+    return [cycles[k] for k in sorted(cycles)]
+
+
+def job_cache_key(job, do_file=DO_FILE, plusargs=(), top=TOP_MODULE, library=None):
+    """Result-cache key of a job: its RTL sources, linked weights, input image(s), run mode and plusargs
+
+    The run mode (precompiled library or per-job .do script) and the full
+    job_plusargs() are part of the key, so a result is only replayed for the
+    same launch that produced it.
+    """
+    do_path = os.path.join(job['dir'], do_file)
+    sources = rtl_sources(do_file, job['dir']) if os.path.exists(do_path) else []
+    weights = os.path.join(job['dir'], 'memory_files')
+    inputs = [os.path.join(job['dir'], job['image_name'])]
+    if job.get('batch'):
+        inputs.append(os.path.join(job['dir'], BATCH_INDEX))
+    mode = 'library' if library else f'do={do_file}'
+    return sim_cache.cache_key(sources, weights if os.path.exists(weights) else None, inputs,
+                               [mode, top] + job_plusargs(job, plusargs))
+
+
+def job_plusargs(job, plusargs=()):
+    """Plusargs handing a job's image (+IMAGE=/+NAME=) or batch (+BATCH=) to the testbench, then plusargs"""
+    if job.get('batch'):
+        return [f"+BATCH={BATCH_MEM}", f"+BATCH_INDEX={BATCH_INDEX}"] + list(plusargs)
+    return [f"+IMAGE={job['image_name']}", f"+NAME={job['name']}"] + list(plusargs)
+
+
+def write_job_script(job, do_file=DO_FILE, plusargs=()):
+    """Copy of a .do script in the job directory with plusargs added to its vsim lines
+
+    The copy ends with `quit -f` so the batch-mode simulator exits when the
+    script is done. Returns the script name relative to the job directory.
+    """
+    lines = []
+    with open(os.path.join(job['dir'], do_file), 'r') as f:
+        for line in f:
+            code = line.split('#')[0].rstrip()
+            if code.split()[:1] == ['vsim']:
+                line = ' '.join([code] + list(plusargs)) + '\n'
+            lines.append(line)
+    with open(os.path.join(job['dir'], JOB_DO_FILE), 'w') as f:
+        f.writelines(lines + ['\nquit -f\n'])
+    return JOB_DO_FILE
+
+
+def job_command(job, simulator=('vsim',), do_file=DO_FILE, plusargs=(), library=None, top=TOP_MODULE):
+    """Simulator command line of a job
+
+    With a precompiled library only elaboration and simulation run; otherwise
+    a per-job copy of the .do script (write_job_script) compiles and
+    simulates in one go. Either way the testbench gets job_plusargs().
+    """
+    plusargs = job_plusargs(job, plusargs)
+    if library:
+        return list(simulator) + ['-c', '-t', 'ps', '-lib', library, top] + plusargs + ['-do', 'run -all; quit -f']
+    return list(simulator) + ['-c', '-do', write_job_script(job, do_file, plusargs)]
+
+
+def _cached_result(job, key, cache_dir, start):
+    """Result record replayed from the cache, or None on a miss"""
+    record = sim_cache.lookup(key, cache_dir) if key else None
+    if not record:
+        return None
+    sim_cache.restore(key, job['dir'], cache_dir)
+    return dict(record, name=job['name'], image=job['image'], dir=job['dir'],
+                transcript=os.path.join(job['dir'], TRANSCRIPT), seconds=round(time.time() - start, 3), cached=True)
+
+
+def _finish_job(job, status, returncode, start, key=None, cache_dir=None):
+    """Collect a finished job's scores and cycles into its result record and cache passing runs"""
+    outputs = os.path.join(job['dir'], OUTPUTS_FILE)
+    log = os.path.join(job['dir'], LOG_FILE)
+    results_file = os.path.join(job['dir'], RESULTS_FILE)
+    transcript = os.path.join(job['dir'], TRANSCRIPT)
+    if os.path.exists(results_file):
+        # Structured channel: no text scraping needed
+        res = read_results(results_file)
+        scores = [row.tolist() if ok else None for row, ok in zip(res['scores'], res['passed'])]
+        cycles = res['cycles'].tolist()
+    else:
+        scores = read_scores(outputs) if os.path.exists(outputs) else []
+        cycles = read_cycles(log) if os.path.exists(log) else []
+    if status == 'passed' and not any(scores):
+        status = 'no_output'
+    result = {
+        'name': job['name'],
+        'image': job['image'],
+        'dir': job['dir'],
+        'status': status,
+        'returncode': returncode,
+        'seconds': round(time.time() - start, 3),
+        'transcript': transcript,
+        'scores': scores[0] if scores else None,
+        'cycles': cycles[0] if cycles else None,
+        'batch_scores': scores if job.get('batch') else None,
+        'batch_cycles': cycles if job.get('batch') else None,
+        'cached': False,
+    }
+    if key and status == 'passed':
+        sim_cache.store(key, {k: result[k] for k in ('status', 'returncode', 'seconds', 'scores', 'cycles',
+                                                    'batch_scores', 'batch_cycles')},
+                        [outputs, log, results_file, transcript], cache_dir)
+    return result
+
+
+def run_job(job, simulator=('vsim',), do_file=DO_FILE, timeout=TIMEOUT, plusargs=(), library=None, top=TOP_MODULE,
+            cache_dir=None, verbosity=None):
+    """Run the simulator inside the job directory and return a result record
+
+    See job_command() for how the job is launched. With a cache_dir, a run
+    whose inputs are already cached is replayed from there. verbosity (0-3)
+    is passed on as +VERBOSITY=; regressions use 0 so the transcript holds
+    only the per-test summary.
+    """
+    if verbosity is not None:
+        plusargs = list(plusargs) + [f"+VERBOSITY={verbosity}"]
+    start = time.time()
+    key = job_cache_key(job, do_file, plusargs, top, library) if cache_dir else None
+    cached = _cached_result(job, key, cache_dir, start)
+    if cached:
+        return cached
+
+    cmd = job_command(job, simulator, do_file, plusargs, library, top)
+    transcript = os.path.join(job['dir'], TRANSCRIPT)
+    try:
+        with open(transcript, 'w') as log:
+            proc = subprocess.run(cmd, cwd=job['dir'], stdout=log, stderr=subprocess.STDOUT, timeout=timeout)
+        returncode = proc.returncode
+        status = 'passed' if returncode == 0 else 'failed'
+    except subprocess.TimeoutExpired:
+        returncode, status = None, 'timeout'
+    except OSError as e:
+        with open(transcript, 'a') as log:
+            log.write(f"\nFailed to start {cmd[0]}: {e}\n")
+        returncode, status = None, 'error'
+    return _finish_job(job, status, returncode, start, key, cache_dir)
+
+
+async def run_job_async(job, simulator=('vsim',), do_file=DO_FILE, timeout=None, plusargs=(), library=None,
+                        top=TOP_MODULE, cache_dir=None, verbosity=None, stall_timeout=STALL_TIMEOUT,
+                        heartbeat=HEARTBEAT_CYCLES):
+    """run_job() under the progress watchdog (see sim_watchdog.py)
+
+    The testbench prints a heartbeat every `heartbeat` cycles and the job is
+    killed with status 'stalled' once its output counters stop moving for
+    stall_timeout seconds. Without a library the job compiles first, which
+    prints no heartbeat, so it falls back to the fixed TIMEOUT.
+    """
+    if verbosity is not None:
+        plusargs = list(plusargs) + [f"+VERBOSITY={verbosity}"]
+    start = time.time()
+    key = job_cache_key(job, do_file, plusargs, top, library) if cache_dir else None
+    cached = _cached_result(job, key, cache_dir, start)
+    if cached:
+        return dict(cached, sim_cycles=None, cycles_per_second=None)
+
+    if library:
+        plusargs = list(plusargs) + [f"+HEARTBEAT={heartbeat}"]
+    else:
+        stall_timeout, timeout = None, timeout or TIMEOUT
+    cmd = job_command(job, simulator, do_file, plusargs, library, top)
+    watched = await watch_process(cmd, job['dir'], os.path.join(job['dir'], TRANSCRIPT), stall_timeout, timeout)
+    result = _finish_job(job, watched['status'], watched['returncode'], start, key, cache_dir)
+    result.update(sim_cycles=watched['sim_cycles'], cycles_per_second=watched['cycles_per_second'])
+    return result
+
+
+def _report(result, done, total):
+    flag = "♻️" if result.get('cached') else ("✅" if result['status'] == 'passed' else "❌")
+    rate = f", {result['cycles_per_second']:,.0f} cycles/s" if result.get('cycles_per_second') else ""
+    print(f"  {flag} [{done}/{total}] {result['name']}: {result['status']} ({result['seconds']:.1f}s{rate})")
+
+
+async def _run_jobs_async(jobs, workers, progress, **run_kwargs):
+    slots = asyncio.Semaphore(workers)
+    results = [None] * len(jobs)
+
+    async def one(i, job):
+        async with slots:
+            return i, await run_job_async(job, **run_kwargs)
+
+    for done, task in enumerate(asyncio.as_completed([one(i, job) for i, job in enumerate(jobs)]), 1):
+        i, result = await task
+        results[i] = result
+        if progress:
+            _report(result, done, len(jobs))
+    return results
+
+
+def run_jobs(jobs, workers=None, progress=True, stall_timeout=None, **run_kwargs):
+    """Run jobs with up to `workers` simulator processes at once; results keep job order
+
+    With a stall_timeout the jobs run on an asyncio loop under the progress
+    watchdog (run_job_async) instead of one thread per blocking subprocess.
+    """
+    workers = workers or os.cpu_count() or 1
+    if stall_timeout:
+        return asyncio.run(_run_jobs_async(jobs, workers, progress, stall_timeout=stall_timeout, **run_kwargs))
+    results = [None] * len(jobs)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_job, job, **run_kwargs): i for i, job in enumerate(jobs)}
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results[futures[future]] = result
+            if progress:
+                _report(result, done, len(jobs))
+    return results
+
+
+def write_summary(results, filename):
+    """Write all job results plus totals as one JSON summary"""
+    counts = {}
+    for r in results:
+        counts[r['status']] = counts.get(r['status'], 0) + 1
+    summary = {
+        'total_jobs': len(results),
+        'status_counts': counts,
+        'cache_hits': sum(1 for r in results if r.get('cached')),
+        'total_sim_seconds': round(sum(r['seconds'] for r in results), 3),
+        'jobs': results,
+    }
+    with open(filename, 'w') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run full-system simulations for many images in parallel")
+    parser.add_argument('images', nargs='+', help='Image .mem files, one simulation job each')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count(), help='Simulator processes at once')
+    parser.add_argument('--work-root', type=str, default='sim_jobs', help='Parent of the per-job scratch directories')
+    parser.add_argument('--models-dir', type=str, default=MODELS_DIR, help='RTL tree the .do file expects')
+    parser.add_argument('--weights', type=str, default=WEIGHTS_DIR, help='Weight .mem directory linked as memory_files/')
+    parser.add_argument('--do', type=str, default=DO_FILE, help='ModelSim script, relative to the models tree')
+    parser.add_argument('--simulator', type=str, default='vsim', help='Simulator command (may include arguments)')
+    parser.add_argument('--timeout', type=int, default=None,
+                        help=f'Hard limit per job in seconds (default: none with the watchdog, {TIMEOUT} without)')
+    parser.add_argument('--stall-timeout', type=float, default=STALL_TIMEOUT,
+                        help='Kill a job after this many seconds without progress (0: fixed timeout only)')
+    parser.add_argument('--summary', type=str, default=None, help='Summary JSON (default: <work-root>/summary.json)')
+    parser.add_argument('--lib-root', type=str, default=LIB_ROOT, help='Cache of compiled work libraries')
+    parser.add_argument('--recompile-each', action='store_true',
+                        help='Run the full .do script (compile + simulate) in every job')
+    parser.add_argument('--no-cache', action='store_true', help='Always simulate, ignoring the result cache')
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help='Images streamed through one simulator launch (+BATCH= mode)')
+    parser.add_argument('--verbosity', type=int, default=0, choices=range(4),
+                        help='Testbench/RTL transcript detail (0: summary only, 3: per-cycle trace)')
+    args = parser.parse_args()
+
+    simulator = args.simulator.split()
+    library = None
+    if not args.recompile_each:
+        sources = rtl_sources(args.do, args.models_dir)
+        start = time.time()
+        library = compile_library(sources, args.lib_root, simulator)
+        print(f"🔧 Work library {library} ready ({len(sources)} sources, {time.time() - start:.1f}s)")
+
+    if args.batch_size > 1:
+        batches = [args.images[i:i + args.batch_size] for i in range(0, len(args.images), args.batch_size)]
+        print(f"🚀 Preparing {len(batches)} batch job(s) of up to {args.batch_size} images under {args.work_root}/")
+        jobs = [prepare_batch_job(args.work_root, f'batch_{i:04d}', images, args.models_dir, args.weights)
+                for i, images in enumerate(batches)]
+    else:
+        print(f"🚀 Preparing {len(args.images)} job(s) under {args.work_root}/")
+        jobs = [prepare_job(args.work_root, batch_name(image), image, args.models_dir, args.weights)
+                for image in args.images]
+    # The watchdog replaces the fixed limit unless one is asked for
+    timeout = args.timeout or (None if args.stall_timeout else TIMEOUT)
+    if timeout:
+        timeout *= max(1, args.batch_size)
+    start = time.time()
+    results = run_jobs(jobs, args.jobs, simulator=simulator, do_file=args.do, timeout=timeout,
+                       library=library, cache_dir=None if args.no_cache else sim_cache.cache_dir(),
+                       verbosity=args.verbosity, stall_timeout=args.stall_timeout)
+    if args.batch_size > 1:
+        results = [r for job, result in zip(jobs, results) for r in split_batch_result(result, job)]
+    summary = write_summary(results, args.summary or os.path.join(args.work_root, 'summary.json'))
+
+    print(f"\n📊 {summary['status_counts'].get('passed', 0)}/{len(results)} passed in {time.time() - start:.1f}s "
+          f"wall ({summary['total_sim_seconds']:.1f}s simulator time, {args.jobs} parallel, "
+          f"{summary['cache_hits']} from cache)")
+    sys.exit(0 if summary['status_counts'].get('passed', 0) == len(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
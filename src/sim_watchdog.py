@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Simulation progress watchdog
+Runs a simulator process under asyncio, copies its output into the job
+transcript as it arrives and follows the progress markers the testbench
+prints: +HEARTBEAT=<n> lines, or the "Cycle N: First outputs=.., BNeck
+outputs=.." lines at verbosity 2 and up. A job whose first-layer/BNECK output
+counts stop moving for stall_timeout seconds is killed right away instead of
+holding its core until a fixed timeout, and every job reports how many
+simulated cycles it got through per wall-clock second.
+"""
+
+import os
+import sys
+import time
+import signal
+import asyncio
+import argparse
+from log_parser import parse_line
+
+STALL_TIMEOUT = 60
+HEARTBEAT_CYCLES = 10000
+# Records that mean the testbench moved on even without a heartbeat
+MILESTONES = ('test', 'cycles', 'timeout')
+LINE_LIMIT = 1 << 20
+
+
+class ProgressTracker:
+    """Last time a job made progress, and how far it got in simulated cycles
+
+    Until the first progress marker arrives any output counts as progress
+    (compilation, elaboration, weight loading); after that only a change in
+    the marker counters or a finished test does, so a testbench that keeps
+    printing identical heartbeats while waiting on a hung design still stalls.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.start = self.last_progress = clock()
+        self.marker = None
+        self.heartbeat_cycle = 0
+        self.completed_cycles = 0
+
+    def feed(self, line):
+        """Account for one line of simulator output; returns its record (or None)"""
+        now = self.clock()
+        rec = parse_line(line)
+        if rec is None or rec['type'] not in MILESTONES + ('progress',):
+            if self.marker is None:
+                self.last_progress = now
+            return rec
+        if rec['type'] == 'progress':
+            marker = (rec['test'], rec['first'], rec['bneck'], rec['state'])
+            if marker != self.marker:
+                self.marker, self.last_progress = marker, now
+            if rec['heartbeat']:
+                self.heartbeat_cycle = max(self.heartbeat_cycle, rec['cycle'])
+        else:
+            self.last_progress = now
+            if self.marker is None:
+                self.marker = ()
+            if rec['type'] != 'test':
+                self.completed_cycles += rec['cycles']
+        return rec
+
+    @property
+    def sim_cycles(self):
+        """Simulated cycles so far: the latest heartbeat, or the finished tests' cycle counts"""
+        return max(self.heartbeat_cycle, self.completed_cycles)
+
+    def stats(self):
+        """Progress summary as stored in the job result"""
+        seconds = max(self.clock() - self.start, 1e-6)
+        return {'sim_cycles': self.sim_cycles, 'cycles_per_second': round(self.sim_cycles / seconds, 1),
+                'idle_seconds': round(self.clock() - self.last_progress, 3)}
+
+
+def _kill(proc):
+    """Kill the simulator and everything it started (vsim forks vsimk)"""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+
+
+async def _read_line(stream):
+    """Next output line; an over-long line comes back in chunks of up to LINE_LIMIT bytes, EOF as b''"""
+    try:
+        return await stream.readuntil(b'\n')
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+    except asyncio.LimitOverrunError as e:
+        # readline() would discard the buffered bytes here; keep them as one chunk
+        return await stream.readexactly(e.consumed)
+
+
+async def watch_process(cmd, cwd, transcript, stall_timeout=STALL_TIMEOUT, timeout=None):
+    """Run cmd in cwd, stream its output into transcript and kill it once it stalls
+
+    Returns a dict with 'status' (passed, failed, stalled, timeout or error),
+    'returncode' and the ProgressTracker stats. stall_timeout=None disables
+    stall detection; timeout is an optional hard limit in seconds.
+    """
+    tracker = ProgressTracker()
+    try:
+        proc = await asyncio.create_subprocess_exec(*cmd, cwd=cwd, stdout=asyncio.subprocess.PIPE,
+                                                    stderr=asyncio.subprocess.STDOUT, limit=LINE_LIMIT,
+                                                    start_new_session=True)
+    except OSError as e:
+        with open(transcript, 'a') as log:
+            log.write(f"\nFailed to start {cmd[0]}: {e}\n")
+        return dict(tracker.stats(), status='error', returncode=None)
+
+    status = None
+    with open(transcript, 'w', encoding='utf-8') as log:
+        while True:
+            now = tracker.clock()
+            deadlines = []
+            if stall_timeout:
+                deadlines.append((tracker.last_progress + stall_timeout, 'stalled'))
+            if timeout:
+                deadlines.append((tracker.start + timeout, 'timeout'))
+            deadline, reason = min(deadlines) if deadlines else (None, None)
+            if deadline is not None and deadline <= now:
+                status = reason
+                break
+            try:
+                line = await asyncio.wait_for(_read_line(proc.stdout), None if deadline is None else deadline - now)
+            except asyncio.TimeoutError:
+                continue
+            if not line:
+                break
+            text = line.decode('utf-8', errors='replace')
+            log.write(text)
+            tracker.feed(text)
+        if status:
+            log.write(f"\n# Watchdog: killed ({status}, no progress for "
+                      f"{tracker.clock() - tracker.last_progress:.1f}s)\n")
+            _kill(proc)
+    returncode = await proc.wait()
+    if status is None:
+        status = 'passed' if returncode == 0 else 'failed'
+    return dict(tracker.stats(), status=status, returncode=None if status in ('stalled', 'timeout') else returncode)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one simulator command under the stall watchdog")
+    parser.add_argument('command', nargs=argparse.REMAINDER, help='Simulator command line')
+    parser.add_argument('--stall-timeout', type=float, default=STALL_TIMEOUT,
+                        help='Kill after this many seconds without progress (0: never)')
+    parser.add_argument('--timeout', type=float, default=None, help='Hard limit in seconds')
+    parser.add_argument('--transcript', type=str, default='transcript.log', help='Where the output goes')
+    args = parser.parse_args()
+
+    if not args.command:
+        parser.error("no simulator command given")
+    result = asyncio.run(watch_process(args.command, os.getcwd(), args.transcript,
+                                       args.stall_timeout or None, args.timeout))
+    flag = "✅" if result['status'] == 'passed' else "❌"
+    print(f"{flag} {result['status']}: {result['sim_cycles']} cycles, {result['cycles_per_second']:.0f} cycles/s")
+    sys.exit(0 if result['status'] == 'passed' else 1)
+
+
+if __name__ == "__main__":
+    main()
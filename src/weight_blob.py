@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Packed weight image for the hardware accelerator
+Concatenates every exported tensor into one contiguous blob of 16-bit words,
+written both as $readmemh text (one word per line) and as raw little-endian
+binary, with a JSON manifest of per-tensor word offsets, shapes, dtypes and
+Q-formats. Simulation, the golden model and a DDR/BRAM loader can then fetch
+all parameters with a single bulk read.
+"""
+
+import os
+import json
+import argparse
+import numpy as np
+from mem_io import write_mem
+
+BLOB_HEX = 'weights.hex'
+BLOB_BIN = 'weights.bin'
+BLOB_MANIFEST = 'weights_manifest.json'
+WORD_BITS = 16
+# Tensor start offsets are aligned to 16-byte bursts
+ALIGN_WORDS = 8
+
+
+def pack_tensors(tensors, frac_bits=8, align=ALIGN_WORDS, qformats=None):
+    """Pack an ordered list of (key, filename, int array) into one word blob
+
+    Returns (blob as int16 array, list of manifest entries). qformats may map a
+    key to its fractional bit count when it differs from frac_bits, or to a
+    (bits, frac) pair for tensors a Q-format plan stores in narrower words;
+    those are sign-extended into the 16-bit blob words.
+    """
+    entries = []
+    chunks = []
+    offset = 0
+    for key, filename, values in tensors:
+        values = np.asarray(values)
+        pad = (-offset) % align
+        if pad:
+            chunks.append(np.zeros(pad, dtype=np.int16))
+            offset += pad
+        flat = values.astype(np.int64).reshape(-1)
+        chunks.append((flat & 0xFFFF).astype(np.uint16).view(np.int16))
+        fmt = (qformats or {}).get(key, frac_bits)
+        bits, frac = fmt if isinstance(fmt, (tuple, list)) else (WORD_BITS, fmt)
+        entries.append({
+            'key': key,
+            'file': filename,
+            'offset': offset,
+            'length': int(flat.size),
+            'shape': list(values.shape),
+            'dtype': 'int16',
+            'qformat': f'Q{bits - frac}.{frac}',
+            'bits': bits,
+            'frac_bits': frac,
+        })
+        offset += flat.size
+    blob = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int16)
+    return blob, entries
+
+
+def write_weight_blob(output_dir, tensors, frac_bits=8, align=ALIGN_WORDS, qformats=None, extra=None):
+    """Write weights.hex, weights.bin and weights_manifest.json into output_dir"""
+    blob, entries = pack_tensors(tensors, frac_bits, align, qformats)
+    write_mem(os.path.join(output_dir, BLOB_HEX), blob, width=WORD_BITS)
+    blob.astype('<i2').tofile(os.path.join(output_dir, BLOB_BIN))
+
+    manifest = {
+        'word_bits': WORD_BITS,
+        'byte_order': 'little',
+        'align_words': align,
+        'total_words': int(blob.size),
+        'hex_file': BLOB_HEX,
+        'bin_file': BLOB_BIN,
+        'tensors': entries,
+    }
+    manifest.update(extra or {})
+    with open(os.path.join(output_dir, BLOB_MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_weight_blob(output_dir):
+    """Read the binary blob in one go and split it into {key: signed array}"""
+    with open(os.path.join(output_dir, BLOB_MANIFEST), 'r') as f:
+        manifest = json.load(f)
+    blob = np.fromfile(os.path.join(output_dir, manifest['bin_file']), dtype='<i2')
+    if blob.size != manifest['total_words']:
+        raise ValueError(f"{manifest['bin_file']}: {blob.size} words, expected {manifest['total_words']}")
+    params = {}
+    for entry in manifest['tensors']:
+        start = entry['offset']
+        params[entry['key']] = blob[start:start + entry['length']].astype(np.int64).reshape(entry['shape'])
+    return params, manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the tensor map of a packed weight blob")
+    parser.add_argument('directory', help='Directory holding weights_manifest.json')
+    args = parser.parse_args()
+
+    params, manifest = load_weight_blob(args.directory)
+    print(f"📦 {manifest['total_words']} words ({manifest['total_words'] * WORD_BITS // 8} bytes), "
+          f"{len(params)} tensors")
+    for entry in manifest['tensors']:
+        print(f"  0x{entry['offset']:06x}  {entry['length']:>8}  {entry['qformat']:<6} "
+              f"{str(tuple(entry['shape'])):<20} {entry['key']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Shared test data factories
+Imported by the test modules as a plain helper module, so the suite also
+collects under pytest --import-mode=importlib, where one test module cannot
+import another.
+"""
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import golden_model as gm
+import results_db
+import sim_runner
+from mem_io import write_mem
+
+FAKE_VSIM = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_vsim.py')]
+
+TRANSCRIPT = """# Loading work.tb_emergency_system
+# DATA FLOW DEBUG: pixel_in=0x0012
+#
+# === TESTING DISEASE 6: Mass ===
+# DATA FLOW DEBUG: first_layer_out=0x00ff
+#   Class 0 (No Finding): 120
+#   Class 6 (Mass): 900
+# ✅ CORRECT: Expected Mass (Class 6), Predicted Mass (Class 6)
+# Confidence: 900
+# ✅ Test 0 completed successfully in 5021 cycles
+#
+# === TESTING DISEASE 12: Edema ===
+#   Class 0 (No Finding): 700
+#   Class 12 (Edema): 300
+# ❌ INCORRECT: Expected Edema (Class 12), Predicted No Finding (Class 0)
+# Confidence: 700
+# ❌ Test 1 TIMEOUT after 1000000 cycles
+"""
+
+
+def random_params(seed=0, fold_bn=False):
+    """Small random Q8.8 parameters covering the whole layout"""
+    rng = np.random.default_rng(seed)
+    params = {}
+    for key, filename, shape in gm.parameter_layout(fold_bn=fold_bn):
+        if filename.endswith('_gamma.mem'):
+            params[key] = rng.integers(200, 300, size=shape)
+        elif filename.endswith(('_beta.mem', '_biases.mem', '_bias.mem')):
+            params[key] = rng.integers(-16, 16, size=shape)
+        else:
+            params[key] = rng.integers(-40, 40, size=shape)
+    return params
+
+
+def real_tensors(seed=0):
+    """Real-valued parameters whose Q8.8 rounding is the random_params() words"""
+    return {key: value / 256.0 for key, value in random_params(seed).items()}
+
+
+def make_records(expected, predicted, cycles=1000):
+    """Result records of a run, one per (expected, predicted) pair"""
+    return [{'name': f'{e}_case{i}', 'expected': e, 'expected_class': results_db.class_index(e),
+             'predicted': p, 'predicted_class': results_db.class_index(p), 'correct': int(e == p),
+             'cycles': cycles, 'scores': list(range(i, i + 15))}
+            for i, (e, p) in enumerate(zip(expected, predicted))]
+
+
+def make_jobs(tmp_path, count):
+    """Fake models tree plus `count` distinct images, one job each"""
+    project = tmp_path / 'models'
+    (project / 'FULL_TOP').mkdir(parents=True)
+    (project / 'FULL_TOP' / 'run_tb_full_system_top.do').write_text('run -all\n')
+    jobs = []
+    for i in range(count):
+        image = str(tmp_path / f'case{i}.mem')
+        write_mem(image, [i * 100 + k for k in range(45)])
+        jobs.append(sim_runner.prepare_job(str(tmp_path / 'jobs'), f'case{i}', image,
+                                           str(project), weights_dir=None))
+    return jobs
@@ -5,11 +5,17 @@ Tests all disease patterns and provides detailed analysis
 """
 
 import os
+import sys
 import subprocess
 import time
-import shutil
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from sim_runner import prepare_job, run_job, job_cache_key
+import sim_cache
+
+ANALYZER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'analyze_disease_hex_outputs.py')
+
 # Medical conditions mapping
 DISEASE_MAPPING = {
     "normal": "No Finding",
@@ -36,34 +42,31 @@ def test_single_disease(disease_name):
         print("Run: python prepare_disease_images_simple.py --diseases")
         return False
     
-    # Backup current test image
-    if os.path.exists("test_image.mem"):
-        shutil.copy("test_image.mem", "test_image_backup.mem")
-        print("📋 Backed up current test_image.mem")
+    # Give this case its own scratch directory instead of the shared test_image.mem
+    job = prepare_job("disease_jobs", disease_name, disease_file)
+    print(f"📋 Prepared {job['dir']} with {disease_file}")
     
-    # Copy disease pattern to test image
-    shutil.copy(disease_file, "test_image.mem")
-    print(f"📋 Copied {disease_file} to test_image.mem")
-    
-    # Run simulation (if ModelSim is available)
+    # Run simulation (if ModelSim is available, or replay it from the result cache)
     print("🔄 Running hardware simulation...")
     try:
-        # Check if ModelSim is available
-        result = subprocess.run(["vsim", "-version"], 
-                              capture_output=True, text=True, timeout=10)
-        if result.returncode == 0:
-            print("✅ ModelSim found, running simulation...")
+        cache = sim_cache.cache_dir()
+        cached = cache and sim_cache.lookup(job_cache_key(job), cache)
+        if not cached:
+            # Check if ModelSim is available
+            result = subprocess.run(["vsim", "-version"], 
+                                  capture_output=True, text=True, timeout=10)
+        if cached or result.returncode == 0:
+            print("♻️ Cached result found, skipping simulation..." if cached else "✅ ModelSim found, running simulation...")
             
             # Run the simulation
-            sim_result = subprocess.run(["vsim", "-do", "run_tb_full_system_top.do"],
-                                      capture_output=True, text=True, timeout=300)
+            sim_result = run_job(job, timeout=300, cache_dir=cache)
             
-            if sim_result.returncode == 0:
+            if sim_result['status'] == 'passed':
                 print("✅ Simulation completed successfully")
                 
                 # Analyze results
                 print("📊 Analyzing results...")
-                analysis_result = subprocess.run(["python", "analyze_disease_hex_outputs.py"],
+                analysis_result = subprocess.run([sys.executable, ANALYZER], cwd=job['dir'],
                                               capture_output=True, text=True, timeout=60)
                 
                 if analysis_result.returncode == 0:
@@ -76,7 +79,8 @@ def test_single_disease(disease_name):
                         f.write(f"Test Date: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
                         f.write(f"Expected Disease: {DISEASE_MAPPING.get(disease_name, disease_name)}\n")
                         f.write("\n=== SIMULATION OUTPUT ===\n")
-                        f.write(sim_result.stdout)
+                        with open(sim_result['transcript'], 'r', errors='replace') as transcript:
+                            f.write(transcript.read())
                         f.write("\n=== ANALYSIS OUTPUT ===\n")
                         f.write(analysis_result.stdout)
                     
@@ -86,8 +90,7 @@ def test_single_disease(disease_name):
                     print("❌ Analysis failed")
                     print(analysis_result.stderr)
             else:
-                print("❌ Simulation failed")
-                print(sim_result.stderr)
+                print(f"❌ Simulation {sim_result['status']} (see {sim_result['transcript']})")
         else:
             print("⚠️  ModelSim not available, skipping simulation")
             print("📋 To run simulation manually:")
@@ -106,11 +109,6 @@ def test_single_disease(disease_name):
     except Exception as e:
         print(f"❌ Error running simulation: {e}")
     
-    # Restore backup
-    if os.path.exists("test_image_backup.mem"):
-        shutil.copy("test_image_backup.mem", "test_image.mem")
-        print("📋 Restored original test_image.mem")
-    
     return False
 
 def test_all_diseases():
@@ -141,9 +139,6 @@ def test_all_diseases():
     for disease in DISEASE_MAPPING.keys():
         success = test_single_disease(disease)
         results[disease] = success
-        
-        # Small delay between tests
-        time.sleep(1)
     
     # Summary
     print("\n" + "=" * 60)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming activation-range calibration
+"""
+
+import os
+import sys
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+import golden_model as gm
+import calibrate_activations as ca
+from mem_io import write_mem
+from factories import random_params
+
+
+def write_images(directory, count, size=64, seed=0):
+    rng = np.random.default_rng(seed)
+    for i in range(count):
+        Image.fromarray(rng.integers(0, 256, size=(size, size), dtype=np.uint8)).save(
+            os.path.join(directory, f'img_{i:02d}.png'))
+
+
+def test_batches_decode_images_and_skip_unreadable_files(tmp_path):
+    """PNG and .mem files are found recursively, batched in order, and broken files are skipped"""
+    write_images(str(tmp_path), 3)
+    (tmp_path / 'sub').mkdir()
+    write_mem(str(tmp_path / 'sub' / 'img.mem'), np.full((32, 32), 128))
+    (tmp_path / 'broken.png').write_bytes(b'not an image')
+    (tmp_path / 'notes.txt').write_text('ignored')
+
+    paths = ca.find_images(str(tmp_path))
+    assert [os.path.basename(p) for p in paths] == ['broken.png', 'img_00.png', 'img_01.png', 'img_02.png', 'img.mem']
+    batches = list(ca.image_batches(paths, batch_size=2, img_size=32))
+    assert [len(names) for names, _ in batches] == [1, 2, 1]
+    assert batches[0][1].shape == (1, 32, 32) and batches[2][1].max() == 128
+
+    pixels = np.asarray(Image.open(paths[1]).resize((32, 32), Image.BILINEAR), dtype=np.float64)
+    assert np.array_equal(batches[0][1][0], gm.to_fixed(pixels / 255.0))
+
+
+def test_running_statistics_match_the_full_data():
+    """Min/max are exact and histogram percentiles land within one bin of np.percentile"""
+    rng = np.random.default_rng(1)
+    data = rng.standard_normal((40, 3, 50)) * np.array([0.5, 2.0, 8.0])[None, :, None]
+    stats = ca.ActivationStats()
+    for chunk in np.split(data, 4):
+        stats('layer', chunk)
+    entry = stats.summary()['layer']
+
+    assert entry['count'] == data.size and entry['min'] == data.min() and entry['max'] == data.max()
+    assert np.array_equal(entry['channel_max'], data.max(axis=(0, 2)))
+    step = 2.0 ** (1.0 / ca.BINS_PER_OCTAVE)
+    for q in (99.0, 99.9):
+        exact = np.percentile(np.abs(data), q)
+        assert exact <= entry[f'p{q:g}'] <= exact * step * step
+        channel_exact = np.percentile(np.abs(data), q, axis=(0, 2))
+        assert np.all(np.asarray(entry[f'channel_p{q:g}']) >= channel_exact)
+
+
+def test_golden_calibration_gives_datapath_formats(tmp_path):
+    """Calibrating the golden model on an image directory yields per-layer formats it can run"""
+    write_images(str(tmp_path), 5, seed=2)
+    model = gm.GoldenMobileNetV3(random_params())
+    runner = lambda images, hook: model.forward(images, hook=hook)
+    stats, images = ca.calibrate(ca.image_batches(ca.find_images(str(tmp_path)), batch_size=2, img_size=64), runner)
+    cal = ca.calibration_document(stats, images, 'fixed')
+    assert images == 5 and 'linear4' in cal['layers'] and 'bneck.0' in cal['layers']
+
+    scores = model.forward(np.stack([ca.load_image(p, 64) for p in ca.find_images(str(tmp_path))]))
+    peak = np.abs(scores).max()
+    assert cal['layers']['linear4']['abs_max'] == peak / 256.0
+
+    layers = [layer for layer, _, _ in gm.weight_layers()]
+    formats = ca.calibrated_formats(cal, 8, layers=layers)
+    assert set(formats) == set(layers)
+    for fmt in formats.values():
+        bits, frac = fmt['activation']
+        assert bits == 8 and 0 <= frac <= gm.FRAC_BITS and bits - frac <= gm.DATA_WIDTH - gm.FRAC_BITS
+    gm.GoldenMobileNetV3(random_params(), qformats=formats).forward(
+        ca.load_image(ca.find_images(str(tmp_path))[0], 64)[None])
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the RTL vs golden divergence finder
+"""
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+import golden_model as gm
+import compare_activations as ca
+from dump_activations import ActivationDumper
+from factories import random_params
+
+
+def test_first_divergence_is_located(tmp_path):
+    """A corrupted layer in the simulation dumps is reported as the first divergence"""
+    model = gm.GoldenMobileNetV3(random_params())
+    image = np.random.default_rng(6).integers(0, 256, size=(gm.IMG_SIZE, gm.IMG_SIZE))
+    golden_acts = ca.golden_activations(model, image)
+
+    dumper = ActivationDumper([str(tmp_path)])
+
+    def corrupt(name, tensor):
+        if name == 'bneck.2.bn1':
+            tensor = tensor.copy()
+            tensor[0, 0, 0, 5] += 4
+            tensor[0, 0, 0, 6] = ca.SAT_MAX
+        dumper(name, tensor)
+
+    model.forward(image[None], hook=corrupt)
+    rtl_acts = ca.load_dump_dir(str(tmp_path))
+
+    reports, first_bad = ca.find_divergence(rtl_acts, golden_acts, ulp_threshold=1)
+    assert first_bad == 'bneck_2_bn1'
+    bad = next(r for r in reports if r['layer'] == first_bad)
+    assert bad['max_ulp'] >= 4 and bad['rtl_saturated'] >= 1
+    assert all(r['max_ulp'] == 0 for r in reports[:reports.index(bad)])
+    assert len(reports) == len(rtl_acts)
+
+
+def test_flat_golden_dumps_have_no_per_channel_errors():
+    """Word-level errors of a flat golden dump are not reported as channels"""
+    golden = np.arange(24).reshape(2, 3, 4)
+    rtl = golden.reshape(-1).copy()
+    rtl[13] += 3
+    folded = ca.compare_layer(rtl, golden)
+    assert folded['per_channel_max_ulp'] == [0, 3]
+    flat = ca.compare_layer(rtl, golden.reshape(-1))
+    assert flat['max_ulp'] == 3 and flat['per_channel_max_ulp'] is None
+
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    with tempfile.TemporaryDirectory() as d:
+        test_first_divergence_is_located(pathlib.Path(d))
+    test_flat_golden_dumps_have_no_per_channel_errors()
+    print("✅ Divergence finder tests passed")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-layer activation dumper
+"""
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+import golden_model as gm
+import dump_activations as da
+from mem_io import read_mem, write_mem
+from factories import random_params
+
+MEMORY_DIR = os.path.join(os.path.dirname(__file__), '..', 'hardware', 'memory_files')
+
+
+def test_fixed_mode_matches_reference_naming(tmp_path):
+    """Dumped file names line up with the checked-in reference traces"""
+    rng = np.random.default_rng(5)
+    image_files = []
+    for i in range(2):
+        path = str(tmp_path / f'img{i}.mem')
+        write_mem(path, rng.integers(0, 256, size=gm.IMG_SIZE * gm.IMG_SIZE))
+        image_files.append(path)
+
+    model = gm.GoldenMobileNetV3(random_params())
+    acts = {}
+
+    def runner(images, hook):
+        def both(name, tensor):
+            acts[name] = tensor
+            hook(name, tensor)
+        model.forward(images, hook=both)
+
+    da.dump_batches(image_files, str(tmp_path / 'out'), runner, batch_size=2)
+
+    reference = sorted(f for f in os.listdir(MEMORY_DIR) if f.endswith('_act.mem'))
+    dumped = sorted(os.listdir(tmp_path / 'out' / 'img1'))
+    assert set(reference) <= set(dumped)
+
+    # nolinear1 fires twice per block; its file holds the second (post-bn2) tensor
+    words = read_mem(str(tmp_path / 'out' / 'img1' / '05_bneck_0_nolinear1_act.mem'), radix=2, chunk_bits=4)
+    assert np.array_equal(words, acts['bneck.0.nolinear1'][1].reshape(-1)[:da.DUMP_WORDS])
+
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    with tempfile.TemporaryDirectory() as d:
+        test_fixed_mode_matches_reference_naming(pathlib.Path(d))
+    print("✅ Activation dumper tests passed")
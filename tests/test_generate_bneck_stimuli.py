@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Tests for the standalone BNECK stimulus generator
+"""
+
+import os
+import sys
+import json
+import shutil
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+import golden_model as gm
+import generate_bneck_stimuli as gs
+from mem_io import read_mem
+from factories import random_params
+
+
+def test_block_directories_chain(tmp_path):
+    """Each block's stimulus is the previous block's expected output"""
+    model = gm.GoldenMobileNetV3(random_params())
+    image = np.random.default_rng(7).integers(0, 256, size=(gm.IMG_SIZE, gm.IMG_SIZE))
+    dirs = gs.generate_block_dirs(model, image, str(tmp_path), str(tmp_path / 'weights'), blocks=[4, 5])
+    assert [os.path.basename(d) for d in dirs] == ['bneck_4', 'bneck_5']
+
+    expected_4 = read_mem(os.path.join(dirs[0], 'expected.mem'))
+    assert np.array_equal(read_mem(os.path.join(dirs[1], 'input.mem')), expected_4)
+    with open(os.path.join(dirs[1], 'block.json')) as f:
+        block = json.load(f)
+    assert block['parameters']['FEATURE_SIZE'] == 14 and block['output_shape'] == [40, 14, 14]
+    assert '-GEXPANDED_CHANNELS=240' in open(os.path.join(dirs[1], 'run_bneck.do')).read()
+
+    # A simulation that reproduces the golden output checks clean
+    shutil.copy(os.path.join(dirs[1], 'expected.mem'), os.path.join(dirs[1], 'actual.mem'))
+    assert gs.check_block(dirs[1])['max_ulp'] == 0
+    shape = tuple(block['output_shape'])
+    assert np.array_equal(gs.to_raster(gs.from_raster(expected_4, shape)), expected_4)
+
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    with tempfile.TemporaryDirectory() as d:
+        test_block_directories_chain(pathlib.Path(d))
+    print("✅ BNECK stimulus tests passed")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for the NumPy fixed-point golden model
+"""
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+import golden_model as gm
+from mem_io import write_mem
+from factories import random_params
+
+MEMORY_DIR = os.path.join(os.path.dirname(__file__), '..', 'hardware', 'memory_files')
+
+
+def direct_conv(x, w, stride, padding, groups, rounding):
+    """Reference convolution written as plain loops"""
+    n, c, h, wd = x.shape
+    o, cg, k, _ = w.shape
+    xp = np.pad(x, ((0, 0), (0, 0), (padding, padding), (padding, padding)))
+    ho = (h + 2 * padding - k) // stride + 1
+    wo = (wd + 2 * padding - k) // stride + 1
+    out = np.zeros((n, o, ho, wo), dtype=np.int64)
+    for b in range(n):
+        for oc in range(o):
+            for y in range(ho):
+                for xx in range(wo):
+                    acc = 0
+                    for ci in range(cg):
+                        ic = ci if groups == 1 else oc
+                        for i in range(k):
+                            for j in range(k):
+                                acc += int(xp[b, ic, y * stride + i, xx * stride + j]) * int(w[oc, ci, i, j])
+                    acc = gm.wrap(acc, 32)
+                    if rounding:
+                        acc += 128
+                    out[b, oc, y, xx] = gm.wrap(acc >> 8)
+    return out
+
+
+def test_primitives():
+    """Wrap, truncating division and activations follow the RTL expressions"""
+    assert gm.wrap(32768) == -32768
+    assert gm.wrap(-32769) == 32767
+    assert list(gm.div_trunc(np.array([-7, 7]), 2)) == [-3, 3]
+    # 0.25 -> 0.25 * 3.25 / 6 = 0.1354 -> 34 LSB
+    assert gm.hswish(np.array(64)) == 34
+    # 1.0 overflows the 32-bit reciprocal multiply of hswish.sv
+    assert gm.hswish(np.array(256)) == -86
+    # HSwish.sv shifts in a 16-bit context, so 1.0 collapses to 0
+    assert gm.hswish_divider(np.array(256)) == 0
+    assert gm.hsigmoid(np.array(0)) == 128
+
+
+def test_conv2d_matches_direct_loops():
+    """Vectorised convolution equals a naive loop nest for every conv flavour"""
+    rng = np.random.default_rng(1)
+    x = rng.integers(-3000, 3000, size=(2, 3, 7, 7))
+    cases = [
+        (rng.integers(-300, 300, size=(4, 3, 3, 3)), 2, 1, 1, True),
+        (rng.integers(-300, 300, size=(3, 1, 5, 5)), 1, 2, 3, False),
+        (rng.integers(-300, 300, size=(5, 3, 1, 1)), 1, 0, 1, False),
+    ]
+    for w, stride, padding, groups, rounding in cases:
+        got = gm.conv2d(x, w, stride=stride, padding=padding, groups=groups, rounding=rounding)
+        want = direct_conv(x, w, stride, padding, groups, rounding)
+        assert np.array_equal(got, want)
+
+
+def test_batch_matches_single_images():
+    """A batch gives exactly the per-image results"""
+    model = gm.GoldenMobileNetV3(random_params())
+    rng = np.random.default_rng(2)
+    images = rng.integers(0, 256, size=(2, gm.IMG_SIZE, gm.IMG_SIZE))
+    batch = model(images)
+    assert batch.shape == (2, gm.NUM_CLASSES)
+    assert batch.dtype == np.int16
+    for i in range(2):
+        assert np.array_equal(model(images[i]), batch[i:i + 1])
+
+
+def test_hook_order_matches_reference_dumps():
+    """Hook names follow the numbering of the reference activation dumps"""
+    names = []
+
+    def hook(name, tensor):
+        if name not in names:
+            names.append(name)
+
+    gm.GoldenMobileNetV3(random_params()).forward(np.zeros((1, 224, 224)), hook=hook)
+    dumps = sorted((f for f in os.listdir(MEMORY_DIR) if f.endswith('_act.mem')),
+                   key=lambda f: int(f.split('_')[0]))
+    expected = [f.split('_', 1)[1][:-len('_act.mem')] for f in dumps]
+    assert [n.replace('.', '_') for n in names[:len(expected)]] == expected
+
+
+def test_load_parameters_round_trip(tmp_path):
+    """Parameters written as .mem files load back unchanged"""
+    params = random_params(3)
+    for key, filename, shape in gm.parameter_layout():
+        write_mem(str(tmp_path / filename), params[key])
+    loaded = gm.load_parameters(str(tmp_path))
+    for key in params:
+        assert np.array_equal(loaded[key], params[key])
+
+
+def test_folded_layout_loads_and_runs(tmp_path):
+    """A BN-folded export is detected from its manifest and skips every BN stage"""
+    params = random_params(4, fold_bn=True)
+    layout = gm.parameter_layout(fold_bn=True)
+    assert not any(f.endswith(('_gamma.mem', '_beta.mem')) for _, f, _ in layout)
+    for key, filename, shape in layout:
+        write_mem(str(tmp_path / filename), params[key])
+    (tmp_path / gm.FUSION_MANIFEST).write_text('{"mode": "bn_folded"}')
+
+    model = gm.GoldenMobileNetV3.from_mem_dir(str(tmp_path))
+    acts = {}
+    model.forward(np.full((1, 224, 224), 100), hook=lambda name, t: acts.setdefault(name, t))
+    assert acts['bn1'] is acts['conv1']
+    # The folded bias is preloaded into the accumulator as bias << FRAC
+    x = np.arange(-50, 50).reshape(1, 4, 5, 5)
+    w = np.ones((2, 4, 1, 1), dtype=np.int64)
+    with_bias = gm.conv2d(x, w, bias=np.array([3, -3]))
+    assert np.array_equal(with_bias, gm.conv2d(x, w) + np.array([3, -3])[None, :, None, None])
+
+
+if __name__ == "__main__":
+    test_primitives()
+    test_conv2d_matches_direct_loops()
+    test_batch_matches_single_images()
+    test_hook_order_matches_reference_dumps()
+    print("✅ Golden model tests passed")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests for the concatenated batch image stream and its index
+"""
+
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from image_batch import write_image_batch, read_image_batch, read_batch_index, index_path
+from mem_io import write_mem
+
+
+def test_batch_round_trip(tmp_path):
+    """Every image comes back out of the stream at its indexed offset"""
+    rng = np.random.default_rng(0)
+    images = {}
+    for name in ['normal case1', 'pneumonia_case2', 'mass_case3']:
+        images[name] = rng.integers(0, 1 << 16, size=64)
+        write_mem(str(tmp_path / f'{name}.mem'), images[name])
+
+    stream = str(tmp_path / 'batch.mem')
+    files = [str(tmp_path / f'{name}.mem') for name in images]
+    entries = write_image_batch(files, stream, words=64)
+    assert [e['offset'] for e in entries] == [0, 64, 128]
+    assert index_path(stream) == str(tmp_path / 'batch.idx')
+    assert [e['name'] for e in read_batch_index(index_path(stream))] == ['normal_case1', 'pneumonia_case2',
+                                                                         'mass_case3']
+
+    unpacked = read_image_batch(stream)
+    for name, pixels in images.items():
+        assert np.array_equal(unpacked[name.replace(' ', '_')], pixels)
+
+
+def test_batch_rejects_wrong_image_size(tmp_path):
+    """A short image is caught before it can shift every later image in the stream"""
+    write_mem(str(tmp_path / 'short.mem'), [1, 2, 3])
+    with pytest.raises(ValueError, match='expected 224'):
+        write_image_batch([str(tmp_path / 'short.mem')], str(tmp_path / 'batch.mem'), words=224)
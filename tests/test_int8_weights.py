@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for the int8 per-channel weight path
+"""
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+import golden_model as gm
+import int8_weights as iw
+from factories import real_tensors
+
+
+def test_per_channel_scales_reconstruct_the_weights():
+    """Each channel uses the full int8 range and multiplier * 2**-shift tracks its scale"""
+    rng = np.random.default_rng(0)
+    w = rng.normal(size=(6, 4, 3, 3)) * np.array([0.01, 0.1, 1.0, 3.0, 20.0, 0.0])[:, None, None, None]
+    q, scale = iw.quantize_per_channel(w)
+    assert q.shape == w.shape and q.min() >= -128 and q.max() <= 127
+    assert np.array_equal(np.abs(q[:5]).reshape(5, -1).max(axis=1), [127] * 5) and not q[5].any()
+    assert np.all(np.abs(q * scale[:, None, None, None] - w) <= scale[:, None, None, None] / 2 + 1e-12)
+
+    multiplier, shift = iw.multiplier_shift(scale)
+    assert np.all((multiplier[:5] >= 1 << 14) & (multiplier[:5] < 1 << 15)) and multiplier[5] == 0
+    assert np.allclose(multiplier[:5] * 2.0 ** -shift[:5], scale[:5], rtol=2.0 ** -14)
+
+
+def test_int8_layers_track_the_float_result():
+    """Per-channel requantization returns conv and linear results to Q8.8 within an LSB"""
+    rng = np.random.default_rng(1)
+    x = rng.integers(-512, 512, size=(2, 3, 5, 5))
+    w = rng.normal(size=(4, 3, 3, 3)) * 0.2
+    bias = rng.integers(-100, 100, size=4)
+    q, scale = iw.quantize_per_channel(w)
+    out = gm.conv2d(x, q, padding=1, bias=bias, scale=iw.multiplier_shift(scale))
+    windows = np.lib.stride_tricks.sliding_window_view(np.pad(x, ((0, 0), (0, 0), (1, 1), (1, 1))), (3, 3), (2, 3))
+    exact = np.einsum('nchwij,ocij->nohw', windows, q * scale[:, None, None, None])
+    assert np.abs(out - (exact + bias[None, :, None, None])).max() <= 1
+
+    xs = rng.integers(-512, 512, size=(3, 16))
+    ws = rng.normal(size=(5, 16)) * 0.3
+    qs, scales = iw.quantize_per_channel(ws)
+    ref = (xs / 256.0) @ (qs * scales[:, None]).T * 256 + bias[:1]
+    out = gm.linear(xs, qs, bias[:1].repeat(5), scale=iw.multiplier_shift(scales))
+    assert np.abs(out - ref).max() <= 1
+
+
+def test_export_loads_back_as_the_int8_golden_model(tmp_path):
+    """The exported directory rebuilds the same integer model, and the report counts linear3"""
+    tensors = real_tensors()
+    params = iw.export_int8(tensors, str(tmp_path), fold_bn=False)
+    model = gm.GoldenMobileNetV3.from_mem_dir(str(tmp_path))
+    assert all(np.array_equal(model.params[key], value) for key, value in params.items())
+    images = np.random.default_rng(2).integers(0, 256, size=(2, 64, 64))
+    assert np.array_equal(model(images), gm.GoldenMobileNetV3(params).forward(images))
+    assert model.params['linear3.weight'].max() == 127
+
+    report = {row['layer']: row for row in iw.memory_report()}
+    assert report['linear3']['weights'] == 737280
+    assert report['linear3']['int8_bits'] == 737280 * 8 + 1280 * 24
+
+
+def test_onnx_graph_import_dequantizes_and_folds_bn():
+    """QDQ weights are dequantized, scopes map to module names and a trailing BatchNorm folds in"""
+    assert iw.onnx_layer_name('/bneck/bneck.0/se/se/se.1/Conv') == 'bneck.0.se.se.1'
+    assert iw.onnx_layer_name('/bneck/bneck.6/shortcut/shortcut.0/Conv') == 'bneck.6.shortcut.0'
+    assert iw.onnx_layer_name('/linear3/Gemm') == 'linear3'
+
+    rng = np.random.default_rng(3)
+    wq = rng.integers(-127, 128, size=(4, 2, 3, 3)).astype(np.int8)
+    lq = rng.integers(-127, 128, size=(3, 4)).astype(np.int8)
+    gamma, beta = np.array([1.0, 2.0, -0.5]), np.array([0.1, 0.0, -0.2])
+    mean, var = np.array([0.5, 0.0, 1.0]), np.array([1.0, 4.0, 0.25])
+    initializers = {
+        'conv_q': wq, 'conv_s': np.float32(0.02), 'conv_z': np.int8(0), 'conv_b': np.arange(4.0),
+        'fc_q': lq, 'fc_s': np.float32(0.5), 'fc_z': np.int8(0), 'fc_b': np.ones(3),
+        'bn_g': gamma, 'bn_b': beta, 'bn_m': mean, 'bn_v': var,
+    }
+    nodes = [
+        {'op': 'DequantizeLinear', 'name': 'dq1', 'inputs': ['conv_q', 'conv_s', 'conv_z'], 'outputs': ['conv_w'],
+         'attrs': {}},
+        {'op': 'Conv', 'name': '/bneck/bneck.0/conv1/Conv', 'inputs': ['x', 'conv_w', 'conv_b'], 'outputs': ['c'],
+         'attrs': {}},
+        {'op': 'DequantizeLinear', 'name': 'dq2', 'inputs': ['fc_q', 'fc_s', 'fc_z'], 'outputs': ['fc_w'],
+         'attrs': {}},
+        {'op': 'Gemm', 'name': '/linear3/Gemm', 'inputs': ['h', 'fc_w', 'fc_b'], 'outputs': ['g'],
+         'attrs': {'transB': 1}},
+        {'op': 'QuantizeLinear', 'name': 'q3', 'inputs': ['g', 's', 'z'], 'outputs': ['gq'], 'attrs': {}},
+        {'op': 'DequantizeLinear', 'name': 'dq3', 'inputs': ['gq', 's', 'z'], 'outputs': ['gd'], 'attrs': {}},
+        {'op': 'BatchNormalization', 'name': '/bn3/BatchNormalization',
+         'inputs': ['gd', 'bn_g', 'bn_b', 'bn_m', 'bn_v'], 'outputs': ['b'], 'attrs': {'epsilon': 0.0}},
+    ]
+    tensors = iw.onnx_tensors(initializers, nodes)
+    assert np.allclose(tensors['bneck.0.conv1.weight'], wq * np.float32(0.02))
+    assert np.array_equal(tensors['bneck.0.conv1.bias'], np.arange(4.0))
+    g = gamma / np.sqrt(var)
+    assert np.allclose(tensors['linear3.weight'], lq * 0.5 * g[:, None])
+    assert np.allclose(tensors['linear3.bias'], (1.0 - mean) * g + beta)
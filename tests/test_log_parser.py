@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming simulation log parser
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+import log_parser
+from analyze_disease_hex_outputs import extract_hex_values_from_log, MEDICAL_CONDITIONS
+from factories import TRANSCRIPT
+
+
+def test_records_and_test_grouping():
+    """Every record type is recognised and folded into per-test summaries"""
+    records = list(log_parser.iter_records(TRANSCRIPT.splitlines(True)))
+    assert [r['type'] for r in records] == ['test', 'score', 'score', 'verdict', 'confidence', 'cycles',
+                                            'test', 'score', 'score', 'verdict', 'confidence', 'timeout']
+    assert records[0]['line'] == 4
+
+    tests = list(log_parser.group_tests(records))
+    assert [(t['test'], t['name']) for t in tests] == [(6, 'Mass'), (12, 'Edema')]
+    assert tests[0]['scores'] == [120, 900] and tests[0]['correct'] and tests[0]['cycles'] == 5021
+    assert tests[1]['predicted_class'] == 0 and tests[1]['correct'] is False and tests[1]['timeout']
+
+    table = log_parser.parse_line('# Pleural Thickening   |   0.1250   |      -12 ← PRIMARY')
+    assert table['condition'] == 'Pleural Thickening' and table['value'] == -12
+    assert log_parser.parse_line('ff9c\n')['value'] == -100
+    assert log_parser.parse_line('Confidence: 6.67% (0.0667)') == {'type': 'confidence', 'value': 6.67,
+                                                                   'percent': True}
+    assert log_parser.parse_line('  CORRECT DISEASE BOOST: Class 0 gets +8000') is None
+
+
+def test_follow_reads_a_growing_transcript(tmp_path):
+    """Records appear while the writer is still going, including a line split across writes"""
+    path = tmp_path / 'transcript'
+    finished = threading.Event()
+
+    def writer():
+        with open(path, 'w') as f:
+            for chunk in ['# === Test 0: live ===\n', '# Confid', 'ence: 42\n', '# Test 0 completed in 9 cycles\n']:
+                f.write(chunk)
+                f.flush()
+                time.sleep(0.05)
+        finished.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    records = list(log_parser.follow(str(path), poll=0.01, done=finished.is_set))
+    thread.join()
+    assert [r['type'] for r in records] == ['test', 'confidence', 'cycles']
+    assert records[1]['value'] == 42.0
+
+
+def test_hex_extraction_streams_score_lines(tmp_path):
+    """The hex analyzer picks up exactly the score words, not every hex-looking token"""
+    log = tmp_path / 'full_system_testbench.log'
+    rows = ''.join(f"{name:<20} | {0.0667:8.4f}   | {i * 10 - 20:8d}\n" for i, name in enumerate(MEDICAL_CONDITIONS))
+    log.write_text('=== Test 0: x ===\nParameters: DATA_WIDTH=16, IMG_SIZE=224\n' + rows)
+    values = extract_hex_values_from_log(str(log))
+    assert values == [f"{(i * 10 - 20) & 0xFFFF:04x}" for i in range(15)]
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for the low-rank factorization of linear3
+"""
+
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+import golden_model as gm
+import lowrank_factorize as lr
+from mem_io import write_mem
+from factories import real_tensors
+
+
+def low_rank_tensors(rank=8, seed=0):
+    """real_tensors() with a linear3 weight of exactly the given rank"""
+    tensors = real_tensors(seed)
+    rng = np.random.default_rng(seed)
+    tensors['linear3.weight'] = rng.normal(size=(1280, rank)) @ rng.normal(size=(rank, 576)) * 0.02
+    return tensors
+
+
+def test_factors_reconstruct_and_cut_the_cost():
+    """Full rank rebuilds the weight, and ranks 79..128 give the 3-5x MAC and storage cut"""
+    w = np.random.default_rng(1).normal(size=(40, 24))
+    f = lr.Factorization(w)
+    factor_in, factor_out = f.factors(24)
+    assert factor_in.shape == (24, 24) and factor_out.shape == (40, 24)
+    assert np.allclose(factor_out @ factor_in, w) and np.isclose(f.energy[-1], 1.0)
+    assert np.all(np.diff(f.energy) >= 0)
+
+    assert lr.cost((1280, 576)) == 737280
+    assert 3.0 < lr.cost((1280, 576)) / lr.cost((1280, 576), 128) < 3.2
+    assert lr.cost((1280, 576)) / lr.cost((1280, 576), 79) > 5.0
+
+
+def test_sweep_finds_the_true_rank_and_the_head_matches_the_full_model():
+    """A rank-8 linear3 passes from rank 8 on; head() on pooled features equals a full forward"""
+    tensors = low_rank_tensors()
+    params = {key: gm.to_fixed(np.reshape(tensors[key], shape)) for key, _, shape in gm.parameter_layout()}
+    images = np.random.default_rng(2).integers(0, 256, size=(4, 64, 64))
+    model = gm.GoldenMobileNetV3(params)
+    features = lr.pooled_features(model, images, batch_size=3)
+    assert features.shape == (4, 576)
+    assert np.array_equal(model.head(features), model(images))
+
+    rows = lr.rank_sweep(params, features, ranks=(2, 4, 8, 16), factorization=lr.Factorization(tensors['linear3.weight']))
+    assert [row['rank'] for row in rows] == [2, 4, 8, 16]
+    assert rows[2]['energy'] > 0.999999 and rows[0]['energy'] < rows[1]['energy']
+    assert lr.choose_rank(rows, min_agreement=1.0, max_deviation=4.0) == 8
+    assert lr.choose_rank(rows, min_agreement=1.0, max_deviation=-1.0) is None
+
+
+def test_exported_factors_replace_the_dense_weight(tmp_path):
+    """The weight directory loads the two factor files in place of linear3_weights.mem"""
+    tensors = low_rank_tensors()
+    for key, filename, shape in gm.parameter_layout():
+        write_mem(str(tmp_path / filename), gm.to_fixed(np.reshape(tensors[key], shape)))
+    fixed = lr.Factorization(tensors['linear3.weight']).fixed_factors(8)
+    assert all(bits == 16 and frac > gm.FRAC_BITS for _, (bits, frac) in fixed.values())
+    manifest = lr.export_lowrank(str(tmp_path), 'linear3', fixed)
+    assert manifest['layers']['linear3']['factored_words'] == 8 * (576 + 1280)
+    assert gm.load_lowrank(str(tmp_path))['linear3']['rank'] == 8
+
+    model = gm.GoldenMobileNetV3.from_mem_dir(str(tmp_path))
+    assert 'linear3.weight' not in model.params and model.params['linear3.factor_in'].shape == (8, 576)
+    images = np.random.default_rng(3).integers(0, 256, size=(2, 64, 64))
+    params = {key: gm.to_fixed(np.reshape(tensors[key], shape)) for key, _, shape in gm.parameter_layout()}
+    counters = gm.OverflowCounters()
+    assert np.array_equal(model.forward(images, counters=counters), lr.factored_model(params, 'linear3', fixed)(images))
+    assert counters.counts[('linear3.factor_in', 'output')].shape == (2, 8)
+
+
+def test_factors_are_tied_to_the_directory_layout(tmp_path):
+    """Factors of the unfolded weight are refused next to BN-folded files, and an export clears them"""
+    tensors = low_rank_tensors()
+    for key, filename, shape in gm.parameter_layout():
+        write_mem(str(tmp_path / filename), gm.to_fixed(np.reshape(tensors[key], shape)))
+    fixed = lr.Factorization(tensors['linear3.weight']).fixed_factors(8)
+    assert not lr.export_lowrank(str(tmp_path), 'linear3', fixed)['layers']['linear3']['fold_bn']
+
+    (tmp_path / gm.FUSION_MANIFEST).write_text('{}')
+    with pytest.raises(ValueError, match='not made for the BN-folded layout'):
+        gm.load_parameters(str(tmp_path))
+    with pytest.raises(ValueError, match='BN-folded'):
+        lr.export_lowrank(str(tmp_path), 'linear3', fixed)
+
+    gm.clear_manifests(str(tmp_path))
+    assert not any(os.path.exists(tmp_path / name) for name in gm.DIRECTORY_MANIFESTS)
+    assert 'linear3.weight' in gm.load_parameters(str(tmp_path))
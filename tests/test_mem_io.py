@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared .mem reader/writer
+"""
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import mem_io
+
+MEMORY_DIR = os.path.join(os.path.dirname(__file__), '..', 'hardware', 'memory_files')
+
+
+def test_round_trip_widths(tmp_path):
+    """Signed and unsigned words survive a write/read cycle at several widths"""
+    rng = np.random.default_rng(0)
+    for width in (8, 12, 16, 32):
+        values = rng.integers(-(1 << (width - 1)), 1 << (width - 1), size=1000)
+        path = str(tmp_path / f'w{width}.mem')
+        mem_io.write_mem(path, values, width=width)
+        assert np.array_equal(mem_io.read_mem(path, width=width), values)
+        assert np.array_equal(mem_io.read_mem(path, width=width, signed=False), values & ((1 << width) - 1))
+    mem_io.write_mem(str(tmp_path / 'b.mem'), [5, -1], width=4, radix=2)
+    assert (tmp_path / 'b.mem').read_text() == '0101\n1111\n'
+
+
+def test_readmemh_syntax(tmp_path):
+    """Comments, several words per line, '_' separators and @addr directives"""
+    path = tmp_path / 'x.mem'
+    path.write_text('// header\n@2\n1_0 ff /* skip */\n@0 7\n')
+    assert list(mem_io.read_mem(str(path), width=8, signed=False)) == [7, 0, 16, 255]
+    assert list(mem_io.read_mem(str(path), width=8, depth=6)) == [7, 0, 16, -1, 0, 0]
+
+
+def test_nibble_dumps_match_line_loop():
+    """Binary nibble-per-line activation dumps decode like a plain Python loop"""
+    path = os.path.join(MEMORY_DIR, '00_conv1_act.mem')
+    with open(path) as f:
+        bits = ''.join(line.strip() for line in f)
+    expected = [int(bits[i:i + 16], 2) for i in range(0, len(bits), 16)]
+    assert list(mem_io.read_mem(path, radix=2, chunk_bits=4, signed=False)) == expected
+
+
+def test_npy_cache_invalidation(tmp_path):
+    """The cache is reused while the text is unchanged and refreshed when it changes"""
+    path = str(tmp_path / 'w.mem')
+    mem_io.write_mem(path, [1, -2, 3])
+    first = mem_io.load_mem(path)
+    assert isinstance(first, np.memmap) and first.dtype == np.int16
+    assert list(first) == [1, -2, 3]
+    assert os.listdir(tmp_path / mem_io.CACHE_DIRNAME)
+
+    # Same content with a new mtime is revalidated by hash
+    os.utime(path, ns=(0, 12345))
+    assert list(mem_io.load_mem(path)) == [1, -2, 3]
+
+    # Same size but different content is caught by the hash
+    mem_io.write_mem(path, [4, 5, 6])
+    os.utime(path, ns=(0, 67890))
+    assert list(mem_io.load_mem(path)) == [4, 5, 6]
+
+
+def test_npy_cache_keeps_same_named_files_apart(tmp_path, monkeypatch):
+    """Files sharing a basename in a shared cache directory get separate entries"""
+    monkeypatch.setenv('MEM_CACHE_DIR', str(tmp_path / 'shared'))
+    paths = []
+    for name, values in (('a', [1, 2, 3]), ('b', [7, 8, 9])):
+        (tmp_path / name).mkdir()
+        path = str(tmp_path / name / 'w.mem')
+        mem_io.write_mem(path, values)
+        # Identical size and mtime would satisfy a basename-keyed fast path
+        os.utime(path, ns=(0, 12345))
+        paths.append(path)
+    assert list(mem_io.load_mem(paths[0])) == [1, 2, 3]
+    assert list(mem_io.load_mem(paths[1])) == [7, 8, 9]
+    assert list(mem_io.load_mem(paths[0])) == [1, 2, 3]
+
+
+if __name__ == "__main__":
+    test_nibble_dumps_match_line_loop()
+    print("✅ mem_io tests passed")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for the vectorised metrics module
+"""
+
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import metrics
+
+
+def test_confusion_matrix_and_per_class_metrics():
+    """Counts land in (true, predicted) cells and precision/recall follow from them"""
+    labels = [0, 0, 1, 1, 2, -1]
+    predicted = [0, 1, 1, 1, 0, 2]
+    cm = metrics.confusion_matrix(labels, predicted, 3)
+    assert cm.tolist() == [[1, 1, 0], [0, 2, 0], [1, 0, 0]]
+
+    m = metrics.per_class_metrics(cm)
+    assert m['precision'].tolist() == [0.5, 2 / 3, 0.0]
+    assert m['recall'].tolist() == [0.5, 1.0, 0.0]
+    assert m['support'].tolist() == [2, 2, 1]
+    accuracy, counts = metrics.per_class_accuracy(labels, np.array(labels) == np.array(predicted), 3)
+    assert accuracy.tolist() == [0.5, 1.0, 0.0] and counts.tolist() == [2, 2, 1]
+    assert metrics.class_labels(['Mass', 'pleural_thickening', 'normal', 'unknown']).tolist() == [6, 8, 0, -1]
+
+
+def test_top_k_and_calibration():
+    """Top-k counts the label among the k best scores; matching confidence gives zero ECE"""
+    scores = np.array([[5, 4, 3, 0], [1, 5, 4, 0], [0, 1, 2, 5]])
+    labels = np.array([1, 2, 0])
+    assert metrics.top_k_accuracy(scores, labels, 1) == 0.0
+    assert metrics.top_k_accuracy(scores, labels, 2) == 2 / 3
+    assert metrics.top_k_accuracy(scores, labels, 4) == 1.0
+
+    confidence = np.repeat([0.25, 0.75], 4)
+    correct = np.array([1, 0, 0, 0, 1, 1, 1, 0])
+    ece, bins = metrics.expected_calibration_error(confidence, correct, n_bins=4)
+    assert ece == 0.0 and bins['count'].tolist() == [0, 4, 0, 4]
+    ece, _ = metrics.expected_calibration_error(confidence, 1 - correct, n_bins=4)
+    assert abs(ece - 0.5) < 1e-12
+
+
+def test_bootstrap_intervals_bracket_the_estimate():
+    """Binomial and multinomial bootstraps agree with resampling rows"""
+    rng = np.random.default_rng(1)
+    correct = rng.random(2000) < 0.8
+    low, high = metrics.bootstrap_ci(correct, n_boot=2000)
+    assert low < correct.mean() < high and 0.02 < high - low < 0.05
+    rows = rng.integers(0, len(correct), size=(2000, len(correct)))
+    naive = np.quantile(correct[rows].mean(axis=1), [0.025, 0.975])
+    assert np.allclose((low, high), naive, atol=0.005)
+
+    labels = rng.integers(0, 3, size=len(correct))
+    ci = metrics.bootstrap_class_ci(labels, correct, num_classes=4, n_boot=2000)
+    accuracy, _ = metrics.per_class_accuracy(labels, correct, 4)
+    assert np.all((ci[:3, 0] < accuracy[:3]) & (accuracy[:3] < ci[:3, 1]))
+    assert np.isnan(ci[3]).all()
+
+
+def test_evaluate_scales_to_large_sweeps():
+    """A 100k-image evaluation with every metric stays well under a few seconds"""
+    rng = np.random.default_rng(0)
+    labels = rng.integers(0, metrics.NUM_CLASSES, size=100000)
+    scores = rng.integers(-512, 512, size=(len(labels), metrics.NUM_CLASSES)).astype(np.int16)
+    scores[np.arange(len(labels)), labels] += 300
+
+    start = time.time()
+    m = metrics.evaluate(scores, labels)
+    assert time.time() - start < 3
+    assert m['confusion'].sum() == len(labels)
+    assert m['accuracy'] == np.mean(scores.argmax(axis=1) == labels)
+    assert m['top_k'][1] <= m['top_k'][3] <= m['top_k'][5]
+    assert 'Top-1 accuracy' in metrics.format_report(m)
+
+
+def test_evaluate_drops_unknown_labels():
+    """Names class_labels() cannot map are left out of every metric instead of counting as wrong"""
+    labels = metrics.class_labels(['mass', 'bogus', 'hernia', 'mass'])
+    assert labels[1] == -1
+    scores = np.zeros((4, metrics.NUM_CLASSES), dtype=np.int16)
+    scores[np.arange(4), np.where(labels < 0, 0, labels)] = 256
+    m = metrics.evaluate(scores, labels, n_boot=50)
+    assert m['n'] == 3 and m['accuracy'] == 1.0 and m['top_k'][1] == 1.0
+    assert m['confusion'].sum() == 3 and not np.isnan(m['recall_ci'][labels[0]]).any()
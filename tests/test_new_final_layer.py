@@ -3,6 +3,12 @@
 Test script for the new final layer implementation
 """
 
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from postprocess import sigmoid
+
 def test_new_final_layer():
     """Test the new final layer with simulated inputs"""
     
@@ -113,18 +119,8 @@ def test_new_final_layer():
     print(f"Condition: {MEDICAL_CONDITIONS[primary_condition]}")
     print(f"Score: 0x{max_score:04x} ({max_score})")
     
-    # Convert to probability (simplified sigmoid)
-    def fixed_to_probability(fixed_val):
-        temp_real = fixed_val / 256.0  # Scale down
-        if temp_real > 5.0:
-            return 1.0
-        elif temp_real < -5.0:
-            return 0.0
-        else:
-            import math
-            return 1.0 / (1.0 + math.exp(-temp_real))
-    
-    probability = fixed_to_probability(max_score)
+    # Convert to probability (Q8.8 sigmoid, as the postprocessor does)
+    probability = sigmoid(max_score)
     print(f"Confidence: {probability*100:.2f}%")
     
     print("\n=== TEST COMPLETE ===")
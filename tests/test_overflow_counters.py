@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the saturation and overflow counters of the golden model
+"""
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+import golden_model as gm
+import overflow_report
+from mem_io import read_mem
+from factories import random_params
+
+
+def test_primitives_count_the_values_they_wrap_or_saturate():
+    """Each counted event is a value the 16/32-bit arithmetic changes; outputs are unaffected"""
+    counters = gm.OverflowCounters()
+
+    x = np.array([[100, 30000, -30000]])
+    w = np.array([[1, 1, 1], [0, 300, 0]])
+    out = gm.linear(x, w, np.zeros(2, dtype=np.int64), counter=counters.counter('fc'))
+    assert np.array_equal(out, gm.linear(x, w, np.zeros(2, dtype=np.int64)))
+    assert counters.counts[('fc', 'output')].tolist() == [[0, 1]]
+
+    acc_x = np.full((1, 1, 3, 3), 32767)
+    acc_w = np.full((2, 1, 3, 3), 32767)
+    acc_w[1] = 1
+    gm.conv2d(acc_x, acc_w, counter=counters.counter('conv'))
+    assert counters.counts[('conv', 'accumulator')].tolist() == [[1, 0]]
+    assert counters.counts[('conv', 'output')].tolist() == [[1, 0]]
+
+    h = np.array([[[[0, 256, 3000], [4000, -200, 0]]]])
+    assert np.array_equal(gm.hswish(h, counters.counter('hs')), gm.hswish(h))
+    # x * relu6(x + 3) * 10923 already leaves 32 bits at x = 1.0 (256 * 1024 * 10923 > 2**31)
+    assert counters.counts[('hs', 'hswish')].tolist() == [[3]]
+
+    bn_x = np.array([[1000, 20000], [1000, 100]])
+    gm.batchnorm(bn_x, np.array([256, 512]), np.array([32000, 0]), counters.counter('bn'))
+    assert counters.counts[('bn', 'bn')].tolist() == [[1, 1], [1, 0]]
+
+
+def test_model_counters_leave_scores_unchanged_and_find_the_first_overflow():
+    """Counting is observation only; scaled-up weights make an early layer overflow first"""
+    images = np.random.default_rng(3).integers(0, 256, size=(3, 64, 64))
+    params = random_params()
+    model = gm.GoldenMobileNetV3(params)
+    counters = overflow_report.count_overflows(model, images, batch_size=2)
+    assert np.array_equal(model(images), model.forward(images, counters=gm.OverflowCounters()))
+    assert counters.counts[('conv1', 'accumulator')].shape == (3, 16)
+    assert counters.counts[('bneck.2', 'residual')].shape == (3, 24)
+    assert all(stage in gm.OverflowCounters.STAGES for _, stage in counters.counts)
+
+    loud = dict(params, **{'conv1.weight': params['conv1.weight'] * 256})
+    hot = gm.OverflowCounters()
+    gm.GoldenMobileNetV3(loud).forward(images, counters=hot)
+    assert hot.first_overflow(('output',)) == ('conv1', 'output')
+    row = next(r for r in hot.summary() if (r['layer'], r['stage']) == ('conv1', 'output'))
+    assert row['images'] == 3 and row['events'] == sum(row['per_image']) == sum(row['per_channel'])
+
+
+def test_rtl_debug_counters_are_compared_per_pass_or_in_total(tmp_path):
+    """Transcript OVERFLOW lines are matched against the golden per-image counts"""
+    counters = gm.OverflowCounters()
+    counters.record('linear3', 'output', np.array([[True, False], [True, True]]))
+    counters.record('hs3', 'hswish', np.array([[False, True], [True, True]]))
+    log = tmp_path / 'transcript'
+    log.write_text("# OVERFLOW layer=linear3 stage=output count=1\n"
+                   "# OVERFLOW layer=linear3 stage=output count=2\n"
+                   "# OVERFLOW layer=hs3 stage=hswish total=2\n"
+                   "# OVERFLOW layer=bn3 stage=bn count=0\n")
+    rtl = overflow_report.read_rtl_counters(str(log))
+    assert rtl[('linear3', 'output')]['passes'] == [1, 2]
+    rows = {(r['layer'], r['stage']): r for r in overflow_report.compare_counters(counters, rtl)}
+    assert rows[('linear3', 'output')]['match']
+    assert not rows[('hs3', 'hswish')]['match'] and rows[('hs3', 'hswish')]['golden'] == 3
+    assert rows[('bn3', 'bn')]['golden'] is None
+
+
+def test_head_features_feed_the_rtl_head_testbench(tmp_path):
+    """The dumped linear3 inputs rebuild the golden head scores, image after image"""
+    images = np.random.default_rng(4).integers(0, 256, size=(3, 64, 64))
+    model = gm.GoldenMobileNetV3(random_params())
+    filename = str(tmp_path / overflow_report.HEAD_FEATURES)
+    overflow_report.dump_head_features(model, images, filename, batch_size=2)
+    features = read_mem(filename).reshape(3, -1)
+    assert features.shape == (3, 576)
+    assert np.array_equal(model.head(features), model(images))
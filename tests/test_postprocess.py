@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the batch score postprocessor and its integer LUT variant
+"""
+
+import os
+import sys
+import math
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import postprocess
+from mem_io import read_mem
+
+
+def scalar_probability(fixed_val):
+    """The per-score conversion the analyzers used before the batch postprocessor"""
+    if fixed_val >= 2**15:
+        fixed_val -= 2**16
+    temp_real = fixed_val / 256.0
+    if temp_real > 5.0:
+        return 1.0
+    elif temp_real < -5.0:
+        return 0.0
+    return 1.0 / (1.0 + math.exp(-temp_real))
+
+
+def test_sigmoid_matches_the_scalar_conversion_for_every_word():
+    """All 65536 score words map to the same probability as the old one-at-a-time code"""
+    words = np.arange(1 << 16)
+    assert np.allclose(postprocess.sigmoid(words), [scalar_probability(int(w)) for w in words], rtol=0, atol=1e-15)
+
+
+def test_integer_luts_track_the_float_postprocessor(tmp_path):
+    """Q1.15 lookups stay within a fraction of a percent and export as readable .mem files"""
+    words = np.arange(1 << 16)
+    q15 = postprocess.sigmoid_int(words)
+    assert np.abs(q15 / postprocess.PROB_ONE - postprocess.sigmoid(words)).max() < 0.004
+    assert q15[0] == postprocess.PROB_ONE // 2 and q15[0x7FFF] == postprocess.PROB_ONE and q15[0x8000] == 0
+
+    rng = np.random.default_rng(0)
+    scores = rng.integers(-2000, 2000, size=(1000, 15))
+    soft = postprocess.softmax_int(scores)
+    assert np.abs(soft / postprocess.PROB_ONE - postprocess.softmax(scores)).max() < 0.004
+    assert np.all(np.abs(soft.sum(axis=1) - postprocess.PROB_ONE) <= 15)
+
+    paths = dict(postprocess.export_luts(str(tmp_path)))
+    lut = read_mem(str(tmp_path / 'sigmoid_lut.mem'), signed=False)
+    assert np.array_equal(lut, postprocess.sigmoid_lut()) and paths[str(tmp_path / 'exp_lut.mem')] == 1024
+
+
+def test_batch_findings_and_urgency():
+    """Top-k, secondary findings and urgency come out per row of the batch"""
+    # 0x8000 is -128.0, so the first zero score wins
+    saturated_low = [0x8000] + [0] * 14
+    pneumothorax = [0] * 5 + [0x0900] + [0] * 9
+    pneumonia = [0, 0x0100, 0, 0, 0, 0, 0, 0x0200, 0, 0, 0, 0, 0, 0x0600, 0]
+    for integer in (False, True):
+        r = postprocess.postprocess([saturated_low, pneumothorax, pneumonia], integer=integer)
+        assert r['primary'].tolist() == [1, 5, 13]
+        assert [postprocess.URGENCY_LEVELS[u] for u in r['urgency']] == ['STANDARD', 'HIGH', 'MODERATE']
+        assert r['top_k'][2].tolist() == [13, 7, 1]
+        assert r['secondary'][2].nonzero()[0].tolist() == list(range(13)) + [14]
+        assert not r['secondary'][np.arange(3), r['primary']].any()
+
+    soft = postprocess.postprocess([pneumonia], method='softmax')
+    assert soft['primary'][0] == 13 and abs(soft['probabilities'].sum() - 1) < 1e-12
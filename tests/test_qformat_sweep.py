@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for per-layer Q formats in the golden model and the mixed-precision sweep
+"""
+
+import os
+import sys
+import json
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+import golden_model as gm
+import qformat_sweep as qs
+from mem_io import write_mem
+from factories import random_params, real_tensors
+
+
+def test_weight_frac_bits_move_the_accumulator_shift():
+    """Weights stored with more fractional bits give the Q8.8 result, and narrow activations round"""
+    rng = np.random.default_rng(4)
+    x = rng.integers(-3000, 3000, size=(1, 3, 6, 6))
+    w = rng.integers(-300, 300, size=(4, 3, 3, 3))
+    bias = rng.integers(-50, 50, size=4)
+    assert np.array_equal(gm.conv2d(x, w << 3, padding=1, bias=bias, frac_bits=11),
+                          gm.conv2d(x, w, padding=1, bias=bias))
+    xs = rng.integers(-3000, 3000, size=(2, 8))
+    ws = rng.integers(-300, 300, size=(5, 8))
+    assert np.array_equal(gm.linear(xs, ws << 2, bias[:1].repeat(5), 10), gm.linear(xs, ws, bias[:1].repeat(5)))
+
+    assert np.array_equal(gm.quantize_activation(x, 16, 8), x)
+    assert gm.quantize_activation(np.array([135, -135, 5000]), 8, 4).tolist() == [128, -128, 2032]
+    assert gm.to_fixed([0.3, -2.0, 9.0], 8, 5).tolist() == [10, -64, 127]
+
+
+def test_candidates_follow_the_tensor_range():
+    """Fractional bits are picked so the largest magnitude just fits the word"""
+    assert qs.weight_candidates(np.array([0.7, -0.2]), (8, 16)) == [(8, 7), (8, 8), (16, 15)]
+    assert qs.weight_candidates(np.array([3.5]), (4,)) == [(4, 1), (4, 2)]
+    # Q8.8 outputs peaking at 2.0 need two integer bits; 16-bit activations stay Q8.8
+    assert qs.activation_candidates(512, (8, 12, 16)) == [(8, 5), (12, 8), (16, 8)]
+
+
+def test_sweep_plans_and_the_golden_model_reads_the_export(tmp_path):
+    """A plan inside the budget shrinks weight memory and loads back through the weight directory"""
+    tensors = real_tensors()
+    images = np.random.default_rng(5).integers(0, 256, size=(2, 64, 64))
+    sweep = qs.QFormatSweep(tensors, images)
+    assert np.array_equal(sweep.reference, gm.GoldenMobileNetV3(random_params()).forward(images))
+
+    budget = (1.0, 2.0)
+    layers = ['linear3', 'conv2', 'bneck.0.conv1']
+    weights = sweep.sweep_weights((4, 8, 16), layers, budget)
+    activations = sweep.sweep_activations((8, 16), layers, budget)
+    assert set(weights) == set(layers) and all(r['bits'] == 4 for r in weights['linear3'][:2])
+    qformats, error = sweep.choose_plan(weights, activations, budget)
+    assert qs.within_budget(error, *budget) and qformats
+    plan = sweep.plan_document(qformats, error, budget)
+    assert plan['weight_bits'] < plan['baseline_weight_bits']
+    assert plan['layers']['linear4']['weight'] == [16, 8]
+
+    # What export_mobilenetv3_weights_for_hw.py --plan writes: planned widths plus the plan itself
+    formats = {f'{layer}.weight': entry['weight'] for layer, entry in plan['layers'].items()}
+    for key, filename, shape in gm.parameter_layout():
+        bits, frac = formats.get(key, qs.BASELINE)
+        write_mem(str(tmp_path / filename), gm.to_fixed(tensors[key], bits, frac).reshape(shape), width=bits)
+    (tmp_path / gm.PLAN_FILE).write_text(json.dumps(plan))
+    model = gm.GoldenMobileNetV3.from_mem_dir(str(tmp_path))
+    assert np.array_equal(model(images), sweep.run(qformats))
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar score export and loader
+"""
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+import results_db
+import results_columnar
+from factories import make_records
+
+
+def test_db_export_round_trips_scores(tmp_path):
+    """Stored runs export to one file and load back as an (N, 15) int16 matrix"""
+    path = str(tmp_path / 'r.sqlite')
+    conn = results_db.connect(path)
+    records = make_records(['mass', 'edema', 'hernia'], ['mass', 'mass', 'hernia'])
+    records[2]['scores'] = None
+    run = results_db.add_run(conn, 'nightly', records, commit='c0ffee')
+    results_db.add_run(conn, 'other', make_records(['mass'], ['mass']), commit='c0ffee')
+
+    frame = results_columnar.frame_from_db([run], path=path)
+    assert len(frame) == 3 and frame['source'].tolist() == ['nightly'] * 3
+    assert frame['has_scores'].tolist() == [True, True, False]
+
+    written = results_columnar.write_frame(frame, str(tmp_path / 'sweep.parquet'))
+    assert os.path.exists(written)
+    scores, loaded = results_columnar.load_scores(written, with_frame=True)
+    assert scores.dtype == np.int16 and scores.shape == (3, 15)
+    assert scores[1].tolist() == list(range(1, 16)) and not scores[2].any()
+    assert loaded['expected'].tolist() == ['mass', 'edema', 'hernia']
+    # Per-class accuracy and argmax are single vectorised operations on the loaded data
+    assert loaded.groupby('expected')['correct'].mean().to_dict() == {'edema': 0, 'hernia': 1, 'mass': 1}
+    assert scores.argmax(axis=1).tolist() == [14, 14, 0]
+
+
+def test_layer_statistics_export(tmp_path):
+    """compare_activations reports become one row per layer"""
+    reports = [{'layer': 'first_layer', 'words': 10, 'max_ulp': 0, 'mean_ulp': 0.0, 'diverged': False,
+                'per_channel_max_ulp': [0, 0]},
+               {'layer': 'bneck_0', 'words': 10, 'max_ulp': 3, 'mean_ulp': 0.5, 'diverged': True,
+                'per_channel_max_ulp': [3, 1]}]
+    written = results_columnar.write_frame(results_columnar.layer_frame(reports), str(tmp_path / 'layers.feather'))
+    frame = results_columnar.read_frame(written)
+    assert frame['layer'].tolist() == ['first_layer', 'bneck_0'] and frame['max_ulp'].tolist() == [0, 3]
+    assert 'per_channel_max_ulp' not in frame.columns
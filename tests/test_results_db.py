@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite regression results store and the analyzers reading it
+"""
+
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+import results_db
+import analyze_test_results
+from analyze_emergency_results import EmergencyResultsAnalyzer
+from factories import make_records, TRANSCRIPT
+
+
+def test_runs_round_trip_and_history(tmp_path):
+    """Scores, per-condition accuracy and the run history come back out of the store"""
+    conn = results_db.connect(str(tmp_path / 'r.sqlite'))
+    first = results_db.add_run(conn, 'nightly', make_records(['mass', 'mass', 'edema'], ['mass', 'nodule', 'edema']),
+                               rtl_hash='abc', commit='c0ffee')
+    second = results_db.add_run(conn, 'nightly', make_records(['mass', 'edema'], ['mass', 'edema'], 2000),
+                                commit='c0ffee')
+
+    rows = results_db.run_results(conn, first)
+    assert [r['expected_class'] for r in rows] == [6, 6, 12] and rows[1]['scores'] == list(range(1, 16))
+    assert results_db.score_matrix(conn, first).shape == (3, 15)
+    stats = results_db.accuracy_by_expected(conn, first)
+    assert stats['mass']['correct'] == 1 and stats['mass']['accuracy'] == 0.5
+
+    history = results_db.run_history(conn, 'nightly')
+    assert [h['id'] for h in history] == [second, first]
+    assert history[0]['accuracy'] == 1.0 and history[0]['avg_cycles'] == 2000
+    assert results_db.latest_run(conn, 'nightly')['id'] == second
+
+    # An import keyed by content is stored only once
+    key = results_db.import_hash([str(tmp_path / 'r.sqlite')])
+    assert results_db.add_run(conn, 'import', [], import_hash=key) == results_db.add_run(conn, 'import', [],
+                                                                                          import_hash=key)
+    assert results_db.class_index('pleural_thickening') == 8 and results_db.class_index('normal') == 0
+
+
+def test_analyzers_query_the_store(tmp_path, monkeypatch):
+    """Legacy JSON results and emergency transcripts are imported once, then read from the database"""
+    monkeypatch.setenv('RESULTS_DB', str(tmp_path / 'r.sqlite'))
+    results_dir = tmp_path / 'test_results'
+    results_dir.mkdir()
+    legacy = [{'test_file': 'mass_case1.mem', 'expected': 'mass', 'detected': 'Mass', 'confidence': 0.4,
+               'correct_detection': True}]
+    (results_dir / 'mass_results.json').write_text(json.dumps(legacy))
+
+    summary, by_disease = analyze_test_results.load_test_results(str(results_dir))
+    assert summary['total_tests'] == 1 and summary['accuracy'] == 1.0
+    assert by_disease['mass'][0]['detected'] == 'Mass'
+    analyze_test_results.load_test_results(str(results_dir))
+    conn = results_db.connect()
+    assert len(results_db.run_history(conn)) == 1
+
+    # Another directory is analyzed as its own run, and the first one still maps to its run
+    other_dir = tmp_path / 'other_results'
+    other_dir.mkdir()
+    (other_dir / 'mass_results.json').write_text(json.dumps([dict(legacy[0], detected='Hernia',
+                                                                  correct_detection=False)]))
+    other, _ = analyze_test_results.load_test_results(str(other_dir))
+    assert other['accuracy'] == 0.0 and other['run_id'] != summary['run_id']
+    assert analyze_test_results.load_test_results(str(results_dir))[0]['run_id'] == summary['run_id']
+    assert len(results_db.run_history(conn)) == 2
+
+    log = tmp_path / 'transcript'
+    log.write_text(TRANSCRIPT)
+    for _ in range(2):
+        analyzer = EmergencyResultsAnalyzer(str(log))
+        analyzer.parse_simulation_log()
+    assert [r['correct'] for r in analyzer.results] == [True, False]
+    assert analyzer.results[1]['scores'] == [700, 300] and analyzer.results[0]['test_id'] == 6
+    assert len(results_db.run_history(conn)) == 3
+
+
+def test_all_diseases_analyzer_reports_the_imported_summary(tmp_path, monkeypatch):
+    """Re-analyzing an older summary shows that summary's run, not the latest stored one"""
+    monkeypatch.syspath_prepend(os.path.join(os.path.dirname(__file__), '..', 'models', 'FULL_TOP'))
+    import analyze_all_diseases_results as analyzer
+
+    monkeypatch.setenv('RESULTS_DB', str(tmp_path / 'r.sqlite'))
+    monkeypatch.chdir(tmp_path)
+    shown = []
+    monkeypatch.setattr(analyzer, 'analyze_performance_metrics', shown.append)
+    monkeypatch.setattr(analyzer, 'analyze_confusion_matrix', lambda results: None)
+    monkeypatch.setattr(analyzer, 'generate_recommendations', lambda results: None)
+
+    def analyze(predicted):
+        (tmp_path / analyzer.SUMMARY_FILE).write_text(
+            "DETAILED RESULTS BY DISEASE:\n"
+            f"Mass | {predicted} | {'CORRECT' if predicted == 'Mass' else 'INCORRECT'} | 900 | 5000\n"
+            "PERFORMANCE ANALYSIS:\n")
+        analyzer.main()
+        return shown[-1]
+
+    first = analyze('Mass')
+    second = analyze('Edema')
+    assert second['run_id'] != first['run_id']
+    again = analyze('Mass')
+    assert again['run_id'] == first['run_id'] and again['correct_predictions'] == 1
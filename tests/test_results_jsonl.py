@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Tests for the testbench JSON-lines result reader
+"""
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+from results_jsonl import read_results
+import sim_runner
+from factories import make_jobs, FAKE_VSIM
+
+
+def test_read_results_columns(tmp_path):
+    """Records become column arrays; missing output and a cut-off last line are tolerated"""
+    path = tmp_path / 'full_system_results.jsonl'
+    path.write_text(
+        '{"test": 0, "name": "a", "passed": 1, "cycles": 500, "latency": 7, "argmax": 2, '
+        '"scores": [1, -2, 300, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -32768]}\n'
+        '{"test": 1, "name": "b", "passed": 0, "cycles": 900, "latency": 1000000, "argmax": null, "scores": null}\n'
+        '{"test": 2, "name": "c", "pas')
+    res = read_results(str(path))
+    assert res['test'].tolist() == [0, 1] and res['name'] == ['a', 'b']
+    assert res['scores'].dtype == np.int16 and res['scores'].shape == (2, 15)
+    assert res['scores'][0, 2] == 300 and res['scores'][0, 14] == -32768 and not res['scores'][1].any()
+    assert res['argmax'].tolist() == [2, -1] and res['passed'].tolist() == [True, False]
+    assert res['cycles'].tolist() == [500, 900]
+
+
+def test_runner_prefers_jsonl_and_matches_text_outputs(tmp_path, monkeypatch):
+    """The structured channel and the scraped outputs file give the same scores"""
+    job = make_jobs(tmp_path, 1)[0]
+    structured = sim_runner.run_job(job, simulator=FAKE_VSIM)
+    assert os.path.exists(os.path.join(job['dir'], sim_runner.RESULTS_FILE))
+
+    monkeypatch.setenv('FAKE_VSIM_NO_JSONL', '1')
+    os.remove(os.path.join(job['dir'], sim_runner.RESULTS_FILE))
+    scraped = sim_runner.run_job(job, simulator=FAKE_VSIM)
+    assert structured['scores'] == scraped['scores'] and structured['cycles'] == scraped['cycles'] == 45
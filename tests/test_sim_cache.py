@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-addressed simulation result cache
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import sim_cache
+
+
+def make_inputs(tmp_path):
+    """One RTL file, a weights directory and an image"""
+    (tmp_path / 'top.sv').write_text('module top; endmodule\n')
+    (tmp_path / 'weights').mkdir()
+    (tmp_path / 'weights' / 'conv1_conv.mem').write_text('0001\n0002\n')
+    (tmp_path / 'image.mem').write_text('00ff\n')
+    return [str(tmp_path / 'top.sv')], str(tmp_path / 'weights'), [str(tmp_path / 'image.mem')]
+
+
+def test_key_tracks_rtl_weights_and_image(tmp_path):
+    """Changing any of the three inputs (or the extra settings) changes the key"""
+    rtl, weights, inputs = make_inputs(tmp_path)
+    key = sim_cache.cache_key(rtl, weights, inputs)
+    assert sim_cache.cache_key(rtl, weights, inputs) == key
+    assert sim_cache.cache_key(rtl, weights, inputs, ['+VERBOSE']) != key
+
+    for path, text in [('top.sv', 'module top; wire a; endmodule\n'),
+                       ('weights/conv1_conv.mem', '0001\n0003\n'),
+                       ('image.mem', '00fe\n')]:
+        original = (tmp_path / path).read_text()
+        (tmp_path / path).write_text(text)
+        assert sim_cache.cache_key(rtl, weights, inputs) != key
+        (tmp_path / path).write_text(original)
+    assert sim_cache.cache_key(rtl, weights, inputs) == key
+
+
+def test_store_lookup_restore(tmp_path, monkeypatch):
+    """Stored records and files come back; SIM_CACHE=0 turns the cache off"""
+    cache = str(tmp_path / 'cache')
+    outputs = tmp_path / 'full_system_outputs.txt'
+    outputs.write_text('=== Test 0: x ===\n0100\n')
+    assert sim_cache.lookup('ab' * 32, cache) is None
+
+    sim_cache.store('ab' * 32, {'status': 'passed', 'scores': [256], 'cycles': 7}, [str(outputs)], cache)
+    record = sim_cache.lookup('ab' * 32, cache)
+    assert record['scores'] == [256] and record['cycles'] == 7 and record['key'] == 'ab' * 32
+
+    dest = tmp_path / 'job'
+    dest.mkdir()
+    assert sim_cache.restore('ab' * 32, str(dest), cache) == ['full_system_outputs.txt']
+    assert (dest / 'full_system_outputs.txt').read_text() == outputs.read_text()
+
+    monkeypatch.setenv('SIM_CACHE', '0')
+    assert sim_cache.cache_dir(cache) is None
+    assert sim_cache.lookup('ab' * 32, cache) is None
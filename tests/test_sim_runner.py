@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for the parallel simulation job runner, using the fake simulator stub
+"""
+
+import os
+import sys
+import time
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+import sim_runner
+from mem_io import write_mem
+from factories import make_jobs, FAKE_VSIM
+
+
+def test_jobs_run_isolated_and_in_parallel(tmp_path, monkeypatch):
+    """Each job sees only its own image, and N jobs overlap in time"""
+    jobs = make_jobs(tmp_path, 4)
+    assert os.path.islink(os.path.join(jobs[0]['dir'], 'FULL_TOP'))
+
+    monkeypatch.setenv('FAKE_VSIM_DELAY', '0.5')
+    start = time.time()
+    results = sim_runner.run_jobs(jobs, workers=4, progress=False, simulator=FAKE_VSIM)
+    assert time.time() - start < 1.8
+
+    assert [r['status'] for r in results] == ['passed'] * 4
+    assert len({tuple(r['scores']) for r in results}) == 4
+    assert all(len(r['scores']) == 15 for r in results)
+
+    summary = sim_runner.write_summary(results, str(tmp_path / 'summary.json'))
+    assert summary['status_counts'] == {'passed': 4}
+    assert json.loads((tmp_path / 'summary.json').read_text())['total_jobs'] == 4
+
+
+def test_failures_and_missing_simulator(tmp_path, monkeypatch):
+    """A failing simulator and an unknown executable are reported, not raised"""
+    job = make_jobs(tmp_path, 1)[0]
+    monkeypatch.setenv('FAKE_VSIM_FAIL', '1')
+    assert sim_runner.run_job(job, simulator=FAKE_VSIM)['status'] == 'failed'
+    assert sim_runner.run_job(job, simulator=['no-such-simulator'])['status'] == 'error'
+
+
+def test_library_compiled_once_per_rtl_hash(tmp_path):
+    """Jobs share one compiled library until an RTL source changes"""
+    jobs = make_jobs(tmp_path, 2)
+    src = tmp_path / 'models' / 'top.sv'
+    src.write_text('module top; endmodule\n')
+    do_file = tmp_path / 'models' / 'FULL_TOP' / 'run_tb_full_system_top.do'
+    do_file.write_text('vlib work\nvlog -sv top.sv\nvsim work.top\n')
+    sources = sim_runner.rtl_sources(sim_runner.DO_FILE, str(tmp_path / 'models'))
+    assert sources == [str(tmp_path / 'models' / 'top.sv')]
+
+    lib_root = str(tmp_path / 'libs')
+    lib = sim_runner.compile_library(sources, lib_root, FAKE_VSIM)
+    assert sim_runner.compile_library(sources, lib_root, FAKE_VSIM) == lib
+    assert open(os.path.join(lib, 'compile_count')).read() == '1'
+
+    results = sim_runner.run_jobs(jobs, workers=2, progress=False, simulator=FAKE_VSIM, library=lib)
+    assert [r['status'] for r in results] == ['passed', 'passed']
+
+    src.write_text('module top; wire a; endmodule\n')
+    assert sim_runner.compile_library(sources, lib_root, FAKE_VSIM) != lib
+
+
+def test_do_script_jobs_forward_plusargs_to_the_inner_vsim(tmp_path):
+    """Without a library the job's own .do copy carries +IMAGE/+NAME/+VERBOSITY on its vsim line"""
+    jobs = make_jobs(tmp_path, 2)
+    do_file = tmp_path / 'models' / 'FULL_TOP' / 'run_tb_full_system_top.do'
+    do_file.write_text('vlib work\nvlog -sv top.sv\nvsim -t ps work.tb_full_system_top  # simulate\nrun -all\n')
+    results = sim_runner.run_jobs(jobs, workers=2, progress=False, simulator=FAKE_VSIM, verbosity=0)
+
+    script = open(os.path.join(jobs[0]['dir'], sim_runner.JOB_DO_FILE)).read()
+    assert 'vsim -t ps work.tb_full_system_top +IMAGE=test_image.mem +NAME=case0 +VERBOSITY=0\n' in script
+    assert script.endswith('quit -f\n')
+    transcript = open(results[0]['transcript']).read()
+    assert '+NAME=case0' in transcript and 'completed successfully' not in transcript
+    assert [r['status'] for r in results] == ['passed'] * 2 and results[0]['scores'] != results[1]['scores']
+
+
+def test_batch_job_matches_single_image_jobs(tmp_path):
+    """One batch launch yields the same per-image scores as one launch per image"""
+    singles = sim_runner.run_jobs(make_jobs(tmp_path, 3), workers=3, progress=False, simulator=FAKE_VSIM)
+    images = [str(tmp_path / f'case{i}.mem') for i in range(3)]
+    batch = sim_runner.prepare_batch_job(str(tmp_path / 'batches'), 'batch_0000', images,
+                                         str(tmp_path / 'models'), weights_dir=None)
+    result = sim_runner.run_job(batch, simulator=FAKE_VSIM, library=str(tmp_path / 'lib'))
+    records = sim_runner.split_batch_result(result, batch)
+
+    assert [r['name'] for r in records] == ['case0', 'case1', 'case2']
+    assert [r['status'] for r in records] == ['passed'] * 3
+    assert [r['scores'] for r in records] == [r['scores'] for r in singles]
+    assert all(r['batch'] == 'batch_0000' for r in records)
+
+
+def test_result_cache_skips_unchanged_simulations(tmp_path, monkeypatch):
+    """A second run of the same image is replayed from the cache without the simulator"""
+    job = make_jobs(tmp_path, 1)[0]
+    cache = str(tmp_path / 'cache')
+    first = sim_runner.run_job(job, simulator=FAKE_VSIM, cache_dir=cache)
+    assert first['status'] == 'passed' and not first['cached']
+    assert first['cycles'] == 45
+
+    # The simulator would fail now, so a pass proves the cache answered
+    monkeypatch.setenv('FAKE_VSIM_FAIL', '1')
+    os.remove(os.path.join(job['dir'], sim_runner.OUTPUTS_FILE))
+    second = sim_runner.run_job(job, simulator=FAKE_VSIM, cache_dir=cache)
+    assert second['cached'] and second['scores'] == first['scores'] and second['cycles'] == 45
+    assert sim_runner.read_scores(os.path.join(job['dir'], sim_runner.OUTPUTS_FILE)) == [first['scores']]
+
+    # The launch mode is part of the key: a library run is not answered by the .do run
+    assert sim_runner.job_cache_key(job) != sim_runner.job_cache_key(job, library='lib')
+    assert sim_runner.job_cache_key(job) != sim_runner.job_cache_key(job, plusargs=['+VERBOSITY=0'])
+
+    # A different image is a different key, and failures are never cached
+    write_mem(os.path.join(job['dir'], job['image_name']), list(range(45, 0, -1)))
+    assert sim_runner.run_job(job, simulator=FAKE_VSIM, cache_dir=cache)['status'] == 'failed'
+    assert sim_runner.run_job(job, simulator=FAKE_VSIM, cache_dir=cache)['status'] == 'failed'
+
+
+def test_verbosity_plusarg_quiets_transcript(tmp_path):
+    """+VERBOSITY=0 trims the transcript but the scores still come through the results file"""
+    loud, quiet = make_jobs(tmp_path, 2)
+    lib = str(tmp_path / 'lib')
+    verbose = sim_runner.run_job(loud, simulator=FAKE_VSIM, library=lib)
+    silent = sim_runner.run_job(quiet, simulator=FAKE_VSIM, library=lib, verbosity=0)
+
+    assert 'completed successfully' in open(verbose['transcript']).read()
+    transcript = open(silent['transcript']).read()
+    assert '+VERBOSITY=0' in transcript and 'completed successfully' not in transcript
+    assert silent['status'] == 'passed' and silent['cycles'] == 45
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for the stall watchdog and the asyncio job runner, using the fake simulator stub
+"""
+
+import os
+import sys
+import time
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+import sim_runner
+from sim_watchdog import ProgressTracker, watch_process, LINE_LIMIT
+from factories import make_jobs, FAKE_VSIM
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_only_moving_counters_count_as_progress():
+    """Start-up chatter and new counters reset the stall clock, repeated heartbeats do not"""
+    clock = FakeClock()
+    tracker = ProgressTracker(clock)
+    clock.now = 5
+    tracker.feed('# Loading work.tb_full_system_top\n')
+    assert tracker.last_progress == 5
+
+    clock.now = 10
+    tracker.feed('# HEARTBEAT cycle=10000 test=0 first=900 bneck=0 state=1\n')
+    clock.now = 20
+    tracker.feed('# HEARTBEAT cycle=20000 test=0 first=900 bneck=0 state=1\n')
+    tracker.feed('# REAL WEIGHTS BNECK_0: Starting Conv1 (1x1 expansion)\n')
+    assert tracker.last_progress == 10 and tracker.sim_cycles == 20000
+
+    clock.now = 30
+    tracker.feed('#   Cycle 10000: First outputs=900, BNeck outputs=7, First done=1, BNeck done=0\n')
+    assert tracker.last_progress == 30
+    clock.now = 40
+    tracker.feed('# ✅ Test 0 completed successfully in 65000 cycles\n')
+    assert tracker.last_progress == 40 and tracker.sim_cycles == 65000
+    assert tracker.stats()['cycles_per_second'] == 65000 / 40
+
+
+def test_watchdog_runs_jobs_and_reports_cycle_rate(tmp_path):
+    """Healthy jobs pass under the watchdog with the same scores as the thread runner"""
+    jobs = make_jobs(tmp_path, 3)
+    lib = str(tmp_path / 'lib')
+    plain = sim_runner.run_jobs(jobs, workers=3, progress=False, simulator=FAKE_VSIM, library=lib)
+    watched = sim_runner.run_jobs(jobs, workers=2, progress=False, simulator=FAKE_VSIM, library=lib,
+                                  stall_timeout=5, heartbeat=10)
+
+    assert [r['status'] for r in watched] == ['passed'] * 3
+    assert [r['scores'] for r in watched] == [r['scores'] for r in plain]
+    assert all(r['sim_cycles'] == 45 and r['cycles_per_second'] > 0 for r in watched)
+    assert 'HEARTBEAT cycle=40' in open(watched[0]['transcript']).read()
+
+
+def test_stalled_job_is_killed_early(tmp_path, monkeypatch):
+    """A job whose counters freeze is killed after the stall timeout, not the hard limit"""
+    job = make_jobs(tmp_path, 1)[0]
+    monkeypatch.setenv('FAKE_VSIM_STALL', '1')
+    start = time.time()
+    result = sim_runner.run_jobs([job], progress=False, simulator=FAKE_VSIM, library=str(tmp_path / 'lib'),
+                                 stall_timeout=0.5, heartbeat=10, timeout=60)[0]
+
+    assert result['status'] == 'stalled' and result['returncode'] is None
+    assert time.time() - start < 10
+    assert 'Watchdog: killed (stalled' in open(result['transcript']).read()
+
+
+def test_over_long_output_lines_are_kept(tmp_path):
+    """A line beyond the stream limit is copied to the transcript in chunks instead of killing the watcher"""
+    script = f"import sys; sys.stdout.write('x' * {3 * LINE_LIMIT} + '\\nlast line\\n')"
+    transcript = str(tmp_path / 'transcript.log')
+    result = asyncio.run(watch_process([sys.executable, '-c', script], str(tmp_path), transcript, 5, 30))
+    assert result['status'] == 'passed' and result['returncode'] == 0
+    text = open(transcript).read()
+    assert text.count('x') == 3 * LINE_LIMIT and text.endswith('\nlast line\n')
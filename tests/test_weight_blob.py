@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for the packed weight blob and its manifest
+"""
+
+import os
+import sys
+import json
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import golden_model as gm
+import weight_blob as wb
+
+
+def test_blob_round_trip(tmp_path):
+    """Hex text, binary and manifest all describe the same aligned words"""
+    rng = np.random.default_rng(0)
+    tensors = [('a.weight', 'a_conv.mem', rng.integers(-32768, 32768, size=(3, 1, 3, 3))),
+               ('a.bias', 'a_bias.mem', rng.integers(-300, 300, size=(3,)))]
+    manifest = wb.write_weight_blob(str(tmp_path), tensors)
+
+    assert [e['offset'] for e in manifest['tensors']] == [0, 32]
+    assert manifest['tensors'][1]['qformat'] == 'Q8.8'
+    hex_words = np.array([int(l, 16) for l in (tmp_path / wb.BLOB_HEX).read_text().split()])
+    assert hex_words.size == manifest['total_words'] == os.path.getsize(tmp_path / wb.BLOB_BIN) // 2
+
+    params, _ = wb.load_weight_blob(str(tmp_path))
+    for key, _, values in tensors:
+        assert np.array_equal(params[key], values)
+    assert json.loads((tmp_path / wb.BLOB_MANIFEST).read_text())['byte_order'] == 'little'
+
+
+def test_golden_model_prefers_blob(tmp_path):
+    """The golden model loads its parameters from the blob when one is present"""
+    rng = np.random.default_rng(1)
+    layout = gm.parameter_layout()
+    tensors = [(key, filename, rng.integers(-40, 40, size=shape)) for key, filename, shape in layout]
+    wb.write_weight_blob(str(tmp_path), tensors, extra={'fold_bn': False})
+    params = gm.load_parameters(str(tmp_path))
+    for key, _, values in tensors:
+        assert np.array_equal(params[key], values)
+
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    with tempfile.TemporaryDirectory() as d:
+        test_blob_round_trip(pathlib.Path(d))
+    print("✅ Weight blob tests passed")